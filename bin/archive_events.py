@@ -0,0 +1,73 @@
+"""
+Archive old months of events to compressed files and drop them from the DB.
+
+Each month's `event`, `event_user` and `event_data` partitions are exported
+to gzipped CSV files and then detached and dropped, one month per
+transaction. Reports are built from the events left in the DB, so archived
+months drop out of them the next time they are created from scratch.
+"""
+
+from argparse import ArgumentParser
+from pathlib import Path
+
+from pyramid.paster import bootstrap
+
+from lms.services import EventPartitionService
+
+parser = ArgumentParser(description=__doc__.strip().split("\n", maxsplit=1)[0])
+parser.add_argument(
+    "-c",
+    "--config-file",
+    required=True,
+    help="The paster config for this application. (e.g. development.ini)",
+)
+parser.add_argument(
+    "-d",
+    "--directory",
+    required=True,
+    type=Path,
+    help="The directory to write the archive files to",
+)
+parser.add_argument(
+    "--keep-months",
+    type=int,
+    default=24,
+    help="How many whole months of events before this one to keep in the DB",
+)
+parser.add_argument(
+    "--dry-run",
+    action="store_const",
+    default=False,
+    const=True,
+    help="List the months which would be archived without archiving them",
+)
+
+
+def main():
+    args = parser.parse_args()
+    args.directory.mkdir(parents=True, exist_ok=True)
+
+    with bootstrap(args.config_file) as env:
+        request = env["request"]
+        partition_service = request.find_service(EventPartitionService)
+
+        with request.tm:
+            months = partition_service.old_months(keep_months=args.keep_months)
+
+        for month in months:
+            if args.dry_run:
+                print(f"Dry run! Would archive: {month:%Y-%m}")
+                continue
+
+            # Commit after each month so we don't hold locks on the event
+            # tables for longer than it takes to archive one month
+            with request.tm:
+                paths = partition_service.archive(month, args.directory)
+
+            print(f"Archived {month:%Y-%m}:")
+            for path in paths:
+                print(f"    {path}")
+
+
+if __name__ == "__main__":
+    main()
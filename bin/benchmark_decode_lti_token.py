@@ -0,0 +1,102 @@
+"""
+Micro-benchmark for verifying LTI 1.3 `id_token`s.
+
+Compares the old way of verifying a launch's `id_token`, which parsed the
+token three times with PyJWT (unverified header, unverified claims and then
+the real verification), with `JWTService.verify_lti_token()`, which parses it
+once. Network and database lookups are stubbed out so only the JWT work is
+measured.
+
+    python bin/benchmark_decode_lti_token.py -n 5000
+"""
+import json
+import timeit
+from argparse import ArgumentParser
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+import jwt
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jwt.algorithms import RSAAlgorithm
+
+from lms.services.jwt import JWTService
+
+parser = ArgumentParser(description="Time verifying an LTI 1.3 id_token")
+parser.add_argument(
+    "-n", "--number", type=int, default=2000, help="Tokens to verify per run"
+)
+parser.add_argument(
+    "-r", "--repeat", type=int, default=5, help="Runs (the best one is shown)"
+)
+
+
+def _make_token():
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    signing_key = jwt.PyJWK.from_dict(
+        json.loads(RSAAlgorithm.to_jwk(private_key.public_key()))
+    )
+    # Roughly the size of a real launch
+    claims = {
+        "iss": "https://lms.example.com",
+        "aud": "CLIENT_ID",
+        "sub": "USER_ID",
+        "nonce": "NONCE",
+        "https://purl.imsglobal.org/spec/lti/claim/roles": [
+            "http://purl.imsglobal.org/vocab/lis/v2/membership#Learner"
+        ]
+        * 3,
+        "https://purl.imsglobal.org/spec/lti/claim/custom": {
+            f"custom_{i}": "value" * 10 for i in range(20)
+        },
+    }
+    id_token = jwt.encode(
+        claims, private_key, algorithm="RS256", headers={"kid": "KID"}
+    )
+    return id_token, signing_key
+
+
+def _old_decode(id_token, registration_service, platform_jwks):
+    kid = jwt.get_unverified_header(id_token)["kid"]
+    unverified = jwt.decode(id_token, options={"verify_signature": False})
+    registration = registration_service.get(unverified["iss"], unverified["aud"])
+    signing_key = platform_jwks.get_signing_key(registration.key_set_url, kid)
+    return jwt.decode(
+        id_token,
+        key=signing_key.key,
+        audience=unverified["aud"],
+        algorithms=["RS256"],
+    )
+
+
+def main():
+    args = parser.parse_args()
+
+    id_token, signing_key = _make_token()
+    registration_service = Mock(
+        get=Mock(return_value=SimpleNamespace(key_set_url="https://lms/jwks"))
+    )
+    platform_jwks = Mock(get_signing_key=Mock(return_value=signing_key))
+    svc = JWTService(registration_service, Mock(), platform_jwks)
+
+    assert _old_decode(id_token, registration_service, platform_jwks) == (
+        svc.decode_lti_token(id_token)
+    )
+
+    results = {}
+    for name, func in (
+        ("old", lambda: _old_decode(id_token, registration_service, platform_jwks)),
+        ("verify_lti_token", lambda: svc.verify_lti_token(id_token)),
+    ):
+        best = min(timeit.repeat(func, number=args.number, repeat=args.repeat))
+        results[name] = best / args.number * 1e6
+        print(f"{name:>18}: {results[name]:8.1f} µs per token")
+
+    saving = results["old"] - results["verify_lti_token"]
+    print(
+        f"{'saving':>18}: {saving:8.1f} µs per launch "
+        f"({saving / results['old']:.0%})"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Find the steps of a data task which were slower than usual in its last run.
+
+This compares the latest run log written by `bin/run_data_task.py --log-dir`
+for a task with the runs before it, and exits with an error if any steps have
+regressed.
+"""
+
+import sys
+from argparse import ArgumentParser
+from pathlib import Path
+
+from lms.scripts.data_task_log import find_regressions, load_run_logs
+
+parser = ArgumentParser(description=__doc__.strip().split("\n", maxsplit=1)[0])
+parser.add_argument(
+    "-d",
+    "--log-dir",
+    required=True,
+    type=Path,
+    help="The directory the run logs were written to",
+)
+parser.add_argument("-t", "--task", required=True, help="The data task name")
+parser.add_argument(
+    "--runs",
+    type=int,
+    default=5,
+    help="How many runs before the latest to compare it with",
+)
+parser.add_argument(
+    "--threshold",
+    type=float,
+    default=1.5,
+    help="How many times slower than usual a step must be to be reported",
+)
+parser.add_argument(
+    "--min-seconds",
+    type=float,
+    default=1.0,
+    help="How many seconds slower than usual a step must be to be reported",
+)
+
+
+def main():
+    args = parser.parse_args()
+
+    run_logs = load_run_logs(args.log_dir, args.task)
+    if len(run_logs) < 2:
+        sys.exit(f"Need at least two run logs for '{args.task}' to compare")
+
+    latest, previous = run_logs[-1], run_logs[-args.runs - 1 : -1]
+    regressions = find_regressions(
+        latest, previous, threshold=args.threshold, min_seconds=args.min_seconds
+    )
+
+    print(
+        f"Compared the run at {latest['started_at']} with {len(previous)} "
+        "previous runs"
+    )
+    if not regressions:
+        print("No steps regressed")
+        return
+
+    for regression in regressions:
+        print(
+            f"{regression.step}: {regression.duration:.3f}s, usually "
+            f"{regression.baseline:.3f}s ({regression.ratio:.1f}x)"
+        )
+    sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
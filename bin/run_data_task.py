@@ -4,17 +4,29 @@ Task runner for tasks written as SQL files in directories.
 This is a general mechanism for running tasks defined in SQL, however it's
 currently only used to perform the aggregations and mappings required for
 reporting.
+
+By default every script runs in order in one transaction. Scripts can declare
+the scripts they depend on (see `lms.scripts.data_task_runner`), and with
+`--workers` above one, scripts which don't depend on each other run at the
+same time on separate connections.
+
+With `--log-dir` the time and rows of every step and query are written to a
+JSON run log, which `bin/compare_data_task_runs.py` can compare with earlier
+runs to find steps which have slowed down.
 """
 
 from argparse import ArgumentParser
+from datetime import datetime
+from functools import partial
+from pathlib import Path
 
-import data_tasks
 import importlib_resources
-from data_tasks.python_script import PythonScript
 from psycopg2.extensions import parse_dsn
 from pyramid.paster import bootstrap
 
 from lms.models import Regions
+from lms.scripts.data_task_log import make_run_log, write_run_log
+from lms.scripts.data_task_runner import DataTaskRunner, format_timings, load_steps
 
 TASK_ROOT = importlib_resources.files("lms.data_tasks")
 
@@ -44,6 +56,28 @@ parser.add_argument(
     const=True,
     help="Run through the task without executing anything for real",
 )
+parser.add_argument(
+    "-w",
+    "--workers",
+    type=int,
+    default=1,
+    help=(
+        "How many scripts to run at once. With more than one each script "
+        "commits separately, instead of the whole task in one transaction"
+    ),
+)
+parser.add_argument(
+    "--log-dir",
+    type=Path,
+    help="Write a JSON log of the time and rows of each step to this directory",
+)
+parser.add_argument(
+    "--explain",
+    action="store_const",
+    default=False,
+    const=True,
+    help="Run queries with EXPLAIN (ANALYZE, BUFFERS) and log their plans",
+)
 
 
 def main():
@@ -55,7 +89,7 @@ def main():
 
         Regions.set_region(settings["h_authority"])
 
-        scripts = data_tasks.from_dir(
+        steps = load_steps(
             task_dir=TASK_ROOT / args.task,
             template_vars={
                 "db_user": parse_dsn(settings["database_url"].strip())["user"],
@@ -65,19 +99,43 @@ def main():
             },
         )
 
-        # Run the update in a transaction, so we roll back if it goes wrong
-        with request.db.bind.connect() as connection:
-            with connection.begin():
-                for script in scripts:
-                    if args.no_python and isinstance(script, PythonScript):
-                        print(f"Skipping: {script}")
-                        continue
+        runner = DataTaskRunner(
+            engine=request.db.bind,
+            workers=args.workers,
+            dry_run=args.dry_run,
+            skip_python=args.no_python,
+            explain=args.explain,
+            on_step_done=partial(print_step, dry_run=args.dry_run),
+        )
+        started_at = datetime.utcnow()
+        try:
+            runner.run(steps)
+        finally:
+            print(format_timings(sorted(steps, key=_slowest_first)))
+
+            if args.log_dir:
+                args.log_dir.mkdir(parents=True, exist_ok=True)
+                path = write_run_log(
+                    args.log_dir,
+                    make_run_log(args.task, started_at, args.workers, steps),
+                )
+                print(f"Wrote run log: {path}")
+
+
+def print_step(step, dry_run):
+    if step.status == "skipped":
+        print(f"Skipping: {step.script}")
+        return
+
+    for result in step.results:
+        if dry_run:
+            print("Dry run!")
+
+        print(result.dump(indent="    ") + "\n")
 
-                    for step in script.execute(connection, dry_run=args.dry_run):
-                        if args.dry_run:
-                            print("Dry run!")
 
-                        print(step.dump(indent="    ") + "\n")
+def _slowest_first(step):
+    return -(step.duration or 0)
 
 
 if __name__ == "__main__":
@@ -105,6 +105,7 @@ def create_app(global_config, **settings):  # pylint: disable=unused-argument
     config.include("lms.views")
     config.include("lms.services")
     config.include("lms.services.jwt")
+    config.include("lms.services.snapshot_cache")
     config.include("lms.validation")
     config.include("lms.tweens")
     config.add_static_view(name="export", path="lms:static/export")
@@ -101,6 +101,15 @@ SETTINGS = (
     _Setting("jstor_api_url"),
     _Setting("jstor_api_secret"),
     _Setting("disable_key_rotation", value_mapper=asbool),
+    # Send h syncs for users and groups h already knows about in the
+    # background with celery, rather than during the launch.
+    _Setting("h_sync_async", value_mapper=asbool),
+    # Write events in batches with celery after the request has finished,
+    # rather than as part of the request's transaction.
+    _Setting("events_write_behind", value_mapper=asbool),
+    # Where the app is served from, e.g. "https://lms.hypothes.is". Celery
+    # tasks use this to generate URLs like OAuth 2 redirect URIs.
+    _Setting("app_url"),
 )
 
 
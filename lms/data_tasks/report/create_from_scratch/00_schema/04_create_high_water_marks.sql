@@ -0,0 +1,13 @@
+DROP TABLE IF EXISTS report.high_water_marks CASCADE;
+
+-- How far the tables updated by `report/incremental` have got, so each run
+-- only needs to merge in what's new since the last one. Deleting a row here
+-- makes the next run rebuild that table from scratch.
+CREATE TABLE report.high_water_marks (
+    name TEXT PRIMARY KEY,
+    -- The last `event.id` merged into `report.events`
+    event_id INTEGER,
+    -- The last `created_week` merged from H's annotation counts
+    created_week DATE,
+    updated TIMESTAMP NOT NULL DEFAULT NOW()
+);
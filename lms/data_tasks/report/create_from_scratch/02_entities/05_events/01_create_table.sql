@@ -0,0 +1,25 @@
+DROP TYPE IF EXISTS report.event_type CASCADE;
+
+CREATE TYPE report.event_type AS ENUM (
+    'configured_launch', 'deep_linking', 'audit'
+);
+
+DROP TABLE IF EXISTS report.events CASCADE;
+
+-- A compressed version of the event table aggregated by week. This is a table
+-- rather than a materialized view so we can merge in new events as they
+-- arrive (see `report.merge_events()`).
+
+CREATE TABLE report.events (
+    timestamp_week DATE NOT NULL,
+    organization_id INTEGER,
+    event_type report.event_type NOT NULL,
+    user_id INTEGER,
+    event_count BIGINT NOT NULL
+);
+
+-- Lots of events don't have users, and so organizations. NULLs are never
+-- equal in unique indexes, so we coalesce them for the upserts to match
+CREATE UNIQUE INDEX events_timestamp_week_organization_id_event_type_user_id_idx ON report.events (
+    timestamp_week, COALESCE(organization_id, -1), event_type, COALESCE(user_id, -1)
+);
@@ -0,0 +1,101 @@
+-- Add the events which have arrived since the last time this was called to
+-- `report.events`, or recount all events if `full_rebuild` is true. Returns
+-- the number of rows of `report.events` which were added or updated.
+--
+-- Events are counted against the organization and user they map to when
+-- they are merged, so changes to `report.user_map` and deleted events only
+-- show up for older events after a full rebuild.
+
+CREATE OR REPLACE FUNCTION report.merge_events(full_rebuild BOOLEAN DEFAULT FALSE)
+RETURNS INTEGER
+AS $$
+DECLARE
+    last_event_id INTEGER;
+    max_event_id INTEGER;
+    oldest_running_age INTEGER;
+    merged_rows INTEGER;
+BEGIN
+    IF full_rebuild THEN
+        DELETE FROM report.high_water_marks WHERE name = 'events';
+    END IF;
+
+    SELECT event_id INTO last_event_id
+    FROM report.high_water_marks WHERE name = 'events';
+
+    -- Without a high water mark we are starting again from the first event,
+    -- so anything already counted has to go or it would be counted twice
+    IF last_event_id IS NULL THEN
+        -- Not `TRUNCATE` so people can still read the old numbers until we
+        -- commit the new ones
+        DELETE FROM report.events;
+        last_event_id := 0;
+    END IF;
+
+    -- Event ids are handed out before the transactions writing them commit,
+    -- so a transaction which is still running might add events with lower
+    -- ids than ones we can already see. Event timestamps don't help here as
+    -- the write-behind queue holds on to events before writing them. Instead
+    -- only count events written by transactions older than the oldest one
+    -- still running, leaving the rest for the next run
+    oldest_running_age := AGE(
+        (TXID_SNAPSHOT_XMIN(TXID_CURRENT_SNAPSHOT()) % 4294967296)::TEXT::XID
+    );
+
+    SELECT MAX(id) INTO max_event_id
+    FROM event
+    WHERE id > last_event_id AND AGE(xmin) > oldest_running_age;
+
+    IF max_event_id IS NULL THEN
+        RETURN 0;
+    END IF;
+
+    WITH
+        new_events AS NOT MATERIALIZED (
+            SELECT id, timestamp, type_id
+            FROM event
+            WHERE id > last_event_id AND id <= max_event_id
+        ),
+
+        -- Unique event user relations without considering role
+        unique_event_users AS (
+            SELECT DISTINCT event_user.event_id, event_user.user_id
+            FROM event_user
+            JOIN new_events ON
+                event_user.event_id = new_events.id
+                -- Matching on the partition key too lets Postgres skip the
+                -- months we aren't interested in
+                AND event_user.event_timestamp = new_events.timestamp
+        )
+
+    INSERT INTO report.events (
+        timestamp_week, organization_id, event_type, user_id, event_count
+    )
+    SELECT
+        DATE_TRUNC('week', new_events.timestamp)::date AS timestamp_week,
+        user_map.organization_id,
+        event_type.type::report.event_type AS event_type,
+        user_map.user_id,
+        COUNT(1) AS event_count
+    FROM new_events
+    JOIN event_type ON
+        new_events.type_id = event_type.id
+    -- Lots of events don't have users
+    LEFT OUTER JOIN unique_event_users ON
+        unique_event_users.event_id = new_events.id
+    LEFT OUTER JOIN report.user_map ON
+        unique_event_users.user_id = user_map.lms_user_id
+    GROUP BY timestamp_week, user_map.organization_id, event_type.type, user_map.user_id
+    ON CONFLICT (
+        timestamp_week, COALESCE(organization_id, -1), event_type, COALESCE(user_id, -1)
+    )
+    DO UPDATE SET event_count = events.event_count + EXCLUDED.event_count;
+
+    GET DIAGNOSTICS merged_rows = ROW_COUNT;
+
+    INSERT INTO report.high_water_marks (name, event_id) VALUES ('events', max_event_id)
+    ON CONFLICT (name) DO UPDATE SET event_id = EXCLUDED.event_id, updated = NOW();
+
+    RETURN merged_rows;
+END;
+$$
+LANGUAGE plpgsql;
@@ -0,0 +1,7 @@
+-- Let Postgres join and aggregate the event tables a month at a time
+SET LOCAL enable_partitionwise_join = on;
+SET LOCAL enable_partitionwise_aggregate = on;
+
+SELECT report.merge_events(full_rebuild => true);
+
+ANALYSE report.events;
@@ -0,0 +1,13 @@
+DROP TABLE IF EXISTS report.group_activity CASCADE;
+
+-- A weekly count of groups with annotation activity. This is a table rather
+-- than a materialized view so we only need to fetch recent weeks from H
+-- (see `report.merge_group_activity()`).
+
+CREATE TABLE report.group_activity (
+    created_week DATE NOT NULL,
+    group_id INTEGER NOT NULL,
+    annotation_count BIGINT NOT NULL
+);
+
+CREATE UNIQUE INDEX group_activity_created_week_group_id_idx ON report.group_activity (created_week, group_id);
@@ -0,0 +1,53 @@
+-- Fetch the weeks of annotation counts for `region_authority` which have
+-- changed since the last time this was called from H into
+-- `report.group_activity`, or fetch every week if `full_rebuild` is true.
+-- Returns the number of rows which were added or updated.
+--
+-- The last week we fetched was probably still in progress, so we fetch it
+-- again. Changes to the counts for older weeks (e.g. from deleted
+-- annotations) only show up after a full rebuild.
+
+CREATE OR REPLACE FUNCTION report.merge_group_activity(
+    region_authority TEXT, full_rebuild BOOLEAN DEFAULT FALSE
+)
+RETURNS INTEGER
+AS $$
+DECLARE
+    last_week DATE;
+    merged_rows INTEGER;
+BEGIN
+    IF full_rebuild THEN
+        DELETE FROM report.group_activity;
+        DELETE FROM report.high_water_marks WHERE name = 'group_activity';
+    END IF;
+
+    SELECT COALESCE(MAX(created_week), '1901-01-01') INTO last_week
+    FROM report.high_water_marks WHERE name = 'group_activity';
+
+    -- The filter on `created_week` is sent to H over the FDW, so we only
+    -- transfer the weeks we need
+    INSERT INTO report.group_activity (created_week, group_id, annotation_count)
+    SELECT
+        created_week,
+        group_id,
+        count AS annotation_count
+    FROM h.annotation_group_counts
+    JOIN h.authorities ON
+        annotation_group_counts.authority_id = authorities.id
+        AND authorities.authority = region_authority
+    WHERE created_week >= last_week
+    ON CONFLICT (created_week, group_id)
+    DO UPDATE SET annotation_count = EXCLUDED.annotation_count;
+
+    GET DIAGNOSTICS merged_rows = ROW_COUNT;
+
+    INSERT INTO report.high_water_marks (name, created_week)
+    SELECT 'group_activity', MAX(created_week) FROM report.group_activity
+    HAVING MAX(created_week) IS NOT NULL
+    ON CONFLICT (name) DO UPDATE
+        SET created_week = EXCLUDED.created_week, updated = NOW();
+
+    RETURN merged_rows;
+END;
+$$
+LANGUAGE plpgsql;
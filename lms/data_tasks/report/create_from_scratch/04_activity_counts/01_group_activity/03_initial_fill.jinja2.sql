@@ -0,0 +1,3 @@
+SELECT report.merge_group_activity('{{ region.authority }}', full_rebuild => true);
+
+ANALYSE report.group_activity;
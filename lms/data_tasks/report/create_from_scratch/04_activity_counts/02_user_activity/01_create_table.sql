@@ -0,0 +1,13 @@
+DROP TABLE IF EXISTS report.user_activity CASCADE;
+
+-- Annotation activity by users in a given period. This is a table rather
+-- than a materialized view so we only need to fetch recent weeks from H
+-- (see `report.merge_user_activity()`).
+
+CREATE TABLE report.user_activity (
+    created_week DATE NOT NULL,
+    user_id INTEGER NOT NULL,
+    annotation_count BIGINT NOT NULL
+);
+
+CREATE UNIQUE INDEX user_activity_created_week_user_id_idx ON report.user_activity (created_week, user_id);
@@ -0,0 +1,51 @@
+-- Fetch the weeks of annotation counts for `region_authority` which have
+-- changed since the last time this was called from H into
+-- `report.user_activity`, or fetch every week if `full_rebuild` is true.
+-- Returns the number of rows which were added or updated.
+--
+-- As with `report.merge_group_activity()` the last week we fetched is
+-- fetched again, and older weeks only change after a full rebuild.
+
+CREATE OR REPLACE FUNCTION report.merge_user_activity(
+    region_authority TEXT, full_rebuild BOOLEAN DEFAULT FALSE
+)
+RETURNS INTEGER
+AS $$
+DECLARE
+    last_week DATE;
+    merged_rows INTEGER;
+BEGIN
+    IF full_rebuild THEN
+        DELETE FROM report.user_activity;
+        DELETE FROM report.high_water_marks WHERE name = 'user_activity';
+    END IF;
+
+    SELECT COALESCE(MAX(created_week), '1901-01-01') INTO last_week
+    FROM report.high_water_marks WHERE name = 'user_activity';
+
+    INSERT INTO report.user_activity (created_week, user_id, annotation_count)
+    SELECT
+        created_week,
+        user_id,
+        SUM(count) AS annotation_count
+    FROM h.annotation_user_counts
+    JOIN h.authorities ON
+        annotation_user_counts.authority_id = authorities.id
+        AND authorities.authority = region_authority
+    WHERE created_week >= last_week
+    GROUP BY created_week, user_id
+    ON CONFLICT (created_week, user_id)
+    DO UPDATE SET annotation_count = EXCLUDED.annotation_count;
+
+    GET DIAGNOSTICS merged_rows = ROW_COUNT;
+
+    INSERT INTO report.high_water_marks (name, created_week)
+    SELECT 'user_activity', MAX(created_week) FROM report.user_activity
+    HAVING MAX(created_week) IS NOT NULL
+    ON CONFLICT (name) DO UPDATE
+        SET created_week = EXCLUDED.created_week, updated = NOW();
+
+    RETURN merged_rows;
+END;
+$$
+LANGUAGE plpgsql;
@@ -0,0 +1,3 @@
+SELECT report.merge_user_activity('{{ region.authority }}', full_rebuild => true);
+
+ANALYSE report.user_activity;
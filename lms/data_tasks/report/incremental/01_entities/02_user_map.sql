@@ -0,0 +1,4 @@
+-- depends-on: 01_entities/01_users
+
+REFRESH MATERIALIZED VIEW CONCURRENTLY report.user_map;
+ANALYSE report.user_map;
@@ -0,0 +1,4 @@
+-- depends-on: 01_entities/02_user_map
+
+SELECT report.merge_events();
+ANALYSE report.events;
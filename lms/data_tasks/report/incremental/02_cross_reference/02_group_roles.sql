@@ -0,0 +1,4 @@
+-- depends-on: 01_entities/02_user_map, 01_entities/03_groups, 01_entities/04_group_map, 02_cross_reference/01_user_groups
+
+REFRESH MATERIALIZED VIEW CONCURRENTLY report.group_roles;
+ANALYSE report.group_roles;
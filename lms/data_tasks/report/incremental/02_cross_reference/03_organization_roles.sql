@@ -0,0 +1,4 @@
+-- depends-on: 01_entities/04_group_map, 02_cross_reference/02_group_roles
+
+REFRESH MATERIALIZED VIEW CONCURRENTLY report.organization_roles;
+ANALYSE report.organization_roles;
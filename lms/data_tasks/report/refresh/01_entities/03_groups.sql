@@ -0,0 +1,4 @@
+-- depends-on: 00_fdw_refresh
+
+REFRESH MATERIALIZED VIEW CONCURRENTLY report.groups;
+ANALYSE report.groups;
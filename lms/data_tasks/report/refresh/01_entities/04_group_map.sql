@@ -0,0 +1,4 @@
+-- depends-on: 01_entities/03_groups
+
+REFRESH MATERIALIZED VIEW CONCURRENTLY report.group_map;
+ANALYSE report.group_map;
@@ -0,0 +1,8 @@
+-- depends-on: 01_entities/02_user_map
+
+-- Let Postgres join and aggregate the event tables a month at a time
+SET LOCAL enable_partitionwise_join = on;
+SET LOCAL enable_partitionwise_aggregate = on;
+
+SELECT report.merge_events(full_rebuild => true);
+ANALYSE report.events;
@@ -0,0 +1,4 @@
+-- depends-on: 00_fdw_refresh
+
+REFRESH MATERIALIZED VIEW CONCURRENTLY report.user_groups;
+ANALYSE report.user_groups;
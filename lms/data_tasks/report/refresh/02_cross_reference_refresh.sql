@@ -1,8 +0,0 @@
-REFRESH MATERIALIZED VIEW CONCURRENTLY report.user_groups;
-ANALYSE report.user_groups;
-
-REFRESH MATERIALIZED VIEW CONCURRENTLY report.group_roles;
-ANALYSE report.group_roles;
-
-REFRESH MATERIALIZED VIEW CONCURRENTLY report.organization_roles;
-ANALYSE report.organization_roles;
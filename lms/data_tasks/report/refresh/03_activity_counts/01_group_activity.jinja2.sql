@@ -0,0 +1,4 @@
+-- depends-on: 00_fdw_refresh
+
+SELECT report.merge_group_activity('{{ region.authority }}', full_rebuild => true);
+ANALYSE report.group_activity;
@@ -0,0 +1,4 @@
+-- depends-on: 00_fdw_refresh
+
+SELECT report.merge_user_activity('{{ region.authority }}', full_rebuild => true);
+ANALYSE report.user_activity;
@@ -0,0 +1,4 @@
+-- depends-on: 01_entities/04_group_map, 01_entities/05_events, 02_cross_reference, 03_activity_counts/01_group_activity, 03_activity_counts/02_user_activity
+
+REFRESH MATERIALIZED VIEW CONCURRENTLY report.organization_activity;
+ANALYSE report.organization_activity;
@@ -1,8 +0,0 @@
-REFRESH MATERIALIZED VIEW CONCURRENTLY report.group_activity;
-ANALYSE report.group_activity;
-
-REFRESH MATERIALIZED VIEW CONCURRENTLY report.user_activity;
-ANALYSE report.organization_activity;
-
-REFRESH MATERIALIZED VIEW CONCURRENTLY report.organization_activity;
-ANALYSE report.organization_activity;
@@ -7,4 +7,9 @@ from lms.services import EventService
 @subscriber(BaseEvent)
 def handle_event(event: BaseEvent):
     """Record the event in the Event model's table."""
-    event.request.find_service(EventService).insert_event(event)
+    event_service = event.request.find_service(EventService)
+
+    if event.request.registry.settings["events_write_behind"]:
+        event_service.queue_event(event)
+    else:
+        event_service.insert_event(event)
@@ -0,0 +1,306 @@
+"""
+Partition event, event_user and event_data by month.
+
+The child tables get a copy of the event's timestamp so they can be
+partitioned (and referenced) along with their event.
+
+This recreates the tables and copies the existing events across, so the
+`lti_launches` view is recreated and the `report.events` materialized view
+(and the report views built on it) are dropped. Run the `report/create_from_scratch`
+data task afterwards to rebuild the reports.
+
+Revision ID: c83cf6229071
+Revises: 6eb9de301ac3
+Create Date: 2022-11-21 10:14:32.118402
+
+"""
+from datetime import date
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "c83cf6229071"
+down_revision = "6eb9de301ac3"
+
+# How many months after this one to create partitions for. After this the
+# `create_event_partitions` task keeps them topped up.
+MONTHS_AHEAD = 3
+
+# Names which are backed by an index, and so would clash between the old and
+# new tables while we copy from one to the other.
+INDEXES = {
+    "event": [
+        "ix__event_timestamp",
+        "ix__event_application_instance_id",
+        "ix__event_assignment_id",
+        "ix__event_course_id",
+        "ix__event_type_id",
+    ],
+    "event_user": ["ix__event_user_lti_role_id", "ix__event_user_user_id"],
+    "event_data": [],
+}
+CONSTRAINTS = {
+    "event": ["pk__event"],
+    "event_user": ["uq__event_user__event_id", "pk__event_user"],
+    "event_data": ["pk__event_data"],
+}
+
+
+def upgrade():
+    conn = op.get_bind()
+
+    _drop_views()
+    _rename_old_tables()
+
+    op.execute(
+        """
+        CREATE TABLE event (
+            id INTEGER NOT NULL DEFAULT nextval('event_id_seq'),
+            timestamp TIMESTAMP WITHOUT TIME ZONE DEFAULT now() NOT NULL,
+            type_id INTEGER,
+            application_instance_id INTEGER,
+            course_id INTEGER,
+            assignment_id INTEGER,
+            grouping_id INTEGER,
+            CONSTRAINT pk__event PRIMARY KEY (id, timestamp),
+            CONSTRAINT fk__event__type_id__event_type FOREIGN KEY(type_id)
+                REFERENCES event_type (id) ON DELETE cascade,
+            CONSTRAINT fk__event__application_instance_id__application_instances
+                FOREIGN KEY(application_instance_id)
+                REFERENCES application_instances (id) ON DELETE cascade,
+            CONSTRAINT fk__event__course_id__grouping FOREIGN KEY(course_id)
+                REFERENCES grouping (id) ON DELETE cascade,
+            CONSTRAINT fk__event__assignment_id__assignment FOREIGN KEY(assignment_id)
+                REFERENCES assignment (id) ON DELETE cascade,
+            CONSTRAINT fk__event__grouping_id__grouping FOREIGN KEY(grouping_id)
+                REFERENCES grouping (id) ON DELETE cascade
+        ) PARTITION BY RANGE (timestamp);
+
+        -- The event type table is tiny and never deleted from, so unlike the
+        -- other foreign keys `type_id` doesn't need an index
+        CREATE INDEX ix__event_timestamp ON event (timestamp);
+        CREATE INDEX ix__event_application_instance_id ON event (application_instance_id);
+        CREATE INDEX ix__event_assignment_id ON event (assignment_id);
+        CREATE INDEX ix__event_course_id ON event (course_id);
+
+        CREATE TABLE event_user (
+            id INTEGER NOT NULL DEFAULT nextval('event_user_id_seq'),
+            event_id INTEGER NOT NULL,
+            event_timestamp TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            user_id INTEGER NOT NULL,
+            lti_role_id INTEGER,
+            CONSTRAINT pk__event_user PRIMARY KEY (id, event_timestamp),
+            CONSTRAINT uq__event_user__event_id
+                UNIQUE (event_id, user_id, lti_role_id, event_timestamp),
+            CONSTRAINT fk__event_user__event_id__event
+                FOREIGN KEY(event_id, event_timestamp)
+                REFERENCES event (id, timestamp) ON DELETE cascade,
+            CONSTRAINT fk__event_user__user_id__user FOREIGN KEY(user_id)
+                REFERENCES "user" (id) ON DELETE cascade,
+            CONSTRAINT fk__event_user__lti_role_id__lti_role FOREIGN KEY(lti_role_id)
+                REFERENCES lti_role (id) ON DELETE cascade
+        ) PARTITION BY RANGE (event_timestamp);
+
+        CREATE INDEX ix__event_user_lti_role_id ON event_user (lti_role_id);
+        CREATE INDEX ix__event_user_user_id ON event_user (user_id);
+
+        CREATE TABLE event_data (
+            event_id INTEGER NOT NULL,
+            event_timestamp TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            extra JSONB DEFAULT '{}'::jsonb NOT NULL,
+            CONSTRAINT pk__event_data PRIMARY KEY (event_id, event_timestamp),
+            CONSTRAINT fk__event_data__event_id__event
+                FOREIGN KEY(event_id, event_timestamp)
+                REFERENCES event (id, timestamp) ON DELETE cascade
+        ) PARTITION BY RANGE (event_timestamp);
+        """
+    )
+
+    # Partitions for every month we have events for, and a few to come
+    first_month = conn.execute(
+        "SELECT DATE_TRUNC('month', MIN(timestamp))::date FROM event_old"
+    ).scalar()
+    this_month = date.today().replace(day=1)
+    month = min(first_month or this_month, this_month)
+    last_month = _add_months(this_month, MONTHS_AHEAD)
+    while month <= last_month:
+        next_month = _add_months(month, 1)
+        for table in ("event", "event_user", "event_data"):
+            op.execute(
+                f"""
+                CREATE TABLE {table}_{month:%Y_%m} PARTITION OF {table}
+                FOR VALUES FROM ('{month.isoformat()}') TO ('{next_month.isoformat()}')
+                """
+            )
+        month = next_month
+
+    op.execute(
+        """
+        CREATE TABLE event_default PARTITION OF event DEFAULT;
+        CREATE TABLE event_user_default PARTITION OF event_user DEFAULT;
+        CREATE TABLE event_data_default PARTITION OF event_data DEFAULT;
+
+        INSERT INTO event (
+            id, timestamp, type_id, application_instance_id,
+            course_id, assignment_id, grouping_id
+        )
+        SELECT
+            id, timestamp, type_id, application_instance_id,
+            course_id, assignment_id, grouping_id
+        FROM event_old;
+
+        INSERT INTO event_user (id, event_id, event_timestamp, user_id, lti_role_id)
+        SELECT event_user_old.id, event_id, event_old.timestamp, user_id, lti_role_id
+        FROM event_user_old
+        JOIN event_old ON event_old.id = event_user_old.event_id;
+
+        INSERT INTO event_data (event_id, event_timestamp, extra)
+        SELECT event_id, event_old.timestamp, extra
+        FROM event_data_old
+        JOIN event_old ON event_old.id = event_data_old.event_id;
+        """
+    )
+
+    _drop_old_tables()
+    _create_lti_launches_view()
+
+    op.execute(
+        """
+        ANALYZE event;
+        ANALYZE event_user;
+        ANALYZE event_data;
+        """
+    )
+
+
+def downgrade():
+    _drop_views()
+    _rename_old_tables()
+
+    op.execute(
+        """
+        CREATE TABLE event (
+            id INTEGER NOT NULL DEFAULT nextval('event_id_seq'),
+            timestamp TIMESTAMP WITHOUT TIME ZONE DEFAULT now() NOT NULL,
+            type_id INTEGER,
+            application_instance_id INTEGER,
+            course_id INTEGER,
+            assignment_id INTEGER,
+            grouping_id INTEGER,
+            CONSTRAINT pk__event PRIMARY KEY (id),
+            CONSTRAINT fk__event__type_id__event_type FOREIGN KEY(type_id)
+                REFERENCES event_type (id) ON DELETE cascade,
+            CONSTRAINT fk__event__application_instance_id__application_instances
+                FOREIGN KEY(application_instance_id)
+                REFERENCES application_instances (id) ON DELETE cascade,
+            CONSTRAINT fk__event__course_id__grouping FOREIGN KEY(course_id)
+                REFERENCES grouping (id) ON DELETE cascade,
+            CONSTRAINT fk__event__assignment_id__assignment FOREIGN KEY(assignment_id)
+                REFERENCES assignment (id) ON DELETE cascade,
+            CONSTRAINT fk__event__grouping_id__grouping FOREIGN KEY(grouping_id)
+                REFERENCES grouping (id) ON DELETE cascade
+        );
+
+        CREATE INDEX ix__event_timestamp ON event (timestamp);
+        CREATE INDEX ix__event_application_instance_id ON event (application_instance_id);
+        CREATE INDEX ix__event_assignment_id ON event (assignment_id);
+        CREATE INDEX ix__event_course_id ON event (course_id);
+        CREATE INDEX ix__event_type_id ON event (type_id);
+
+        CREATE TABLE event_user (
+            id INTEGER NOT NULL DEFAULT nextval('event_user_id_seq'),
+            event_id INTEGER NOT NULL,
+            user_id INTEGER NOT NULL,
+            lti_role_id INTEGER,
+            CONSTRAINT pk__event_user PRIMARY KEY (id, event_id),
+            CONSTRAINT uq__event_user__event_id UNIQUE (event_id, user_id, lti_role_id),
+            CONSTRAINT fk__event_user__event_id__event FOREIGN KEY(event_id)
+                REFERENCES event (id) ON DELETE cascade,
+            CONSTRAINT fk__event_user__user_id__user FOREIGN KEY(user_id)
+                REFERENCES "user" (id) ON DELETE cascade,
+            CONSTRAINT fk__event_user__lti_role_id__lti_role FOREIGN KEY(lti_role_id)
+                REFERENCES lti_role (id) ON DELETE cascade
+        );
+
+        CREATE INDEX ix__event_user_lti_role_id ON event_user (lti_role_id);
+        CREATE INDEX ix__event_user_user_id ON event_user (user_id);
+
+        CREATE TABLE event_data (
+            event_id INTEGER NOT NULL,
+            extra JSONB DEFAULT '{}'::jsonb NOT NULL,
+            CONSTRAINT pk__event_data PRIMARY KEY (event_id),
+            CONSTRAINT fk__event_data__event_id__event FOREIGN KEY(event_id)
+                REFERENCES event (id) ON DELETE cascade
+        );
+
+        INSERT INTO event (
+            id, timestamp, type_id, application_instance_id,
+            course_id, assignment_id, grouping_id
+        )
+        SELECT
+            id, timestamp, type_id, application_instance_id,
+            course_id, assignment_id, grouping_id
+        FROM event_old;
+
+        INSERT INTO event_user (id, event_id, user_id, lti_role_id)
+        SELECT id, event_id, user_id, lti_role_id FROM event_user_old;
+
+        INSERT INTO event_data (event_id, extra)
+        SELECT event_id, extra FROM event_data_old;
+        """
+    )
+
+    _drop_old_tables()
+    _create_lti_launches_view()
+
+
+def _add_months(month, months):
+    year, month_index = divmod(month.year * 12 + month.month - 1 + months, 12)
+    return date(year, month_index + 1, 1)
+
+
+def _drop_views():
+    op.execute("DROP VIEW IF EXISTS lti_launches")
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS report.events CASCADE")
+
+
+def _rename_old_tables():
+    """Move the existing tables and the names they use out of the way."""
+    for table in ("event_data", "event_user", "event"):
+        op.execute(f"ALTER TABLE {table} RENAME TO {table}_old")
+        for constraint in CONSTRAINTS[table]:
+            # This also drops any foreign keys which depend on the constraint
+            op.execute(f"ALTER TABLE {table}_old DROP CONSTRAINT {constraint} CASCADE")
+        for index in INDEXES[table]:
+            op.execute(f"DROP INDEX IF EXISTS {index}")
+
+    # Keep the id sequences, so ids carry on from where they were
+    op.execute("ALTER SEQUENCE event_id_seq OWNED BY NONE")
+    op.execute("ALTER SEQUENCE event_user_id_seq OWNED BY NONE")
+
+
+def _drop_old_tables():
+    op.execute("DROP TABLE event_data_old, event_user_old, event_old CASCADE")
+    op.execute("ALTER SEQUENCE event_id_seq OWNED BY event.id")
+    op.execute("ALTER SEQUENCE event_user_id_seq OWNED BY event_user.id")
+
+
+def _create_lti_launches_view():
+    # As created by 9bb2beba95bc_lti_launches_view
+    op.execute(
+        """CREATE VIEW lti_launches AS (
+            SELECT
+                event.id,
+                event.timestamp AS created,
+                grouping.lms_id AS context_id,
+                application_instances.consumer_key AS lti_key
+            FROM event
+            JOIN application_instances
+                ON event.application_instance_id = application_instances.id
+            JOIN grouping
+                ON event.course_id = grouping.id
+            WHERE event.type_id = (
+                SELECT id FROM event_type WHERE type = 'configured_launch'
+            )
+        )"""
+    )
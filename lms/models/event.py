@@ -20,19 +20,30 @@ class EventType(BASE):
 
 
 class Event(BASE):
-    """Model to store any relevant events that occur within the application."""
+    """
+    Model to store any relevant events that occur within the application.
+
+    Events and their `EventUser` and `EventData` rows are partitioned by month
+    on the time of the event. See `EventPartitionService` for details.
+    """
 
     __tablename__ = "event"
 
+    __table_args__ = {"postgresql_partition_by": "RANGE (timestamp)"}
+
     id = sa.Column(sa.Integer, autoincrement=True, primary_key=True)
 
     timestamp = sa.Column(
-        sa.DateTime(), server_default=sa.func.now(), nullable=False, index=True
+        sa.DateTime(),
+        server_default=sa.func.now(),
+        nullable=False,
+        primary_key=True,
+        index=True,
     )
     """Time the event occurred, defaults to now() if not specified"""
 
     type_id = sa.Column(
-        sa.Integer(), sa.ForeignKey("event_type.id", ondelete="cascade"), index=True
+        sa.Integer(), sa.ForeignKey("event_type.id", ondelete="cascade")
     )
     type = sa.orm.relationship("EventType")
     """One of EventType"""
@@ -76,16 +87,21 @@ class EventUser(BASE):
 
     __tablename__ = "event_user"
 
-    __table_args__ = (sa.UniqueConstraint("event_id", "user_id", "lti_role_id"),)
+    __table_args__ = (
+        sa.UniqueConstraint("event_id", "user_id", "lti_role_id", "event_timestamp"),
+        sa.ForeignKeyConstraint(
+            ["event_id", "event_timestamp"],
+            ["event.id", "event.timestamp"],
+            ondelete="cascade",
+        ),
+        {"postgresql_partition_by": "RANGE (event_timestamp)"},
+    )
 
     id = sa.Column(sa.Integer, autoincrement=True, primary_key=True)
 
-    event_id = sa.Column(
-        sa.Integer(),
-        sa.ForeignKey("event.id", ondelete="cascade"),
-        nullable=False,
-        primary_key=True,
-    )
+    event_id = sa.Column(sa.Integer(), nullable=False)
+    event_timestamp = sa.Column(sa.DateTime(), nullable=False, primary_key=True)
+    """A copy of `Event.timestamp` to partition this table on"""
     event = sa.orm.relationship("Event")
 
     user_id = sa.Column(
@@ -112,12 +128,18 @@ class EventData(BASE):
 
     __tablename__ = "event_data"
 
-    event_id = sa.Column(
-        sa.Integer(),
-        sa.ForeignKey("event.id", ondelete="cascade"),
-        nullable=False,
-        primary_key=True,
+    __table_args__ = (
+        sa.ForeignKeyConstraint(
+            ["event_id", "event_timestamp"],
+            ["event.id", "event.timestamp"],
+            ondelete="cascade",
+        ),
+        {"postgresql_partition_by": "RANGE (event_timestamp)"},
     )
+
+    event_id = sa.Column(sa.Integer(), nullable=False, primary_key=True)
+    event_timestamp = sa.Column(sa.DateTime(), nullable=False, primary_key=True)
+    """A copy of `Event.timestamp` to partition this table on"""
     event = sa.orm.relationship("Event")
 
     data = sa.Column(
@@ -126,3 +148,14 @@ class EventData(BASE):
         server_default=sa.text("'{}'::jsonb"),
         nullable=False,
     )
+
+
+# Tables created from these models rather than by migrations (e.g. in tests
+# and by `lms.db.init()`) get a default partition which accepts every row.
+# Monthly partitions are created by migrations and `EventPartitionService`.
+for _table in (Event.__table__, EventUser.__table__, EventData.__table__):
+    sa.event.listen(
+        _table,
+        "after_create",
+        sa.DDL("CREATE TABLE %(table)s_default PARTITION OF %(table)s DEFAULT"),
+    )
@@ -125,20 +125,3 @@ class GroupInfo(BASE):
     @type.setter
     def type(self, new_type):
         self._safe_info["type"] = new_type
-
-    def upsert_instructor(self, new_instructor):
-        updated_instructors = []
-        found = False
-
-        for existing_instructor in self.instructors:
-            if existing_instructor["username"] == new_instructor["username"]:
-                updated_instructors.append(new_instructor)
-                found = True
-            else:
-                updated_instructors.append(existing_instructor)
-
-        if not found:
-            updated_instructors.append(new_instructor)
-
-        if updated_instructors != self.instructors:
-            self.instructors = updated_instructors
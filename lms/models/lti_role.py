@@ -1,4 +1,5 @@
 from enum import Enum, unique
+from functools import lru_cache
 
 import sqlalchemy as sa
 from sqlalchemy.ext.hybrid import hybrid_property
@@ -49,10 +50,15 @@ class LTIRole(BASE):
 class _RoleParser:
     """Close collaborator class for parsing roles."""
 
-    @classmethod
-    def parse_role(cls, role) -> RoleType:
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def parse_role(role) -> RoleType:
+        # We see the same few role strings over and over, so remember the
+        # results rather than parsing (and prefix matching) them every time
         return (
-            cls._parse_v13_role(role) or cls._parse_v11_role(role) or RoleType.LEARNER
+            _RoleParser._parse_v13_role(role)
+            or _RoleParser._parse_v11_role(role)
+            or RoleType.LEARNER
         )
 
     _V11_INSTRUCTOR_STRINGS = (
@@ -2,6 +2,7 @@
 import datetime
 
 import sqlalchemy as sa
+from sqlalchemy.ext.hybrid import hybrid_property
 
 from lms.db import BASE
 
@@ -74,3 +75,15 @@ class OAuth2Token(BASE):
         server_default=sa.func.now(),
         nullable=False,
     )
+
+    @hybrid_property
+    def expires_at(self):
+        """Return when `access_token` expires, or None if we don't know."""
+        if self.expires_in is None:
+            return None
+
+        return self.received_at + datetime.timedelta(seconds=self.expires_in)
+
+    @expires_at.expression
+    def expires_at(cls):  # pylint:disable=no-self-argument
+        return cls.received_at + cls.expires_in * sa.text("INTERVAL '1 second'")
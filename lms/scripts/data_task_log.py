@@ -0,0 +1,109 @@
+"""Record runs of data tasks as JSON and spot steps which have slowed down."""
+
+import json
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+from statistics import median
+from typing import List
+
+from lms.scripts.data_task_runner import Step
+
+
+@dataclass
+class Regression:
+    """A step which took longer than usual."""
+
+    step: str
+    duration: float
+    """Seconds the step took in the latest run"""
+
+    baseline: float
+    """The median seconds the step took in the runs before"""
+
+    @property
+    def ratio(self):
+        return self.duration / self.baseline if self.baseline else float("inf")
+
+
+def make_run_log(task: str, started_at: datetime, workers: int, steps: List[Step]):
+    """Get a JSON serializable record of a run of a task."""
+    return {
+        "task": task,
+        "started_at": started_at.isoformat(),
+        "workers": workers,
+        "steps": [
+            {
+                "name": step.name,
+                "status": step.status,
+                "started": step.started,
+                "duration": step.duration,
+                "queries": [asdict(query) for query in step.queries],
+            }
+            for step in steps
+        ],
+    }
+
+
+def write_run_log(directory: Path, run_log: dict) -> Path:
+    """
+    Write a run log to a new file in `directory`.
+
+    :return: the path of the file written
+    """
+    started_at = datetime.fromisoformat(run_log["started_at"])
+    path = Path(directory) / f"{_slug(run_log['task'])}-{started_at:%Y%m%dT%H%M%S}.json"
+    path.write_text(json.dumps(run_log, indent=2, default=str), encoding="utf-8")
+
+    return path
+
+
+def load_run_logs(directory: Path, task: str) -> List[dict]:
+    """Get the run logs for a task from `directory`, oldest first."""
+    run_logs = [
+        json.loads(path.read_text(encoding="utf-8"))
+        for path in Path(directory).glob(f"{_slug(task)}-*.json")
+    ]
+    return sorted(run_logs, key=lambda run_log: run_log["started_at"])
+
+
+def find_regressions(
+    latest: dict, previous: List[dict], threshold=1.5, min_seconds=1.0
+) -> List[Regression]:
+    """
+    Get the steps in `latest` which were slower than in `previous` runs.
+
+    A step has regressed if it took more than `threshold` times its median
+    time in the previous runs in which it succeeded, and more than
+    `min_seconds` longer. The minimum stops quick steps being reported
+    because of noise. Steps with no previous successful runs are ignored.
+
+    :return: the regressed steps, the worst first
+    """
+    history = {}
+    for run_log in previous:
+        for step in run_log["steps"]:
+            if step["status"] == "done":
+                history.setdefault(step["name"], []).append(step["duration"])
+
+    regressions = []
+    for step in latest["steps"]:
+        if step["status"] != "done" or step["name"] not in history:
+            continue
+
+        baseline = median(history[step["name"]])
+        if (
+            step["duration"] > baseline * threshold
+            and step["duration"] - baseline > min_seconds
+        ):
+            regressions.append(
+                Regression(
+                    step=step["name"], duration=step["duration"], baseline=baseline
+                )
+            )
+
+    return sorted(regressions, key=lambda regression: -regression.ratio)
+
+
+def _slug(task):
+    return task.strip("/").replace("/", "-")
@@ -0,0 +1,340 @@
+"""Run the scripts of a data task in dependency order, optionally in parallel."""
+
+import re
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from time import monotonic
+from typing import Callable, List, Optional, Set
+
+import data_tasks
+import sqlalchemy as sa
+import sqlparse
+from data_tasks.python_script import PythonScript
+from data_tasks.sql_script import SQLScript
+
+_DEPENDS_ON = re.compile(r"^\s*(?:--|#)\s*depends-on:(.*)$", re.MULTILINE)
+_SUFFIX = re.compile(r"(\.jinja2)?\.sql$|\.py$")
+
+# The kinds of statement Postgres can `EXPLAIN`
+_EXPLAINABLE = ("SELECT", "INSERT", "UPDATE", "DELETE")
+
+
+class DependencyError(Exception):
+    """A step depends on steps which don't exist or which depend on it."""
+
+
+@dataclass
+class QueryStats:
+    """What running a query in a step took and did."""
+
+    index: int
+    """The position of the query in its script"""
+
+    text: str
+
+    duration: Optional[float] = None
+    """Seconds the query took to run"""
+
+    rows: Optional[int] = None
+    """The rows the query returned or changed, if known"""
+
+    plan: Optional[list] = None
+    """The query's `EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON)` output"""
+
+
+@dataclass
+class Step:  # pylint:disable=too-many-instance-attributes
+    """A script in a data task and the steps which must run before it."""
+
+    name: str
+    """The path of the script in the task, without its suffix"""
+
+    script: object
+    """The `data_tasks` script object to execute"""
+
+    depends_on: Set[str] = field(default_factory=set)
+    """The names of the steps which must run before this one"""
+
+    status: str = "pending"
+    """One of pending, running, done, skipped or failed"""
+
+    started: Optional[float] = None
+    """Seconds from the start of the run until this step started"""
+
+    duration: Optional[float] = None
+    """Seconds this step took to run"""
+
+    results: list = field(default_factory=list)
+    """The queries and script executed, for printing"""
+
+    queries: List[QueryStats] = field(default_factory=list)
+    """Stats for each query run by an SQL script"""
+
+
+def load_steps(task_dir: Path, template_vars: dict) -> List[Step]:
+    """
+    Get the scripts of a data task as steps with dependencies.
+
+    Scripts say which steps they depend on with one or more comments like:
+
+        -- depends-on: 00_fdw_refresh, 01_entities/01_users
+
+    Steps are named by their path in the task without a suffix. Depending on
+    a directory depends on every step in it. A script without any of these
+    comments depends on the script before it, so tasks which don't use them
+    run one script at a time in order.
+
+    :raises DependencyError: if a step depends on a step which doesn't exist
+    """
+    task_dir = Path(task_dir)
+    steps = []
+    for script in data_tasks.from_dir(task_dir=task_dir, template_vars=template_vars):
+        path = Path(script.path)
+        name = _SUFFIX.sub("", path.relative_to(task_dir).as_posix())
+
+        declared = {
+            dependency.strip()
+            for line in _DEPENDS_ON.findall(path.read_text(encoding="utf-8"))
+            for dependency in line.split(",")
+            if dependency.strip()
+        }
+        if not declared and steps:
+            declared = {steps[-1].name}
+
+        steps.append(Step(name=name, script=script, depends_on=declared))
+
+    # Dependencies can refer to later steps, so we can only check them and
+    # expand directories once we know every step
+    names = [step.name for step in steps]
+    for step in steps:
+        step.depends_on = _expand(step.name, step.depends_on, names)
+
+    return steps
+
+
+def _expand(name, dependencies, names):
+    expanded = set()
+    for dependency in dependencies:
+        matches = {
+            other
+            for other in names
+            if other == dependency or other.startswith(f"{dependency}/")
+        }
+        if not matches:
+            raise DependencyError(f"'{name}' depends on unknown step '{dependency}'")
+        expanded.update(matches)
+
+    return expanded
+
+
+def sort_steps(steps: List[Step]) -> List[Step]:
+    """
+    Sort steps so each comes after the steps it depends on.
+
+    Steps which could go in any order stay in the order they were given.
+
+    :raises DependencyError: if steps depend on each other in a loop
+    """
+    remaining = list(steps)
+    done = set()
+    ordered = []
+
+    while remaining:
+        ready = next(
+            (step for step in remaining if step.depends_on <= done),
+            None,
+        )
+        if ready is None:
+            raise DependencyError(
+                "Steps depend on each other in a loop: "
+                + ", ".join(step.name for step in remaining)
+            )
+
+        remaining.remove(ready)
+        done.add(ready.name)
+        ordered.append(ready)
+
+    return ordered
+
+
+class DataTaskRunner:
+    """
+    Run the steps of a data task.
+
+    With one worker every step runs in order on one connection in a single
+    transaction, so either the whole task happens or none of it does.
+
+    With more workers steps which don't depend on each other run at the same
+    time, each on its own connection and in its own transaction. A step is
+    only started once the steps it depends on have been committed. If a step
+    fails no more steps are started, but steps which have already finished
+    stay committed.
+
+    The time and rows of every query in an SQL script are recorded in the
+    step's `queries`. With `explain` on, queries which Postgres can explain
+    are run with `EXPLAIN (ANALYZE, BUFFERS)` instead. This still runs them,
+    so they have the same effect, but they return their plan instead of any
+    rows, and are slowed down a little by the timing.
+    """
+
+    def __init__(  # pylint:disable=too-many-arguments
+        self,
+        engine,
+        workers=1,
+        dry_run=False,
+        skip_python=False,
+        explain=False,
+        on_step_done: Optional[Callable[[Step], None]] = None,
+    ):
+        self._engine = engine
+        self._workers = workers
+        self._dry_run = dry_run
+        self._skip_python = skip_python
+        self._explain = explain
+        self._on_step_done = on_step_done or (lambda _step: None)
+        self._start = None
+
+    def run(self, steps: List[Step]) -> List[Step]:
+        """
+        Run the steps, calling `on_step_done` as each one finishes.
+
+        :return: the steps in the order they were started
+        :raises DependencyError: if the steps' dependencies are in a loop
+        """
+        steps = sort_steps(steps)
+        self._start = monotonic()
+
+        if self._workers == 1:
+            self._run_in_one_transaction(steps)
+        else:
+            self._run_in_parallel(steps)
+
+        return sorted(
+            steps,
+            key=lambda step: float("inf") if step.started is None else step.started,
+        )
+
+    def _run_in_one_transaction(self, steps):
+        with self._engine.connect() as connection:
+            with connection.begin():
+                for step in steps:
+                    self._execute(step, connection)
+                    self._on_step_done(step)
+
+    def _run_in_parallel(self, steps):
+        pending = list(steps)
+        done = set()
+        running = {}
+        failure = None
+
+        with ThreadPoolExecutor(
+            max_workers=self._workers, thread_name_prefix="DataTaskStep"
+        ) as executor:
+            while pending or running:
+                if failure is None:
+                    for step in [step for step in pending if step.depends_on <= done]:
+                        if len(running) == self._workers:
+                            break
+
+                        pending.remove(step)
+                        running[
+                            executor.submit(self._run_in_own_transaction, step)
+                        ] = step
+
+                if not running:
+                    break
+
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    step = running.pop(future)
+                    try:
+                        future.result()
+                    except Exception as err:  # pylint:disable=broad-except
+                        failure = failure or err
+                        continue
+
+                    done.add(step.name)
+                    self._on_step_done(step)
+
+        if failure:
+            raise failure
+
+    def _run_in_own_transaction(self, step):
+        with self._engine.connect() as connection:
+            with connection.begin():
+                self._execute(step, connection)
+
+    def _execute(self, step, connection):
+        step.started = monotonic() - self._start
+        step.status = "running"
+
+        try:
+            if self._skip_python and isinstance(step.script, PythonScript):
+                step.status = "skipped"
+                return
+
+            if isinstance(step.script, SQLScript):
+                step.results = self._execute_sql(step, connection)
+            else:
+                step.results = list(
+                    step.script.execute(connection, dry_run=self._dry_run)
+                )
+        except Exception:
+            step.status = "failed"
+            raise
+        finally:
+            step.duration = monotonic() - self._start - step.started
+
+        step.status = "done"
+
+    def _execute_sql(self, step, connection):
+        # We run the queries ourselves rather than with `SQLScript.execute()`
+        # so we can see the cursor, but fill in the same details so the
+        # queries and script can be printed in the same way.
+        script = step.script
+
+        with script.timing.time_it():
+            for query in script.queries:
+                stats = QueryStats(index=query.index, text=query.text)
+                step.queries.append(stats)
+
+                with query.timing.time_it():
+                    if not self._dry_run:
+                        self._execute_query(query, stats, connection)
+
+                stats.duration = query.timing.duration.total_seconds()
+
+        return [*script.queries, script]
+
+    def _execute_query(self, query, stats, connection):
+        if self._explain and _is_explainable(query.text):
+            stats.plan = connection.execute(
+                sa.text(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON)\n{query.text}")
+            ).scalar()
+            return
+
+        cursor = connection.execute(sa.text(query.text))
+        if cursor.returns_rows:
+            query.columns = list(cursor.keys())
+            query.rows = cursor.fetchall()
+
+        if cursor.rowcount >= 0:
+            stats.rows = cursor.rowcount
+
+
+def _is_explainable(text):
+    return sqlparse.parse(text)[0].get_type() in _EXPLAINABLE
+
+
+def format_timings(steps: List[Step]) -> str:
+    """Get a table of when each step started and how long it took."""
+    width = max((len(step.name) for step in steps), default=0)
+
+    lines = [f"{'Step':<{width}}  {'Status':<8}  {'Started':>9}  {'Took':>9}"]
+    for step in steps:
+        started = "" if step.started is None else f"{step.started:.3f}s"
+        took = "" if step.duration is None else f"{step.duration:.3f}s"
+        lines.append(f"{step.name:<{width}}  {step.status:<8}  {started:>9}  {took:>9}")
+
+    return "\n".join(lines)
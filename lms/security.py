@@ -39,6 +39,10 @@ class Permissions(Enum):
     ADMIN = "admin"
 
 
+_LAUNCH_PATHS = {"/lti_launches", "/content_item_selection", "/api/gateway/h/lti"}
+"""Paths where the user is authenticated by LTI launch params."""
+
+
 @lru_cache(maxsize=1)
 def get_policy(request):
     """Pick the right policy based the request's path."""
@@ -47,7 +51,7 @@ def get_policy(request):
     if path.startswith("/admin") or path.startswith("/googleauth"):
         return LMSGoogleSecurityPolicy()
 
-    if path in {"/lti_launches", "/content_item_selection", "/api/gateway/h/lti"}:
+    if path in _LAUNCH_PATHS:
         return LTIUserSecurityPolicy(get_lti_user_from_launch_params)
 
     return LTIUserSecurityPolicy(get_lti_user)
@@ -182,25 +186,26 @@ def get_lti_user(request, from_identity=False) -> Optional[LTIUser]:
     if from_identity and request.identity and request.identity.lti_user:
         lti_user = request.identity.lti_user
     else:
-
-        bearer_token_schema = BearerTokenSchema(request)
-        schemas = [
-            partial(bearer_token_schema.lti_user, location="headers"),
-            partial(bearer_token_schema.lti_user, location="querystring"),
-            partial(bearer_token_schema.lti_user, location="form"),
-            OAuthCallbackSchema(request).lti_user,
-        ]
-        for schema in schemas:
-            try:
-                lti_user = schema()
-                break
-            except ValidationError:
-                continue
+        # Only try the one place the user could be in, rather than trying
+        # every schema in turn
+        try:
+            if location := BearerTokenSchema.authorization_location(request):
+                lti_user = BearerTokenSchema(request).lti_user(location=location)
+            elif "state" in request.params:
+                lti_user = OAuthCallbackSchema(request).lti_user()
+        except ValidationError:
+            lti_user = None
 
     if lti_user:
         # Make a record of the user for analytics so we can map from the
         # LTI users and the corresponding user in H
-        request.find_service(UserService).upsert_user(lti_user)
+        user_service = request.find_service(UserService)
+        if request.path in _LAUNCH_PATHS:
+            user_service.upsert_user(lti_user)
+        else:
+            # API calls happen a lot more often than launches and their users
+            # were stored when they launched, so only write on changes
+            user_service.upsert_user_if_changed(lti_user)
 
     return lti_user
 
@@ -4,6 +4,7 @@ from lms.services.canvas import CanvasService
 from lms.services.d2l_api.client import D2LAPIClient
 from lms.services.document_url import DocumentURLService
 from lms.services.event import EventService
+from lms.services.event_partition import EventPartitionService
 from lms.services.exceptions import (
     BlackboardFileNotFoundInCourse,
     CanvasAPIError,
@@ -18,6 +19,7 @@ from lms.services.exceptions import (
 from lms.services.h_api import HAPIError
 from lms.services.jstor import JSTORService
 from lms.services.jwt import JWTService
+from lms.services.launch_persistence import LaunchPersistenceService
 from lms.services.launch_verifier import (
     ConsumerKeyLaunchVerificationError,
     LTILaunchVerificationError,
@@ -111,6 +113,12 @@ def includeme(config):
         "lms.services.document_url.factory", iface=DocumentURLService
     )
     config.register_service_factory("lms.services.event.factory", iface=EventService)
+    config.register_service_factory(
+        "lms.services.event_partition.factory", iface=EventPartitionService
+    )
+    config.register_service_factory(
+        "lms.services.launch_persistence.factory", iface=LaunchPersistenceService
+    )
     config.register_service_factory(
         "lms.services.organization.service_factory", iface=OrganizationService
     )
@@ -5,11 +5,13 @@ from logging import getLogger
 from typing import List
 
 from sqlalchemy.exc import NoResultFound
+from sqlalchemy.orm import contains_eager, joinedload
 
 from lms.models import ApplicationInstance, LTIParams, LTIRegistration
 from lms.services.aes import AESService
 from lms.services.exceptions import SerializableError
 from lms.services.organization import OrganizationService
+from lms.services.snapshot_cache import SNAPSHOT_CACHE
 from lms.validation import ValidationError
 
 LOG = getLogger(__name__)
@@ -34,17 +36,25 @@ class AccountDisabled(SerializableError):
 
 
 class ApplicationInstanceService:
-    def __init__(
+    def __init__(  # pylint:disable=too-many-arguments
         self,
         db,
         request,
         aes_service: AESService,
         organization_service: OrganizationService,
+        cache=None,
     ):
+        """
+        Initialize the service.
+
+        :param cache: A SnapshotCache to share instances between requests.
+            Without one every lookup queries the DB
+        """
         self._db = db
         self._request = request
         self._aes_service = aes_service
         self._organization_service = organization_service
+        self._cache = cache
 
     @lru_cache(maxsize=1)
     def get_current(self) -> ApplicationInstance:
@@ -84,10 +94,7 @@ class ApplicationInstanceService:
 
     @lru_cache(maxsize=1)
     def get_by_id(self, id_) -> ApplicationInstance:
-        try:
-            return self._ai_search_query(id_=id_).one()
-        except NoResultFound as err:
-            raise ApplicationInstanceNotFound() from err
+        return self._get_cached(("id", id_), lambda: self._ai_search_query(id_=id_))
 
     @lru_cache(maxsize=128)
     def get_by_consumer_key(self, consumer_key) -> ApplicationInstance:
@@ -101,10 +108,10 @@ class ApplicationInstanceService:
         if not consumer_key:
             raise ApplicationInstanceNotFound()
 
-        try:
-            return self._ai_search_query(consumer_key=consumer_key).one()
-        except NoResultFound as err:
-            raise ApplicationInstanceNotFound() from err
+        return self._get_cached(
+            ("consumer_key", consumer_key),
+            lambda: self._ai_search_query(consumer_key=consumer_key),
+        )
 
     @lru_cache(maxsize=128)
     def get_by_deployment_id(
@@ -113,19 +120,51 @@ class ApplicationInstanceService:
         if not all([issuer, client_id, deployment_id]):
             raise ApplicationInstanceNotFound()
 
-        try:
-            return (
-                self._db.query(ApplicationInstance)
-                .join(LTIRegistration)
-                .filter(
-                    LTIRegistration.issuer == issuer,
-                    LTIRegistration.client_id == client_id,
-                    ApplicationInstance.deployment_id == deployment_id,
+        return self._get_cached(
+            ("deployment_id", issuer, client_id, deployment_id),
+            lambda: self._db.query(ApplicationInstance)
+            .join(LTIRegistration)
+            .filter(
+                LTIRegistration.issuer == issuer,
+                LTIRegistration.client_id == client_id,
+                ApplicationInstance.deployment_id == deployment_id,
+            ),
+        )
+
+    def _get_cached(self, key, make_query) -> ApplicationInstance:
+        """
+        Get the single instance matching a query, from the cache if we can.
+
+        The instance's organization and registration are cached with it, as
+        we check them on most requests.
+
+        :param key: What identifies the instance in the cache
+        :param make_query: Called to get the query if it isn't in the cache
+        :raise ApplicationInstanceNotFound: if there's no matching instance
+        """
+
+        def load():
+            try:
+                return (
+                    make_query()
+                    .options(
+                        joinedload(ApplicationInstance.organization),
+                        contains_eager(ApplicationInstance.lti_registration),
+                    )
+                    .one()
                 )
-                .one()
-            )
-        except NoResultFound as err:
-            raise ApplicationInstanceNotFound() from err
+            except NoResultFound as err:
+                raise ApplicationInstanceNotFound() from err
+
+        if not self._cache:
+            return load()
+
+        return self._cache.get(
+            self._db,
+            ("application_instance", *key),
+            load,
+            related=["organization", "lti_registration"],
+        )
 
     def search(
         self,
@@ -301,4 +340,5 @@ def factory(_context, request):
         request=request,
         aes_service=request.find_service(AESService),
         organization_service=request.find_service(OrganizationService),
+        cache=SNAPSHOT_CACHE,
     )
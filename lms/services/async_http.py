@@ -0,0 +1,238 @@
+"""A long lived asyncio HTTP engine shared by all requests in a process."""
+
+import asyncio
+import os
+import random
+import threading
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import List, Union
+
+import aiohttp
+from yarl import URL
+
+from lms.services.exceptions import ExternalAsyncRequestError
+
+
+class AsyncHTTPEngine:  # pylint:disable=too-many-instance-attributes
+    """
+    Send many HTTP requests concurrently from synchronous code.
+
+    The engine owns an event loop running in a background thread and a single
+    `aiohttp.ClientSession` on that loop. Both are created lazily the first
+    time they are needed in each process (so they are never shared across a
+    fork) and live as long as the process does. This means that connections
+    (and their TLS sessions) are kept alive and DNS lookups are cached between
+    calls rather than being thrown away after each one.
+
+    Idempotent requests which get a 429 or 5xx response are retried with a
+    jittered exponential backoff, or after the delay the server asked for with
+    `Retry-After`.
+    """
+
+    RETRY_STATUSES = frozenset((429, 500, 502, 503, 504))
+    """Response statuses which are worth retrying."""
+
+    RETRY_METHODS = frozenset(("GET", "HEAD", "OPTIONS", "PUT", "DELETE"))
+    """Methods which are safe to send again after a failed attempt."""
+
+    def __init__(  # pylint:disable=too-many-arguments
+        self,
+        limit=100,
+        limit_per_host=10,
+        keepalive_timeout=30,
+        dns_cache_ttl=300,
+        retries=2,
+        retry_backoff=0.5,
+        max_retry_after=10,
+    ):
+        """
+        Create a new engine.
+
+        :param limit: Maximum number of simultaneous connections
+        :param limit_per_host: Maximum number of requests in flight to any one
+            host. Requests over this limit wait their turn before starting
+            (and before their timeout starts)
+        :param keepalive_timeout: Seconds to keep idle connections open for
+        :param dns_cache_ttl: Seconds to cache DNS lookups for
+        :param retries: How many times to retry a 429 or 5xx response to an
+            idempotent request
+        :param retry_backoff: Base delay in seconds between retries. This is
+            doubled on each attempt and a random part of it is used
+        :param max_retry_after: Maximum number of seconds we'll honour in a
+            `Retry-After` header
+        """
+        self._connector_kwargs = {
+            "limit": limit,
+            "limit_per_host": limit_per_host,
+            "keepalive_timeout": keepalive_timeout,
+            "ttl_dns_cache": dns_cache_ttl,
+        }
+        self._limit_per_host = limit_per_host
+        self._retries = retries
+        self._retry_backoff = retry_backoff
+        self._max_retry_after = max_retry_after
+
+        self._lock = threading.Lock()
+        self._pid = None
+        self._loop = None
+        self._thread = None
+        self._session = None
+        self._host_semaphores = {}
+
+    def gather(
+        self, method, urls: List[str], return_exceptions=False, **kwargs
+    ) -> List[Union[aiohttp.ClientResponse, ExternalAsyncRequestError]]:
+        r"""
+        Send a request to each of `urls` concurrently and return the responses.
+
+        The responses are returned in the same order as `urls`. Their bodies
+        have already been read and are available as `response.sync_text`.
+
+        :param method: The HTTP method to use
+        :param urls: All URLs to request
+        :param return_exceptions: Return an `ExternalAsyncRequestError` in
+            place of the response for each request that fails instead of
+            raising. This lets callers keep the successful responses
+        :param \**kwargs: Any other keyword arguments will be passed directly
+            to aiohttp.ClientSession().request():
+            https://docs.aiohttp.org/en/stable/client_reference.html
+
+        :raise ExternalAsyncRequestError: if any of the requests fail and
+            `return_exceptions` is false
+        """
+        return asyncio.run_coroutine_threadsafe(
+            self._gather(method, urls, return_exceptions, **kwargs), self._get_loop()
+        ).result()
+
+    @property
+    def closed(self):
+        """Whether this process has no loop running (one is started on use)."""
+        return self._loop is None or self._pid != os.getpid()
+
+    def close(self):
+        """Close all connections and stop the background event loop."""
+        with self._lock:
+            if self.closed:
+                return
+
+            asyncio.run_coroutine_threadsafe(self._session.close(), self._loop).result()
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop.close()
+
+            self._loop = self._thread = self._session = self._pid = None
+
+    def _get_loop(self):
+        with self._lock:
+            if self.closed:
+                # Either this is the first call or we've been forked, in which
+                # case the thread running the loop didn't come with us.
+                self._pid = os.getpid()
+                self._host_semaphores = {}
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(
+                    target=self._loop.run_forever, name="AsyncHTTPEngine", daemon=True
+                )
+                self._thread.start()
+                # The session has to be created on the loop it'll be used from
+                self._session = asyncio.run_coroutine_threadsafe(
+                    self._new_session(), self._loop
+                ).result()
+
+            return self._loop
+
+    async def _new_session(self):
+        return aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(**self._connector_kwargs)
+        )
+
+    async def _gather(self, method, urls, return_exceptions, **kwargs):
+        session = self._session
+
+        if return_exceptions:
+            return await asyncio.gather(
+                *[self._outcome(session, method, url, **kwargs) for url in urls]
+            )
+
+        tasks = [
+            asyncio.ensure_future(self._request(session, method, url, **kwargs))
+            for url in urls
+        ]
+
+        try:
+            return await asyncio.gather(*tasks)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as err:
+            for task in tasks:
+                task.cancel()
+
+            raise ExternalAsyncRequestError() from err
+
+    async def _outcome(self, session, method, url, **kwargs):
+        try:
+            return await self._request(session, method, url, **kwargs)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as err:
+            error = ExternalAsyncRequestError()
+            error.__cause__ = err
+            return error
+
+    async def _request(self, session, method, url, **kwargs):
+        host = URL(url).host
+        if host not in self._host_semaphores:
+            self._host_semaphores[host] = asyncio.Semaphore(self._limit_per_host)
+
+        attempt = 0
+        while True:
+            async with self._host_semaphores[host]:
+                response = await _async_request(session, method, url, **kwargs)
+
+            if (
+                response.status not in self.RETRY_STATUSES
+                or method.upper() not in self.RETRY_METHODS
+                or attempt >= self._retries
+            ):
+                return response
+
+            attempt += 1
+            await asyncio.sleep(self._retry_delay(response, attempt))
+
+    def _retry_delay(self, response, attempt):
+        """Get how many seconds to wait before retrying `response`."""
+        if retry_after := _parse_retry_after(response.headers.get("Retry-After")):
+            return min(retry_after, self._max_retry_after)
+
+        # "Full jitter" so that requests which failed together don't all retry
+        # at the same time.
+        return random.uniform(0, self._retry_backoff * 2 ** (attempt - 1))
+
+
+async def _async_request(aio_session, method, url, **kwargs):
+    async with aio_session.request(method, url, **kwargs) as response:
+        # Calling `.text()` here caches the result in `response` but is still behind a coroutine.
+        # We assign it to another response attribute for it to be
+        # available in a sync context without needing to start coroutine.
+        response.sync_text = await response.text()
+        return response
+
+
+def _parse_retry_after(value):
+    """Get the number of seconds in a `Retry-After` header, if there's one."""
+    if not value:
+        return None
+
+    try:
+        seconds = float(value)
+    except ValueError:
+        # It can also be an HTTP date
+        try:
+            seconds = (
+                parsedate_to_datetime(value) - datetime.now(timezone.utc)
+            ).total_seconds()
+        except (TypeError, ValueError):
+            return None
+
+    return max(seconds, 0)
+
+
+ENGINE = AsyncHTTPEngine()
+"""The engine shared by everything in this process."""
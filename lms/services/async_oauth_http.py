@@ -1,18 +1,26 @@
-import asyncio
-from typing import List
+from typing import List, Union
 
 import aiohttp
 
-from lms.services import ExternalAsyncRequestError
+from lms.services.async_http import ENGINE
+from lms.services.exceptions import ExternalAsyncRequestError
 
 
 class AsyncOAuthHTTPService:
-    def __init__(self, oauth2_token_service):
+    def __init__(self, oauth2_token_service, engine):
         self._oauth2_token_service = oauth2_token_service
+        self._engine = engine
 
     def request(
-        self, method, urls: List[str], timeout=10, headers=None, **kwargs
-    ) -> List[aiohttp.ClientResponse]:
+        # pylint:disable=too-many-arguments
+        self,
+        method,
+        urls: List[str],
+        timeout=10,
+        headers=None,
+        return_exceptions=False,
+        **kwargs,
+    ) -> List[Union[aiohttp.ClientResponse, ExternalAsyncRequestError]]:
         r"""
         Send access token-authenticated async requests with aiohttp to all `urls`.
 
@@ -21,53 +29,30 @@ class AsyncOAuthHTTPService:
         :param timeout: How long (in seconds) to wait before raising an error
             for each of the requests.
         :param headers:  Headers to attach to all requests
+        :param return_exceptions: Return an `ExternalAsyncRequestError` in
+            place of the response for each request that fails instead of
+            raising
         :param \**kwargs: Any other keyword arguments will be passed directly to
             aiohttp.ClientSession().request():
             https://docs.aiohttp.org/en/stable/client_reference.html
 
         :raise OAuth2TokenError: if we don't have an access token for the user
         :raise ExternalAsyncRequestError: if something goes wrong with the HTTP
-            request
+            request and `return_exceptions` is false
         """
         headers = headers or {}
 
         access_token = self._oauth2_token_service.get().access_token
         headers["Authorization"] = f"Bearer {access_token}"
-        return asyncio.run(
-            _prepare_requests(method, urls, timeout=timeout, headers=headers, **kwargs)
+        return self._engine.gather(
+            method,
+            urls,
+            return_exceptions=return_exceptions,
+            timeout=timeout,
+            headers=headers,
+            **kwargs,
         )
 
 
-async def _async_request(aio_session, method, url, **kwargs):
-    async with aio_session.request(method, url, **kwargs) as response:
-        # Calling `.text()` here caches the result in `response` but is still behind a coroutine.
-        # We assign it to another response attribute for it to be
-        # available in a sync context without needing to start coroutine.
-        response.sync_text = await response.text()
-        return response
-
-
-async def _prepare_requests(method, urls, **kwargs):
-    async with aiohttp.ClientSession() as session:
-        tasks = []
-        for url in urls:
-            task = asyncio.create_task(
-                _async_request(
-                    session,
-                    method,
-                    url,
-                    **kwargs,
-                )
-            )
-            tasks.append(task)
-        try:
-            return await asyncio.gather(*tasks, return_exceptions=False)
-        except aiohttp.ClientError as err:
-            for task in tasks:
-                task.cancel()
-
-            raise ExternalAsyncRequestError() from err
-
-
 def factory(_context, request):
-    return AsyncOAuthHTTPService(request.find_service(name="oauth2_token"))
+    return AsyncOAuthHTTPService(request.find_service(name="oauth2_token"), ENGINE)
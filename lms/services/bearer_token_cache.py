@@ -0,0 +1,83 @@
+"""A process wide cache of verified bearer tokens."""
+
+import hashlib
+import threading
+from datetime import datetime, timedelta
+from typing import Optional
+
+from lms.models import LTIUser
+from lms.services.ttl_map import TTLMap
+
+
+class BearerTokenCache:
+    """
+    A size bounded, thread safe cache of verified bearer tokens.
+
+    Maps the authorization params our API requests are made with to the
+    `LTIUser` they were verified as, so the same token doesn't have to be
+    parsed and verified again on every request. Tokens are stored as digests
+    so we don't keep usable credentials in memory. Entries never outlive the
+    token they were made from.
+
+    This cache lives as long as the worker process and is shared between
+    requests.
+    """
+
+    def __init__(self, max_size=10000, ttl=timedelta(minutes=5)):
+        self._users = TTLMap(max_size=max_size, ttl=ttl)
+        """Map of token digest to the `LTIUser` it was verified as."""
+
+        self._lock = threading.Lock()
+        self._hits = self._misses = 0
+
+    def get(self, authorization: str) -> Optional[LTIUser]:
+        """Get the user `authorization` was verified as, if it's cached."""
+        lti_user = self._users.get(self._digest(authorization))
+
+        with self._lock:
+            if lti_user:
+                self._hits += 1
+            else:
+                self._misses += 1
+
+        return lti_user
+
+    def set(self, authorization: str, lti_user: LTIUser, expires_at: datetime):
+        """
+        Cache the user `authorization` has just been verified as.
+
+        :param authorization: The verified authorization param
+        :param lti_user: The user it was verified as
+        :param expires_at: When the token in `authorization` expires
+        """
+        self._users.set(self._digest(authorization), lti_user, expires_at=expires_at)
+
+    def stats(self) -> dict:
+        """
+        Get counters describing how well the cache is working.
+
+        :return: A dict with the number of cached `tokens`, the number of
+            `hits` and the number of `misses` (tokens which had to be
+            verified)
+        """
+        with self._lock:
+            return {
+                "tokens": len(self._users),
+                "hits": self._hits,
+                "misses": self._misses,
+            }
+
+    def clear(self):
+        """Remove all tokens and reset the counters."""
+        self._users.clear()
+
+        with self._lock:
+            self._hits = self._misses = 0
+
+    @staticmethod
+    def _digest(authorization: str) -> str:
+        return hashlib.sha256(authorization.encode("utf-8")).hexdigest()
+
+
+BEARER_TOKEN_CACHE = BearerTokenCache()
+"""The cache shared by all requests in this process."""
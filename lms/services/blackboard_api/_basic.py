@@ -79,7 +79,9 @@ class BasicClient:
 
     def request(self, method, path):
         try:
-            return self._oauth_http_service.request(method, self._api_url(path))
+            return self._oauth_http_service.request(
+                method, self._api_url(path), refresh=self.refresh_access_token
+            )
         except ExternalRequestError as err:
             err.refreshable = getattr(err.response, "status_code", None) == 401
 
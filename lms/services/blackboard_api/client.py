@@ -1,3 +1,4 @@
+from logging import getLogger
 from urllib.parse import urlencode
 
 from lms.services.blackboard_api._schemas import (
@@ -12,6 +13,8 @@ from lms.services.exceptions import (
     ExternalRequestError,
 )
 
+LOG = getLogger(__name__)
+
 # The maximum number of paginated requests we'll make before returning.
 PAGINATION_MAX_REQUESTS = 25
 
@@ -134,7 +137,9 @@ class BlackboardAPIClient:
         :param group_set_id: Only return groups that belong to this group set
         :param current_student_own_groups_only: Only return groups the current user (a student) belong to.
 
-        :raise services.ExternalAsyncRequestError: if something goes wrong with the async group membership requests.
+        :raise services.ExternalAsyncRequestError: if all of the async group
+            membership requests fail. If only some of them fail the groups
+            we couldn't check are left out.
         """
         response = self._api.request(
             "GET",
@@ -166,23 +171,50 @@ class BlackboardAPIClient:
                 )
 
         if self_enrollment_groups:
-            responses = self._request.find_service(name="async_oauth_http").request(
-                "GET", self_enrollment_check_urls
+            self_enrollment_groups = self._enrolled_groups(
+                self_enrollment_groups, self_enrollment_check_urls
             )
-            # We are going to be modifying `self_enrollment_groups` within the loop
-            # Create a copy here to iterate over.
-            for group, response in zip(list(self_enrollment_groups), responses):
-                # If we are a member of any of the SelfEnrollment groups
-                # we'll get a 200 response from the endpoint
-                if response.status == 200:
-                    continue
-
-                # If we are not a member will get a 403 response.
-                if response.status == 403:
-                    self_enrollment_groups.remove(group)
-                    continue
-
-                # Any other result is unexpected
-                raise ExternalAsyncRequestError(response=response)
 
         return self_enrollment_groups + instructor_only_groups
+
+    def _enrolled_groups(self, groups, check_urls):
+        """
+        Return the groups in `groups` the current user is a member of.
+
+        :param groups: SelfEnrollment groups to check
+        :param check_urls: The URL to check membership with for each group
+
+        :raise services.ExternalAsyncRequestError: if all of the requests fail
+        """
+        responses = self._request.find_service(name="async_oauth_http").request(
+            "GET", check_urls, return_exceptions=True
+        )
+        enrolled_groups = []
+        errors = []
+
+        for group, response in zip(groups, responses):
+            if isinstance(response, ExternalAsyncRequestError):
+                errors.append(response)
+
+            # If we are a member of any of the SelfEnrollment groups
+            # we'll get a 200 response from the endpoint
+            elif response.status == 200:
+                enrolled_groups.append(group)
+
+            # Any other result than a 403 (not a member) is unexpected
+            elif response.status != 403:
+                errors.append(ExternalAsyncRequestError(response=response))
+
+        if errors:
+            if len(errors) == len(responses):
+                # We couldn't check any of the groups, there's no answer
+                # worth returning.
+                raise errors[0]
+
+            LOG.warning(
+                "Couldn't check membership of %s of %s Blackboard groups",
+                len(errors),
+                len(responses),
+            )
+
+        return enrolled_groups
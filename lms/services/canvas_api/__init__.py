@@ -1,2 +1,3 @@
+from lms.services.canvas_api._files_cache import FILES_CACHE
 from lms.services.canvas_api.client import CanvasAPIClient
 from lms.services.canvas_api.factory import canvas_api_client_factory
@@ -53,7 +53,7 @@ class AuthenticatedClient:
         :raise OAuth2TokenError: if the request fails because our Canvas API
             access token for the user is missing, expired, or has been deleted
         """
-        access_token = self._oauth2_token_service.get().access_token
+        access_token = self._get_access_token()
 
         return self._client.send(
             method,
@@ -64,6 +64,30 @@ class AuthenticatedClient:
             headers={"Authorization": f"Bearer {access_token}"},
         )
 
+    def send_conditional(
+        self, method, path, schema, validators, timeout=DEFAULT_TIMEOUT, params=None
+    ):  # pylint:disable=too-many-arguments
+        """
+        Send a conditional Canvas API request.
+
+        See BasicClient.send_conditional() for documentation of parameters,
+        return value and exceptions raised.
+
+        :raise OAuth2TokenError: if the request fails because our Canvas API
+            access token for the user is missing, expired, or has been deleted
+        """
+        access_token = self._get_access_token()
+
+        return self._client.send_conditional(
+            method,
+            path,
+            schema,
+            timeout,
+            validators,
+            params,
+            headers={"Authorization": f"Bearer {access_token}"},
+        )
+
     def get_token(self, authorization_code):
         """
         Get an access token for the current LTI user.
@@ -93,6 +117,17 @@ class AuthenticatedClient:
             grant_type="refresh_token", refresh_token=refresh_token
         )
 
+    def _get_access_token(self):
+        # Refresh before the token expires rather than letting the request
+        # fail and having the frontend refresh it and retry
+        self._oauth2_token_service.refresh_if_expiring(
+            lambda: self.get_refreshed_token(
+                self._oauth2_token_service.get().refresh_token
+            )
+        )
+
+        return self._oauth2_token_service.get().access_token
+
     def _send_token_request(self, grant_type, refresh_token=None, **kwargs):
         params = {
             "grant_type": grant_type,
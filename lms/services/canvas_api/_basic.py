@@ -1,7 +1,8 @@
 """Low level access to the Canvas API."""
 
+from concurrent.futures import ThreadPoolExecutor
 from copy import deepcopy
-from urllib.parse import urlencode
+from urllib.parse import parse_qs, parse_qsl, urlencode, urlparse
 
 import requests
 from requests import RequestException, Session
@@ -15,7 +16,7 @@ class BasicClient:
 
     Also supports:
 
-     * Pagination
+     * Pagination (concurrent when Canvas tells us the page numbers)
      * Apply schema to responses
     """
 
@@ -28,6 +29,12 @@ class BasicClient:
     PAGINATION_MAXIMUM_REQUESTS = 25
     """The maximum number of calls to make before giving up."""
 
+    PAGINATION_MAXIMUM_CONCURRENT_REQUESTS = 5
+    """The maximum number of pages to fetch at the same time.
+
+    Pages are only fetched concurrently when Canvas gives us numbered `next`
+    and `last` links. Opaque bookmark links are always followed one by one."""
+
     def __init__(self, canvas_host, session=None):
         """
         Create a new BasicClient for making calls to the Canvas API.
@@ -79,6 +86,73 @@ class BasicClient:
 
         :return: The result of applying the schema to the response
         """
+        request = self._prepare_request(method, path, schema, params, headers, url_stub)
+
+        return self._send_prepared(request, schema, timeout)
+
+    def send_conditional(
+        # pylint: disable=too-many-arguments
+        self,
+        method,
+        path,
+        schema,
+        timeout,
+        validators,
+        params=None,
+        headers=None,
+    ):
+        """
+        Make a conditional request to the Canvas API.
+
+        This works like `send()` but adds `If-None-Match` and
+        `If-Modified-Since` headers based on `validators` from a previous call.
+
+        :param method: HTTP method to use
+        :param path: Path fragment to add to the end of the URL
+        :param schema: A schema object which this request must
+        :param timeout: The timeout to pass to requests (see `send()`)
+        :param validators: A dict with the `ETag` and/or `Last-Modified`
+            values of an earlier response (possibly empty)
+        :param params: URL parameters to include
+        :param headers: Headers to include
+
+        :raise CanvasAPIError: For any validation or request errors
+
+        :return: A `(result, validators)` tuple. `result` is `None` if Canvas
+            told us nothing has changed. `validators` are the ones to send
+            next time: these are empty for paginated results as Canvas only
+            validates the first page.
+        """
+        headers = dict(headers or {})
+        if etag := validators.get("ETag"):
+            headers["If-None-Match"] = etag
+        if last_modified := validators.get("Last-Modified"):
+            headers["If-Modified-Since"] = last_modified
+
+        request = self._prepare_request(
+            method, path, schema, params, headers, url_stub="/api/v1"
+        )
+        response, result = self._send_and_parse(request, schema, timeout)
+
+        if response.status_code == 304:
+            return None, validators
+
+        new_validators = {}
+        if not response.links.get("next"):
+            new_validators = {
+                header: response.headers[header]
+                for header in ("ETag", "Last-Modified")
+                if header in response.headers
+            }
+
+        return (
+            self._paginate(request, response, result, schema, timeout),
+            new_validators,
+        )
+
+    def _prepare_request(
+        self, method, path, schema, params, headers, url_stub
+    ):  # pylint: disable=too-many-arguments
         # Always request the maximum items per page for requests which return
         # more than one thing
         if schema.many:
@@ -87,32 +161,23 @@ class BasicClient:
 
             params["per_page"] = self.PAGINATION_PER_PAGE
 
-        request = requests.Request(
+        return requests.Request(
             method, self._get_url(path, params, url_stub), headers=headers
         ).prepare()
 
-        return self._send_prepared(request, schema, timeout)
-
     def _get_url(self, path, params, url_stub):
         return f"https://{self._canvas_host}{url_stub}/{path}" + (
             "?" + urlencode(params) if params else ""
         )
 
     def _send_prepared(self, request, schema, timeout, request_depth=1):
-        response = None
+        response, result = self._send_and_parse(request, schema, timeout)
 
-        try:
-            response = self._session.send(request, timeout=timeout)
-            response.raise_for_status()
-        except RequestException as err:
-            CanvasAPIError.raise_from(err, request, response)
-
-        result = None
-        try:
-            result = schema(response).parse()
-        except ExternalRequestError as err:
-            CanvasAPIError.raise_from(err, request, response, err.validation_errors)
+        return self._paginate(request, response, result, schema, timeout, request_depth)
 
+    def _paginate(
+        self, request, response, result, schema, timeout, request_depth=1
+    ):  # pylint: disable=too-many-arguments
         # Handle pagination links. See:
         # https://canvas.instructure.com/doc/api/file.pagination.html
         next_url = response.links.get("next")
@@ -130,12 +195,105 @@ class BasicClient:
 
             # Don't make requests forever
             if request_depth < self.PAGINATION_MAXIMUM_REQUESTS:
-                new_request = deepcopy(request)
-                new_request.url = next_url["url"]
-                result.extend(
-                    self._send_prepared(
-                        new_request, schema, timeout, request_depth=request_depth + 1
-                    )
+                page_urls = self._numbered_page_urls(
+                    response.links,
+                    max_pages=self.PAGINATION_MAXIMUM_REQUESTS - request_depth,
                 )
+                if page_urls:
+                    result.extend(
+                        self._send_pages_concurrently(
+                            request, page_urls, schema, timeout
+                        )
+                    )
+                else:
+                    new_request = deepcopy(request)
+                    new_request.url = next_url["url"]
+                    result.extend(
+                        self._send_prepared(
+                            new_request,
+                            schema,
+                            timeout,
+                            request_depth=request_depth + 1,
+                        )
+                    )
 
         return result
+
+    def _send_and_parse(self, request, schema, timeout):
+        response = None
+
+        try:
+            response = self._session.send(request, timeout=timeout)
+            response.raise_for_status()
+        except RequestException as err:
+            CanvasAPIError.raise_from(err, request, response)
+
+        if response.status_code == 304:
+            # Not modified: there's nothing to parse. We only get these when
+            # we've asked for them with `send_conditional()`
+            return response, None
+
+        result = None
+        try:
+            result = schema(response).parse()
+        except ExternalRequestError as err:
+            CanvasAPIError.raise_from(err, request, response, err.validation_errors)
+
+        return response, result
+
+    def _send_pages_concurrently(self, request, page_urls, schema, timeout):
+        """Fetch and parse all `page_urls`, returning the items in page order."""
+
+        def send_page(url):
+            page_request = request.copy()
+            page_request.url = url
+            return self._send_and_parse(page_request, schema, timeout)[1]
+
+        with ThreadPoolExecutor(
+            max_workers=min(len(page_urls), self.PAGINATION_MAXIMUM_CONCURRENT_REQUESTS)
+        ) as executor:
+            # Each page is parsed in its worker as soon as it arrives, `map`
+            # then gives us the parsed pages back in the order we asked.
+            return [
+                item for page in executor.map(send_page, page_urls) for item in page
+            ]
+
+    @classmethod
+    def _numbered_page_urls(cls, links, max_pages):
+        """
+        Get the URLs of all the remaining pages from numbered pagination links.
+
+        Canvas uses numbered pages for most endpoints (`?page=2`) but opaque
+        bookmarks for others (`?page=bookmark:...`). We can only work out the
+        remaining pages up front in the first case.
+
+        :return: A list of URLs or an empty list if the links are not numbered
+        """
+        next_page = cls._page_number(links.get("next"))
+        last_page = cls._page_number(links.get("last"))
+
+        if next_page is None or last_page is None:
+            return []
+
+        next_url = urlparse(links["next"]["url"])
+        query = parse_qsl(next_url.query, keep_blank_values=True)
+
+        return [
+            next_url._replace(
+                query=urlencode(
+                    [(key, page if key == "page" else value) for key, value in query]
+                )
+            ).geturl()
+            for page in range(next_page, min(last_page, next_page + max_pages - 1) + 1)
+        ]
+
+    @staticmethod
+    def _page_number(link):
+        if not link:
+            return None
+
+        page = parse_qs(urlparse(link["url"]).query).get("page")
+        if not page or not page[0].isdigit():
+            return None
+
+        return int(page[0])
@@ -0,0 +1,75 @@
+"""A process wide cache of Canvas course file listings."""
+
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import NamedTuple, Optional
+
+from lms.services.ttl_map import TTLMap
+
+
+class FilesCacheKey(NamedTuple):
+    """What a file listing depends on."""
+
+    canvas_host: str
+    user_id: str
+    """Different users can see different files (e.g. unpublished ones)."""
+
+    course_id: str
+    sort: str
+
+
+@dataclass
+class CachedFiles:
+    files: list
+    """The list of file dicts as returned by `CanvasAPIClient.list_files`."""
+
+    validators: dict
+    """`ETag` and `Last-Modified` values to revalidate the listing with."""
+
+    is_fresh: bool = True
+    """Whether the listing can be used without revalidating it."""
+
+
+class FilesCache:
+    """
+    A size bounded, thread safe cache of file listings with a TTL.
+
+    Entries are kept after they expire (until they are evicted) so that they
+    can be revalidated with Canvas using their validators. This cache lives
+    as long as the worker process and is shared between requests.
+    """
+
+    def __init__(self, max_size=1000, ttl=timedelta(minutes=5)):
+        self._entries = TTLMap(max_size=max_size, ttl=ttl)
+        """Map of `FilesCacheKey` to `CachedFiles`."""
+
+    def get(self, key: FilesCacheKey) -> Optional[CachedFiles]:
+        """Get the cached listing for `key` whether it's fresh or not."""
+        if (entry := self._entries.peek(key)) is None:
+            return None
+
+        cached, is_fresh = entry
+        return CachedFiles(cached.files, cached.validators, is_fresh)
+
+    def set(self, key: FilesCacheKey, files: list, validators: dict):
+        """Store a fresh listing for `key` evicting the oldest ones if needed."""
+        self._entries.set(key, CachedFiles(files, validators))
+
+    def refresh(self, key: FilesCacheKey):
+        """Mark the listing for `key` as fresh again (e.g. after a 304)."""
+        self._entries.refresh(key)
+
+    def invalidate(self, canvas_host, course_id):
+        """Remove all listings of `course_id` for every user."""
+        course_id = str(course_id)
+
+        self._entries.remove_if(
+            lambda key: key.canvas_host == canvas_host and key.course_id == course_id
+        )
+
+    def clear(self):
+        self._entries.clear()
+
+
+FILES_CACHE = FilesCache()
+"""The cache shared by all requests in this process."""
@@ -7,6 +7,7 @@ import marshmallow
 from marshmallow import EXCLUDE, Schema, fields, post_load, validate, validates_schema
 
 from lms.services import CanvasAPIError
+from lms.services.canvas_api._files_cache import FilesCacheKey
 from lms.validation import RequestsResponseSchema
 
 log = logging.getLogger(__name__)
@@ -40,14 +41,23 @@ class CanvasAPIClient:
         Canvas API request fails for any other reason
     """
 
-    def __init__(self, authenticated_client, file_service):
+    def __init__(
+        self, authenticated_client, file_service, files_cache=None, cache_scope=None
+    ):
         """
         Create a new CanvasAPIClient.
 
         :param authenticated_client: An instance of AuthenticatedClient
+        :param file_service: The "file" service
+        :param files_cache: A FilesCache to share file listings between
+            requests. File listings are not shared if this is `None`
+        :param cache_scope: A (canvas host, LTI user id) tuple which shared
+            file listings are scoped to
         """
         self._client = authenticated_client
         self._file_service = file_service
+        self._files_cache = files_cache
+        self._cache_scope = cache_scope
 
     def get_token(self, authorization_code):
         """
@@ -218,16 +228,43 @@ class CanvasAPIClient:
             Defaults to "position" which is an undocumented option but that it should be the most stable of the options available as it sorts by both "position" and "name" on Canvas' side.
             https://github.com/instructure/canvas-lms/blob/d43feb92d40d2c69684c4536f74dec37992c557a/app/controllers/files_controller.rb#L305
         :rtype: list(dict)
+
+        Listings are shared between requests using `files_cache`. Once they
+        expire we revalidate them with Canvas using a conditional request.
         """
+        if self._files_cache is None:
+            return self._fetch_files(course_id, sort, validators={})[0]
+
+        cache_key = FilesCacheKey(*self._cache_scope, str(course_id), sort)
+        cached = self._files_cache.get(cache_key)
+        if cached and cached.is_fresh:
+            return cached.files
+
+        files, validators = self._fetch_files(
+            course_id, sort, validators=cached.validators if cached else {}
+        )
+        if files is None:
+            # Canvas told us the listing hasn't changed
+            self._files_cache.refresh(cache_key)
+            return cached.files
+
+        self._files_cache.set(cache_key, files, validators)
+        return files
+
+    def _fetch_files(self, course_id, sort, validators):
         # For documentation of this request see:
         # https://canvas.instructure.com/doc/api/files.html#method.files.api_index
 
-        files = self._client.send(
+        files, validators = self._client.send_conditional(
             "GET",
             f"courses/{course_id}/files",
             params={"content_types[]": "application/pdf", "sort": sort},
             schema=self._ListFilesSchema,
+            validators=validators,
         )
+        if files is None:
+            return None, validators
+
         # Canvas' pagination is broken as it sorts by fields that allows duplicates.
         # This can lead to objects being skipped or duplicated across pages.
         # We can't detected objects that are not returned but we can detect the duplicates,
@@ -255,7 +292,7 @@ class CanvasAPIClient:
             ]
         )
 
-        return sorted(files, key=lambda file_: file_["display_name"])
+        return sorted(files, key=lambda file_: file_["display_name"]), validators
 
     class _ListFilesSchema(RequestsResponseSchema):
         """Schema for the list_files response."""
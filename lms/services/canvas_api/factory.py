@@ -1,6 +1,7 @@
 from lms.services.aes import AESService
 from lms.services.canvas_api._authenticated import AuthenticatedClient
 from lms.services.canvas_api._basic import BasicClient
+from lms.services.canvas_api._files_cache import FILES_CACHE
 from lms.services.canvas_api.client import CanvasAPIClient
 
 
@@ -32,4 +33,6 @@ def canvas_api_client_factory(_context, request):
     return CanvasAPIClient(
         authenticated_api,
         file_service=request.find_service(name="file"),
+        files_cache=FILES_CACHE,
+        cache_scope=(application_instance.lms_host(), request.lti_user.user_id),
     )
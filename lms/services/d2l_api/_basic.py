@@ -61,7 +61,9 @@ class BasicClient:
             path = self.api_url(path)
 
         try:
-            return self._oauth_http_service.request(method, path, **kwargs)
+            return self._oauth_http_service.request(
+                method, path, refresh=self.refresh_access_token, **kwargs
+            )
         except ExternalRequestError as err:
             err.refreshable = getattr(err.response, "status_code", None) == 401
             raise
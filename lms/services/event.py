@@ -1,14 +1,21 @@
+from datetime import datetime
 from functools import lru_cache
+from typing import List
 
+from sqlalchemy import func, insert, select
 from sqlalchemy.orm import Session
+from zope.sqlalchemy import mark_changed
 
 from lms.events.event import BaseEvent
 from lms.models import Event, EventData, EventType, EventUser
+from lms.services.event_queue import EVENT_QUEUE, EventQueue
 
 
 class EventService:
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, transaction_manager=None, queue=EVENT_QUEUE):
         self._db = db
+        self._transaction_manager = transaction_manager
+        self._queue: EventQueue = queue
 
     def insert_event(self, event: BaseEvent):
         """
@@ -38,6 +45,99 @@ class EventService:
 
         return event
 
+    def queue_event(self, event: BaseEvent):
+        """
+        Queue an event to be inserted into the DB later by `insert_events()`.
+
+        The event is only queued if the current transaction commits, so we
+        don't record events for requests which failed.
+        """
+        payload = self.to_payload(event)
+
+        def after_commit(success):
+            if success:
+                self._queue.add(payload)
+
+        self._transaction_manager.get().addAfterCommitHook(after_commit)
+
+    @staticmethod
+    def to_payload(event: BaseEvent) -> dict:
+        """Get a JSON serializable copy of an event for `insert_events()`."""
+        return {
+            "type": event.type.value,
+            # The event happened now, not when it's finally written
+            "timestamp": datetime.utcnow().isoformat(),
+            "user_id": event.user_id,
+            "role_ids": list(event.role_ids or []),
+            "application_instance_id": event.application_instance_id,
+            "course_id": event.course_id,
+            "assignment_id": event.assignment_id,
+            "grouping_id": event.grouping_id,
+            "data": event.data,
+        }
+
+    def insert_events(self, payloads: List[dict]):
+        """
+        Insert a batch of events from `to_payload()` into the DB.
+
+        Whatever the size of the batch this takes one query to reserve the
+        event ids and one multi-row INSERT each for events, users and data.
+        """
+        if not payloads:
+            return
+
+        ids = self._db.execute(
+            select(func.nextval("event_id_seq")).select_from(
+                func.generate_series(1, len(payloads))
+            )
+        ).scalars()
+
+        events, users, data = [], [], []
+        for event_id, payload in zip(ids, payloads):
+            timestamp = datetime.fromisoformat(payload["timestamp"])
+            events.append(
+                {
+                    "id": event_id,
+                    "type_id": self._get_type_pk(EventType.Type(payload["type"])),
+                    "timestamp": timestamp,
+                    "application_instance_id": payload["application_instance_id"],
+                    "course_id": payload["course_id"],
+                    "assignment_id": payload["assignment_id"],
+                    "grouping_id": payload["grouping_id"],
+                }
+            )
+
+            if payload["user_id"]:
+                users.extend(
+                    {
+                        "event_id": event_id,
+                        "event_timestamp": timestamp,
+                        "user_id": payload["user_id"],
+                        "lti_role_id": role_id,
+                    }
+                    for role_id in payload["role_ids"] or [None]
+                )
+
+            if payload["data"]:
+                # `EventData.data` is stored in the `extra` column
+                data.append(
+                    {
+                        "event_id": event_id,
+                        "event_timestamp": timestamp,
+                        "extra": payload["data"],
+                    }
+                )
+
+        for model_class, values in (
+            (Event, events),
+            (EventUser, users),
+            (EventData, data),
+        ):
+            if values:
+                self._db.execute(insert(model_class).values(values))
+
+        mark_changed(self._db)
+
     @lru_cache(maxsize=10)
     def _get_type_pk(self, type_: EventType.Type) -> int:
         """Cache the PK of the event_type table to avoid an extra query while inserting events."""
@@ -51,4 +151,4 @@ class EventService:
 
 
 def factory(_context, request):
-    return EventService(request.db)
+    return EventService(db=request.db, transaction_manager=request.tm)
@@ -0,0 +1,158 @@
+"""Create and archive the monthly partitions of the event tables."""
+
+import gzip
+import re
+from datetime import date
+from pathlib import Path
+from typing import List
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from zope.sqlalchemy import mark_changed
+
+_PARTITION_NAME = re.compile(r"^event_(\d{4})_(\d{2})$")
+
+
+def _add_months(month: date, months: int) -> date:
+    """Get the first day of the month `months` after `month`."""
+    year, month_index = divmod(month.year * 12 + month.month - 1 + months, 12)
+    return date(year, month_index + 1, 1)
+
+
+class EventPartitionService:
+    """
+    Manage the monthly partitions of `event`, `event_user` and `event_data`.
+
+    Each month has a partition in each of the three tables called
+    `<table>_<YYYY>_<MM>` holding the events which happened that month, and
+    the `event_user` and `event_data` rows which belong to them. Rows which
+    don't fall into any month's partition go into the `<table>_default`
+    partitions, so we want to create partitions well before they are needed.
+
+    Partitioning lets us drop whole months of old events cheaply, and lets
+    Postgres skip the months a query can't match (for example when it
+    filters or joins on `event.timestamp` and `event_user.event_timestamp`).
+    """
+
+    TABLES = ("event", "event_user", "event_data")
+    """The partitioned tables, with the table the others refer to first"""
+
+    def __init__(self, db: Session):
+        self._db = db
+
+    def months(self) -> List[date]:
+        """Get the first day of each month which has partitions, oldest first."""
+        names = self._db.execute(
+            text(
+                """
+                SELECT partition.relname
+                FROM pg_inherits
+                JOIN pg_class AS parent ON parent.oid = pg_inherits.inhparent
+                JOIN pg_class AS partition ON partition.oid = pg_inherits.inhrelid
+                WHERE parent.relname = 'event'
+                """
+            )
+        ).scalars()
+
+        matches = (_PARTITION_NAME.match(name) for name in names)
+        return sorted(
+            date(int(match.group(1)), int(match.group(2)), 1)
+            for match in matches
+            if match
+        )
+
+    def old_months(self, keep_months: int, today=None) -> List[date]:
+        """
+        Get the months with partitions older than the last `keep_months`.
+
+        :param keep_months: how many whole months before this one to keep
+        :param today: the day to count from (defaults to today)
+        """
+        this_month = (today or date.today()).replace(day=1)
+        cutoff = _add_months(this_month, -keep_months)
+
+        return [month for month in self.months() if month < cutoff]
+
+    def create_partitions(self, months_ahead=3, today=None) -> List[date]:
+        """
+        Create any missing partitions from this month to `months_ahead`.
+
+        A partition can't be created while the default partition has rows
+        which belong in it, so this should run regularly to stay ahead of
+        the events being written.
+
+        :param months_ahead: how many months after this one to create
+        :param today: the day to count from (defaults to today)
+        :return: the first day of each month partitions were created for
+        """
+        this_month = (today or date.today()).replace(day=1)
+        existing = set(self.months())
+
+        created = []
+        for offset in range(months_ahead + 1):
+            month = _add_months(this_month, offset)
+            if month in existing:
+                continue
+
+            for table in self.TABLES:
+                self._db.execute(
+                    text(
+                        f"""
+                        CREATE TABLE {self.partition_name(table, month)}
+                        PARTITION OF {table}
+                        FOR VALUES FROM ('{month.isoformat()}')
+                            TO ('{_add_months(month, 1).isoformat()}')
+                        """
+                    )
+                )
+            created.append(month)
+
+        if created:
+            mark_changed(self._db)
+
+        return created
+
+    def archive(self, month: date, directory: Path) -> List[Path]:
+        """
+        Export a month's partitions to compressed files and drop them.
+
+        Each partition is written as a gzipped CSV file with a header row
+        to `<directory>/<partition name>.csv.gz`, and is then detached and
+        dropped. This all happens in the current transaction, so nothing is
+        dropped unless the exports succeeded and the transaction commits.
+
+        :param month: the first day of the month to archive
+        :param directory: the directory to write the files to
+        :return: the paths of the files written
+        """
+        # Use the raw psycopg2 connection so we can stream with COPY
+        cursor = self._db.connection().connection.cursor()
+
+        paths = []
+        for table in self.TABLES:
+            partition = self.partition_name(table, month)
+            path = Path(directory) / f"{partition}.csv.gz"
+
+            with gzip.open(path, "wb") as file_:
+                cursor.copy_expert(
+                    f"COPY {partition} TO STDOUT WITH (FORMAT csv, HEADER)", file_
+                )
+            paths.append(path)
+
+        # Children first, as they refer to the `event` partition
+        for table in reversed(self.TABLES):
+            partition = self.partition_name(table, month)
+            self._db.execute(text(f"ALTER TABLE {table} DETACH PARTITION {partition}"))
+            self._db.execute(text(f"DROP TABLE {partition}"))
+
+        mark_changed(self._db)
+        return paths
+
+    @staticmethod
+    def partition_name(table: str, month: date) -> str:
+        """Get the name of `table`'s partition for `month`."""
+        return f"{table}_{month:%Y_%m}"
+
+
+def factory(_context, request):
+    return EventPartitionService(request.db)
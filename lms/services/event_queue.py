@@ -0,0 +1,94 @@
+"""A process wide buffer of events waiting to be written by celery."""
+
+import atexit
+import logging
+import threading
+from datetime import timedelta
+
+LOG = logging.getLogger(__name__)
+
+
+class EventQueue:  # pylint:disable=too-many-instance-attributes
+    """
+    A thread safe buffer which batches events before queueing them.
+
+    Events are collected for up to `window` after the first one and then
+    handed to a celery task in one go, which writes them all with a few
+    multi-row INSERTs. The buffer is sent early if it reaches `max_size`
+    events. Once the task is in the broker the events will be written even
+    if this process or the celery worker restarts.
+
+    This buffer lives as long as the worker process and is shared between
+    requests. Anything still in it when the process exits cleanly is sent.
+    """
+
+    def __init__(self, window=timedelta(seconds=1), max_size=500):
+        self._window = window
+        self._max_size = max_size
+
+        self._lock = threading.Lock()
+        self._payloads = []
+        self._timer = None
+        self._added = self._batches = self._errors = 0
+
+    def add(self, payload: dict):
+        """Add an event payload (see `EventService.to_payload()`)."""
+        with self._lock:
+            self._payloads.append(payload)
+            self._added += 1
+
+            send_now = len(self._payloads) >= self._max_size
+            if not send_now and self._timer is None:
+                self._timer = threading.Timer(self._window.total_seconds(), self.flush)
+                self._timer.name = "EventQueueFlush"
+                self._timer.daemon = True
+                self._timer.start()
+
+        if send_now:
+            self.flush()
+
+    def flush(self):
+        """Queue everything in the buffer to be written now."""
+        with self._lock:
+            payloads, self._payloads = self._payloads, []
+
+            if self._timer:
+                self._timer.cancel()
+                self._timer = None
+
+            if not payloads:
+                return
+
+            self._batches += 1
+
+        # pylint:disable=import-outside-toplevel,cyclic-import
+        from lms.tasks.event import insert_events
+
+        try:
+            insert_events.delay(payloads)
+        except Exception:  # pylint:disable=broad-except
+            with self._lock:
+                self._errors += 1
+            LOG.exception("Couldn't queue %d events for writing", len(payloads))
+
+    def stats(self) -> dict:
+        """
+        Get counters describing how events are being batched.
+
+        :return: A dict with the number of events `added`, the number of
+            `batches` queued for writing, the number of batches we couldn't
+            queue (`errors`) and the number of `pending` events
+        """
+        with self._lock:
+            return {
+                "added": self._added,
+                "batches": self._batches,
+                "errors": self._errors,
+                "pending": len(self._payloads),
+            }
+
+
+EVENT_QUEUE = EventQueue()
+"""The buffer of events shared by everything in this process."""
+
+atexit.register(EVENT_QUEUE.flush)
@@ -1,13 +1,23 @@
-from sqlalchemy import func
+from sqlalchemy import func, or_
 
 from lms.models import File
+from lms.services.canvas_api import FILES_CACHE
 from lms.services.upsert import bulk_upsert
 
 
 class FileService:
-    def __init__(self, application_instance, db):
+    def __init__(self, application_instance, db, files_cache=None):
+        """
+        Create a new FileService.
+
+        :param application_instance: The current application instance
+        :param db: The SQLAlchemy session
+        :param files_cache: A cache of LMS file listings to invalidate when
+            files change
+        """
         self._application_instance = application_instance
         self._db = db
+        self._files_cache = files_cache
 
     def get(self, lms_id, type_):
         """Return the file with the given lms_id and type_ or None."""
@@ -22,19 +32,37 @@ class FileService:
         )
 
     def upsert(self, file_dicts):
-        """Insert or update a batch of files."""
+        """
+        Insert or update a batch of files.
+
+        Any cached file listings for courses with new or changed files are
+        invalidated.
+        """
         for value in file_dicts:
             value["application_instance_id"] = self._application_instance.id
             value["updated"] = func.now()
 
-        return bulk_upsert(
+        # Only rows which are new or have actually changed are updated and
+        # returned, which tells us which listings are out of date
+        changed = bulk_upsert(
             self._db,
             File,
             file_dicts,
             index_elements=["application_instance_id", "lms_id", "type", "course_id"],
             update_columns=["name", "size", "updated"],
+            update_where=lambda excluded: or_(
+                File.name.is_distinct_from(excluded.name),
+                File.size.is_distinct_from(excluded.size),
+            ),
+            return_keys=True,
         )
 
+        if self._files_cache is not None:
+            for course_id in {row.course_id for row in changed}:
+                self._files_cache.invalidate(
+                    self._application_instance.lms_host(), course_id
+                )
+
 
 def factory(_context, request):
     return FileService(
@@ -42,4 +70,5 @@ def factory(_context, request):
             name="application_instance"
         ).get_current(),
         db=request.db,
+        files_cache=FILES_CACHE,
     )
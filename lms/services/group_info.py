@@ -1,6 +1,43 @@
 """A service for managing `GroupInfo` records."""
 
+from typing import List
+
+from sqlalchemy import text
+
 from lms.models import GroupInfo, Grouping
+from lms.services.upsert import bulk_upsert
+
+# Merge the instructor we're upserting (if any) into the row's existing list,
+# replacing any instructor with the same username in place or adding them to
+# the end.
+_MERGE_INFO = text(
+    """
+    COALESCE(group_info.info, '{}'::jsonb)
+    || jsonb_build_object('type', excluded.info -> 'type')
+    || CASE
+        WHEN NOT excluded.info ? 'instructors' THEN '{}'::jsonb
+        WHEN COALESCE(group_info.info -> 'instructors', '[]'::jsonb) @> jsonb_build_array(
+            jsonb_build_object('username', excluded.info -> 'instructors' -> 0 -> 'username')
+        ) THEN jsonb_build_object('instructors', (
+            SELECT jsonb_agg(
+                CASE
+                    WHEN existing.value -> 'username' = excluded.info -> 'instructors' -> 0 -> 'username'
+                    THEN excluded.info -> 'instructors' -> 0
+                    ELSE existing.value
+                END
+                ORDER BY existing.ordinality
+            )
+            FROM jsonb_array_elements(group_info.info -> 'instructors')
+                WITH ORDINALITY AS existing
+        ))
+        ELSE jsonb_build_object(
+            'instructors',
+            COALESCE(group_info.info -> 'instructors', '[]'::jsonb)
+            || (excluded.info -> 'instructors')
+        )
+    END
+    """
+)
 
 
 class GroupInfoService:
@@ -18,39 +55,64 @@ class GroupInfoService:
         "d2l_group": "d2l_group_group",
     }
 
-    def upsert_group_info(self, grouping: Grouping, params: dict):
+    _SKIP_PARAMS = {
+        "authority_provided_id",
+        "id",
+        "info",
+        "_info",
+        "application_instance_id",
+    }
+
+    def upsert_group_infos(self, groupings: List[Grouping], params: dict):
         """
-        Upsert a row into the `group_info` DB table.
+        Upsert rows into the `group_info` DB table in one statement.
 
-        :param grouping: grouping to upsert based on
-        :param params: columns to set on the row ("authority_provided_id",
+        :param groupings: groupings to upsert based on
+        :param params: columns to set on each row ("authority_provided_id",
             "id", "info" and any non-matching items will be ignored)
         """
-        group_info = (
-            self._db.query(GroupInfo)
-            .filter_by(authority_provided_id=grouping.authority_provided_id)
-            .one_or_none()
-        )
+        if any(grouping.application_instance.id is None for grouping in groupings):
+            # Ensure all ORM objects have their PK populated
+            self._db.flush()
+
+        param_columns = sorted(set(GroupInfo.columns()) - self._SKIP_PARAMS)
+        param_columns = [column for column in param_columns if column in params]
 
-        if not group_info:
-            group_info = GroupInfo(
-                authority_provided_id=grouping.authority_provided_id,
-                application_instance=grouping.application_instance,
+        instructor = None
+        if self._lti_user.is_instructor:
+            instructor = dict(
+                email=self._lti_user.email, **self._lti_user.h_user._asdict()
             )
-            self._db.add(group_info)
 
-        # This is very strange. The DB layout is wrong here. You can "steal" a
-        # group info row from another application instance by updating it with
-        # a grouping from another AI. This is wrong in because grouping to
-        # AI should be many:many, and we reflect that wrongness here.
-        group_info.application_instance = grouping.application_instance
+        # Postgres can't update the same row twice in one statement, so only
+        # keep the last of any groupings with the same authority_provided_id
+        values = {
+            grouping.authority_provided_id: {
+                "authority_provided_id": grouping.authority_provided_id,
+                # This is very strange. The DB layout is wrong here. You can
+                # "steal" a group info row from another application instance
+                # by updating it with a grouping from another AI. This is
+                # wrong in because grouping to AI should be many:many, and we
+                # reflect that wrongness here.
+                "application_instance_id": grouping.application_instance.id,
+                "info": self._info(grouping, instructor),
+                **{column: params[column] for column in param_columns},
+            }
+            for grouping in groupings
+        }
 
-        group_info.type = self._GROUPING_TYPES[grouping.type]
-        group_info.update_from_dict(
-            params, skip_keys={"authority_provided_id", "id", "info"}
+        bulk_upsert(
+            self._db,
+            GroupInfo,
+            list(values.values()),
+            index_elements=["authority_provided_id"],
+            update_columns=["application_instance_id", *param_columns],
+            update_expressions=lambda _excluded: {"info": _MERGE_INFO},
         )
 
-        if self._lti_user.is_instructor:
-            group_info.upsert_instructor(
-                dict(email=self._lti_user.email, **self._lti_user.h_user._asdict())
-            )
+    def _info(self, grouping, instructor):
+        info = {"type": self._GROUPING_TYPES[grouping.type]}
+        if instructor:
+            info["instructors"] = [instructor]
+
+        return info
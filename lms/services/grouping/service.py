@@ -81,7 +81,8 @@ class GroupingService:
             values,
             index_elements=["application_instance_id", "authority_provided_id"],
             update_columns=["lms_name", "extra", "updated"],
-        ).all()
+            return_entities=True,
+        )
 
     def upsert_grouping_memberships(self, user: User, groups: List[Grouping]):
         """
@@ -0,0 +1,88 @@
+"""A process wide record of what we've recently synced to h."""
+
+import hashlib
+import json
+import threading
+from datetime import timedelta
+from typing import Iterable
+
+from lms.services.ttl_map import TTLMap
+
+
+class HSyncCache:
+    """
+    A size bounded, thread safe record of recent successful h syncs.
+
+    Each sync is identified by a fingerprint of the Bulk API commands it
+    sends: the h user, the groups and the memberships. If we've successfully
+    sent exactly the same commands within the last `ttl` there's no need to
+    send them again, as h already has everything in them.
+
+    This cache lives as long as the worker process and is shared between
+    requests. Other workers keep their own, so at worst each of them syncs
+    once per `ttl`.
+    """
+
+    def __init__(self, max_size=10000, ttl=timedelta(minutes=10)):
+        self._synced = TTLMap(max_size=max_size, ttl=ttl)
+        """Map of the fingerprints we have synced to `True`."""
+
+        self._lock = threading.Lock()
+        self._skipped = self._synced_count = 0
+
+    @staticmethod
+    def fingerprint(commands: Iterable) -> str:
+        """Get a fingerprint for a series of h_api Commands."""
+        raw = json.dumps(
+            [command.raw for command in commands],
+            sort_keys=True,
+            separators=(",", ":"),
+        )
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def is_fresh(self, fingerprint: str) -> bool:
+        """
+        Return True if `fingerprint` has been synced within the TTL.
+
+        Every True counts as a skipped sync (an avoided h round trip).
+        """
+        if not self._synced.get(fingerprint):
+            return False
+
+        with self._lock:
+            self._skipped += 1
+
+        return True
+
+    def record(self, fingerprint: str):
+        """Record that `fingerprint` has just been synced successfully."""
+        self._synced.set(fingerprint, True)
+
+        with self._lock:
+            self._synced_count += 1
+
+    def stats(self) -> dict:
+        """
+        Get counters describing how well the cache is working.
+
+        :return: A dict with the number of remembered `fingerprints`, the
+            number of syncs `skipped` (h round trips avoided) and the number
+            of syncs actually sent to h (`synced`)
+        """
+        with self._lock:
+            return {
+                "fingerprints": len(self._synced),
+                "skipped": self._skipped,
+                "synced": self._synced_count,
+            }
+
+    def clear(self):
+        """Forget all syncs and reset the counters."""
+        self._synced.clear()
+
+        with self._lock:
+            self._skipped = self._synced_count = 0
+
+
+H_SYNC_CACHE = HSyncCache()
+"""The record of h syncs shared by everything in this process."""
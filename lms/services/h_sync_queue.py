@@ -0,0 +1,137 @@
+"""A process wide buffer of h syncs waiting to be sent by celery."""
+
+import atexit
+import logging
+import threading
+from datetime import timedelta
+from typing import List
+
+from h_api.bulk_api import CommandBuilder
+
+LOG = logging.getLogger(__name__)
+
+
+class HSyncQueue:  # pylint:disable=too-many-instance-attributes
+    """
+    A thread safe buffer which coalesces h syncs before queueing them.
+
+    Syncs added within `window` of the first one are merged into a single
+    Bulk API call which is sent to h by a celery task: each user and group
+    is upserted once (the most recent version wins) and the memberships of
+    all of the syncs are combined. The buffer is sent early if it reaches
+    `max_users` users.
+
+    This buffer lives as long as the worker process and is shared between
+    requests.
+    """
+
+    def __init__(self, window=timedelta(seconds=2), max_users=50):
+        self._window = window
+        self._max_users = max_users
+
+        self._lock = threading.Lock()
+        self._users = {}
+        """Map of username to user upsert attributes."""
+        self._groups = {}
+        """Map of authority_provided_id to group upsert attributes."""
+        self._memberships = set()
+        """Set of `(username, authority_provided_id)` tuples."""
+        self._timer = None
+        self._added = self._batches = 0
+
+    def add(self, user: dict, groups: List[dict]):
+        """
+        Add a sync of `user` and their membership of `groups` to the buffer.
+
+        :param user: The attributes to upsert the h user with
+        :param groups: The attributes to upsert each of the h groups with
+        """
+        with self._lock:
+            self._users[user["username"]] = user
+            for group in groups:
+                self._groups[group["authority_provided_id"]] = group
+                self._memberships.add(
+                    (user["username"], group["authority_provided_id"])
+                )
+            self._added += 1
+
+            send_now = len(self._users) >= self._max_users
+            if not send_now and self._timer is None:
+                self._timer = threading.Timer(self._window.total_seconds(), self.flush)
+                self._timer.name = "HSyncQueueFlush"
+                self._timer.daemon = True
+                self._timer.start()
+
+        if send_now:
+            self.flush()
+
+    def flush(self):
+        """Queue everything in the buffer to be sent to h now."""
+        with self._lock:
+            users, groups, memberships = self._users, self._groups, self._memberships
+            self._users, self._groups, self._memberships = {}, {}, set()
+
+            if self._timer:
+                self._timer.cancel()
+                self._timer = None
+
+            if not users:
+                return
+
+            self._batches += 1
+
+        commands = _build_commands(users, groups, memberships)
+
+        # pylint:disable=import-outside-toplevel,cyclic-import
+        from lms.tasks.h_api import sync_to_h
+
+        try:
+            sync_to_h.delay([command.raw for command in commands])
+        except Exception:  # pylint:disable=broad-except
+            # We only queue syncs for users and groups h already has, so this
+            # just means h misses an update until the next launch syncs again
+            LOG.exception("Couldn't queue h sync for %d users", len(users))
+
+    def stats(self) -> dict:
+        """
+        Get counters describing how well syncs are being coalesced.
+
+        :return: A dict with the number of syncs `added`, the number of
+            `batches` queued for h and the number of `pending` users
+        """
+        with self._lock:
+            return {
+                "added": self._added,
+                "batches": self._batches,
+                "pending": len(self._users),
+            }
+
+
+def _build_commands(users, groups, memberships):
+    # The command builders modify the attributes they're given, so they each
+    # get a copy
+    user_refs = {username: f"user_{i}" for i, username in enumerate(users)}
+    group_refs = {apid: f"group_{i}" for i, apid in enumerate(groups)}
+
+    return (
+        [
+            CommandBuilder.user.upsert(dict(attributes), user_refs[username])
+            for username, attributes in users.items()
+        ]
+        + [
+            CommandBuilder.group.upsert(dict(attributes), group_refs[apid])
+            for apid, attributes in groups.items()
+        ]
+        + [
+            CommandBuilder.group_membership.create(
+                user_refs[username], group_refs[apid]
+            )
+            for username, apid in sorted(memberships)
+        ]
+    )
+
+
+H_SYNC_QUEUE = HSyncQueue()
+"""The buffer of h syncs shared by everything in this process."""
+
+atexit.register(H_SYNC_QUEUE.flush)
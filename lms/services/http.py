@@ -1,23 +1,26 @@
-from requests import RequestException, Response, Session
+from requests import RequestException, Response
 
 from lms.services.exceptions import ExternalRequestError
+from lms.services.http_pool import SESSION_POOL
 
 
 class HTTPService:
     """Send HTTP requests with `requests` and receive the responses."""
 
-    # This is here mostly to let auto-spec know about it in the tests
-    session: Session = None
-    """The underlying requests Session."""
-
-    def __init__(self):
-        # A session is used so that cookies are persisted across
-        # requests and urllib3 connection pooling is used (which means that
-        # underlying TCP connections are re-used when making multiple requests
-        # to the same host, e.g. pagination).
-
-        # See https://docs.python-requests.org/en/latest/user/advanced/#session-objects
-        self.session = Session()
+    def __init__(self, headers=None, session_pool=SESSION_POOL):
+        """
+        Initialise the service.
+
+        :param headers: Headers to send with every request made by this
+            service. Headers passed to individual calls take precedence
+        :param session_pool: Where to get requests Sessions from. Sessions
+            are shared across the whole process so that urllib3 connection
+            pooling (which means that underlying TCP connections are re-used
+            when making multiple requests to the same host) outlives any one
+            request. Because of that they must never be modified
+        """
+        self._headers = headers or {}
+        self._session_pool = session_pool
 
     def request(self, method, url, timeout=(10, 10), **kwargs) -> Response:
         """
@@ -31,10 +34,15 @@ class HTTPService:
         :raises ExternalRequestError: For any request based failure or if the
             response is an error (4xx or 5xx response).
         """
+        if self._headers:
+            kwargs["headers"] = {**self._headers, **(kwargs.get("headers") or {})}
+
         response = None
 
         try:
-            response = self.session.request(method, url, timeout=timeout, **kwargs)
+            response = self._session_pool.get(url).request(
+                method, url, timeout=timeout, **kwargs
+            )
             response.raise_for_status()
         except RequestException as err:
             raise ExternalRequestError(request=err.request, response=response) from err
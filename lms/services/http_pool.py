@@ -0,0 +1,184 @@
+"""A process wide pool of `requests` Sessions shared by all requests."""
+
+import os
+import socket
+import threading
+from collections import OrderedDict
+from http.cookiejar import DefaultCookiePolicy
+from urllib.parse import urlparse
+
+from requests import Session
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+
+
+class SessionPool:
+    """
+    Hand out one long lived `requests.Session` per upstream host.
+
+    Sessions (and the connections in their pools) live as long as the process
+    does, so repeated calls to the same host don't pay for a new TCP and TLS
+    handshake each time.
+
+    As the sessions are shared between everyone talking to the same host they
+    must never carry any state of their own: callers pass headers and auth on
+    each call and cookies are never stored.
+    """
+
+    def __init__(
+        self, pool_connections=10, pool_maxsize=10, keepalive=True, max_hosts=500
+    ):
+        """
+        Create a new pool.
+
+        :param pool_connections: Number of connection pools to keep per host
+            (one per scheme and port combination)
+        :param pool_maxsize: Maximum number of connections to keep open to
+            each host
+        :param keepalive: Enable TCP keep-alive on idle pooled connections so
+            they aren't silently dropped by firewalls between requests
+        :param max_hosts: Maximum number of hosts to keep sessions for. The
+            least recently used session is closed beyond this
+        """
+        self._adapter_kwargs = {
+            "pool_connections": pool_connections,
+            "pool_maxsize": pool_maxsize,
+            "keepalive": keepalive,
+        }
+        self._max_hosts = max_hosts
+
+        self._lock = threading.Lock()
+        self._pid = None
+        self._sessions = OrderedDict()
+        self._stats = None
+
+    def get(self, url) -> Session:
+        """Get the session to use for requests to `url`."""
+        parsed = urlparse(url)
+        key = (parsed.scheme.lower(), parsed.netloc.lower())
+
+        with self._lock:
+            self._check_pid()
+
+            if session := self._sessions.get(key):
+                self._sessions.move_to_end(key)
+                self._stats["hits"] += 1
+                return session
+
+            self._stats["misses"] += 1
+            session = self._sessions[key] = self._new_session()
+
+            if len(self._sessions) > self._max_hosts:
+                _, evicted = self._sessions.popitem(last=False)
+                connections, requests = _connection_stats(evicted)
+                self._stats["evictions"] += 1
+                self._stats["closed_connections"] += connections
+                self._stats["closed_requests"] += requests
+                evicted.close()
+
+            return session
+
+    def stats(self) -> dict:
+        """
+        Get counters describing how well the pool is working.
+
+        :return: A dict with the number of open `sessions`, session `hits`,
+            `misses` and `evictions`, and the total number of `connections`
+            opened and `requests` sent over them
+        """
+        with self._lock:
+            self._check_pid()
+
+            connections = self._stats["closed_connections"]
+            requests = self._stats["closed_requests"]
+            for session in self._sessions.values():
+                session_connections, session_requests = _connection_stats(session)
+                connections += session_connections
+                requests += session_requests
+
+            return {
+                "sessions": len(self._sessions),
+                "hits": self._stats["hits"],
+                "misses": self._stats["misses"],
+                "evictions": self._stats["evictions"],
+                "connections": connections,
+                "requests": requests,
+            }
+
+    def clear(self):
+        """Close all sessions and reset the counters."""
+        with self._lock:
+            if self._pid == os.getpid():
+                for session in self._sessions.values():
+                    session.close()
+
+            self._pid = None
+            self._check_pid()
+
+    def _check_pid(self):
+        if self._pid != os.getpid():
+            # Either this is the first call or we've been forked. In the
+            # latter case the connections belong to our parent, so we start
+            # again without touching them.
+            self._pid = os.getpid()
+            self._sessions = OrderedDict()
+            self._stats = dict.fromkeys(
+                (
+                    "hits",
+                    "misses",
+                    "evictions",
+                    "closed_connections",
+                    "closed_requests",
+                ),
+                0,
+            )
+
+    def _new_session(self):
+        session = Session()
+        # This session is shared between tenants, so we never want to send
+        # one user's cookies with another's request.
+        session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+
+        adapter = _PoolAdapter(**self._adapter_kwargs)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+
+        return session
+
+
+class _PoolAdapter(HTTPAdapter):
+    """An `HTTPAdapter` which can enable TCP keep-alive on its connections."""
+
+    __attrs__ = HTTPAdapter.__attrs__ + ["_keepalive"]
+
+    def __init__(self, keepalive, **kwargs):
+        self._keepalive = keepalive
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        if self._keepalive:
+            kwargs["socket_options"] = HTTPConnection.default_socket_options + [
+                (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+            ]
+
+        super().init_poolmanager(*args, **kwargs)
+
+
+def _connection_stats(session):
+    """Get the number of connections opened and requests sent by `session`."""
+    connections = requests = 0
+
+    for adapter in set(session.adapters.values()):
+        pools = adapter.poolmanager.pools
+        # This container refuses to be iterated over directly, as it's not
+        # thread safe. Its `keys()` takes a copy under a lock.
+        for key in pools.keys():
+            if pool := pools.get(key):
+                connections += pool.num_connections
+                requests += pool.num_requests
+
+    return connections, requests
+
+
+SESSION_POOL = SessionPool()
+"""The session pool shared by everything in this process."""
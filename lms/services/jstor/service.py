@@ -38,8 +38,7 @@ class JSTORService:
         self._enabled = enabled
         self._site_code = site_code
 
-        self._http = HTTPService()
-        self._http.session.headers = headers
+        self._http = HTTPService(headers=headers)
 
     @property
     def enabled(self) -> bool:
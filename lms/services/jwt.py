@@ -1,24 +1,52 @@
 import copy
 import datetime
+import json
 import logging
-from functools import lru_cache
+from calendar import timegm
+from typing import NamedTuple
 
 import jwt
-import requests
-from jwt.exceptions import ExpiredSignatureError, InvalidTokenError, PyJWTError
+from jwt.algorithms import get_default_algorithms
+from jwt.exceptions import (
+    DecodeError,
+    ExpiredSignatureError,
+    ImmatureSignatureError,
+    InvalidAlgorithmError,
+    InvalidIssuedAtError,
+    InvalidSignatureError,
+    InvalidTokenError,
+    PyJWTError,
+)
+from jwt.utils import base64url_decode
 
 from lms.services.exceptions import ExpiredJWTError, InvalidJWTError
 from lms.services.lti_registration import LTIRegistrationService
+from lms.services.platform_jwks import PLATFORM_JWKS, PlatformJWKSCache
 from lms.services.rsa_key import RSAKeyService
 from lms.validation import ValidationError
 
 LOG = logging.getLogger(__name__)
 
+_RS256 = get_default_algorithms()["RS256"]
+
+
+class LTIToken(NamedTuple):
+    """A verified LTI `id_token`."""
+
+    header: dict
+    claims: dict
+
 
 class JWTService:
-    def __init__(self, registration_service, rsa_key_service):
+    def __init__(
+        self,
+        registration_service,
+        rsa_key_service,
+        platform_jwks: PlatformJWKSCache,
+    ):
         self._registration_service = registration_service
         self._rsa_key_service = rsa_key_service
+        self._platform_jwks = platform_jwks
 
     @classmethod
     def decode_with_secret(cls, jwt_str, secret) -> dict:
@@ -74,14 +102,32 @@ class JWTService:
         if not id_token:
             return {}
 
-        if not jwt.get_unverified_header(id_token).get("kid"):
+        return self.verify_lti_token(id_token).claims
+
+    def verify_lti_token(self, id_token: str) -> LTIToken:
+        """
+        Verify an LTI `id_token` JWT and return its header and claims.
+
+        The token is only split and decoded once. We need its claims to find
+        out who signed it, so they are read before the signature is checked
+        and only trusted after.
+
+        :raise ValidationError: If the token is malformed, we don't know who
+            it's from, or it's not valid
+        """
+        try:
+            header, claims, signing_input, signature = _split_jwt(id_token)
+        except DecodeError as err:
+            LOG.debug("Malformed JWT. %s", str(err))
+            raise ValidationError(messages={"jwt": [f"Invalid JWT. {err}"]}) from err
+
+        if not (kid := header.get("kid")):
             LOG.debug("Missing 'kid' value in JWT header")
             raise ValidationError(
                 messages={"jwt": ["Missing 'kid' value in JWT header"]}
             )
 
-        unverified_payload = jwt.decode(id_token, options={"verify_signature": False})
-        iss, aud = unverified_payload.get("iss"), unverified_payload.get("aud")
+        iss, aud = claims.get("iss"), claims.get("aud")
 
         # Find the registration based on the token's claimed issuer & audience
         registration = self._registration_service.get(iss, aud)
@@ -94,58 +140,90 @@ class JWTService:
             )
 
         try:
-            signing_key = self._get_jwk_client(
-                registration.key_set_url
-            ).get_signing_key_from_jwt(id_token)
-
-            return jwt.decode(
-                id_token, key=signing_key.key, audience=aud, algorithms=["RS256"]
+            signing_key = self._platform_jwks.get_signing_key(
+                registration.key_set_url, kid
             )
+            _verify_signature(header, signing_input, signature, signing_key.key)
+            # There's no need to check `aud` here: we found the registration
+            # with it, so it's the audience we expect by definition.
+            _validate_time_claims(claims)
         except PyJWTError as err:
             LOG.debug("Invalid JWT for: %s, %s. %s", iss, aud, str(err))
             raise ValidationError(
                 messages={"jwt": [f"Invalid JWT for: {iss}, {aud}. {err}"]}
             ) from err
 
+        return LTIToken(header=header, claims=claims)
+
     def encode_with_private_key(self, payload: dict):
-        key = self._rsa_key_service.get_random_key()
+        key = self._rsa_key_service.get_random_signing_key()
         return jwt.encode(
             payload,
-            self._rsa_key_service.private_key(key),
+            key.private_key,
             algorithm="RS256",
             headers={"kid": key.kid},
         )
 
-    @staticmethod
-    @lru_cache
-    def _get_jwk_client(jwk_url: str):
-        """
-        Get a PyJWKClient for the given key set URL.
 
-        PyJWKClient maintains a cache of keys it has seen we want to keep
-        the clients around with `lru_cache` in case we can reuse that internal cache
-        """
-        return _RequestsPyJWKClient(jwk_url)
-
-
-class _RequestsPyJWKClient(jwt.PyJWKClient):
+def _split_jwt(token: str):
     """
-    Version of PyJWKClient which uses requests to gather JWKs.
+    Split and decode a JWT without verifying it.
 
-    Having our own class and using request allows for easier customization.
+    :return: A `(header, claims, signing_input, signature)` tuple
+    :raise DecodeError: If the token is malformed
     """
+    try:
+        signing_input, signature = token.encode("utf-8").rsplit(b".", 1)
+        header_segment, claims_segment = signing_input.split(b".", 1)
+
+        header = json.loads(base64url_decode(header_segment))
+        claims = json.loads(base64url_decode(claims_segment))
+        signature = base64url_decode(signature)
+    except (ValueError, TypeError) as err:
+        raise DecodeError("Not enough segments or invalid padding") from err
+
+    if not isinstance(header, dict) or not isinstance(claims, dict):
+        raise DecodeError("Invalid header or payload: must be JSON objects")
+
+    return header, claims, signing_input, signature
+
+
+def _verify_signature(header, signing_input, signature, key):
+    if header.get("alg") != "RS256":
+        raise InvalidAlgorithmError("The specified alg value is not allowed")
+
+    if not _RS256.verify(signing_input, key, signature):
+        raise InvalidSignatureError("Signature verification failed")
+
+
+def _validate_time_claims(claims):
+    """Validate `exp`, `nbf` and `iat` in the same way as `jwt.decode()`."""
+    now = timegm(datetime.datetime.now(tz=datetime.timezone.utc).utctimetuple())
+
+    try:
+        if "iat" in claims:
+            int(claims["iat"])
+    except (TypeError, ValueError) as err:
+        raise InvalidIssuedAtError("Issued At claim (iat) must be an integer.") from err
+
+    try:
+        if "nbf" in claims and int(claims["nbf"]) > now:
+            raise ImmatureSignatureError("The token is not yet valid (nbf)")
+    except (TypeError, ValueError) as err:
+        raise DecodeError("Not Before claim (nbf) must be an integer.") from err
 
-    def fetch_data(self):
-        # We found that some Moodle instances return 403s
-        # on request without an User-Agent.
-        with requests.get(self.uri, headers={"User-Agent": "requests"}) as response:
-            return response.json()
+    try:
+        if "exp" in claims and int(claims["exp"]) < now:
+            raise ExpiredSignatureError("Signature has expired")
+    except (TypeError, ValueError) as err:
+        raise DecodeError("Expiration Time claim (exp) must be an integer.") from err
 
 
 def factory(_context, request):
     return JWTService(
         registration_service=request.find_service(LTIRegistrationService),
         rsa_key_service=request.find_service(RSAKeyService),
+        platform_jwks=PLATFORM_JWKS,
     )
 
 
@@ -0,0 +1,153 @@
+from typing import List
+
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from zope.sqlalchemy import mark_changed
+
+from lms.models import (
+    Assignment,
+    AssignmentGrouping,
+    AssignmentMembership,
+    Course,
+    GroupingMembership,
+    LTIParams,
+    LTIRole,
+    User,
+)
+
+
+class LaunchPersistenceService:
+    """Store what we learn about assignments and their members from launches."""
+
+    def __init__(self, db: Session):
+        self._db = db
+
+    # pylint: disable=too-many-arguments
+    def record_assignment_launch(
+        self,
+        course: Course,
+        user: User,
+        lti_roles: List[LTIRole],
+        tool_consumer_instance_guid,
+        resource_link_id,
+        document_url,
+        lti_params: LTIParams,
+        is_gradable=False,
+        extra=None,
+    ) -> Assignment:
+        """
+        Create or update an assignment and record a user launching it.
+
+        This upserts the assignment and the user's memberships of the
+        assignment (one per role) and of the course, and the assignment's
+        place in the course. It's done in a single statement to save round
+        trips to the DB on every launch.
+
+        Any existing `document_url` for the assignment will be overwritten,
+        as will any existing `extra` if `extra` is provided.
+
+        :return: the created or updated assignment
+        """
+        if not user.id or not course.id or any(role.id is None for role in lti_roles):
+            # Ensure all ORM objects have their PK populated
+            self._db.flush()
+
+        # We use the tables here rather than the models, as SQLAlchemy doesn't
+        # render the CTEs we add with `add_cte()` for ORM enabled selects
+        values = {
+            "document_url": document_url,
+            "title": lti_params.get("resource_link_title"),
+            "description": lti_params.get("resource_link_description"),
+            "is_gradable": is_gradable,
+        }
+        if extra:
+            values["extra"] = extra
+
+        assignment = self._upsert_assignment(
+            tool_consumer_instance_guid, resource_link_id, values
+        )
+
+        query = sa.select(assignment)
+        for dml in self._upsert_memberships(assignment, course, user, lti_roles):
+            query = query.add_cte(dml)
+
+        result = self._db.execute(
+            sa.select(Assignment).from_statement(query)
+            # Overwrite anything we already had loaded for this assignment
+            .execution_options(populate_existing=True)
+        ).scalar_one()
+
+        # Let SQLAlchemy know that something has changed, otherwise it will
+        # never commit the transaction we are working on and it will get rolled
+        # back
+        mark_changed(self._db)
+
+        return result
+
+    @staticmethod
+    def _upsert_assignment(tool_consumer_instance_guid, resource_link_id, values):
+        stmt = insert(Assignment.__table__).values(
+            tool_consumer_instance_guid=tool_consumer_instance_guid,
+            resource_link_id=resource_link_id,
+            **values,
+        )
+        return (
+            stmt.on_conflict_do_update(
+                index_elements=["resource_link_id", "tool_consumer_instance_guid"],
+                set_=dict(
+                    {column: stmt.excluded[column] for column in values},
+                    updated=sa.func.now(),
+                ),
+            )
+            .returning(*Assignment.__table__.columns)
+            .cte("upserted_assignment")
+        )
+
+    @staticmethod
+    def _upsert_memberships(assignment, course, user, lti_roles):
+        if lti_roles:
+            role_ids = sa.values(sa.column("id", sa.Integer), name="lti_role_ids").data(
+                [(role_id,) for role_id in sorted({role.id for role in lti_roles})]
+            )
+            yield (
+                insert(AssignmentMembership.__table__)
+                .from_select(
+                    ["assignment_id", "user_id", "lti_role_id"],
+                    sa.select(assignment.c.id, sa.literal(user.id), role_ids.c.id).join(
+                        role_ids, sa.true()
+                    ),
+                )
+                .on_conflict_do_update(
+                    index_elements=["assignment_id", "user_id", "lti_role_id"],
+                    set_={"updated": sa.func.now()},
+                )
+                .cte("assignment_membership")
+            )
+
+        yield (
+            insert(AssignmentGrouping.__table__)
+            .from_select(
+                ["assignment_id", "grouping_id"],
+                sa.select(assignment.c.id, sa.literal(course.id)),
+            )
+            .on_conflict_do_update(
+                index_elements=["assignment_id", "grouping_id"],
+                set_={"updated": sa.func.now()},
+            )
+            .cte("assignment_grouping")
+        )
+
+        yield (
+            insert(GroupingMembership.__table__)
+            .values(grouping_id=course.id, user_id=user.id)
+            .on_conflict_do_update(
+                index_elements=["grouping_id", "user_id"],
+                set_={"updated": sa.func.now()},
+            )
+            .cte("grouping_membership")
+        )
+
+
+def factory(_context, request):
+    return LaunchPersistenceService(db=request.db)
@@ -1,11 +1,14 @@
 from typing import List
 
 from h_api.bulk_api import CommandBuilder
+from sqlalchemy import func
 
-from lms.models import Grouping
+from lms.models import GroupInfo, Grouping, GroupingMembership, User
+from lms.services.h_sync_cache import H_SYNC_CACHE
+from lms.services.h_sync_queue import H_SYNC_QUEUE
 
 
-class LTIHService:
+class LTIHService:  # pylint:disable=too-many-instance-attributes
     """
     Copy LTI users and courses to h users and groups.
 
@@ -18,15 +21,22 @@ class LTIHService:
     :raise HTTPInternalServerError: if any calls to the H API fail
     """
 
-    def __init__(self, _context, request):
+    def __init__(
+        self, _context, request, sync_cache=H_SYNC_CACHE, sync_queue=H_SYNC_QUEUE
+    ):
+        self._lti_user = request.lti_user
         self._h_user = request.lti_user.h_user
+        self._db = request.db
 
         self._authority = request.registry.settings["h_authority"]
+        self._async = request.registry.settings["h_sync_async"]
         self._application_instance_service = request.find_service(
             name="application_instance"
         )
         self._h_api = request.find_service(name="h_api")
         self._group_info_service = request.find_service(name="group_info")
+        self._sync_cache = sync_cache
+        self._sync_queue = sync_queue
 
     def sync(self, groupings: List[Grouping], group_info_params: dict):
         """
@@ -35,6 +45,15 @@ class LTIHService:
         This will upsert the provided list of groups, the current user and
         make that user a member of each group.
 
+        If we've recently sent h exactly the same user, groups and memberships
+        the call to h is skipped.
+
+        With the `h_sync_async` setting on, syncs for users and groups that h
+        already has are queued and sent in the background by celery instead.
+        We still wait for h if it's never seen the user, any of the groups or
+        the user's membership of them, as the launch won't work without them.
+        Queued syncs aren't recorded as done, as h might never accept them.
+
         :param groupings: groupings to sync to H
         :param group_info_params: params to add for each in `GroupInfo`
 
@@ -46,13 +65,52 @@ class LTIHService:
         if not application_instance.provisioning:
             return
 
-        self._h_api.execute_bulk(commands=self._yield_commands(groupings))
+        commands = list(self._yield_commands(groupings))
+        fingerprint = self._sync_cache.fingerprint(commands)
+
+        if not self._sync_cache.is_fresh(fingerprint):
+            if self._async and self._h_has_seen(groupings):
+                self._sync_queue.add(
+                    user=self._user_attributes(self._h_user),
+                    groups=[self._group_attributes(g) for g in groupings],
+                )
+            else:
+                self._h_api.execute_bulk(commands=commands)
+                self._sync_cache.record(fingerprint)
 
         # Keep a note of the groups locally for reporting purposes.
-        for grouping in groupings:
-            self._group_info_service.upsert_group_info(
-                grouping=grouping, params=group_info_params
+        self._group_info_service.upsert_group_infos(
+            groupings=groupings, params=group_info_params
+        )
+
+    def _h_has_seen(self, groupings):
+        """Return True if we've synced this user to all `groupings` before."""
+
+        # Anything created by this request has a `created` of `now()` (the
+        # start of the transaction), so only rows from earlier requests count.
+        # GroupInfo is only written after syncing, so is good as it is.
+        with self._db.no_autoflush:
+            grouping_ids = {grouping.id for grouping in groupings}
+            seen_memberships = (
+                self._db.query(func.count(GroupingMembership.grouping_id))
+                .join(User)
+                .filter(
+                    User.application_instance_id
+                    == self._lti_user.application_instance_id,
+                    User.h_userid == self._h_user.userid(self._authority),
+                    User.created < func.now(),
+                    GroupingMembership.grouping_id.in_(grouping_ids),
+                    GroupingMembership.created < func.now(),
+                )
+                .scalar()
             )
+            if seen_memberships != len(grouping_ids):
+                return False
+
+            authority_provided_ids = {g.authority_provided_id for g in groupings}
+            return self._db.query(func.count(GroupInfo.id)).filter(
+                GroupInfo.authority_provided_id.in_(authority_provided_ids)
+            ).scalar() == len(authority_provided_ids)
 
     def _yield_commands(self, groupings):
         yield self._user_upsert(self._h_user)
@@ -64,27 +122,27 @@ class LTIHService:
             yield CommandBuilder.group_membership.create("user_0", f"group_{i}")
 
     def _user_upsert(self, h_user, ref="user_0"):
-        return CommandBuilder.user.upsert(
-            {
-                "authority": self._authority,
-                "username": h_user.username,
-                "display_name": h_user.display_name,
-                "identities": [
-                    {
-                        "provider": h_user.provider,
-                        "provider_unique_id": h_user.provider_unique_id,
-                    }
-                ],
-            },
-            ref,
-        )
+        return CommandBuilder.user.upsert(self._user_attributes(h_user), ref)
+
+    def _user_attributes(self, h_user):
+        return {
+            "authority": self._authority,
+            "username": h_user.username,
+            "display_name": h_user.display_name,
+            "identities": [
+                {
+                    "provider": h_user.provider,
+                    "provider_unique_id": h_user.provider_unique_id,
+                }
+            ],
+        }
 
     def _group_upsert(self, grouping, ref):
-        return CommandBuilder.group.upsert(
-            {
-                "authority": self._authority,
-                "name": grouping.name,
-                "authority_provided_id": grouping.authority_provided_id,
-            },
-            ref,
-        )
+        return CommandBuilder.group.upsert(self._group_attributes(grouping), ref)
+
+    def _group_attributes(self, grouping):
+        return {
+            "authority": self._authority,
+            "name": grouping.name,
+            "authority_provided_id": grouping.authority_provided_id,
+        }
@@ -1,11 +1,18 @@
 from typing import List, Optional
 
 from lms.models import LTIRegistration
+from lms.services.snapshot_cache import SNAPSHOT_CACHE
 
 
 class LTIRegistrationService:
-    def __init__(self, db):
+    def __init__(self, db, cache=None):
+        """
+        Initialize the service.
+
+        :param cache: A SnapshotCache to share registrations between requests
+        """
         self._db = db
+        self._cache = cache
 
     def get(self, issuer: str, client_id: Optional[str] = None):
         """
@@ -23,9 +30,15 @@ class LTIRegistrationService:
         if not issuer:
             return None
 
-        return self._registration_search_query(
-            issuer=issuer, client_id=client_id
-        ).one_or_none()
+        def load():
+            return self._registration_search_query(
+                issuer=issuer, client_id=client_id
+            ).one_or_none()
+
+        if not self._cache:
+            return load()
+
+        return self._cache.get(self._db, ("lti_registration", issuer, client_id), load)
 
     def get_by_id(self, id_) -> Optional[LTIRegistration]:
         return self._registration_search_query(id_=id_).one_or_none()
@@ -78,4 +91,4 @@ class LTIRegistrationService:
 
 
 def factory(_context, request):
-    return LTIRegistrationService(db=request.db)
+    return LTIRegistrationService(db=request.db, cache=SNAPSHOT_CACHE)
@@ -0,0 +1,70 @@
+"""A process wide record of the rows in the `lti_role` table."""
+
+import threading
+from typing import Dict, Iterable, NamedTuple, Optional
+
+from lms.models.lti_role import LTIRole, RoleType
+
+
+class RoleRow(NamedTuple):
+    """The parts of an `LTIRole` we need to use it without a query."""
+
+    value: str
+    id: int
+    type: RoleType
+
+
+class LTIRoleRegistry:
+    """
+    A thread safe map of LTI role strings to their rows in `lti_role`.
+
+    The table is tiny and rows are only ever added, so we load all of it the
+    first time we need it and then only add to it. New rows should only be
+    added once the transaction that created them has committed, otherwise we
+    could remember ids which don't exist.
+
+    This lives as long as the worker process and is shared between requests.
+    Rows added by other workers aren't here until someone adds them, so a
+    role missing from the registry doesn't mean it's missing from the DB.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._roles: Optional[Dict[str, RoleRow]] = None
+
+    def get(self, db, values: Iterable[str]) -> Dict[str, RoleRow]:
+        """
+        Get the rows we know about for `values`.
+
+        :param db: A session to load the table with if this is the first use
+        :param values: Role strings to look up
+        :return: A dict of value to row for the values we know about
+        """
+        with self._lock:
+            if self._roles is None:
+                self._roles = {
+                    value: RoleRow(value, id_, type_)
+                    for value, id_, type_ in db.query(
+                        LTIRole.value, LTIRole.id, LTIRole.type
+                    )
+                }
+
+            return {
+                value: self._roles[value] for value in values if value in self._roles
+            }
+
+    def add(self, rows: Iterable[RoleRow]):
+        """Remember rows which have been committed to the DB."""
+        with self._lock:
+            # Wait until we've loaded the whole table before adding to it
+            if self._roles is not None:
+                self._roles.update((row.value, row) for row in rows)
+
+    def clear(self):
+        """Forget every row, so they are loaded again on the next use."""
+        with self._lock:
+            self._roles = None
+
+
+LTI_ROLE_REGISTRY = LTIRoleRegistry()
+"""The registry shared by all requests in this process."""
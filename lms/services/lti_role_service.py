@@ -1,38 +1,95 @@
 from typing import List
 
-from sqlalchemy.orm import Session
+from sqlalchemy import inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
 
 from lms.models import LTIRole
+from lms.services.lti_role_registry import LTI_ROLE_REGISTRY, RoleRow
 
 
 class LTIRoleService:
     """A service for dealing with LTIRole objects."""
 
-    def __init__(self, db_session: Session):
+    def __init__(self, db_session: Session, registry=None, transaction_manager=None):
+        """
+        Initialize the service.
+
+        :param db_session: The DB session to get and create roles in
+        :param registry: An LTIRoleRegistry to look roles up in before
+            going to the DB
+        :param transaction_manager: The transaction manager to add roles to
+            `registry` after the current transaction commits
+        """
         self._db = db_session
+        self._registry = registry
+        self._transaction_manager = transaction_manager
 
     def get_roles(self, role_description: str) -> List[LTIRole]:
         """
         Get a list of role objects for the provided strings.
 
+        Roles in the registry are returned without querying the DB. Any
+        others are loaded from the DB, or created if they don't exist.
+
         :param role_description: A comma delimited set of role strings
         """
-        role_strings = [role.strip() for role in role_description.split(",")]
+        role_strings = list(
+            dict.fromkeys(role.strip() for role in role_description.split(","))
+        )
+
+        roles = {}
+        if self._registry:
+            for row in self._registry.get(self._db, role_strings).values():
+                roles[row.value] = self._attach(row)
 
-        # pylint: disable=no-member
-        # Pylint is confused about the `in_` for some reason
-        roles = self._db.query(LTIRole).filter(LTIRole.value.in_(role_strings)).all()
+        if missing := [value for value in role_strings if value not in roles]:
+            # pylint: disable=no-member
+            # Pylint is confused about the `in_` for some reason
+            found = self._db.query(LTIRole).filter(LTIRole.value.in_(missing)).all()
 
-        if missing := (set(role_strings) - set(role.value for role in roles)):
-            new_roles = [LTIRole(value=value) for value in missing]
+            new_roles = [
+                LTIRole(value=value)
+                for value in set(missing) - set(role.value for role in found)
+            ]
             self._db.add_all(new_roles)
 
-            roles.extend(new_roles)
+            roles.update((role.value, role) for role in found + new_roles)
+
+            if self._registry:
+                self._register(found + new_roles)
+
+        return [roles[value] for value in role_strings]
+
+    def _attach(self, row: RoleRow) -> LTIRole:
+        """Get a persistent LTIRole for a registry row without a query."""
+        if role := self._db.identity_map.get(
+            inspect(LTIRole).identity_key_from_primary_key((row.id,))
+        ):
+            return role
+
+        role = LTIRole(id=row.id, _value=row.value, type=row.type)
+        make_transient_to_detached(role)
+
+        return self._db.merge(role, load=False)
+
+    def _register(self, roles: List[LTIRole]):
+        """Add roles to the registry once the transaction commits."""
+        # Make sure any new roles have ids
+        self._db.flush()
+        rows = [RoleRow(role.value, role.id, role.type) for role in roles]
+
+        def after_commit(success):
+            if success:
+                self._registry.add(rows)
 
-        return roles
+        self._transaction_manager.get().addAfterCommitHook(after_commit)
 
 
 def service_factory(_context, request) -> LTIRoleService:
     """Create an LTIRoleService object."""
 
-    return LTIRoleService(db_session=request.db)
+    return LTIRoleService(
+        db_session=request.db,
+        registry=LTI_ROLE_REGISTRY,
+        transaction_manager=request.tm,
+    )
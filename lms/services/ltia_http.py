@@ -2,33 +2,69 @@ import uuid
 from datetime import datetime, timedelta
 
 from lms.models import LTIRegistration
+from lms.services.exceptions import ExternalRequestError
 from lms.services.jwt import JWTService
+from lms.services.ltia_token_cache import (
+    ACCESS_TOKEN_CACHE,
+    AccessTokenCache,
+    AccessTokenKey,
+)
 
 
 class LTIAHTTPService:
     """Send LTI Advantage requests and return the responses."""
 
     def __init__(
-        self, lti_registration: LTIRegistration, jwt_service: JWTService, http
+        self,
+        lti_registration: LTIRegistration,
+        jwt_service: JWTService,
+        http,
+        token_cache: AccessTokenCache,
     ):
         self._lti_registration = lti_registration
         self._jwt_service = jwt_service
         self._http = http
+        self._token_cache = token_cache
 
     def request(self, method, url, scopes, headers=None, **kwargs):
         headers = headers or {}
 
         assert "Authorization" not in headers
 
-        access_token = self._get_access_token(scopes)
-        headers["Authorization"] = f"Bearer {access_token}"
+        token_key = AccessTokenKey(self._lti_registration.id, tuple(sorted(scopes)))
 
-        return self._http.request(method, url, headers=headers, **kwargs)
+        try:
+            return self._authenticated_request(
+                token_key, method, url, headers, **kwargs
+            )
+        except ExternalRequestError as err:
+            if err.status_code != 401:
+                raise
+
+            # The LMS might have revoked the token before it was due to
+            # expire. Try again, once, with a brand new one.
+            self._token_cache.invalidate(token_key)
+            return self._authenticated_request(
+                token_key, method, url, headers, **kwargs
+            )
+
+    def _authenticated_request(self, token_key, method, url, headers, **kwargs):
+        access_token = self._token_cache.get(
+            token_key, lambda: self._get_access_token(token_key.scopes)
+        )
+        return self._http.request(
+            method,
+            url,
+            headers={**headers, "Authorization": f"Bearer {access_token}"},
+            **kwargs,
+        )
 
     def _get_access_token(self, scopes):
         """
         Get an access token from the LMS to use in LTA services.
 
+        :return: An `(access_token, expires_in)` tuple
+
         https://datatracker.ietf.org/doc/html/rfc7523
         https://canvas.instructure.com/doc/api/file.oauth_endpoints.html#post-login-oauth2-token
         """
@@ -54,7 +90,13 @@ class LTIAHTTPService:
             },
         )
 
-        return response.json()["access_token"]
+        token = response.json()
+        try:
+            expires_in = int(token.get("expires_in"))
+        except (TypeError, ValueError):
+            expires_in = None
+
+        return token["access_token"], expires_in
 
 
 def factory(_context, request):
@@ -64,4 +106,5 @@ def factory(_context, request):
         .lti_registration,
         request.find_service(JWTService),
         request.find_service(name="http"),
+        ACCESS_TOKEN_CACHE,
     )
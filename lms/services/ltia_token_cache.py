@@ -0,0 +1,128 @@
+"""A process wide cache of LTI Advantage access tokens."""
+
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Callable, NamedTuple, Optional, Tuple
+
+
+class AccessTokenKey(NamedTuple):
+    """What an access token is good for."""
+
+    lti_registration_id: int
+    scopes: Tuple[str, ...]
+    """The scopes the token was granted for, sorted."""
+
+
+class AccessTokenCache:
+    """
+    A size bounded, thread safe cache of LTI Advantage access tokens.
+
+    Tokens are considered stale `refresh_margin` before the LMS says they
+    expire, so we never send one that is about to run out. Only one thread
+    at a time fetches a token for any given key: the others wait for it and
+    then use its result, rather than all asking the LMS at once.
+
+    This cache lives as long as the worker process and is shared between
+    requests.
+    """
+
+    def __init__(self, max_size=1000, refresh_margin=timedelta(seconds=60)):
+        self._max_size = max_size
+        self._refresh_margin = refresh_margin
+
+        self._lock = threading.Lock()
+        self._tokens = OrderedDict()
+        """Map of key to `(access_token, refresh_at)` tuples."""
+        self._fetch_locks = {}
+        self._hits = self._misses = 0
+
+    def get(
+        self,
+        key: AccessTokenKey,
+        fetch: Callable[[], Tuple[str, Optional[int]]],
+    ) -> str:
+        """
+        Get the access token for `key`, fetching a new one if needed.
+
+        :param key: What the token is for
+        :param fetch: Called to get a new token. It should return an
+            `(access_token, expires_in)` tuple. Tokens without an `expires_in`
+            aren't cached
+        """
+        if access_token := self._get_fresh(key):
+            return access_token
+
+        with self._fetch_lock(key):
+            # Another thread might have fetched it while we were waiting
+            if access_token := self._get_fresh(key):
+                return access_token
+
+            with self._lock:
+                self._misses += 1
+
+            access_token, expires_in = fetch()
+
+            if expires_in:
+                lifetime = timedelta(seconds=expires_in)
+                # Don't let a big margin stop short lived tokens being cached
+                refresh_at = (
+                    datetime.utcnow()
+                    + lifetime
+                    - min(self._refresh_margin, lifetime / 2)
+                )
+
+                with self._lock:
+                    self._tokens[key] = (access_token, refresh_at)
+                    self._tokens.move_to_end(key)
+
+                    while len(self._tokens) > self._max_size:
+                        evicted, _ = self._tokens.popitem(last=False)
+                        self._fetch_locks.pop(evicted, None)
+
+            return access_token
+
+    def invalidate(self, key: AccessTokenKey):
+        """Forget the token for `key` (e.g. because the LMS rejected it)."""
+        with self._lock:
+            self._tokens.pop(key, None)
+
+    def stats(self) -> dict:
+        """
+        Get counters describing how well the cache is working.
+
+        :return: A dict with the number of cached `tokens`, the number of
+            `hits` and the number of `misses` (tokens fetched from the LMS)
+        """
+        with self._lock:
+            return {
+                "tokens": len(self._tokens),
+                "hits": self._hits,
+                "misses": self._misses,
+            }
+
+    def clear(self):
+        """Remove all tokens and reset the counters."""
+        with self._lock:
+            self._tokens.clear()
+            self._fetch_locks.clear()
+            self._hits = self._misses = 0
+
+    def _get_fresh(self, key):
+        with self._lock:
+            access_token, refresh_at = self._tokens.get(key, (None, None))
+
+            if access_token and datetime.utcnow() < refresh_at:
+                self._tokens.move_to_end(key)
+                self._hits += 1
+                return access_token
+
+            return None
+
+    def _fetch_lock(self, key):
+        with self._lock:
+            return self._fetch_locks.setdefault(key, threading.Lock())
+
+
+ACCESS_TOKEN_CACHE = AccessTokenCache()
+"""The access token cache shared by everything in this process."""
@@ -1,10 +1,19 @@
 import datetime
+import logging
 from functools import lru_cache
+from typing import Callable, List
 
+import sqlalchemy as sa
 from sqlalchemy.orm.exc import NoResultFound
 
-from lms.models import OAuth2Token
-from lms.services import OAuth2TokenError
+from lms.db import SESSION
+from lms.models import GroupingMembership, OAuth2Token, User
+from lms.services import ExternalRequestError, OAuth2TokenError
+
+LOG = logging.getLogger(__name__)
+
+REFRESH_MARGIN = datetime.timedelta(minutes=5)
+"""How long before a token expires we refresh it when it's used."""
 
 
 class OAuth2TokenService:
@@ -65,6 +74,117 @@ class OAuth2TokenService:
                 "We don't have an OAuth 2 token for this user"
             ) from err
 
+    def refresh_if_expiring(
+        self, refresh: Callable[[], object], margin=REFRESH_MARGIN
+    ) -> bool:
+        """
+        Refresh the user's OAuth 2 token if it expires within `margin`.
+
+        The new token is committed straight away in a transaction of its own,
+        so it's kept even if whatever we wanted the token for then fails and
+        the request's transaction is rolled back. Some LMSes (e.g. D2L) only
+        accept a refresh token once, so losing the new one would leave the
+        user without a working token.
+
+        Only one process refreshes a token at a time. If someone else is
+        already refreshing it we carry on with the current one, which is
+        still good for a while. A failed refresh is logged and otherwise
+        ignored for the same reason.
+
+        :param refresh: Called with no arguments to get a new token and save
+            it with :meth:`save`
+        :param margin: How long before the token expires to refresh it
+        :raise OAuth2TokenError: if we don't have an OAuth 2 token for the user
+        :return: True if the token was refreshed
+        """
+        oauth2_token = self.get()
+        if not self._is_expiring(oauth2_token, margin):
+            return False
+
+        session = SESSION(bind=self._db.get_bind())
+        try:
+            # Lock the row so nobody else refreshes it at the same time
+            locked_token = (
+                session.query(OAuth2Token)
+                .filter_by(id=oauth2_token.id)
+                .with_for_update(skip_locked=True)
+                .one_or_none()
+            )
+            if not locked_token:
+                return False
+
+            # Reload our copy in case somebody has just refreshed it
+            self._db.refresh(oauth2_token)
+            if not self._is_expiring(oauth2_token, margin):
+                return False
+
+            try:
+                refresh()
+            except ExternalRequestError:
+                LOG.warning(
+                    "Couldn't refresh OAuth 2 token %s", oauth2_token.id, exc_info=True
+                )
+                return False
+
+            for column in (
+                "access_token",
+                "refresh_token",
+                "expires_in",
+                "received_at",
+            ):
+                setattr(locked_token, column, getattr(oauth2_token, column))
+            session.commit()
+        finally:
+            session.close()
+
+        # Swap the changes `refresh()` made to our copy for the committed
+        # values, so the request doesn't write them again later
+        self._db.refresh(oauth2_token)
+        return True
+
+    @staticmethod
+    def _is_expiring(oauth2_token, margin):
+        return bool(
+            oauth2_token.refresh_token
+            and oauth2_token.expires_at
+            and oauth2_token.expires_at - margin <= datetime.datetime.utcnow()
+        )
+
+
+def find_expiring_tokens(db, margin, active_since) -> List[OAuth2Token]:
+    """
+    Get the refreshable tokens of recently active users which expire soon.
+
+    :param db: The SQLAlchemy session
+    :param margin: Find tokens which expire within this long from now
+    :param active_since: Only find tokens of users who have launched
+        something since this time
+    """
+    now = datetime.datetime.utcnow()
+
+    recently_launched = (
+        sa.select(User.id)
+        .join(GroupingMembership, GroupingMembership.user_id == User.id)
+        .where(
+            User.application_instance_id == OAuth2Token.application_instance_id,
+            User.user_id == OAuth2Token.user_id,
+            GroupingMembership.updated >= active_since,
+        )
+        .exists()
+    )
+
+    return (
+        db.query(OAuth2Token)
+        .filter(
+            OAuth2Token.refresh_token.isnot(None),
+            # pylint: disable=no-member
+            # Pylint is confused about the `between` for some reason
+            OAuth2Token.expires_at.between(now, now + margin),
+            recently_launched,
+        )
+        .all()
+    )
+
 
 def oauth2_token_service_factory(_context, request):
     return OAuth2TokenService(
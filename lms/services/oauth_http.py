@@ -33,7 +33,7 @@ class OAuthHTTPService:
     def delete(self, *args, **kwargs):
         return self.request("DELETE", *args, **kwargs)
 
-    def request(self, method, url, headers=None, **kwargs):
+    def request(self, method, url, headers=None, refresh=None, **kwargs):
         """
         Send an access token-authenticated request and return the response.
 
@@ -43,6 +43,13 @@ class OAuthHTTPService:
 
         The given `headers` must not already contain an "Authorization" header.
 
+        :param method: The HTTP method to use
+        :param url: The URL to send the request to
+        :param headers: Headers to send along with the "Authorization" one
+        :param refresh: Called with no arguments to refresh the access token
+            first if it's about to expire (e.g. `refresh_access_token()` with
+            the right arguments). Without it the token is used as it is
+        :param kwargs: Passed on to `HTTPService.request()`
         :raise OAuth2TokenError: if we don't have an access token for the user
         :raise ExternalRequestError: if something goes wrong with the HTTP
             request
@@ -51,6 +58,11 @@ class OAuthHTTPService:
 
         assert "Authorization" not in headers
 
+        if refresh:
+            # Refresh before the token expires rather than letting this
+            # request fail and having the frontend refresh it and retry
+            self._oauth2_token_service.refresh_if_expiring(refresh)
+
         access_token = self._oauth2_token_service.get().access_token
         headers["Authorization"] = f"Bearer {access_token}"
 
@@ -0,0 +1,243 @@
+"""A process wide cache of the public keys LMSs sign their JWTs with."""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+import jwt
+from jwt.exceptions import PyJWKClientError, PyJWTError
+
+from lms.services.exceptions import ExternalRequestError
+from lms.services.http import HTTPService
+
+LOG = logging.getLogger(__name__)
+
+
+@dataclass
+class _KeySet:
+    keys: Dict[str, jwt.PyJWK]
+    """The usable signing keys of the key set by `kid`."""
+
+    fetched_at: datetime
+
+    refresh_started_at: Optional[datetime] = None
+    """When we last started refreshing this key set in the background."""
+
+
+@dataclass
+class _Stats:
+    hits: int = 0
+    stale_hits: int = 0
+    """Times we used a key set while refreshing it in the background."""
+
+    misses: int = 0
+    fetches: int = 0
+    fetch_errors: int = 0
+    fetch_seconds_total: float = 0
+    fetch_seconds_max: float = 0
+
+
+class PlatformJWKSCache:  # pylint:disable=too-many-instance-attributes
+    """
+    A size bounded, thread safe cache of LMS JWKS key sets by URL.
+
+    Key sets are fetched when we first need them and then:
+
+     * Used as they are for `ttl`
+     * Used for up to `stale_ttl` while being refreshed in the background, so
+       a slow key set endpoint doesn't hold up launches
+     * Fetched again straight away when we see a `kid` we don't know, in case
+       the LMS has rotated its keys. This happens at most once every
+       `min_refresh_interval` per key set so bogus tokens can't make us hammer
+       an LMS
+
+    This cache lives as long as the worker process and is shared between
+    requests.
+    """
+
+    def __init__(  # pylint:disable=too-many-arguments
+        self,
+        http: HTTPService,
+        max_size=500,
+        ttl=timedelta(hours=1),
+        stale_ttl=timedelta(hours=24),
+        min_refresh_interval=timedelta(seconds=30),
+        timeout=(5, 10),
+    ):
+        self._http = http
+        self._max_size = max_size
+        self._ttl = ttl
+        self._stale_ttl = stale_ttl
+        self._min_refresh_interval = min_refresh_interval
+        self._timeout = timeout
+
+        self._lock = threading.Lock()
+        self._key_sets = OrderedDict()
+        self._fetch_locks = {}
+        self._refreshing = set()
+        self._stats = _Stats()
+
+    def get_signing_key(self, key_set_url: str, kid: str) -> jwt.PyJWK:
+        """
+        Get the signing key `kid` from the key set at `key_set_url`.
+
+        :raise PyJWKClientError: If the key can't be found or we can't get the
+            key set from the LMS
+        """
+        with self._lock:
+            key_set = self._key_sets.get(key_set_url)
+            if key_set:
+                self._key_sets.move_to_end(key_set_url)
+
+        if key_set is None or self._age(key_set) >= self._stale_ttl:
+            with self._lock:
+                self._stats.misses += 1
+            key_set = self._fetch(key_set_url, key_set)
+        elif self._age(key_set) >= self._ttl:
+            with self._lock:
+                self._stats.stale_hits += 1
+            self._refresh_in_background(key_set_url)
+        else:
+            with self._lock:
+                self._stats.hits += 1
+
+        if kid not in key_set.keys and self._age(key_set) >= self._min_refresh_interval:
+            key_set = self._fetch(key_set_url, key_set)
+
+        if key := key_set.keys.get(kid):
+            return key
+
+        raise PyJWKClientError(f'Unable to find a signing key that matches: "{kid}"')
+
+    def stats(self) -> dict:
+        """
+        Get counters describing how well the cache is working.
+
+        :return: A dict with the number of cached `key_sets`, cache `hits`,
+            `stale_hits` and `misses`, and the number of `fetches` and
+            `fetch_errors` and how long fetching took in total and at most
+        """
+        with self._lock:
+            return {
+                "key_sets": len(self._key_sets),
+                "hits": self._stats.hits,
+                "stale_hits": self._stats.stale_hits,
+                "misses": self._stats.misses,
+                "fetches": self._stats.fetches,
+                "fetch_errors": self._stats.fetch_errors,
+                "fetch_seconds_total": self._stats.fetch_seconds_total,
+                "fetch_seconds_max": self._stats.fetch_seconds_max,
+            }
+
+    def clear(self):
+        """Remove all key sets and reset the counters."""
+        with self._lock:
+            self._key_sets.clear()
+            self._fetch_locks.clear()
+            self._stats = _Stats()
+
+    @staticmethod
+    def _age(key_set):
+        return datetime.utcnow() - key_set.fetched_at
+
+    def _fetch(self, key_set_url, old_key_set):
+        """Fetch a key set unless someone replaced `old_key_set` meanwhile."""
+        with self._lock:
+            fetch_lock = self._fetch_locks.setdefault(key_set_url, threading.Lock())
+
+        with fetch_lock:
+            with self._lock:
+                key_set = self._key_sets.get(key_set_url)
+            if key_set and key_set is not old_key_set:
+                return key_set
+
+            try:
+                keys = self._fetch_keys(key_set_url)
+            except PyJWKClientError:
+                with self._lock:
+                    if key_set_url not in self._key_sets:
+                        # Locks only live as long as their key sets do
+                        self._fetch_locks.pop(key_set_url, None)
+                raise
+
+            with self._lock:
+                key_set = self._key_sets[key_set_url] = _KeySet(
+                    keys=keys, fetched_at=datetime.utcnow()
+                )
+                self._key_sets.move_to_end(key_set_url)
+
+                while len(self._key_sets) > self._max_size:
+                    evicted, _ = self._key_sets.popitem(last=False)
+                    self._fetch_locks.pop(evicted, None)
+
+            return key_set
+
+    def _fetch_keys(self, key_set_url):
+        start = time.monotonic()
+        try:
+            data = self._http.get(key_set_url, timeout=self._timeout).json()
+            key_set = jwt.PyJWKSet.from_dict(data)
+        except (ExternalRequestError, ValueError, PyJWTError) as err:
+            with self._lock:
+                self._stats.fetch_errors += 1
+            raise PyJWKClientError(
+                f"Fail to fetch data from the url, err: {err}"
+            ) from err
+        finally:
+            elapsed = time.monotonic() - start
+            with self._lock:
+                self._stats.fetches += 1
+                self._stats.fetch_seconds_total += elapsed
+                self._stats.fetch_seconds_max = max(
+                    self._stats.fetch_seconds_max, elapsed
+                )
+            LOG.debug("Fetched JWKS from %s in %.3fs", key_set_url, elapsed)
+
+        return {
+            key.key_id: key
+            for key in key_set.keys
+            if key.key_id and key.public_key_use in ("sig", None)
+        }
+
+    def _refresh_in_background(self, key_set_url):
+        with self._lock:
+            old_key_set = self._key_sets.get(key_set_url)
+            if old_key_set is None or key_set_url in self._refreshing:
+                return
+
+            # Don't keep trying a failing LMS on every request
+            if (
+                old_key_set.refresh_started_at
+                and datetime.utcnow() - old_key_set.refresh_started_at
+                < self._min_refresh_interval
+            ):
+                return
+
+            self._refreshing.add(key_set_url)
+            old_key_set.refresh_started_at = datetime.utcnow()
+
+        def refresh():
+            try:
+                self._fetch(key_set_url, old_key_set)
+            except PyJWKClientError as err:
+                # We'll carry on with the stale keys until they run out
+                LOG.warning("Couldn't refresh JWKS from %s: %s", key_set_url, err)
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key_set_url)
+
+        threading.Thread(
+            target=refresh, name="PlatformJWKSRefresh", daemon=True
+        ).start()
+
+
+PLATFORM_JWKS = PlatformJWKSCache(
+    # We found that some Moodle instances return 403s
+    # on request without an User-Agent.
+    HTTPService(headers={"User-Agent": "requests"})
+)
+"""The LMS key sets shared by everything in this process."""
@@ -1,5 +1,9 @@
+import hashlib
 import json
+import random
+import threading
 from datetime import datetime, timedelta
+from typing import Callable, List, NamedTuple, Optional
 
 from cryptography.hazmat.backends import default_backend
 from cryptography.hazmat.primitives import serialization
@@ -11,12 +15,92 @@ from lms.models import RSAKey
 from lms.services.aes import AESService
 
 
+class SigningKey(NamedTuple):
+    """An active key, decrypted and ready to sign with."""
+
+    kid: str
+    private_key: rsa.RSAPrivateKey
+
+
+class SigningKeyring:
+    """
+    A worker wide cache of our active signing keys.
+
+    Decrypting and parsing a key is much slower than signing with it, so we
+    keep the parsed keys around and pick between them in memory.
+
+    The keys are reloaded after `ttl` or straight away after a rotation in
+    this process. Other processes might sign with a key for up to `ttl` after
+    it's been expired, which is fine as expired keys are still published for
+    much longer than that (see `RSAKeyService.rotate()`).
+    """
+
+    def __init__(self, ttl=timedelta(minutes=10)):
+        self._ttl = ttl
+        self._lock = threading.Lock()
+        self._keys = []
+        self._expires_at = None
+
+    def get_random_key(
+        self, load: Callable[[], List[SigningKey]]
+    ) -> Optional[SigningKey]:
+        """
+        Get a random key, loading them all with `load` first if needed.
+
+        :return: A random key or `None` if there are no active keys
+        """
+        with self._lock:
+            if not self._keys or datetime.utcnow() >= self._expires_at:
+                self._keys = load()
+                self._expires_at = datetime.utcnow() + self._ttl
+
+            return random.choice(self._keys) if self._keys else None
+
+    def invalidate(self):
+        """Reload the keys the next time one is needed."""
+        with self._lock:
+            self._keys = []
+            self._expires_at = None
+
+
+class JWKSDocument(NamedTuple):
+    """Our public keys, serialized ready to be served."""
+
+    body: bytes
+    etag: str
+
+
+class JWKSCache:
+    """
+    A worker wide cache of our serialized public JWKS.
+
+    The document is rebuilt whenever the key set version changes. The version
+    is cheap to query, so we can check it on every call without loading or
+    parsing any keys.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        self._document = None
+
+    def get(self, version, build: Callable[[], JWKSDocument]) -> JWKSDocument:
+        """Get the document for key set `version`, building it if needed."""
+        with self._lock:
+            if self._document is None or self._version != version:
+                self._version, self._document = version, build()
+
+            return self._document
+
+
 class RSAKeyService:
     no_encryption = serialization.NoEncryption()
 
-    def __init__(self, db, aes_service):
+    def __init__(self, db, aes_service, keyring: SigningKeyring, jwks_cache: JWKSCache):
         self._db = db
         self._aes_service = aes_service
+        self._keyring = keyring
+        self._jwks_cache = jwks_cache
 
     def rotate(
         self,
@@ -63,6 +147,8 @@ class RSAKeyService:
             self._db.query(RSAKey).filter_by(expired=False).count() == target_keys
         ), "The number of active RSAKey doesn't match the target"
 
+        self._keyring.invalidate()
+
     def generate(self) -> RSAKey:
         """Generate a new random RSA key pair."""
         rsa_key = rsa.generate_private_key(
@@ -96,15 +182,49 @@ class RSAKeyService:
             for key in self._db.query(RSAKey).filter_by().all()
         ]
 
-    def get_random_key(self) -> RSAKey:
-        """Get one random key from the valid ones to spread usage between them."""
-        return (
-            self._db.query(RSAKey)
-            .filter_by(expired=False)
-            .order_by(func.random())
-            .first()
+    def get_public_jwks_document(self) -> JWKSDocument:
+        """
+        Get all public keys as a serialized JWKS document.
+
+        The document is only rebuilt when keys have been added or deleted.
+        """
+        return self._jwks_cache.get(
+            self._key_set_version(), self._build_public_jwks_document
         )
 
+    def _key_set_version(self):
+        # Keys are only ever added (with a new, higher id) or deleted, so this
+        # changes whenever the set of public keys does. Expiring a key doesn't
+        # matter as we publish expired keys too.
+        return tuple(self._db.query(func.count(RSAKey.id), func.max(RSAKey.id)).one())
+
+    def _build_public_jwks_document(self) -> JWKSDocument:
+        body = json.dumps(
+            {"keys": self.get_all_public_jwks()}, sort_keys=True, separators=(",", ":")
+        ).encode("utf-8")
+
+        return JWKSDocument(body=body, etag=hashlib.sha256(body).hexdigest())
+
+    def get_random_signing_key(self) -> Optional[SigningKey]:
+        """
+        Get one random key from the valid ones to spread usage between them.
+
+        The keys come from the worker's keyring, so this doesn't usually
+        touch the DB or decrypt anything.
+        """
+        return self._keyring.get_random_key(self._load_signing_keys)
+
+    def _load_signing_keys(self) -> List[SigningKey]:
+        return [
+            SigningKey(
+                kid=key.kid,
+                private_key=serialization.load_pem_private_key(
+                    self.private_key(key), password=None, backend=default_backend()
+                ),
+            )
+            for key in self._db.query(RSAKey).filter_by(expired=False)
+        ]
+
     def _as_pem_private_key(self, rsa_key, aes_iv) -> bytes:
         """Encode a `jose.jwt.RSAKey` as an AES encrypted PEM private key."""
         pem_private_key = rsa_key.private_bytes(
@@ -126,5 +246,14 @@ class RSAKeyService:
         ).to_dict()
 
 
+SIGNING_KEYRING = SigningKeyring()
+"""The signing keys shared by everything in this process."""
+
+JWKS_CACHE = JWKSCache()
+"""The public JWKS document shared by everything in this process."""
+
+
 def factory(_context, request):
-    return RSAKeyService(request.db, request.find_service(AESService))
+    return RSAKeyService(
+        request.db, request.find_service(AESService), SIGNING_KEYRING, JWKS_CACHE
+    )
@@ -0,0 +1,258 @@
+"""A process wide cache of rows we look up on almost every request."""
+
+import threading
+from collections import OrderedDict
+from copy import deepcopy
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from itertools import chain
+from typing import Callable, Dict, FrozenSet, Hashable, Optional, Sequence, Tuple
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import make_transient_to_detached
+from sqlalchemy.orm.attributes import set_committed_value
+
+from lms.db import SESSION
+
+_CHANGES_KEY = "lms.snapshot_cache.changes"
+"""Where in `session.info` we collect the rows changed in a transaction."""
+
+
+_Snapshot = Tuple[type, dict]
+"""The class and column values of an object."""
+
+
+@dataclass
+class _Entry:
+    snapshot: _Snapshot
+
+    related: Dict[str, Optional[_Snapshot]]
+    """Snapshots of the object's related objects by relationship name."""
+
+    identities: FrozenSet[tuple]
+    """The `(class, primary key)` of the object and its related objects."""
+
+    expires_at: datetime
+
+
+class SnapshotCache:
+    """
+    A size bounded, thread safe cache of DB rows with a TTL.
+
+    Rows are stored as snapshots of their column values rather than as ORM
+    objects, as ORM objects belong to the session (and so the request) which
+    loaded them. Looking a row up copies its snapshot into the caller's
+    session as a normal persistent object, without a query. Changes to it
+    are saved as usual.
+
+    Many-to-one relationships of the object can be cached with it, so
+    accessing them doesn't need a query either.
+
+    Any cached row that is updated or deleted through a session made by
+    `lms.db.SESSION` is removed from the cache when that session's
+    transaction ends.
+    This cache lives as long as the worker process and is shared between
+    requests. Other workers keep their own, so changes made elsewhere are
+    seen at the latest `ttl` later.
+    """
+
+    def __init__(self, max_size=1000, ttl=timedelta(minutes=1)):
+        self._max_size = max_size
+        self._ttl = ttl
+
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._classes = set()
+        """The classes of all the objects we've cached."""
+        self._hits = self._misses = 0
+
+    def get(
+        self,
+        db,
+        key: Hashable,
+        load: Callable[[], Optional[object]],
+        related: Sequence[str] = (),
+    ):
+        """
+        Get the object for `key`, loading it from the DB if needed.
+
+        :param db: The session to return the object in
+        :param key: What identifies the object, e.g. `("consumer_key", "KEY")`
+        :param load: Called to load the object if it's not in the cache.
+            It's called with no arguments and should return the object from
+            `db`, or `None` if there isn't one. `None` isn't cached
+        :param related: Names of many-to-one relationships of the object to
+            cache along with it
+        """
+        if entry := self._get_fresh(key):
+            return self._restore_entry(db, entry)
+
+        with self._lock:
+            self._misses += 1
+
+        obj = load()
+        if obj is None:
+            return None
+
+        snapshot = self._snapshot(obj)
+        related_snapshots = {
+            name: self._snapshot(related_obj)
+            if (related_obj := getattr(obj, name)) is not None
+            else None
+            for name in related
+        }
+        identities = frozenset(
+            self._identity(*item)
+            for item in [snapshot, *related_snapshots.values()]
+            if item is not None
+        )
+
+        with self._lock:
+            self._entries[key] = _Entry(
+                snapshot=snapshot,
+                related=related_snapshots,
+                identities=identities,
+                expires_at=datetime.utcnow() + self._ttl,
+            )
+            self._entries.move_to_end(key)
+            self._classes.update(cls for cls, _ in identities)
+
+            while len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+
+        return obj
+
+    def invalidate(self, cls, primary_key):
+        """Remove every entry containing the row of `cls` with `primary_key`."""
+        identity = (cls, primary_key)
+
+        with self._lock:
+            for key, entry in list(self._entries.items()):
+                if identity in entry.identities:
+                    del self._entries[key]
+
+    def watches(self, obj) -> bool:
+        """Return True if objects like `obj` could be in the cache."""
+        return type(obj) in self._classes
+
+    def stats(self) -> dict:
+        """
+        Get counters describing how well the cache is working.
+
+        :return: A dict with the number of cached `entries`, the number of
+            `hits` and the number of `misses` (lookups which went to the DB)
+        """
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self._hits,
+                "misses": self._misses,
+            }
+
+    def clear(self):
+        """Remove all entries and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._hits = self._misses = 0
+
+    def _get_fresh(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry and datetime.utcnow() < entry.expires_at:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return entry
+
+            return None
+
+    @staticmethod
+    def _snapshot(obj):
+        mapper = inspect(obj).mapper
+        return (
+            mapper.class_,
+            {
+                attr.key: deepcopy(getattr(obj, attr.key))
+                for attr in mapper.column_attrs
+            },
+        )
+
+    @staticmethod
+    def _identity(model_class, values):
+        mapper = inspect(model_class)
+        return (
+            model_class,
+            tuple(
+                values[mapper.get_property_by_column(col).key]
+                for col in mapper.primary_key
+            ),
+        )
+
+    def _restore_entry(self, db, entry):
+        obj = self._restore(db, entry.snapshot)
+
+        for name, snapshot in entry.related.items():
+            # Set these as loaded so accessing them doesn't query the DB. This
+            # also keeps them in the session, which only holds weak references
+            if name not in inspect(obj).dict:
+                set_committed_value(obj, name, snapshot and self._restore(db, snapshot))
+
+        return obj
+
+    def _restore(self, db, snapshot):
+        cls, values = snapshot
+        _, primary_key = self._identity(cls, values)
+
+        # If the session already has this row use its copy, which might have
+        # changes we'd otherwise overwrite
+        if obj := db.identity_map.get(
+            inspect(cls).identity_key_from_primary_key(primary_key)
+        ):
+            return obj
+
+        detached = inspect(cls).class_manager.new_instance()
+        for name, value in values.items():
+            # Copy so changes made in this session don't leak into the cache
+            # (e.g. to `ApplicationInstance.settings`)
+            set_committed_value(detached, name, deepcopy(value))
+        make_transient_to_detached(detached)
+
+        return db.merge(detached, load=False)
+
+
+SNAPSHOT_CACHE = SnapshotCache()
+"""The cache shared by all requests in this process."""
+
+
+def record_changes(session, _flush_context):
+    """Remember which cached rows a flush updated or deleted."""
+    changes = session.info.setdefault(_CHANGES_KEY, set())
+
+    # Objects are dirty if any attribute was set, even to the same value
+    modified = (obj for obj in session.dirty if session.is_modified(obj))
+
+    for obj in chain(modified, session.deleted):
+        if SNAPSHOT_CACHE.watches(obj):
+            changes.add((type(obj), inspect(obj).identity))
+
+
+def invalidate_changes(session):
+    """
+    Remove the rows a transaction changed from the cache once it's over.
+
+    We do this whether the transaction was committed or rolled back, as the
+    changed rows could have been cached with their uncommitted values by
+    the same session.
+    """
+    for cls, primary_key in session.info.pop(_CHANGES_KEY, ()):
+        SNAPSHOT_CACHE.invalidate(cls, primary_key)
+
+
+def includeme(_config):
+    for identifier, listener in (
+        ("after_flush", record_changes),
+        ("after_commit", invalidate_changes),
+        ("after_rollback", invalidate_changes),
+    ):
+        if not event.contains(SESSION, identifier, listener):
+            event.listen(SESSION, identifier, listener)
@@ -0,0 +1,88 @@
+"""A size bounded, thread safe map whose entries expire."""
+
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Callable, Hashable, Optional, Tuple
+
+
+class TTLMap:
+    """
+    A size bounded, thread safe map whose entries expire after a TTL.
+
+    Once there are more than `max_size` entries the least recently used ones
+    are evicted. Expired entries are kept until they are evicted or replaced,
+    so callers which can revalidate them can still read them with `peek()`.
+
+    This is the storage shared by our process wide caches. It doesn't count
+    hits or misses, as what those mean differs from cache to cache.
+    """
+
+    def __init__(self, max_size: int, ttl: timedelta):
+        self._max_size = max_size
+        self._ttl = ttl
+
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        """Map of key to `(value, expires_at)` tuples."""
+
+    def get(self, key: Hashable, default=None):
+        """Get the value for `key`, or `default` if there isn't a fresh one."""
+        value, is_fresh = self.peek(key) or (None, False)
+
+        return value if is_fresh else default
+
+    def peek(self, key: Hashable) -> Optional[Tuple[Any, bool]]:
+        """
+        Get the value for `key` and whether it's fresh, even if it's expired.
+
+        :return: A `(value, is_fresh)` tuple or None if `key` isn't present
+        """
+        with self._lock:
+            if (entry := self._entries.get(key)) is None:
+                return None
+
+            self._entries.move_to_end(key)
+            value, expires_at = entry
+
+            return value, datetime.utcnow() < expires_at
+
+    def set(self, key: Hashable, value, expires_at: Optional[datetime] = None):
+        """
+        Store `value` for `key`, evicting the least recently used if needed.
+
+        :param key: The key to store `value` under
+        :param value: The value to store
+        :param expires_at: Expire the value before the TTL is up
+        """
+        ttl_expires_at = datetime.utcnow() + self._ttl
+        if expires_at is None or expires_at > ttl_expires_at:
+            expires_at = ttl_expires_at
+
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+
+    def refresh(self, key: Hashable):
+        """Restart the TTL of `key`'s value, if there is one."""
+        with self._lock:
+            if entry := self._entries.get(key):
+                self._entries[key] = (entry[0], datetime.utcnow() + self._ttl)
+
+    def remove_if(self, predicate: Callable[[Hashable], bool]):
+        """Remove every entry whose key `predicate` returns True for."""
+        with self._lock:
+            for key in [key for key in self._entries if predicate(key)]:
+                del self._entries[key]
+
+    def clear(self):
+        """Remove all entries."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
@@ -1,28 +1,53 @@
 """A helper for upserting into DB tables."""
 
-from typing import List
+from typing import Callable, List, Optional
 
-from sqlalchemy import column, tuple_
+from sqlalchemy import column, select, tuple_
 from sqlalchemy.dialects.postgresql import insert
 from zope.sqlalchemy import mark_changed
 
+MAX_PARAMETERS = 32767
+"""The most bind parameters we'll send in a single upsert statement."""
 
-def bulk_upsert(
+
+def bulk_upsert(  # pylint:disable=too-many-arguments
     db,
     model_class,
     values: List[dict],
     index_elements: List[str],
     update_columns: List[str],
+    update_expressions: Optional[Callable] = None,
+    update_where: Optional[Callable] = None,
+    return_entities=False,
+    return_keys=False,
 ):
     """
     Create or update the specified values in a table.
 
+    Large lists of values are upserted in chunks, one statement per chunk,
+    to stay under the DB's limit on the number of parameters in a statement.
+
     :param db: An SQLAlchemy session
     :param model_class: The model type to upsert
     :param values: Dicts of values to upsert
     :param index_elements: Columns to match when upserting. This must match an index.
     :param update_columns: Columns to update when a match is found.
-    :return: A lazy query of the affected `model_class` rows.
+    :param update_expressions: A function which takes the values we tried to
+        insert (`excluded`) and returns a dict of SQL expressions to update
+        columns with when a match is found, instead of those values.
+    :param update_where: A function which takes the values we tried to
+        insert (`excluded`) and returns an SQL expression saying whether to
+        update a matching row. Matching rows which aren't updated aren't
+        returned either.
+    :param return_entities: Return a list of the affected `model_class`
+        objects, loaded straight from the upsert's `RETURNING` clause rather
+        than with a second query. Any of these objects already in the session
+        are refreshed with the upserted values.
+    :param return_keys: Return a list of the `index_elements` values of the
+        affected rows, straight from the upsert's `RETURNING` clause.
+    :return: A lazy query of the affected `model_class` rows, or a list of
+        them if `return_entities` is set, or a list of their keys if
+        `return_keys` is set.
     """
     if not values:
         # Don't attempt to upsert an empty list of values into the DB.
@@ -43,25 +68,58 @@ def bulk_upsert(
         #
         # We do a wasteful query here to maintain
         # the same return type in all branches.
+        if return_entities or return_keys:
+            return []
+
         return db.query(model_class).filter(False)
 
     index_elements_columns = [column(c) for c in index_elements]
+    returned = []
+
+    for chunk in _chunks(values):
+        stmt = insert(model_class).values(chunk)
 
-    stmt = insert(model_class).values(values)
-    stmt = stmt.on_conflict_do_update(
-        # The columns to use to find matching rows.
-        index_elements=index_elements,
         # The columns to update.
-        set_={element: getattr(stmt.excluded, element) for element in update_columns},
-    ).returning(*index_elements_columns)
+        set_ = {element: getattr(stmt.excluded, element) for element in update_columns}
+        if update_expressions:
+            set_.update(update_expressions(stmt.excluded))
+
+        stmt = stmt.on_conflict_do_update(
+            # The columns to use to find matching rows.
+            index_elements=index_elements,
+            set_=set_,
+            where=update_where(stmt.excluded) if update_where else None,
+        )
 
-    result = db.execute(stmt)
+        if return_entities:
+            returned.extend(
+                db.execute(
+                    select(model_class).from_statement(
+                        stmt.returning(*model_class.__table__.columns)
+                    )
+                    # Overwrite anything we already had loaded for these rows
+                    .execution_options(populate_existing=True)
+                ).scalars()
+            )
+        else:
+            returned.extend(db.execute(stmt.returning(*index_elements_columns)))
 
     # Let SQLAlchemy know that something has changed, otherwise it will
     # never commit the transaction we are working on and it will get rolled
     # back
     mark_changed(db)
 
-    return db.query(model_class).filter(
-        tuple_(*index_elements_columns).in_(result.all())
-    )
+    if return_entities or return_keys:
+        return returned
+
+    return db.query(model_class).filter(tuple_(*index_elements_columns).in_(returned))
+
+
+def _chunks(values):
+    """Split `values` into lists small enough to upsert in one statement."""
+    # Every key of every dict is sent as a parameter (SQL expressions like
+    # `func.now()` aren't, but counting them keeps this simple)
+    chunk_size = max(1, MAX_PARAMETERS // max(len(value) for value in values))
+
+    for start in range(0, len(values), chunk_size):
+        yield values[start : start + chunk_size]
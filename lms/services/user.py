@@ -4,6 +4,7 @@ from typing import Optional
 from sqlalchemy.exc import NoResultFound
 
 from lms.models import LTIUser, User
+from lms.services.user_cache import USER_CACHE, StoredUser
 
 
 class UserNotFound(Exception):
@@ -17,9 +18,20 @@ class UserService:
     At the moment this is purely used for recording/reporting purposes.
     """
 
-    def __init__(self, db, h_authority: str):
+    def __init__(self, db, h_authority: str, cache=None, transaction_manager=None):
+        """
+        Initialize the service.
+
+        :param db: The DB session to store users in
+        :param h_authority: The authority to generate h userids with
+        :param cache: A UserCache recording users we've recently stored
+        :param transaction_manager: The transaction manager to record users
+            in `cache` after the current transaction commits
+        """
         self._db = db
         self._h_authority = h_authority
+        self._cache = cache
+        self._transaction_manager = transaction_manager
 
     def upsert_user(self, lti_user: LTIUser) -> User:
         """Store a record of having seen a particular user."""
@@ -29,10 +41,31 @@ class UserService:
             # Update the existing user from the fields which can change on a
             # new one
             existing_user.roles = new_user.roles
-            return existing_user
+            user = existing_user
+        else:
+            self._db.add(new_user)
+            user = new_user
+
+        if self._cache:
+            self._record(user)
+
+        return user
+
+    def upsert_user_if_changed(self, lti_user: LTIUser) -> Optional[User]:
+        """
+        Store a record of a user unless we've recently stored the same one.
 
-        self._db.add(new_user)
-        return new_user
+        This avoids writing to the DB on every API call from the same user.
+
+        :return: The stored user, or None if nothing needed storing
+        """
+        if self._cache and self._cache.is_stored(
+            (lti_user.application_instance_id, lti_user.user_id),
+            StoredUser(lti_user.roles, lti_user.h_user.userid(self._h_authority)),
+        ):
+            return None
+
+        return self.upsert_user(lti_user)
 
     @lru_cache(maxsize=128)
     def get(self, application_instance, user_id: str) -> User:
@@ -67,6 +100,17 @@ class UserService:
             .one_or_none()
         )
 
+    def _record(self, user: User):
+        """Record `user` in the cache once the transaction commits."""
+        key = (user.application_instance_id, user.user_id)
+        values = StoredUser(user.roles, user.h_userid)
+
+        def after_commit(success):
+            if success:
+                self._cache.record(key, values)
+
+        self._transaction_manager.get().addAfterCommitHook(after_commit)
+
     def _from_lti_user(self, lti_user: LTIUser) -> User:
         return User(
             application_instance_id=lti_user.application_instance_id,
@@ -79,4 +123,9 @@ class UserService:
 def factory(_context, request):
     """Service factory for the UserService."""
 
-    return UserService(request.db, request.registry.settings["h_authority"])
+    return UserService(
+        request.db,
+        request.registry.settings["h_authority"],
+        cache=USER_CACHE,
+        transaction_manager=request.tm,
+    )
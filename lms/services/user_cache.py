@@ -0,0 +1,84 @@
+"""A process wide record of the users we've recently stored in the DB."""
+
+import threading
+from datetime import timedelta
+from typing import Hashable, NamedTuple
+
+from lms.services.ttl_map import TTLMap
+
+
+class StoredUser(NamedTuple):
+    """The values of a `User` row which can change between requests."""
+
+    roles: str
+    h_userid: str
+
+
+class UserCache:
+    """
+    A size bounded, thread safe record of recently stored users.
+
+    Users are identified by their `(application_instance_id, user_id)`. If
+    we've stored exactly the same roles and h userid for a user within the
+    last `ttl` there's no need to write them again.
+
+    Users should only be recorded once the transaction which stored them has
+    committed, otherwise we could skip writing a user who was never saved.
+
+    This cache lives as long as the worker process and is shared between
+    requests. Other workers keep their own, so at worst each of them writes
+    a user once per `ttl`.
+    """
+
+    def __init__(self, max_size=10000, ttl=timedelta(minutes=5)):
+        self._stored = TTLMap(max_size=max_size, ttl=ttl)
+        """Map of user key to the values stored for them."""
+
+        self._lock = threading.Lock()
+        self._skipped = self._recorded = 0
+
+    def is_stored(self, key: Hashable, values: StoredUser) -> bool:
+        """
+        Return True if `values` were stored for `key` within the TTL.
+
+        Every True counts as a skipped write.
+        """
+        if self._stored.get(key) != values:
+            return False
+
+        with self._lock:
+            self._skipped += 1
+
+        return True
+
+    def record(self, key: Hashable, values: StoredUser):
+        """Record that `values` have just been committed for `key`."""
+        self._stored.set(key, values)
+
+        with self._lock:
+            self._recorded += 1
+
+    def stats(self) -> dict:
+        """
+        Get counters describing how well the cache is working.
+
+        :return: A dict with the number of remembered `users`, the number of
+            writes `skipped` and the number of writes `recorded`
+        """
+        with self._lock:
+            return {
+                "users": len(self._stored),
+                "skipped": self._skipped,
+                "recorded": self._recorded,
+            }
+
+    def clear(self):
+        """Forget all users and reset the counters."""
+        self._stored.clear()
+
+        with self._lock:
+            self._skipped = self._recorded = 0
+
+
+USER_CACHE = UserCache()
+"""The record of stored users shared by all requests in this process."""
@@ -42,10 +42,8 @@ class VitalSourceClient:
         if not api_key:
             raise ValueError("VitalSource credentials are missing")
 
-        self._http_session = HTTPService()
-
-        # Set headers in the session which will be passed with every request
-        self._http_session.session.headers = {"X-VitalSource-API-Key": api_key}
+        # These headers will be passed with every request
+        self._http_session = HTTPService(headers={"X-VitalSource-API-Key": api_key})
 
     def get_book_info(self, book_id: str) -> dict:
         """
@@ -8,6 +8,7 @@ from contextlib import contextmanager
 import celery.signals
 from celery import Celery
 from kombu import Exchange, Queue
+from pyramid.request import Request
 from pyramid.scripting import prepare
 
 from lms.app import create_app
@@ -29,7 +30,12 @@ app.conf.update(
         "interval_max": 0.6,
     },
     # Tell celery where our tasks are defined
-    imports=("lms.tasks",),
+    imports=(
+        "lms.tasks",
+        "lms.tasks.event",
+        "lms.tasks.h_api",
+        "lms.tasks.oauth2_token",
+    ),
     # Acknowledge tasks after the task has executed, rather than just before
     task_acks_late=True,
     # Don't store any results, we only use this for scheduling
@@ -67,7 +73,13 @@ def bootstrap_worker(sender, **_kwargs):  # pragma: no cover
 
     @contextmanager
     def request_context():
-        with prepare(registry=lms.registry) as env:
+        request = None
+        if app_url := lms.registry.settings.get("app_url"):
+            # Generate URLs (e.g. OAuth 2 redirect URIs) as they would be in
+            # a web request, rather than for localhost
+            request = Request.blank("/", base_url=app_url)
+
+        with prepare(request=request, registry=lms.registry) as env:
             yield env["request"]
 
     sender.app.request_context = request_context
@@ -0,0 +1,49 @@
+import json
+import logging
+
+from celery import Task
+from sqlalchemy.exc import OperationalError
+
+from lms.services import EventPartitionService, EventService
+from lms.tasks.celery import app
+
+LOG = logging.getLogger(__name__)
+
+
+class _InsertEventsTask(Task):  # pylint:disable=abstract-method
+    def on_failure(
+        self, exc, task_id, args, kwargs, einfo
+    ):  # pylint:disable=too-many-arguments
+        # Nothing else will write these events, so keep a record of them
+        payloads = args[0]
+        LOG.error(
+            "Dropped %d events which couldn't be written: %s",
+            len(payloads),
+            json.dumps(payloads),
+        )
+
+
+@app.task(
+    base=_InsertEventsTask,
+    acks_late=True,
+    # Only retry errors which are likely to be temporary (like losing the DB
+    # connection or a deadlock). Anything else would fail again.
+    autoretry_for=(OperationalError,),
+    max_retries=3,
+    retry_backoff=5,
+)
+def insert_events(payloads):
+    """Write a batch of events queued by `EventService.queue_event()`."""
+
+    with app.request_context() as request:  # pylint: disable=no-member
+        with request.tm:
+            request.find_service(EventService).insert_events(payloads)
+
+
+@app.task
+def create_event_partitions():
+    """Periodically (based on h-periodic) create upcoming event partitions."""
+
+    with app.request_context() as request:  # pylint: disable=no-member
+        with request.tm:
+            request.find_service(EventPartitionService).create_partitions()
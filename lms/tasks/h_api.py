@@ -0,0 +1,19 @@
+from h_api.bulk_api import CommandBuilder
+
+from lms.services import HAPIError
+from lms.tasks.celery import app
+
+
+@app.task(
+    acks_late=True,
+    autoretry_for=(HAPIError,),
+    max_retries=2,
+    retry_backoff=5,
+)
+def sync_to_h(commands):
+    """Send Bulk API commands queued by `LTIHService.sync()` to h."""
+
+    with app.request_context() as request:  # pylint: disable=no-member
+        request.find_service(name="h_api").execute_bulk(
+            commands=[CommandBuilder.from_data(raw) for raw in commands]
+        )
@@ -0,0 +1,99 @@
+"""Refresh users' OAuth 2 tokens for LMS APIs before they expire."""
+
+import logging
+from datetime import datetime, timedelta
+from functools import partial
+
+from lms.models import LTIUser
+from lms.product import Product
+from lms.services import ApplicationInstanceNotFound, D2LAPIClient
+from lms.services.application_instance import AccountDisabled
+from lms.services.oauth2_token import find_expiring_tokens
+from lms.tasks.celery import app
+
+LOG = logging.getLogger(__name__)
+
+REFRESH_MARGIN = timedelta(minutes=10)
+"""
+Refresh tokens which expire within this long.
+
+This should be longer than the time between runs of `refresh_expiring_tokens`.
+"""
+
+ACTIVE_WITHIN = timedelta(hours=2)
+"""Only refresh the tokens of users who've launched something this recently."""
+
+
+@app.task
+def refresh_expiring_tokens():
+    """Periodically (based on h-periodic) refresh tokens about to expire."""
+
+    with app.request_context() as request:  # pylint: disable=no-member
+        with request.tm:
+            tokens = [
+                (token.application_instance_id, token.user_id)
+                for token in find_expiring_tokens(
+                    request.db,
+                    margin=REFRESH_MARGIN,
+                    active_since=datetime.utcnow() - ACTIVE_WITHIN,
+                )
+            ]
+
+    for application_instance_id, user_id in tokens:
+        refresh_token.delay(application_instance_id, user_id)
+
+
+@app.task
+def refresh_token(application_instance_id, user_id):
+    """Refresh a user's OAuth 2 token if it's still about to expire."""
+
+    with app.request_context() as request:  # pylint: disable=no-member
+        # The services find the user's application instance and token from
+        # the LTI user, as they would when the user makes an API call
+        request.lti_user = LTIUser(
+            user_id=user_id,
+            application_instance_id=application_instance_id,
+            roles="",
+            tool_consumer_instance_guid="",
+            display_name="",
+        )
+
+        with request.tm:
+            try:
+                application_instance = request.find_service(
+                    name="application_instance"
+                ).get_current()
+            except (ApplicationInstanceNotFound, AccountDisabled):
+                return
+
+            family = Product.Family(
+                application_instance.tool_consumer_info_product_family_code
+            )
+            if not (refresh := _REFRESHERS.get(family)):
+                LOG.info("Can't refresh OAuth 2 tokens for %s", family)
+                return
+
+            request.find_service(name="oauth2_token").refresh_if_expiring(
+                partial(refresh, request), margin=REFRESH_MARGIN
+            )
+
+
+def _refresh_canvas_token(request):
+    refresh_token_ = request.find_service(name="oauth2_token").get().refresh_token
+    request.find_service(name="canvas_api_client").get_refreshed_token(refresh_token_)
+
+
+def _refresh_blackboard_token(request):
+    request.find_service(name="blackboard_api_client").refresh_access_token()
+
+
+def _refresh_d2l_token(request):
+    request.find_service(D2LAPIClient).refresh_access_token()
+
+
+_REFRESHERS = {
+    Product.Family.CANVAS: _refresh_canvas_token,
+    Product.Family.BLACKBOARD: _refresh_blackboard_token,
+    Product.Family.D2L: _refresh_d2l_token,
+}
+"""How to refresh tokens for each LMS, like `RefreshViews` does."""
@@ -1,10 +1,13 @@
 """Schema for our bearer token-based LTI authentication."""
-from datetime import timedelta
+from datetime import datetime, timedelta
+from typing import Optional
 
+import jwt
 import marshmallow
 
 from lms.models import LTIUser
 from lms.services import JWTService
+from lms.services.bearer_token_cache import BEARER_TOKEN_CACHE
 from lms.services.exceptions import ExpiredJWTError, InvalidJWTError
 from lms.validation import ValidationError
 from lms.validation._base import PyramidRequestSchema
@@ -17,6 +20,10 @@ from lms.validation.authentication._exceptions import (
 __all__ = ("BearerTokenSchema",)
 
 
+_LOCATIONS = {"headers": "headers", "querystring": "GET", "form": "POST"}
+"""Map of the locations we read tokens from to where they are in a request."""
+
+
 class BearerTokenSchema(PyramidRequestSchema):
     """
     Schema for our bearer token-based LTI authentication.
@@ -65,10 +72,27 @@ class BearerTokenSchema(PyramidRequestSchema):
     display_name = marshmallow.fields.Str(required=True)
     email = marshmallow.fields.Str()
 
-    def __init__(self, request):
+    def __init__(self, request, token_cache=BEARER_TOKEN_CACHE):
         super().__init__(request)
         self._jwt_service = request.find_service(iface=JWTService)
         self._secret = request.registry.settings["jwt_secret"]
+        self._token_cache = token_cache
+
+    @staticmethod
+    def authorization_location(request) -> Optional[str]:
+        """
+        Return where in `request` the bearer token is.
+
+        This only checks for a ``"Bearer ..."`` value, it doesn't verify it.
+
+        :return: The location to pass to :meth:`lti_user`, or None if there's
+            no bearer token in the request
+        """
+        for location in _LOCATIONS:
+            if _authorization_param(request, location).startswith("Bearer "):
+                return location
+
+        return None
 
     def authorization_param(self, lti_user):
         """
@@ -110,10 +134,20 @@ class BearerTokenSchema(PyramidRequestSchema):
         :raise ValidationError: if the JWT's payload is invalid, for example if
           it's missing a required parameter
 
+        Tokens we've recently verified are taken from the token cache
+        without being verified again.
+
         :rtype: LTIUser
         """
+        authorization = _authorization_param(self.context["request"], location)
+
+        use_cache = self._token_cache and authorization
+
+        if use_cache and (lti_user := self._token_cache.get(authorization)):
+            return lti_user
+
         try:
-            return self.parse(location=location)
+            lti_user = self.parse(location=location)
         except ValidationError as error:
             try:
                 authorization_error_message = error.messages[location]["authorization"][
@@ -130,6 +164,17 @@ class BearerTokenSchema(PyramidRequestSchema):
                     exc_class = InvalidSessionTokenError
             raise exc_class(messages=error.messages) from error
 
+        if use_cache:
+            # The signature has been verified, so we can trust the expiry
+            expires_at = jwt.decode(
+                authorization[len("Bearer ") :], options={"verify_signature": False}
+            )["exp"]
+            self._token_cache.set(
+                authorization, lti_user, datetime.utcfromtimestamp(expires_at)
+            )
+
+        return lti_user
+
     @marshmallow.post_dump
     def _encode_jwt(self, data, **_kwargs):
         """
@@ -158,10 +203,10 @@ class BearerTokenSchema(PyramidRequestSchema):
                 "Missing data for required field.", "authorization"
             )
 
-        jwt = data["authorization"][len("Bearer ") :]
+        token = data["authorization"][len("Bearer ") :]
 
         try:
-            return self._jwt_service.decode_with_secret(jwt, self._secret)
+            return self._jwt_service.decode_with_secret(token, self._secret)
         except ExpiredJWTError as err:
             raise marshmallow.ValidationError(
                 "Expired session token", "authorization"
@@ -175,3 +220,11 @@ class BearerTokenSchema(PyramidRequestSchema):
     def _make_user(self, data, **_kwargs):
         # See https://marshmallow.readthedocs.io/en/2.x-line/quickstart.html#deserializing-to-objects
         return LTIUser(**data)
+
+
+def _authorization_param(request, location) -> str:
+    if location not in _LOCATIONS:
+        # Another name webargs knows, we just don't cache these
+        return ""
+
+    return getattr(request, _LOCATIONS[location]).get("authorization", "")
@@ -16,9 +16,7 @@ from pyramid.view import view_config, view_defaults
 
 from lms.events import LTIEvent
 from lms.security import Permissions
-from lms.services import DocumentURLService, LTIRoleService
-from lms.services.assignment import AssignmentService
-from lms.services.grouping import GroupingService
+from lms.services import DocumentURLService, LaunchPersistenceService, LTIRoleService
 from lms.validation import BasicLTILaunchSchema, ConfigureAssignmentSchema
 from lms.validation.authentication import BearerTokenSchema
 
@@ -42,10 +40,6 @@ class BasicLaunchViews:
     def __init__(self, context, request):
         self.context = context
         self.request = request
-        self.assignment_service: AssignmentService = request.find_service(
-            name="assignment"
-        )
-        self.grouping_service: GroupingService = request.find_service(name="grouping")
 
         self.context.application_instance.check_guid_aligns(
             self.request.lti_params.get("tool_consumer_instance_guid")
@@ -155,7 +149,6 @@ class BasicLaunchViews:
         )
 
         # Store lots of info
-        self._record_course()
         assignment = self._record_assignment(
             document_url, extra=assignment_extra, is_gradable=assignment_gradable
         )
@@ -166,40 +159,28 @@ class BasicLaunchViews:
         return {}
 
     def _record_assignment(self, document_url, extra, is_gradable):
-        # Store assignment details
-        assignment = self.assignment_service.upsert_assignment(
-            document_url=document_url,
+        # Store assignment details, and the relationships between the
+        # assignment, the user and the course. It's not completely clear but
+        # accessing the course in this way actually is an upsert. So this
+        # stores the course as well
+        return self.request.find_service(
+            LaunchPersistenceService
+        ).record_assignment_launch(
+            course=self.context.course,
+            user=self.request.user,
+            lti_roles=self.request.find_service(LTIRoleService).get_roles(
+                self.request.lti_params["roles"]
+            ),
             tool_consumer_instance_guid=self.request.lti_params[
                 "tool_consumer_instance_guid"
             ],
             resource_link_id=self.request.lti_params.get("resource_link_id"),
+            document_url=document_url,
             lti_params=self.request.lti_params,
             extra=extra,
             is_gradable=is_gradable,
         )
 
-        # Store the relationship between the assignment and the course
-        self.assignment_service.upsert_assignment_membership(
-            assignment=assignment,
-            user=self.request.user,
-            lti_roles=self.request.find_service(LTIRoleService).get_roles(
-                self.request.lti_params["roles"]
-            ),
-        )
-        # Store the relationship between the assignment and the course
-        self.assignment_service.upsert_assignment_groupings(
-            assignment_id=assignment.id, groupings=[self.context.course]
-        )
-
-        return assignment
-
-    def _record_course(self):
-        # It's not completely clear but accessing a course in this way actually
-        # is an upsert. So this stores the course as well
-        self.grouping_service.upsert_grouping_memberships(
-            user=self.request.user, groups=[self.context.course]
-        )
-
     def _configure_js_to_show_document(self, document_url, assignment):
         if self.context.is_canvas:
             # For students in Canvas with grades to submit we need to enable
@@ -1,9 +1,27 @@
+from pyramid.httpexceptions import HTTPNotModified
 from pyramid.view import view_config
 
 from lms.services import RSAKeyService
 
+CACHE_MAX_AGE = 300
+"""How long (in seconds) LMSs can cache our keys for without checking.
 
-@view_config(route_name="lti.jwks", request_method="GET", renderer="json")
+We sign with new keys soon after they are created, so this should stay short.
+Most LMSs will fetch the keys again when they see a `kid` they don't know."""
+
+
+@view_config(route_name="lti.jwks", request_method="GET")
 def jwks(request):
     """Expose RSA public keys for LMSs to verify our LTI Advantage API calls."""
-    return {"keys": request.find_service(RSAKeyService).get_all_public_jwks()}
+    document = request.find_service(RSAKeyService).get_public_jwks_document()
+
+    response = request.response
+    if document.etag in request.if_none_match:
+        response = HTTPNotModified()
+    else:
+        response.body = document.body
+        response.content_type = "application/json"
+
+    response.etag = document.etag
+    response.cache_control = f"public, max-age={CACHE_MAX_AGE}"
+    return response
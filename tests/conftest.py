@@ -41,6 +41,8 @@ TEST_SETTINGS = {
     "blackboard_api_client_secret": "test_blackboard_api_client_secret",
     "vitalsource_api_key": "test_vs_api_key",
     "disable_key_rotation": False,
+    "h_sync_async": False,
+    "events_write_behind": False,
 }
 
 
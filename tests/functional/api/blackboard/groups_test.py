@@ -0,0 +1,84 @@
+import json
+from datetime import datetime, timedelta
+
+import httpretty
+import pytest
+
+from lms.models import OAuth2Token
+from lms.services.jwt import JWTService
+from tests import factories
+from tests.conftest import TEST_SETTINGS
+
+
+class TestCourseGroupSets:
+    @pytest.mark.usefixtures("blackboard_api")
+    def test_it_keeps_a_refreshed_token_if_the_request_fails(
+        self, app, db_session, oauth2_token, authorization
+    ):
+        app.get(
+            "/api/blackboard/courses/COURSE_ID/group_sets",
+            headers={"Authorization": authorization},
+            expect_errors=True,
+        )
+
+        # The old refresh token has been used up, so the new one must be kept
+        db_session.expire_all()
+        assert db_session.query(
+            OAuth2Token.access_token, OAuth2Token.refresh_token
+        ).filter_by(id=oauth2_token.id).one() == (
+            "new_access_token",
+            "new_refresh_token",
+        )
+
+    @pytest.fixture
+    def blackboard_api(self, application_instance):
+        api_url = f"https://{application_instance.lms_host()}/learn/api/public"
+
+        with httpretty.enabled():
+            # Refreshing the token which is about to expire works...
+            httpretty.register_uri(
+                method="POST",
+                uri=f"{api_url}/v1/oauth2/token",
+                body=json.dumps(
+                    {
+                        "access_token": "new_access_token",
+                        "refresh_token": "new_refresh_token",
+                        "expires_in": 3600,
+                    }
+                ),
+            )
+            # ...but the call we wanted it for doesn't
+            httpretty.register_uri(
+                method="GET",
+                uri=f"{api_url}/v2/courses/uuid:COURSE_ID/groups/sets",
+                status=500,
+            )
+
+            yield
+
+    @pytest.fixture
+    def oauth2_token(self, application_instance, lti_user):
+        return factories.OAuth2Token(
+            application_instance=application_instance,
+            user_id=lti_user.user_id,
+            expires_in=60,
+            received_at=datetime.utcnow(),
+        )
+
+    @pytest.fixture
+    def application_instance(self, db_session):  # pylint:disable=unused-argument
+        return factories.ApplicationInstance(
+            tool_consumer_info_product_family_code="BlackboardLearn"
+        )
+
+    @pytest.fixture
+    def lti_user(self, application_instance):
+        return factories.LTIUser(
+            application_instance_id=application_instance.id, roles="Instructor"
+        )
+
+    @pytest.fixture
+    def authorization(self, lti_user):
+        return "Bearer " + JWTService.encode_with_secret(
+            lti_user._asdict(), TEST_SETTINGS["jwt_secret"], timedelta(hours=1)
+        )
@@ -24,6 +24,7 @@ class TestRunSQLTask:
             "report/create_dev_users",
             "report/create_from_scratch",
             "report/refresh",
+            "report/incremental",
             "report/create_from_scratch",
         ):
             self.run_task(environ, task_name)
@@ -11,6 +11,10 @@ from webtest import TestApp
 from lms import db
 from lms.app import create_app
 from lms.db import SESSION
+from lms.services.bearer_token_cache import BEARER_TOKEN_CACHE
+from lms.services.lti_role_registry import LTI_ROLE_REGISTRY
+from lms.services.snapshot_cache import SNAPSHOT_CACHE
+from lms.services.user_cache import USER_CACHE
 from tests import factories
 from tests.conftest import TEST_SETTINGS, get_test_database_url
 
@@ -36,6 +40,13 @@ def clean_database(db_engine):
         conn.execute(f"TRUNCATE {tnames};")
         transaction.commit()
 
+    # Truncating doesn't go through the session, so nothing invalidates rows
+    # the last test left in the process wide caches
+    SNAPSHOT_CACHE.clear()
+    LTI_ROLE_REGISTRY.clear()
+    USER_CACHE.clear()
+    BEARER_TOKEN_CACHE.clear()
+
 
 @pytest.fixture(scope="session")
 def monkeysession():
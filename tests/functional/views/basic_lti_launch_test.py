@@ -5,8 +5,10 @@ from urllib.parse import urlencode
 import oauthlib.common
 import oauthlib.oauth1
 import pytest
+import sqlalchemy as sa
 from h_matchers import Any
 from pytest import param
+from sqlalchemy.engine import Engine
 
 from lms.models import Assignment
 from lms.resources._js_config import JSConfig
@@ -176,6 +178,35 @@ class TestBasicLTILaunch:
             == 1
         )
 
+    @pytest.mark.usefixtures("assignment")
+    def test_repeat_launch_statement_count(
+        self, lti_params, do_lti_launch, sign_lti_params
+    ):
+        # Every launch runs these, so we pin the count to notice when a change
+        # adds round trips to the DB. The first launch also creates the user,
+        # course, roles and so on and updates the application instance (which
+        # removes it from the cache), so we count a later launch.
+        for nonce in ["first", "second"]:
+            do_lti_launch(
+                post_params=sign_lti_params(dict(lti_params, oauth_nonce=nonce)),
+                status=200,
+            )
+        statements = []
+
+        def record(_conn, _cursor, statement, *_args):
+            statements.append(statement)
+
+        sa.event.listen(Engine, "before_cursor_execute", record)
+        try:
+            do_lti_launch(
+                post_params=sign_lti_params(dict(lti_params, oauth_nonce="repeat")),
+                status=200,
+            )
+        finally:
+            sa.event.remove(Engine, "before_cursor_execute", record)
+
+        assert len(statements) == 11, statements
+
     @pytest.fixture(autouse=True)
     def application_instance(self, db_session):  # pylint:disable=unused-argument
         return factories.ApplicationInstance(
@@ -10,3 +10,14 @@ def test_handle_event(event_service, pyramid_request):
     handle_event(event)
 
     event_service.insert_event.assert_called_once_with(event)
+    event_service.queue_event.assert_not_called()
+
+
+def test_handle_event_with_write_behind(event_service, pyramid_request):
+    pyramid_request.registry.settings["events_write_behind"] = True
+    event = BaseEvent(request=pyramid_request, type=sentinel.type)
+
+    handle_event(event)
+
+    event_service.queue_event.assert_called_once_with(event)
+    event_service.insert_event.assert_not_called()
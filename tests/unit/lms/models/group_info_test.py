@@ -1,4 +1,3 @@
-import factory
 import pytest
 from sqlalchemy.exc import IntegrityError
 
@@ -26,43 +25,12 @@ class TestGroupInfo:
         ):
             db_session.flush()
 
-    def test_upsert_instructor_when_no_existing_instructors(self, group_info):
-        instructor = factories.HUser()._asdict()
-
-        group_info.upsert_instructor(instructor)
-
-        assert group_info.instructors == [instructor]
-
-    def test_upsert_instructor_when_existing_instructors(
-        self, group_info, existing_instructors
-    ):
-        new_instructor = factories.HUser(username="new_instructor")._asdict()
-
-        group_info.upsert_instructor(new_instructor)
-
-        assert group_info.instructors == existing_instructors + [new_instructor]
-
-    def test_upsert_instructor_when_existing_matching_instructor(
-        self, group_info, existing_instructors
-    ):
-        updated_instructor = factories.HUser(
-            username=group_info.instructors[1]["username"], display_name="updated"
-        )._asdict()
-
-        group_info.upsert_instructor(updated_instructor)
-
-        assert group_info.instructors == [
-            existing_instructors[0],
-            updated_instructor,
-            existing_instructors[2],
-        ]
+    def test_set_and_get_instructors(self):
+        group_info = GroupInfo()
 
-    def test_upsert_instructor_when_existing_equal_instructor(
-        self, group_info, existing_instructors
-    ):
-        group_info.upsert_instructor(existing_instructors[1])
+        group_info.instructors = [{"username": "INSTRUCTOR"}]
 
-        assert group_info.instructors == existing_instructors
+        assert group_info.instructors == [{"username": "INSTRUCTOR"}]
 
     def test_set_and_get_type(self):
         group_info = GroupInfo()
@@ -80,13 +48,6 @@ class TestGroupInfo:
         assert group_info.type is None
         assert not group_info.instructors
 
-    @pytest.fixture
-    def existing_instructors(self, group_info):
-        group_info.instructors = factory.build_batch(
-            dict, 3, FACTORY_CLASS=factories.HUser
-        )
-        return group_info.instructors
-
     @pytest.fixture(autouse=True)
     def application_instance(self):
         """Return the ApplicationInstance that the test GroupInfo belongs to."""
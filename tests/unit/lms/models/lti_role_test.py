@@ -85,6 +85,14 @@ class TestRoleType:
         # match these correctly
         assert RoleType.parse_lti_role(value) == role_type
 
+    def test_parse_lti_role_remembers_results(self):
+        RoleType.parse_lti_role("Instructor")
+        hits = _RoleParser.parse_role.cache_info().hits
+
+        RoleType.parse_lti_role("Instructor")
+
+        assert _RoleParser.parse_role.cache_info().hits == hits + 1
+
 
 class TestLTIRole:
     @pytest.mark.parametrize(
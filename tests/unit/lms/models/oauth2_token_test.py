@@ -85,6 +85,26 @@ class TestOAuth2Token:
 
         assert isinstance(token.received_at, datetime.datetime)
 
+    @pytest.mark.parametrize(
+        "expires_in,expires_at",
+        [(3600, datetime.datetime(2022, 1, 1, 1)), (None, None)],
+    )
+    def test_expires_at(self, db_session, init_kwargs, expires_in, expires_at):
+        token = OAuth2Token(
+            **init_kwargs,
+            expires_in=expires_in,
+            received_at=datetime.datetime(2022, 1, 1),
+        )
+        db_session.add(token)
+        db_session.flush()
+
+        # Pylint mistakes the hybrid property for a method
+        assert token.expires_at == expires_at  # pylint:disable=comparison-with-callable
+        assert (
+            db_session.query(OAuth2Token.expires_at).filter_by(id=token.id).scalar()
+            == expires_at
+        )
+
     @pytest.fixture
     def init_kwargs(self, application_instance):
         """
@@ -0,0 +1,125 @@
+from datetime import datetime
+from unittest.mock import sentinel
+
+import pytest
+
+from lms.scripts.data_task_log import (
+    Regression,
+    find_regressions,
+    load_run_logs,
+    make_run_log,
+    write_run_log,
+)
+from lms.scripts.data_task_runner import QueryStats, Step
+
+
+class TestMakeRunLog:
+    def test_it(self):
+        step = Step("a", sentinel.script, status="done", started=0.5, duration=1.5)
+        step.queries = [QueryStats(index=0, text="SELECT 1", duration=1.0, rows=1)]
+
+        run_log = make_run_log(
+            "report/refresh", datetime(2022, 11, 1, 12, 30), workers=2, steps=[step]
+        )
+
+        assert run_log == {
+            "task": "report/refresh",
+            "started_at": "2022-11-01T12:30:00",
+            "workers": 2,
+            "steps": [
+                {
+                    "name": "a",
+                    "status": "done",
+                    "started": 0.5,
+                    "duration": 1.5,
+                    "queries": [
+                        {
+                            "index": 0,
+                            "text": "SELECT 1",
+                            "duration": 1.0,
+                            "rows": 1,
+                            "plan": None,
+                        }
+                    ],
+                }
+            ],
+        }
+
+
+class TestWriteRunLog:
+    def test_it_round_trips_with_load_run_logs(self, tmp_path):
+        later = self.run_log("report/refresh", "2022-11-02T00:00:00")
+        earlier = self.run_log("report/refresh", "2022-11-01T00:00:00")
+        other_task = self.run_log("report/incremental", "2022-11-01T00:00:00")
+
+        paths = [write_run_log(tmp_path, log) for log in (later, earlier, other_task)]
+
+        assert paths[0] == tmp_path / "report-refresh-20221102T000000.json"
+        assert load_run_logs(tmp_path, "report/refresh") == [earlier, later]
+
+    def run_log(self, task, started_at):
+        return {"task": task, "started_at": started_at, "workers": 1, "steps": []}
+
+
+class TestFindRegressions:
+    @pytest.mark.parametrize(
+        "duration,regressed",
+        [
+            (15.0, False),  # Within the threshold
+            (16.0, True),
+        ],
+    )
+    def test_it(self, duration, regressed):
+        previous = [
+            self.run_log(step=9.0),
+            self.run_log(step=10.0),
+            self.run_log(step=20.0),
+        ]
+        latest = self.run_log(step=duration)
+
+        regressions = find_regressions(latest, previous, threshold=1.5)
+
+        assert regressions == (
+            [Regression("step", duration, 10.0)] if regressed else []
+        )
+
+    def test_it_ignores_steps_which_are_only_a_little_slower(self):
+        previous = [self.run_log(step=0.1)]
+        latest = self.run_log(step=1.0)
+
+        assert not find_regressions(latest, previous, threshold=1.5, min_seconds=1)
+
+    def test_it_ignores_steps_which_did_not_succeed(self):
+        previous = [self.run_log(status="failed", slow=1.0)]
+        latest = self.run_log(slow=100.0)
+
+        assert not find_regressions(latest, previous)
+
+    def test_it_ignores_steps_which_failed_in_the_latest_run(self):
+        previous = [self.run_log(slow=1.0)]
+        latest = self.run_log(status="failed", slow=100.0)
+
+        assert not find_regressions(latest, previous)
+
+    def test_it_puts_the_worst_first(self):
+        previous = [self.run_log(a=1.0, b=1.0)]
+        latest = self.run_log(a=3.0, b=10.0)
+
+        assert [
+            regression.step for regression in find_regressions(latest, previous)
+        ] == [
+            "b",
+            "a",
+        ]
+
+    def test_ratio(self):
+        assert Regression("a", duration=3.0, baseline=1.5).ratio == 2.0
+        assert Regression("a", duration=3.0, baseline=0).ratio == float("inf")
+
+    def run_log(self, status="done", **durations):
+        return {
+            "steps": [
+                {"name": name, "status": status, "duration": duration}
+                for name, duration in durations.items()
+            ]
+        }
@@ -0,0 +1,241 @@
+import threading
+from unittest.mock import MagicMock, call, create_autospec, sentinel
+
+import pytest
+from data_tasks.python_script import PythonScript
+from data_tasks.sql_script import SQLScript
+
+from lms.scripts.data_task_runner import (
+    DataTaskRunner,
+    DependencyError,
+    Step,
+    format_timings,
+    load_steps,
+    sort_steps,
+)
+
+
+class TestLoadSteps:
+    def test_it(self, tmp_path):
+        self.write(tmp_path, "01_first.sql", "SELECT 1;")
+        self.write(tmp_path, "02_dir/01_a.jinja2.sql", "SELECT {{ value }};")
+        self.write(tmp_path, "02_dir/02_b.sql", "-- depends-on: 01_first\nSELECT 3;")
+
+        steps = load_steps(tmp_path, template_vars={"value": 2})
+
+        assert [(step.name, step.depends_on) for step in steps] == [
+            ("01_first", set()),
+            ("02_dir/01_a", {"01_first"}),
+            ("02_dir/02_b", {"01_first"}),
+        ]
+        assert steps[1].script.queries[0].text == "SELECT 2;"
+
+    def test_it_reads_multiple_annotations(self, tmp_path):
+        self.write(tmp_path, "01_a.sql", "SELECT 1;")
+        self.write(tmp_path, "02_b.sql", "-- depends-on: 01_a\nSELECT 2;")
+        self.write(
+            tmp_path,
+            "03_c.sql",
+            "-- depends-on: 01_a,\n-- depends-on: 02_b\nSELECT 3;",
+        )
+
+        steps = load_steps(tmp_path, template_vars={})
+
+        assert steps[2].depends_on == {"01_a", "02_b"}
+
+    def test_it_expands_directories(self, tmp_path):
+        self.write(tmp_path, "01_dir/01_a.sql", "SELECT 1;")
+        self.write(tmp_path, "01_dir/02_b.sql", "-- depends-on: 01_dir/01_a\nSELECT 2;")
+        self.write(tmp_path, "02_c.sql", "-- depends-on: 01_dir\nSELECT 3;")
+
+        steps = load_steps(tmp_path, template_vars={})
+
+        assert steps[2].depends_on == {"01_dir/01_a", "01_dir/02_b"}
+
+    def test_it_raises_for_unknown_dependencies(self, tmp_path):
+        self.write(tmp_path, "01_a.sql", "-- depends-on: missing\nSELECT 1;")
+
+        with pytest.raises(DependencyError):
+            load_steps(tmp_path, template_vars={})
+
+    def write(self, tmp_path, name, text):
+        path = tmp_path / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text)
+
+
+class TestSortSteps:
+    def test_it(self):
+        steps = [
+            Step("c", sentinel.script, depends_on={"b"}),
+            Step("a", sentinel.script),
+            Step("d", sentinel.script),
+            Step("b", sentinel.script, depends_on={"a"}),
+        ]
+
+        assert [step.name for step in sort_steps(steps)] == ["a", "d", "b", "c"]
+
+    def test_it_raises_for_loops(self):
+        steps = [
+            Step("a", sentinel.script, depends_on={"b"}),
+            Step("b", sentinel.script, depends_on={"a"}),
+        ]
+
+        with pytest.raises(DependencyError):
+            sort_steps(steps)
+
+
+class TestDataTaskRunner:
+    def test_it_runs_in_one_transaction_with_one_worker(self, engine, on_step_done):
+        scripts = [FakeScript(), FakeScript()]
+        steps = [
+            Step("b", scripts[0], depends_on={"a"}),
+            Step("a", scripts[1]),
+        ]
+
+        result = DataTaskRunner(engine, on_step_done=on_step_done).run(steps)
+
+        assert [step.name for step in result] == ["a", "b"]
+        engine.connect.assert_called_once_with()
+        connection = engine.connect.return_value.__enter__.return_value
+        connection.begin.assert_called_once_with()
+        for step, script in zip(steps, scripts):
+            assert script.connections == [connection]
+            assert step.status == "done"
+            assert step.results == [script]
+            assert step.duration >= 0
+        assert on_step_done.call_args_list == [call(steps[1]), call(steps[0])]
+
+    def test_it_passes_dry_run(self, engine):
+        script = FakeScript()
+
+        DataTaskRunner(engine, dry_run=True).run([Step("a", script)])
+
+        assert script.dry_runs == [True]
+
+    def test_it_skips_python(self, engine):
+        script = create_autospec(PythonScript, instance=True, spec_set=True)
+        step = Step("a", script)
+
+        DataTaskRunner(engine, skip_python=True).run([step])
+
+        script.execute.assert_not_called()
+        assert step.status == "skipped"
+
+    def test_it_runs_independent_steps_at_once(self, engine, on_step_done):
+        # Each of these can only finish once the other has started
+        barrier = threading.Barrier(2, timeout=5)
+        steps = [
+            Step("a", FakeScript(barrier)),
+            Step("b", FakeScript(barrier)),
+            Step("c", FakeScript(), depends_on={"a", "b"}),
+        ]
+
+        result = DataTaskRunner(engine, workers=2, on_step_done=on_step_done).run(steps)
+
+        assert result[-1].name == "c"
+        assert result[-1].started >= max(step.started for step in steps[:2])
+        assert engine.connect.call_count == 3
+        assert on_step_done.call_count == 3
+
+    def test_it_waits_for_a_free_worker(self, engine):
+        # "c" is ready to go, but can't start until "a" or "b" is done
+        barrier = threading.Barrier(2, timeout=5)
+        steps = [
+            Step("a", FakeScript(barrier)),
+            Step("b", FakeScript(barrier)),
+            Step("c", FakeScript()),
+        ]
+
+        result = DataTaskRunner(engine, workers=2).run(steps)
+
+        assert result[-1].name == "c"
+        assert all(step.status == "done" for step in steps)
+
+    def test_it_stops_starting_steps_after_a_failure(self, engine, on_step_done):
+        script = FakeScript()
+        steps = [
+            Step("a", FakeScript(error=ValueError("oh no"))),
+            Step("b", script, depends_on={"a"}),
+        ]
+
+        with pytest.raises(ValueError):
+            DataTaskRunner(engine, workers=2, on_step_done=on_step_done).run(steps)
+
+        assert [step.status for step in steps] == ["failed", "pending"]
+        assert not script.connections
+        on_step_done.assert_not_called()
+
+    def test_it_records_query_stats(self, db_engine, sql_step):
+        DataTaskRunner(db_engine).run([sql_step])
+
+        first, second = sql_step.script.queries
+        assert first.rows == [(1,), (2,)]
+        assert sql_step.results == [first, second, sql_step.script]
+        assert [(stats.index, stats.rows) for stats in sql_step.queries] == [
+            (0, 2),
+            (1, None),
+        ]
+        assert all(stats.duration >= 0 for stats in sql_step.queries)
+
+    def test_it_explains_queries(self, db_engine, sql_step):
+        DataTaskRunner(db_engine, explain=True).run([sql_step])
+
+        first, second = sql_step.queries
+        assert first.plan[0]["Plan"]["Actual Rows"] == 2
+        assert first.rows is None
+        assert second.plan is None
+
+    def test_it_does_not_run_queries_in_a_dry_run(self, db_engine, sql_step):
+        DataTaskRunner(db_engine, dry_run=True).run([sql_step])
+
+        assert sql_step.script.queries[0].rows is None
+        assert [stats.rows for stats in sql_step.queries] == [None, None]
+
+    @pytest.fixture
+    def sql_step(self, tmp_path):
+        path = tmp_path / "script.sql"
+        path.write_text("SELECT 1 AS a UNION SELECT 2;\nSET LOCAL work_mem = '64MB';")
+
+        return Step("script", SQLScript(str(path), template_vars={}))
+
+    @pytest.fixture
+    def engine(self):
+        return MagicMock()
+
+    @pytest.fixture
+    def on_step_done(self):
+        return MagicMock()
+
+
+class TestFormatTimings:
+    def test_it(self):
+        steps = [
+            Step("long_step_name", sentinel.script, started=0.5, duration=1.25),
+            Step("a", sentinel.script),
+        ]
+        steps[0].status = "done"
+
+        assert format_timings(steps).splitlines() == [
+            "Step            Status      Started       Took",
+            "long_step_name  done         0.500s     1.250s",
+            "a               pending                       ",
+        ]
+
+
+class FakeScript:
+    def __init__(self, barrier=None, error=None):
+        self.barrier = barrier
+        self.error = error
+        self.connections = []
+        self.dry_runs = []
+
+    def execute(self, connection, dry_run=False):
+        self.connections.append(connection)
+        self.dry_runs.append(dry_run)
+        if self.barrier:
+            self.barrier.wait()
+        if self.error:
+            raise self.error
+
+        yield self
@@ -1,4 +1,4 @@
-from unittest.mock import call, create_autospec, sentinel
+from unittest.mock import create_autospec, sentinel
 
 import pytest
 from pyramid.interfaces import ISecurityPolicy
@@ -323,89 +323,91 @@ class TestGetLaunchesLTIUser:
 
 @pytest.mark.usefixtures("user_service")
 class TestGetLTIUser:
-    def test_it_returns_LTIUsers_from_authorization_headers(
-        self, BearerTokenSchema, bearer_token_schema, pyramid_request
+    @pytest.mark.parametrize("location", ["headers", "querystring", "form"])
+    def test_it_returns_LTIUsers_from_bearer_tokens(
+        self, BearerTokenSchema, bearer_token_schema, pyramid_request, location
     ):
+        BearerTokenSchema.authorization_location.return_value = location
+
         lti_user = get_lti_user(pyramid_request)
 
+        BearerTokenSchema.authorization_location.assert_called_once_with(
+            pyramid_request
+        )
         BearerTokenSchema.assert_called_once_with(pyramid_request)
-        bearer_token_schema.lti_user.assert_called_once_with(location="headers")
+        bearer_token_schema.lti_user.assert_called_once_with(location=location)
         assert lti_user == bearer_token_schema.lti_user.return_value
 
-    def test_it_returns_LTIUsers_from_authorization_query_string_params(
-        self, bearer_token_schema, pyramid_request
+    def test_it_returns_None_if_the_bearer_token_is_invalid(
+        self, bearer_token_schema, OAuthCallbackSchema, pyramid_request
     ):
-        lti_user = factories.LTIUser()
-        bearer_token_schema.lti_user.side_effect = [
-            ValidationError(["TEST_ERROR_MESSAGE"]),
-            lti_user,
-            ValidationError(["TEST_ERROR_MESSAGE"]),
-        ]
-
-        returned_lti_user = get_lti_user(pyramid_request)
-
-        assert bearer_token_schema.lti_user.call_args_list == [
-            call(location="headers"),
-            call(location="querystring"),
-        ]
-        assert returned_lti_user == lti_user
-
-    def test_it_returns_LTIUsers_from_authorization_form_fields(
-        self, bearer_token_schema, pyramid_request
-    ):
-        lti_user = factories.LTIUser()
-        bearer_token_schema.lti_user.side_effect = [
-            ValidationError(["TEST_ERROR_MESSAGE"]),
-            ValidationError(["TEST_ERROR_MESSAGE"]),
-            lti_user,
-        ]
-
-        returned_lti_user = get_lti_user(pyramid_request)
-
-        assert bearer_token_schema.lti_user.call_args_list == [
-            call(location="headers"),
-            call(location="querystring"),
-            call(location="form"),
-        ]
-        assert returned_lti_user == lti_user
+        pyramid_request.params["state"] = "STATE"
+        bearer_token_schema.lti_user.side_effect = ValidationError(
+            ["TEST_ERROR_MESSAGE"]
+        )
+
+        assert get_lti_user(pyramid_request) is None
+        OAuthCallbackSchema.assert_not_called()
 
     def test_it_returns_LTIUsers_from_OAuth2_state_params(
         self,
-        bearer_token_schema,
+        BearerTokenSchema,
         OAuthCallbackSchema,
         oauth_callback_schema,
         pyramid_request,
     ):
-        bearer_token_schema.lti_user.side_effect = ValidationError(
-            ["TEST_ERROR_MESSAGE"]
-        )
+        BearerTokenSchema.authorization_location.return_value = None
+        pyramid_request.params["state"] = "STATE"
 
         lti_user = get_lti_user(pyramid_request)
 
+        BearerTokenSchema.assert_not_called()
         OAuthCallbackSchema.assert_called_once_with(pyramid_request)
         oauth_callback_schema.lti_user.assert_called_once_with()
         assert lti_user == oauth_callback_schema.lti_user.return_value
 
-    def test_it_returns_None_if_all_schemas_fail(
-        self, bearer_token_schema, oauth_callback_schema, pyramid_request
+    def test_it_returns_None_if_the_state_param_is_invalid(
+        self, BearerTokenSchema, oauth_callback_schema, pyramid_request
     ):
-        bearer_token_schema.lti_user.side_effect = ValidationError(
-            ["TEST_ERROR_MESSAGE"]
-        )
+        BearerTokenSchema.authorization_location.return_value = None
+        pyramid_request.params["state"] = "STATE"
         oauth_callback_schema.lti_user.side_effect = ValidationError(
             ["TEST_ERROR_MESSAGE"]
         )
 
         assert get_lti_user(pyramid_request) is None
 
-    def test_it_stores_the_user(
+    def test_it_returns_None_if_there_are_no_credentials(
+        self, BearerTokenSchema, OAuthCallbackSchema, pyramid_request
+    ):
+        BearerTokenSchema.authorization_location.return_value = None
+
+        assert get_lti_user(pyramid_request) is None
+        OAuthCallbackSchema.assert_not_called()
+
+    def test_it_stores_the_user_if_changed(
         self, pyramid_request, user_service, bearer_token_schema
     ):
         get_lti_user(pyramid_request)
 
-        user_service.upsert_user.assert_called_once_with(
+        user_service.upsert_user_if_changed.assert_called_once_with(
             bearer_token_schema.lti_user.return_value
         )
+        user_service.upsert_user.assert_not_called()
+
+    @pytest.mark.parametrize(
+        "path", ["/lti_launches", "/content_item_selection", "/api/gateway/h/lti"]
+    )
+    @pytest.mark.usefixtures("pyramid_request_with_identity")
+    def test_it_always_stores_the_user_on_launches(
+        self, pyramid_request, user_service, path
+    ):
+        pyramid_request.path = path
+
+        get_lti_user(pyramid_request, from_identity=True)
+
+        user_service.upsert_user.assert_called_once_with(sentinel.lti_user)
+        user_service.upsert_user_if_changed.assert_not_called()
 
     @pytest.mark.usefixtures("pyramid_request_with_identity")
     def test_it_picks_lit_user_from_identity(self, pyramid_request):
@@ -1,3 +1,4 @@
+from operator import attrgetter
 from unittest import mock
 
 import pytest
@@ -11,6 +12,7 @@ from lms.services.application_instance import (
     ApplicationInstanceService,
     factory,
 )
+from lms.services.snapshot_cache import SNAPSHOT_CACHE, SnapshotCache
 from lms.validation import ValidationError
 from tests import factories
 
@@ -79,6 +81,51 @@ class TestApplicationInstanceService:
             == lti_v13_application_instance
         )
 
+    @pytest.mark.parametrize(
+        "method,key_attrs",
+        (
+            ("get_by_id", ["id"]),
+            ("get_by_consumer_key", ["consumer_key"]),
+            (
+                "get_by_deployment_id",
+                [
+                    "lti_registration.issuer",
+                    "lti_registration.client_id",
+                    "deployment_id",
+                ],
+            ),
+        ),
+    )
+    def test_lookups_use_the_cache(
+        self,
+        cached_service,
+        cache,
+        db_session,
+        lti_v13_application_instance,
+        method,
+        key_attrs,
+    ):
+        db_session.flush()
+        args = [
+            attrgetter(key_attr)(lti_v13_application_instance) for key_attr in key_attrs
+        ]
+        if method == "get_by_consumer_key":
+            lti_v13_application_instance.consumer_key = args[0] = "CONSUMER_KEY"
+
+        result = getattr(cached_service, method)(*args)
+
+        cache.get.assert_called_once_with(
+            db_session,
+            ("application_instance", method[len("get_by_") :], *args),
+            Any.callable(),
+            related=["organization", "lti_registration"],
+        )
+        assert result == lti_v13_application_instance
+
+    def test_cached_lookups_raise_if_not_found(self, cached_service):
+        with pytest.raises(ApplicationInstanceNotFound):
+            cached_service.get_by_id(100_000_000)
+
     @pytest.mark.parametrize(
         "issuer,client_id,deployment_id",
         [
@@ -299,6 +346,24 @@ class TestApplicationInstanceService:
             organization_service=organization_service,
         )
 
+    @pytest.fixture
+    def cached_service(
+        self, db_session, pyramid_request, aes_service, organization_service, cache
+    ):
+        return ApplicationInstanceService(
+            db=db_session,
+            request=pyramid_request,
+            aes_service=aes_service,
+            organization_service=organization_service,
+            cache=cache,
+        )
+
+    @pytest.fixture
+    def cache(self):
+        cache = mock.create_autospec(SnapshotCache, instance=True, spec_set=True)
+        cache.get.side_effect = lambda _db, _key, load, related=(): load()
+        return cache
+
     @pytest.fixture
     def update_application_instance(self, service):
         with mock.patch.object(
@@ -326,6 +391,7 @@ class TestFactory:
             request=pyramid_request,
             aes_service=aes_service,
             organization_service=organization_service,
+            cache=SNAPSHOT_CACHE,
         )
         assert application_instance_service == ApplicationInstanceService.return_value
 
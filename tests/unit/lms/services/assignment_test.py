@@ -1,10 +1,10 @@
-from datetime import datetime, timedelta
+from datetime import datetime
 from unittest.mock import sentinel
 
 import pytest
 from h_matchers import Any
 
-from lms.models import AssignmentGrouping, AssignmentMembership, LTIParams
+from lms.models import AssignmentGrouping
 from lms.services.assignment import AssignmentService, factory
 from tests import factories
 
@@ -16,77 +16,6 @@ class TestAssignmentService:
     def test_get_assignment_without_match(self, svc, non_matching_params):
         assert svc.get_assignment(**non_matching_params) is None
 
-    upsert_kwargs = {
-        "document_url": "new_document_url",
-        "extra": {"new": "values"},
-        "is_gradable": True,
-        "lti_params": LTIParams(
-            {
-                "resource_link_title": "title",
-                "resource_link_description": "description",
-            }
-        ),
-    }
-
-    upsert_attrs = {
-        "document_url": upsert_kwargs["document_url"],
-        "extra": upsert_kwargs["extra"],
-        "title": upsert_kwargs["lti_params"]["resource_link_title"],
-        "description": upsert_kwargs["lti_params"]["resource_link_description"],
-        "is_gradable": upsert_kwargs["is_gradable"],
-    }
-
-    def test_upsert_assignment_with_existing(
-        self, svc, db_session, assignment, matching_params
-    ):
-        result = svc.upsert_assignment(**matching_params, **self.upsert_kwargs)
-
-        assert result == assignment
-        db_session.flush()
-        db_session.refresh(assignment)
-        Any.assert_on_comparison = True
-        assert assignment == Any.object.with_attrs(self.upsert_attrs)
-        assert assignment.created < datetime.now() - timedelta(days=1)
-        assert assignment.updated >= datetime.now() - timedelta(days=1)
-
-    def test_upsert_assignment_with_new(
-        self, svc, db_session, assignment, non_matching_params
-    ):
-        result = svc.upsert_assignment(**non_matching_params, **self.upsert_kwargs)
-
-        assert result != assignment
-        db_session.flush()
-        db_session.refresh(result)
-        assert result == Any.object.with_attrs(
-            dict(non_matching_params, **self.upsert_attrs)
-        )
-
-        assert result.created >= datetime.now() - timedelta(days=1)
-        assert result.updated >= datetime.now() - timedelta(days=1)
-
-    def test_upsert_assignment_membership(self, svc, assignment):
-        user = factories.User()
-        lti_roles = factories.LTIRole.create_batch(3)
-        # One existing row
-        factories.AssignmentMembership.create(
-            assignment=assignment, user=user, lti_role=lti_roles[0]
-        )
-
-        membership = svc.upsert_assignment_membership(
-            assignment=assignment, user=user, lti_roles=lti_roles
-        )
-        assert (
-            membership
-            == Any.list.containing(
-                [
-                    Any.instance_of(AssignmentMembership).with_attrs(
-                        {"user": user, "assignment": assignment, "lti_role": lti_role}
-                    )
-                    for lti_role in lti_roles
-                ]
-            ).only()
-        )
-
     def test_upsert_assignment_grouping(self, svc, assignment, db_session):
         groupings = factories.CanvasGroup.create_batch(3)
         # One existing row
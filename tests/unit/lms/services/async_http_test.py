@@ -0,0 +1,226 @@
+import asyncio
+import time
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
+
+import aiohttp
+import pytest
+from aiohttp import TooManyRedirects
+from aioresponses import aioresponses
+from freezegun import freeze_time
+
+from lms.services.async_http import ENGINE, AsyncHTTPEngine
+from lms.services.exceptions import ExternalAsyncRequestError
+
+
+class TestAsyncHTTPEngine:
+    def test_gather(self, engine, urls, with_successful_responses):
+        responses = engine.gather("GET", urls, timeout=10, headers={"A": "B"})
+
+        for url, response in zip(urls, responses):
+            assert response.status == 200
+            assert response.headers["url"] == url
+            assert response.sync_text == f"body of {url}"
+
+        for request in with_successful_responses.requests.values():
+            assert request[0].kwargs["timeout"] == 10
+            assert request[0].kwargs["headers"] == {"A": "B"}
+
+    @pytest.mark.usefixtures("with_successful_responses")
+    def test_gather_reuses_the_loop_and_session(self, engine, urls, created):
+        engine.gather("GET", urls)
+        engine.gather("GET", urls)
+
+        assert len(created.loops) == len(created.sessions) == 1
+        assert created.sessions[0].connector.limit_per_host == 10
+
+    @pytest.mark.usefixtures("with_successful_responses")
+    def test_gather_starts_a_new_loop_after_a_fork(self, engine, urls, created):
+        engine.gather("GET", urls)
+
+        with patch("lms.services.async_http.os.getpid", return_value=-1):
+            assert engine.closed
+
+            engine.gather("GET", urls)
+
+            assert len(created.loops) == len(created.sessions) == 2
+            engine.close()
+
+        # Clean up the loop and session we left behind
+        loop, session = created.loops[0], created.sessions[0]
+        asyncio.run_coroutine_threadsafe(session.close(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        while loop.is_running():
+            time.sleep(0.01)
+        loop.close()
+
+    @pytest.mark.usefixtures("with_one_failed_response")
+    def test_gather_with_failure(self, engine, urls):
+        with pytest.raises(ExternalAsyncRequestError):
+            engine.gather("GET", urls)
+
+    @pytest.mark.usefixtures("with_one_failed_response")
+    def test_gather_returning_exceptions(self, engine, urls):
+        responses = engine.gather("GET", urls, return_exceptions=True)
+
+        assert responses[0].status == 200
+        assert isinstance(responses[1], ExternalAsyncRequestError)
+        assert isinstance(responses[1].__cause__, TooManyRedirects)
+
+    @pytest.mark.usefixtures("with_successful_responses")
+    def test_gather_limits_requests_per_host(self, engine, urls):
+        engine.gather("GET", urls)
+
+        # pylint:disable=protected-access
+        assert list(engine._host_semaphores) == ["example.com"]
+        assert engine._host_semaphores["example.com"]._value == 10
+
+    @pytest.mark.parametrize("status", [429, 500, 502, 503, 504])
+    def test_gather_retries(self, engine, urls, status):
+        with aioresponses() as m:
+            m.get(urls[0], status=status, headers={"Retry-After": "0"})
+            m.get(urls[0], status=200)
+
+            (response,) = engine.gather("GET", urls[:1])
+
+        assert response.status == 200
+
+    def test_gather_gives_up_retrying(self, urls):
+        engine = AsyncHTTPEngine(retries=2, retry_backoff=0)
+        with aioresponses() as m:
+            m.get(urls[0], status=503, repeat=True)
+
+            (response,) = engine.gather("GET", urls[:1])
+
+        engine.close()
+        assert response.status == 503
+        assert len(list(m.requests.values())[0]) == 3
+
+    @pytest.mark.parametrize("method", ["POST", "PATCH"])
+    def test_gather_doesnt_retry_non_idempotent_requests(self, engine, urls, method):
+        with aioresponses() as m:
+            m.add(urls[0], method=method, status=503, repeat=True)
+
+            (response,) = engine.gather(method, urls[:1])
+
+        assert response.status == 503
+        assert len(list(m.requests.values())[0]) == 1
+
+    def test_gather_doesnt_retry_other_errors(self, engine, urls):
+        with aioresponses() as m:
+            m.get(urls[0], status=404)
+
+            (response,) = engine.gather("GET", urls[:1])
+
+        assert response.status == 404
+        assert len(list(m.requests.values())[0]) == 1
+
+    @pytest.mark.parametrize(
+        "retry_after,expected",
+        [
+            ("3", 3),
+            ("1.5", 1.5),
+            ("-5", None),
+            ("1000", 10),
+            (format_datetime(datetime(2022, 1, 1, 0, 0, 5, tzinfo=timezone.utc)), 5),
+        ],
+    )
+    @freeze_time("2022-01-01 00:00:00")
+    def test_retry_delay_honours_Retry_After(self, engine, retry_after, expected):
+        response = Mock(headers={"Retry-After": retry_after})
+
+        delay = engine._retry_delay(  # pylint:disable=protected-access
+            response, attempt=1
+        )
+
+        if expected is None:
+            # A negative `Retry-After` means "now", so we fall back to the
+            # backoff
+            assert 0 <= delay <= 0.5
+        else:
+            assert delay == pytest.approx(expected)
+
+    @pytest.mark.parametrize("retry_after", [None, "not a date"])
+    @pytest.mark.parametrize("attempt,max_delay", [(1, 0.5), (2, 1), (3, 2)])
+    def test_retry_delay_backs_off(self, engine, retry_after, attempt, max_delay):
+        response = Mock(headers={"Retry-After": retry_after} if retry_after else {})
+
+        with patch("lms.services.async_http.random.uniform") as uniform:
+            delay = engine._retry_delay(  # pylint:disable=protected-access
+                response, attempt
+            )
+
+        uniform.assert_called_once_with(0, max_delay)
+        assert delay == uniform.return_value
+
+    @pytest.mark.usefixtures("with_successful_responses")
+    def test_close(self, engine, urls, created):
+        engine.gather("GET", urls)
+
+        engine.close()
+
+        assert engine.closed
+        assert created.loops[0].is_closed()
+        assert created.sessions[0].closed
+        # Closing again or using it again are both fine
+        engine.close()
+        assert engine.gather("GET", urls)
+
+    def test_close_without_use(self, engine):
+        engine.close()
+
+        assert engine.closed
+
+    def test_there_is_a_shared_engine(self):
+        assert isinstance(ENGINE, AsyncHTTPEngine)
+
+    @pytest.fixture
+    def with_successful_responses(self, urls):
+        with aioresponses() as m:
+            for url in urls:
+                m.get(url, headers=dict(url=url), body=f"body of {url}", repeat=True)
+
+            yield m
+
+    @pytest.fixture
+    def with_one_failed_response(self, urls):
+        with aioresponses() as m:
+            for url in urls[:-1]:
+                m.get(url, status=200)
+            m.get(urls[-1], exception=TooManyRedirects("info", "history"))
+
+            yield m
+
+    @pytest.fixture
+    def created(self):
+        """Record the event loops and sessions engines create."""
+        created = SimpleNamespace(loops=[], sessions=[])
+        new_event_loop, client_session = asyncio.new_event_loop, aiohttp.ClientSession
+
+        def create_loop():
+            created.loops.append(new_event_loop())
+            return created.loops[-1]
+
+        def create_session(*args, **kwargs):
+            created.sessions.append(client_session(*args, **kwargs))
+            return created.sessions[-1]
+
+        with patch(
+            "lms.services.async_http.asyncio.new_event_loop", side_effect=create_loop
+        ), patch(
+            "lms.services.async_http.aiohttp.ClientSession", side_effect=create_session
+        ):
+            yield created
+
+    @pytest.fixture
+    def urls(self):
+        """Return the URLs that we'll be sending test requests to."""
+        return ["https://example.com/example", "https://example.com/another"]
+
+    @pytest.fixture
+    def engine(self):
+        engine = AsyncHTTPEngine()
+        yield engine
+        engine.close()
@@ -1,67 +1,51 @@
-from unittest.mock import sentinel
+from unittest.mock import create_autospec, sentinel
 
 import pytest
-from aiohttp import TooManyRedirects
-from aioresponses import aioresponses
 
+from lms.services.async_http import ENGINE, AsyncHTTPEngine
 from lms.services.async_oauth_http import AsyncOAuthHTTPService, factory
-from lms.services.exceptions import ExternalAsyncRequestError
 
 
 class TestAsyncOAuthHTTPService:
-    def test_request_success(
-        self, svc, urls, with_successful_responses, oauth2_token_service
-    ):
-        responses = svc.request("GET", urls)
-
-        for url, response in zip(urls, responses):
-            assert response.status == 200
-            assert response.headers["url"] == url
-
-        for request in with_successful_responses.requests.values():
-            request_kwargs = request[0].kwargs
-
-            assert request_kwargs["timeout"] == 10
-            assert (
-                request_kwargs["headers"]["Authorization"]
-                == f"Bearer {oauth2_token_service.get().access_token}"
-            )
+    @pytest.mark.parametrize("return_exceptions", [True, False])
+    def test_request(self, svc, engine, oauth2_token_service, return_exceptions):
+        responses = svc.request(
+            "GET",
+            sentinel.urls,
+            headers={"A": "B"},
+            return_exceptions=return_exceptions,
+            other=sentinel.other,
+        )
 
-    @pytest.mark.usefixtures("with_one_failed_response")
-    def test_request_with_failure(self, svc, urls):
-        with pytest.raises(ExternalAsyncRequestError):
-            svc.request("GET", urls)
+        engine.gather.assert_called_once_with(
+            "GET",
+            sentinel.urls,
+            return_exceptions=return_exceptions,
+            timeout=10,
+            headers={
+                "A": "B",
+                "Authorization": f"Bearer {oauth2_token_service.get().access_token}",
+            },
+            other=sentinel.other,
+        )
+        assert responses == engine.gather.return_value
 
     @pytest.fixture
-    def with_successful_responses(self, urls):
-        with aioresponses() as m:
-            for url in urls:
-                m.get(url, headers=dict(url=url))
-
-            yield m
+    def engine(self):
+        return create_autospec(AsyncHTTPEngine, instance=True, spec_set=True)
 
     @pytest.fixture
-    def with_one_failed_response(self, urls):
-        with aioresponses() as m:
-            for url in urls[:-1]:
-                m.get(url, status=200)
-            m.get(urls[-1], exception=TooManyRedirects("info", "history"))
+    def svc(self, oauth2_token_service, engine):
+        return AsyncOAuthHTTPService(oauth2_token_service, engine)
 
-            yield m
 
-    @pytest.fixture
-    def urls(self):
-        """Return the URLs that we'll be sending test requests to."""
-        return ["https://example.com/example", "https://example.com/another"]
-
-    @pytest.fixture
-    def svc(self, oauth2_token_service):
-        return AsyncOAuthHTTPService(oauth2_token_service)
+class TestFactory:
+    def test_it(self, pyramid_request, oauth2_token_service, AsyncOAuthHTTPService):
+        svc = factory(sentinel.context, pyramid_request)
 
+        AsyncOAuthHTTPService.assert_called_once_with(oauth2_token_service, ENGINE)
+        assert svc == AsyncOAuthHTTPService.return_value
 
-class TestFactory:
-    @pytest.mark.usefixtures("oauth2_token_service")
-    def test_it(self, pyramid_request):
-        assert isinstance(
-            factory(sentinel.context, pyramid_request), AsyncOAuthHTTPService
-        )
+    @pytest.fixture
+    def AsyncOAuthHTTPService(self, patch):
+        return patch("lms.services.async_oauth_http.AsyncOAuthHTTPService")
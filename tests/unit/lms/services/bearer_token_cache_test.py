@@ -0,0 +1,48 @@
+from datetime import datetime, timedelta
+
+import pytest
+from freezegun import freeze_time
+
+from lms.services.bearer_token_cache import BEARER_TOKEN_CACHE, BearerTokenCache
+from tests import factories
+
+
+class TestBearerTokenCache:
+    def test_get_with_an_unknown_token(self, cache):
+        assert cache.get("Bearer TOKEN") is None
+        assert cache.stats() == {"tokens": 0, "hits": 0, "misses": 1}
+
+    def test_get_after_set(self, cache, lti_user):
+        cache.set("Bearer TOKEN", lti_user, datetime.utcnow() + timedelta(hours=1))
+
+        assert cache.get("Bearer TOKEN") == lti_user
+        assert cache.get("Bearer OTHER_TOKEN") is None
+        assert cache.stats() == {"tokens": 1, "hits": 1, "misses": 1}
+
+    def test_get_expires_with_the_token(self, cache, lti_user):
+        with freeze_time("2022-01-01") as frozen_time:
+            cache.set(
+                "Bearer TOKEN", lti_user, datetime.utcnow() + timedelta(minutes=1)
+            )
+
+            frozen_time.tick(timedelta(minutes=1))
+            assert cache.get("Bearer TOKEN") is None
+
+    def test_clear(self, cache, lti_user):
+        cache.set("Bearer TOKEN", lti_user, datetime.utcnow() + timedelta(hours=1))
+        cache.get("Bearer TOKEN")
+
+        cache.clear()
+
+        assert cache.stats() == {"tokens": 0, "hits": 0, "misses": 0}
+
+    def test_there_is_a_shared_cache(self):
+        assert isinstance(BEARER_TOKEN_CACHE, BearerTokenCache)
+
+    @pytest.fixture
+    def cache(self):
+        return BearerTokenCache()
+
+    @pytest.fixture
+    def lti_user(self):
+        return factories.LTIUser()
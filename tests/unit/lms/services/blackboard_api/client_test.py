@@ -329,15 +329,50 @@ class TestGroupCourseGroups:
 
         assert len(groups) == 2
 
+    @pytest.mark.parametrize(
+        "response", [Mock(status=500), ExternalAsyncRequestError()]
+    )
     def test_it_request_error(
-        self, svc, blackboard_list_groups, groups, async_oauth_http_service
+        self, svc, blackboard_list_groups, groups, async_oauth_http_service, response
     ):
         blackboard_list_groups.parse.return_value = groups
-        async_oauth_http_service.request.return_value = [Mock(status=500)]
+        async_oauth_http_service.request.return_value = [response]
 
         with pytest.raises(ExternalAsyncRequestError):
             svc.course_groups("COURSE_ID", current_student_own_groups_only=True)
 
+    @pytest.mark.parametrize(
+        "failed_response", [Mock(status=500), ExternalAsyncRequestError()]
+    )
+    def test_it_keeps_the_successful_checks_if_some_fail(
+        self,
+        svc,
+        blackboard_list_groups,
+        groups,
+        async_oauth_http_service,
+        failed_response,
+    ):
+        groups.append(
+            {
+                "id": "3",
+                "name": "GROUP 3",
+                "groupSetId": "OTHER_GROUP_SET",
+                "enrollment": {"type": "SelfEnrollment"},
+            }
+        )
+        blackboard_list_groups.parse.return_value = groups
+        async_oauth_http_service.request.return_value = [
+            failed_response,
+            Mock(status=200),
+        ]
+
+        groups = svc.course_groups("COURSE_ID", current_student_own_groups_only=True)
+
+        async_oauth_http_service.request.assert_called_once_with(
+            "GET", Any.list.of_size(2), return_exceptions=True
+        )
+        assert [group["id"] for group in groups] == ["3", "2"]
+
     @pytest.fixture
     def groups(self):
         return [
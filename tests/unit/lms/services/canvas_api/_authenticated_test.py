@@ -1,6 +1,7 @@
 from unittest.mock import create_autospec, sentinel
 
 import pytest
+from h_matchers import Any
 
 from lms.services import CanvasAPIServerError, OAuth2TokenError
 from lms.services.canvas_api._basic import BasicClient
@@ -25,6 +26,57 @@ class TestAuthenticatedClient:
 
         assert result == basic_client.send.return_value
 
+    def test_send_conditional(self, authenticated_client, basic_client, oauth_token):
+        result = authenticated_client.send_conditional(
+            "METHOD",
+            "/path",
+            sentinel.schema,
+            sentinel.validators,
+            params=sentinel.params,
+        )
+
+        basic_client.send_conditional.assert_called_once_with(
+            "METHOD",
+            "/path",
+            sentinel.schema,
+            (10, 10),
+            sentinel.validators,
+            sentinel.params,
+            headers={"Authorization": f"Bearer {oauth_token.access_token}"},
+        )
+        assert result == basic_client.send_conditional.return_value
+
+    @pytest.mark.parametrize("method", ["send", "send_conditional"])
+    def test_it_refreshes_expiring_tokens_first(
+        self,
+        authenticated_client,
+        basic_client,
+        oauth2_token_service,
+        oauth_token,
+        method,
+    ):
+        getattr(authenticated_client, method)(
+            "METHOD", "/path", sentinel.schema, sentinel.validators
+        )
+
+        oauth2_token_service.refresh_if_expiring.assert_called_once_with(Any.function())
+        # Check the callback refreshes the token
+        basic_client.send.reset_mock()
+        oauth2_token_service.refresh_if_expiring.call_args[0][0]()
+        basic_client.send.assert_called_once_with(
+            "POST",
+            "login/oauth2/token",
+            url_stub="",
+            params=Any.dict.containing(
+                {
+                    "grant_type": "refresh_token",
+                    "refresh_token": oauth_token.refresh_token,
+                }
+            ),
+            schema=OAuthTokenResponseSchema,
+            timeout=(10, 10),
+        )
+
     def test_send_raises_OAuth2TokenError_if_we_dont_have_an_access_token_for_the_user(
         self, authenticated_client, oauth2_token_service
     ):
@@ -1,4 +1,5 @@
-from unittest.mock import call, create_autospec, sentinel
+from unittest.mock import Mock, call, create_autospec, sentinel
+from urllib.parse import parse_qs, urlparse
 
 import pytest
 import requests
@@ -191,6 +192,159 @@ class TestBasicClient:
         assert exc.request == request
         assert exc.response == response
 
+    @pytest.mark.usefixtures("with_numbered_paginated_results")
+    def test_send_fetches_numbered_pages_concurrently(
+        self, basic_client, PaginatedSchema, http_session
+    ):
+        basic_client.PAGINATION_MAXIMUM_CONCURRENT_REQUESTS = 2
+
+        result = basic_client.send(
+            "METHOD", "path/", schema=PaginatedSchema, timeout=sentinel.timeout
+        )
+
+        # Pages are returned in page order, whatever order they arrive in
+        assert result == ["page_1", "page_2", "page_3", "page_4"]
+        sent_urls = [args[0].url for args, _ in http_session.send.call_args_list]
+        assert sent_urls[0] == Any.url.containing_query({"per_page": Any()})
+        assert sorted(sent_urls[1:]) == [
+            f"https://example.com/api/v1/items?include%5B%5D=users&per_page=100&page={page}"
+            for page in (2, 3, 4)
+        ]
+
+    @pytest.mark.usefixtures("with_numbered_paginated_results")
+    def test_send_only_fetches_numbered_pages_to_the_max_value(
+        self, basic_client, PaginatedSchema
+    ):
+        basic_client.PAGINATION_MAXIMUM_REQUESTS = 3
+
+        result = basic_client.send(
+            "METHOD", "path/", schema=PaginatedSchema, timeout=sentinel.timeout
+        )
+
+        assert result == ["page_1", "page_2", "page_3"]
+
+    @pytest.mark.usefixtures("with_numbered_paginated_results")
+    def test_send_raises_CanvasAPIError_if_a_numbered_page_fails(
+        self, basic_client, PaginatedSchema, numbered_responses
+    ):
+        numbered_responses["3"] = factories.requests.Response(status_code=500)
+
+        with pytest.raises(CanvasAPIError) as exc_info:
+            basic_client.send(
+                "METHOD", "path/", schema=PaginatedSchema, timeout=sentinel.timeout
+            )
+
+        assert exc_info.value.response == numbered_responses["3"]
+
+    @pytest.mark.parametrize(
+        "next_page,last_page",
+        (
+            ("bookmark:WzEsMl0", "bookmark:WzQsNV0"),
+            ("2", None),
+        ),
+    )
+    def test_send_follows_opaque_pagination_links_serially(
+        self, basic_client, PaginatedSchema, http_session, next_page, last_page
+    ):
+        url = "https://example.com/api/v1/items?page="
+        links = [f'<{url}{next_page}>; rel="next"']
+        if last_page:
+            links.append(f'<{url}{last_page}>; rel="last"')
+        http_session.send.side_effect = [
+            factories.requests.Response(
+                status_code=200, headers={"Link": ", ".join(links)}
+            ),
+            factories.requests.Response(status_code=200),
+        ]
+
+        result = basic_client.send(
+            "METHOD", "path/", schema=PaginatedSchema, timeout=sentinel.timeout
+        )
+
+        assert result == ["item_0", "item_1"]
+        assert http_session.send.call_args_list[1] == call(
+            Any.request(url=f"{url}{next_page}"), timeout=sentinel.timeout
+        )
+
+    @pytest.mark.parametrize(
+        "validators,expected_headers",
+        (
+            ({}, {}),
+            ({"ETag": "ETAG"}, {"If-None-Match": "ETAG"}),
+            (
+                {"ETag": "ETAG", "Last-Modified": "LAST_MODIFIED"},
+                {"If-None-Match": "ETAG", "If-Modified-Since": "LAST_MODIFIED"},
+            ),
+        ),
+    )
+    def test_send_conditional_sends_validators(
+        self, basic_client, http_session, Schema, validators, expected_headers
+    ):
+        basic_client.send_conditional(
+            "GET",
+            "path/",
+            schema=Schema,
+            timeout=sentinel.timeout,
+            validators=validators,
+            headers={"Authorization": "Bearer TOKEN"},
+        )
+
+        headers = http_session.send.call_args[0][0].headers
+        assert headers == dict(expected_headers, Authorization="Bearer TOKEN")
+
+    def test_send_conditional_returns_the_result_and_new_validators(
+        self, basic_client, http_session, Schema
+    ):
+        http_session.send.return_value = factories.requests.Response(
+            status_code=200,
+            headers={"ETag": "NEW_ETAG", "Last-Modified": "NEW_LAST_MODIFIED"},
+        )
+
+        result = basic_client.send_conditional(
+            "GET",
+            "path/",
+            schema=Schema,
+            timeout=sentinel.timeout,
+            validators={"ETag": "ETAG"},
+        )
+
+        assert result == (
+            Schema.return_value.parse.return_value,
+            {"ETag": "NEW_ETAG", "Last-Modified": "NEW_LAST_MODIFIED"},
+        )
+
+    def test_send_conditional_returns_None_if_not_modified(
+        self, basic_client, http_session, Schema
+    ):
+        http_session.send.return_value = factories.requests.Response(status_code=304)
+
+        result = basic_client.send_conditional(
+            "GET",
+            "path/",
+            schema=Schema,
+            timeout=sentinel.timeout,
+            validators={"ETag": "ETAG"},
+        )
+
+        assert result == (None, {"ETag": "ETAG"})
+        Schema.assert_not_called()
+
+    @pytest.mark.usefixtures("with_paginated_results")
+    def test_send_conditional_doesnt_return_validators_for_paginated_results(
+        self, basic_client, PaginatedSchema, paginated_responses
+    ):
+        paginated_responses[0].headers["ETag"] = "ETAG"
+
+        result = basic_client.send_conditional(
+            "GET",
+            "path/",
+            schema=PaginatedSchema,
+            timeout=sentinel.timeout,
+            validators={},
+        )
+
+        assert result == (["item_0", "item_1", "item_2"], {})
+
     @pytest.fixture(autouse=True)
     def has_ok_response(self, http_session):
         http_session.send.return_value = factories.requests.Response(status_code=200)
@@ -245,3 +399,43 @@ class TestBasicClient:
                 ]
             )
         }
+
+    @pytest.fixture
+    def numbered_responses(self):
+        url = "https://example.com/api/v1/items?include[]=users&per_page=100&page="
+        links = {"current": 1, "next": 2, "first": 1, "last": 4}
+
+        responses = {
+            page: factories.requests.Response(status_code=200)
+            for page in ("2", "3", "4")
+        }
+        responses["1"] = factories.requests.Response(
+            status_code=200,
+            headers={
+                "Link": ", ".join(
+                    f'<{url}{page}>; rel="{rel}"' for rel, page in links.items()
+                )
+            },
+        )
+        return responses
+
+    @pytest.fixture
+    def with_numbered_paginated_results(
+        self, http_session, numbered_responses, PaginatedSchema
+    ):
+        def send(request, **_kwargs):
+            page = parse_qs(urlparse(request.url).query).get("page", ["1"])[0]
+            return numbered_responses[page]
+
+        def parse(response):
+            (page,) = [
+                page
+                for page, candidate in numbered_responses.items()
+                if candidate is response
+            ]
+            return [f"page_{page}"]
+
+        http_session.send.side_effect = send
+        PaginatedSchema.side_effect = lambda response: Mock(
+            spec_set=["parse"], parse=Mock(return_value=parse(response))
+        )
@@ -0,0 +1,73 @@
+from datetime import timedelta
+
+import pytest
+from freezegun import freeze_time
+
+from lms.services.canvas_api._files_cache import CachedFiles, FilesCache, FilesCacheKey
+
+
+class TestFilesCache:
+    def test_get_returns_None_for_unknown_keys(self, cache):
+        assert cache.get(self.key()) is None
+
+    def test_set(self, cache):
+        cache.set(self.key(), ["file"], {"ETag": "ETAG"})
+
+        assert cache.get(self.key()) == CachedFiles(
+            files=["file"], validators={"ETag": "ETAG"}, is_fresh=True
+        )
+
+    def test_entries_go_stale_after_the_ttl(self, cache):
+        with freeze_time("2022-01-01 00:00:00"):
+            cache.set(self.key(), ["file"], {})
+            assert cache.get(self.key()).is_fresh
+
+        with freeze_time("2022-01-01 00:01:00"):
+            # Stale entries are still returned so they can be revalidated
+            assert not cache.get(self.key()).is_fresh
+
+    def test_refresh(self, cache):
+        with freeze_time("2022-01-01 00:00:00"):
+            cache.set(self.key(), ["file"], {})
+
+        with freeze_time("2022-01-01 00:05:00"):
+            cache.refresh(self.key())
+            cache.refresh(self.key(course_id="UNKNOWN"))
+
+            assert cache.get(self.key()).is_fresh
+
+    def test_invalidate(self, cache):
+        cache.set(self.key(user_id="USER_1"), [], {})
+        cache.set(self.key(user_id="USER_2"), [], {})
+        cache.set(self.key(course_id="OTHER_COURSE"), [], {})
+        cache.set(self.key(canvas_host="other.example.com"), [], {})
+
+        cache.invalidate("canvas.example.com", "COURSE_ID")
+
+        assert not cache.get(self.key(user_id="USER_1"))
+        assert not cache.get(self.key(user_id="USER_2"))
+        assert cache.get(self.key(course_id="OTHER_COURSE"))
+        assert cache.get(self.key(canvas_host="other.example.com"))
+
+    def test_clear(self, cache):
+        cache.set(self.key(), [], {})
+
+        cache.clear()
+
+        assert cache.get(self.key()) is None
+
+    @staticmethod
+    def key(**kwargs):
+        return FilesCacheKey(
+            **{
+                "canvas_host": "canvas.example.com",
+                "user_id": "USER_ID",
+                "course_id": "COURSE_ID",
+                "sort": "position",
+                **kwargs,
+            }
+        )
+
+    @pytest.fixture
+    def cache(self):
+        return FilesCache(max_size=3, ttl=timedelta(minutes=1))
@@ -1,10 +1,12 @@
 from unittest.mock import create_autospec, sentinel
 
 import pytest
+from freezegun import freeze_time
 from h_matchers import Any
 
 from lms.services import CanvasAPIError, CanvasAPIServerError, OAuth2TokenError
 from lms.services.canvas_api._authenticated import AuthenticatedClient
+from lms.services.canvas_api._files_cache import FilesCache, FilesCacheKey
 from lms.services.canvas_api.client import CanvasAPIClient
 from tests import factories
 
@@ -433,6 +435,73 @@ class TestCanvasAPIClientIntegrated:
             ]
         )
 
+    def test_list_files_uses_fresh_cached_files(
+        self, cached_canvas_api_client, files_cache, http_session, file_service
+    ):
+        files_cache.set(self.CACHE_KEY, sentinel.files, {})
+
+        assert cached_canvas_api_client.list_files("COURSE_ID") == sentinel.files
+        http_session.send.assert_not_called()
+        file_service.upsert.assert_not_called()
+
+    def test_list_files_caches_files(
+        self, cached_canvas_api_client, files_cache, http_session
+    ):
+        http_session.send.return_value = factories.requests.Response(
+            status_code=200, json_data=self.FILES, headers={"ETag": "ETAG"}
+        )
+
+        files = cached_canvas_api_client.list_files("COURSE_ID")
+
+        cached = files_cache.get(self.CACHE_KEY)
+        assert cached.files == files == self.FILES
+        assert cached.validators == {"ETag": "ETAG"}
+        assert cached.is_fresh
+
+    def test_list_files_revalidates_stale_cached_files(
+        self, cached_canvas_api_client, files_cache, http_session, file_service
+    ):
+        with freeze_time("2000-01-01"):
+            files_cache.set(self.CACHE_KEY, sentinel.files, {"ETag": "ETAG"})
+        http_session.send.return_value = factories.requests.Response(status_code=304)
+
+        files = cached_canvas_api_client.list_files("COURSE_ID")
+
+        assert files == sentinel.files
+        assert http_session.send.call_args[0][0].headers["If-None-Match"] == "ETAG"
+        assert files_cache.get(self.CACHE_KEY).is_fresh
+        file_service.upsert.assert_not_called()
+
+    def test_list_files_replaces_stale_cached_files_that_changed(
+        self, cached_canvas_api_client, files_cache, http_session
+    ):
+        with freeze_time("2000-01-01"):
+            files_cache.set(self.CACHE_KEY, sentinel.files, {"ETag": "ETAG"})
+        http_session.send.return_value = factories.requests.Response(
+            status_code=200, json_data=self.FILES, headers={"ETag": "NEW_ETAG"}
+        )
+
+        files = cached_canvas_api_client.list_files("COURSE_ID")
+
+        assert files == self.FILES
+        assert files_cache.get(self.CACHE_KEY).validators == {"ETag": "NEW_ETAG"}
+
+    FILES = [{"display_name": "file", "id": 1, "updated_at": "updated_at", "size": 1}]
+    CACHE_KEY = FilesCacheKey("canvas_host", "USER_ID", "COURSE_ID", "position")
+
+    @pytest.fixture
+    def files_cache(self):
+        return FilesCache()
+
+    @pytest.fixture
+    def cached_canvas_api_client(self, authenticated_client, file_service, files_cache):
+        return CanvasAPIClient(
+            authenticated_client,
+            file_service,
+            files_cache=files_cache,
+            cache_scope=("canvas_host", "USER_ID"),
+        )
+
     def test_public_url(self, canvas_api_client, http_session):
         http_session.send.return_value = factories.requests.Response(
             status_code=200, json_data={"public_url": "public_url_value"}
@@ -2,6 +2,7 @@ from unittest.mock import sentinel
 
 import pytest
 
+from lms.services.canvas_api import FILES_CACHE
 from lms.services.canvas_api.factory import canvas_api_client_factory
 
 pytestmark = pytest.mark.usefixtures(
@@ -12,12 +13,23 @@ pytestmark = pytest.mark.usefixtures(
 class TestCanvasAPIClientFactory:
     @pytest.mark.usefixtures("aes_service")
     def test_building_the_CanvasAPIClient(
-        self, pyramid_request, CanvasAPIClient, AuthenticatedClient, file_service
+        self,
+        pyramid_request,
+        CanvasAPIClient,
+        AuthenticatedClient,
+        file_service,
+        application_instance_service,
     ):
         canvas_api = canvas_api_client_factory(sentinel.context, pyramid_request)
 
         CanvasAPIClient.assert_called_once_with(
-            AuthenticatedClient.return_value, file_service
+            AuthenticatedClient.return_value,
+            file_service=file_service,
+            files_cache=FILES_CACHE,
+            cache_scope=(
+                application_instance_service.get_current.return_value.lms_host(),
+                pyramid_request.lti_user.user_id,
+            ),
         )
         assert canvas_api == CanvasAPIClient.return_value
 
@@ -38,7 +38,9 @@ class TestBasicClient:
     ):
         response = basic_client.request("GET", path)
 
-        oauth_http_service.request.assert_called_once_with("GET", expected_url)
+        oauth_http_service.request.assert_called_once_with(
+            "GET", expected_url, refresh=basic_client.refresh_access_token
+        )
         assert response == oauth_http_service.request.return_value
 
     def test_request_raises_ExternalRequestError_if_the_request_fails(
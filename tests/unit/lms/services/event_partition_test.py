@@ -0,0 +1,138 @@
+import csv
+import gzip
+from datetime import date, datetime
+from unittest.mock import sentinel
+
+import pytest
+from sqlalchemy import text
+
+from lms.models import Event, EventData, EventType, EventUser
+from lms.services.event_partition import EventPartitionService, factory
+from tests import factories
+
+
+class TestEventPartitionService:
+    def test_create_partitions(self, svc):
+        created = svc.create_partitions(months_ahead=2, today=date(2022, 11, 15))
+
+        assert created == [date(2022, 11, 1), date(2022, 12, 1), date(2023, 1, 1)]
+        assert svc.months() == created
+
+    def test_create_partitions_skips_existing_months(self, svc):
+        svc.create_partitions(months_ahead=0, today=date(2022, 11, 15))
+
+        created = svc.create_partitions(months_ahead=1, today=date(2022, 11, 15))
+
+        assert created == [date(2022, 12, 1)]
+        assert svc.months() == [date(2022, 11, 1), date(2022, 12, 1)]
+
+    def test_create_partitions_when_theyre_all_there(self, svc):
+        svc.create_partitions(months_ahead=1, today=date(2022, 11, 15))
+
+        assert svc.create_partitions(months_ahead=1, today=date(2022, 11, 15)) == []
+
+    def test_create_partitions_partitions_every_table(self, svc, db_session):
+        svc.create_partitions(months_ahead=0, today=date(2022, 11, 15))
+
+        event = self.add_event(db_session, datetime(2022, 11, 20))
+        late_event = self.add_event(db_session, datetime(2022, 12, 1))
+
+        assert self.partitions(db_session, event) == {
+            "event_2022_11",
+            "event_user_2022_11",
+            "event_data_2022_11",
+        }
+        assert self.partitions(db_session, late_event) == {
+            "event_default",
+            "event_user_default",
+            "event_data_default",
+        }
+
+    def test_months_with_no_partitions(self, svc):
+        assert svc.months() == []
+
+    def test_old_months(self, svc):
+        svc.create_partitions(months_ahead=3, today=date(2022, 10, 15))
+
+        assert svc.old_months(keep_months=1, today=date(2023, 1, 15)) == [
+            date(2022, 10, 1),
+            date(2022, 11, 1),
+        ]
+
+    def test_archive(self, svc, db_session, tmp_path):
+        svc.create_partitions(months_ahead=1, today=date(2022, 11, 15))
+        event = self.add_event(db_session, datetime(2022, 11, 20))
+        kept_event = self.add_event(db_session, datetime(2022, 12, 20))
+
+        paths = svc.archive(date(2022, 11, 1), tmp_path)
+
+        assert paths == [
+            tmp_path / "event_2022_11.csv.gz",
+            tmp_path / "event_user_2022_11.csv.gz",
+            tmp_path / "event_data_2022_11.csv.gz",
+        ]
+        events, event_users, event_data = [self.read_csv(path) for path in paths]
+        assert [row["id"] for row in events] == [str(event.id)]
+        assert events[0]["timestamp"] == "2022-11-20 00:00:00"
+        assert [row["event_id"] for row in event_users] == [str(event.id)]
+        assert [row["event_id"] for row in event_data] == [str(event.id)]
+        assert event_data[0]["extra"] == '{"some": "data"}'
+        assert svc.months() == [date(2022, 12, 1)]
+        db_session.expire_all()
+        assert db_session.query(Event).all() == [kept_event]
+
+    def test_partition_name(self):
+        assert (
+            EventPartitionService.partition_name("event_user", date(2022, 3, 1))
+            == "event_user_2022_03"
+        )
+
+    def add_event(self, db_session, timestamp):
+        user = factories.User()
+        event = Event(
+            timestamp=timestamp,
+            type=EventType(type=EventType.Type.CONFIGURED_LAUNCH),
+        )
+        db_session.add_all(
+            [
+                event,
+                EventUser(event=event, user=user),
+                EventData(event=event, data={"some": "data"}),
+            ]
+        )
+        db_session.flush()
+        return event
+
+    def partitions(self, db_session, event):
+        return set(
+            db_session.execute(
+                text(
+                    """
+                    SELECT tableoid::regclass::text FROM event
+                        WHERE id = :id
+                    UNION
+                    SELECT tableoid::regclass::text FROM event_user
+                        WHERE event_id = :id
+                    UNION
+                    SELECT tableoid::regclass::text FROM event_data
+                        WHERE event_id = :id
+                    """
+                ),
+                {"id": event.id},
+            ).scalars()
+        )
+
+    def read_csv(self, path):
+        with gzip.open(path, "rt") as file_:
+            return list(csv.DictReader(file_))
+
+    @pytest.fixture
+    def svc(self, db_session):
+        return EventPartitionService(db_session)
+
+
+class TestFactory:
+    def test_it(self, pyramid_request):
+        svc = factory(sentinel.context, pyramid_request)
+
+        assert isinstance(svc, EventPartitionService)
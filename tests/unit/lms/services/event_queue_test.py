@@ -0,0 +1,61 @@
+from datetime import timedelta
+
+import pytest
+
+from lms.services.event_queue import EventQueue
+
+
+class TestEventQueue:
+    def test_add_doesnt_send_straight_away(self, queue, insert_events):
+        queue.add({"event": 1})
+
+        insert_events.delay.assert_not_called()
+        assert queue.stats() == {"added": 1, "batches": 0, "errors": 0, "pending": 1}
+
+    def test_flush(self, queue, insert_events):
+        queue.add({"event": 1})
+        queue.add({"event": 2})
+
+        queue.flush()
+
+        insert_events.delay.assert_called_once_with([{"event": 1}, {"event": 2}])
+        assert queue.stats() == {"added": 2, "batches": 1, "errors": 0, "pending": 0}
+
+    def test_flush_with_nothing_to_send(self, queue, insert_events):
+        queue.flush()
+
+        insert_events.delay.assert_not_called()
+
+    def test_flush_if_queueing_fails(self, queue, insert_events):
+        insert_events.delay.side_effect = OSError
+        queue.add({"event": 1})
+
+        queue.flush()
+
+        assert queue.stats() == {"added": 1, "batches": 1, "errors": 1, "pending": 0}
+
+    def test_it_sends_after_the_window(self, insert_events):
+        queue = EventQueue(window=timedelta(seconds=0.01))
+
+        queue.add({"event": 1})
+        queue._timer.join(5)  # pylint:disable=protected-access
+
+        insert_events.delay.assert_called_once_with([{"event": 1}])
+
+    def test_it_sends_when_full(self, insert_events):
+        queue = EventQueue(max_size=2)
+
+        queue.add({"event": 1})
+        queue.add({"event": 2})
+
+        insert_events.delay.assert_called_once_with([{"event": 1}, {"event": 2}])
+
+    @pytest.fixture
+    def queue(self):
+        queue = EventQueue(window=timedelta(hours=1))
+        yield queue
+        queue.flush()
+
+    @pytest.fixture(autouse=True)
+    def insert_events(self, patch):
+        return patch("lms.tasks.event.insert_events")
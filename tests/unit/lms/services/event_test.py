@@ -1,10 +1,15 @@
-from unittest.mock import sentinel
+from datetime import datetime
+from unittest.mock import Mock, create_autospec, sentinel
 
 import pytest
+import transaction
+from freezegun import freeze_time
+from h_matchers import Any
 
 from lms.events import BaseEvent
 from lms.models import Event, EventData, EventType, EventUser
 from lms.services.event import EventService, factory
+from lms.services.event_queue import EVENT_QUEUE, EventQueue
 from tests import factories
 
 
@@ -21,13 +26,18 @@ class TestEventService:
                 data={"some": "data"},
             )
         )
+        event = db_session.query(Event).one()
+        assert event.type.type == EventType.Type.CONFIGURED_LAUNCH
+
+        event_user = db_session.query(EventUser).one()
+        assert event_user.user_id == user.id
+        event_data = db_session.query(EventData).one()
+        assert event_data.data == {"some": "data"}
+        # Child rows are partitioned on the time of their event
         assert (
-            db_session.query(Event).one().type.type == EventType.Type.CONFIGURED_LAUNCH
+            event_user.event_timestamp == event_data.event_timestamp == event.timestamp
         )
 
-        assert db_session.query(EventUser).one().user_id == user.id
-        assert db_session.query(EventData).one().data == {"some": "data"}
-
     def test_insert_event_mulitple_roles(self, svc, db_session):
         user = factories.User()
         roles = factories.LTIRole.create_batch(5)
@@ -81,18 +91,190 @@ class TestEventService:
         # The type is the same as the first insert
         assert event_type == type_query.one()
 
+    @freeze_time("2022-01-01 12:00:00")
+    def test_to_payload(self):
+        payload = EventService.to_payload(
+            BaseEvent(
+                request=sentinel.request,
+                type=EventType.Type.CONFIGURED_LAUNCH,
+                user_id=1,
+                role_ids=[2, 3],
+                application_instance_id=4,
+                course_id=5,
+                assignment_id=6,
+                grouping_id=7,
+                data={"some": "data"},
+            )
+        )
+
+        assert payload == {
+            "type": "configured_launch",
+            "timestamp": "2022-01-01T12:00:00",
+            "user_id": 1,
+            "role_ids": [2, 3],
+            "application_instance_id": 4,
+            "course_id": 5,
+            "assignment_id": 6,
+            "grouping_id": 7,
+            "data": {"some": "data"},
+        }
+
+    def test_queue_event(self, svc, queue, transaction_manager):
+        event = BaseEvent(request=sentinel.request, type=EventType.Type.AUDIT_TRAIL)
+
+        with transaction_manager:
+            svc.queue_event(event)
+            queue.add.assert_not_called()
+
+        queue.add.assert_called_once_with(
+            Any.dict.containing({"type": "audit", "user_id": None})
+        )
+
+    def test_queue_event_doesnt_queue_if_the_transaction_fails(
+        self, svc, queue, transaction_manager
+    ):
+        event = BaseEvent(request=sentinel.request, type=EventType.Type.AUDIT_TRAIL)
+
+        with pytest.raises(ValueError):
+            with transaction_manager:
+                svc.queue_event(event)
+                raise ValueError()
+
+        queue.add.assert_not_called()
+
+    def test_queue_event_doesnt_queue_if_the_commit_fails(
+        self, svc, queue, transaction_manager
+    ):
+        event = BaseEvent(request=sentinel.request, type=EventType.Type.AUDIT_TRAIL)
+        failing_resource = Mock(
+            commit=Mock(side_effect=ValueError), sortKey=Mock(return_value="fail")
+        )
+
+        with pytest.raises(ValueError):
+            with transaction_manager as tx:
+                tx.join(failing_resource)
+                svc.queue_event(event)
+
+        queue.add.assert_not_called()
+
+    def test_insert_events(self, svc, db_session):
+        users = factories.User.create_batch(2)
+        roles = factories.LTIRole.create_batch(2)
+        db_session.flush()
+
+        svc.insert_events(
+            [
+                {
+                    "type": "configured_launch",
+                    "timestamp": "2022-01-01T12:00:00",
+                    "user_id": users[0].id,
+                    "role_ids": [role.id for role in roles],
+                    "application_instance_id": users[0].application_instance_id,
+                    "course_id": None,
+                    "assignment_id": None,
+                    "grouping_id": None,
+                    "data": {"some": "data"},
+                },
+                {
+                    "type": "deep_linking",
+                    "timestamp": "2022-01-01T12:00:01",
+                    "user_id": users[1].id,
+                    "role_ids": [],
+                    "application_instance_id": None,
+                    "course_id": None,
+                    "assignment_id": None,
+                    "grouping_id": None,
+                    "data": None,
+                },
+                {
+                    "type": "audit",
+                    "timestamp": "2022-01-01T12:00:02",
+                    "user_id": None,
+                    "role_ids": [],
+                    "application_instance_id": None,
+                    "course_id": None,
+                    "assignment_id": None,
+                    "grouping_id": None,
+                    "data": {"more": "data"},
+                },
+            ]
+        )
+
+        events = db_session.query(Event).order_by(Event.timestamp).all()
+        assert [(event.type.type, event.timestamp) for event in events] == [
+            (EventType.Type.CONFIGURED_LAUNCH, datetime(2022, 1, 1, 12, 0, 0)),
+            (EventType.Type.DEEP_LINKING, datetime(2022, 1, 1, 12, 0, 1)),
+            (EventType.Type.AUDIT_TRAIL, datetime(2022, 1, 1, 12, 0, 2)),
+        ]
+        assert events[0].application_instance_id == users[0].application_instance_id
+        assert {
+            (event_user.event_id, event_user.user_id, event_user.lti_role_id)
+            for event_user in db_session.query(EventUser)
+        } == {
+            (events[0].id, users[0].id, roles[0].id),
+            (events[0].id, users[0].id, roles[1].id),
+            (events[1].id, users[1].id, None),
+        }
+        assert {
+            (event_data.event_id, tuple(event_data.data))
+            for event_data in db_session.query(EventData)
+        } == {(events[0].id, ("some",)), (events[2].id, ("more",))}
+
+    def test_insert_events_without_users_or_data(self, svc, db_session):
+        svc.insert_events(
+            [
+                {
+                    "type": "audit",
+                    "timestamp": "2022-01-01T12:00:00",
+                    "user_id": None,
+                    "role_ids": [],
+                    "application_instance_id": None,
+                    "course_id": None,
+                    "assignment_id": None,
+                    "grouping_id": None,
+                    "data": None,
+                }
+            ]
+        )
+
+        assert db_session.query(Event).count() == 1
+        assert not db_session.query(EventUser).count()
+        assert not db_session.query(EventData).count()
+
+    def test_insert_events_with_no_events(self, svc, db_session):
+        svc.insert_events([])
+
+        assert not db_session.query(Event).count()
+
+    @pytest.fixture
+    def queue(self):
+        return create_autospec(EventQueue, instance=True, spec_set=True)
+
+    @pytest.fixture
+    def transaction_manager(self):
+        return transaction.TransactionManager(explicit=True)
+
     @pytest.fixture
-    def svc(self, db_session):
-        return EventService(db_session)
+    def svc(self, db_session, transaction_manager, queue):
+        return EventService(
+            db_session, transaction_manager=transaction_manager, queue=queue
+        )
 
 
 class TestFactory:
     def test_it(self, pyramid_request, EventService):
+        pyramid_request.tm = sentinel.tm
+
         svc = factory(sentinel.context, pyramid_request)
 
-        EventService.assert_called_once_with(db=pyramid_request.db)
+        EventService.assert_called_once_with(
+            db=pyramid_request.db, transaction_manager=pyramid_request.tm
+        )
         assert svc == EventService.return_value
 
+    def test_there_is_a_shared_queue(self):
+        assert isinstance(EVENT_QUEUE, EventQueue)
+
     @pytest.fixture
     def EventService(self, patch):
         return patch("lms.services.event.EventService")
@@ -1,8 +1,11 @@
-from unittest.mock import sentinel
+from unittest.mock import call, create_autospec, sentinel
 
 import pytest
+from h_matchers import Any
 
 from lms.models import File
+from lms.services.canvas_api import FILES_CACHE
+from lms.services.canvas_api._files_cache import FilesCache
 from lms.services.file import FileService, factory
 from tests import factories
 
@@ -76,13 +79,98 @@ class TestGet:
             assert file.size == i * 100
             assert file.name == f"insert_file_{i}"
 
+    def test_upsert_invalidates_cached_listings_of_courses_with_changed_files(
+        self, svc, application_instance, files_cache, db_session
+    ):
+        unchanged, changed = factories.File.create_batch(
+            2, application_instance=application_instance
+        )
+        new = factories.File.build()
+        db_session.flush()
+
+        svc.upsert(
+            [
+                {
+                    "type": unchanged.type,
+                    "course_id": unchanged.course_id,
+                    "lms_id": unchanged.lms_id,
+                    "name": unchanged.name,
+                    "size": unchanged.size,
+                },
+                {
+                    "type": changed.type,
+                    "course_id": changed.course_id,
+                    "lms_id": changed.lms_id,
+                    "name": "new_name",
+                    "size": changed.size,
+                },
+                {
+                    "type": new.type,
+                    "course_id": new.course_id,
+                    "lms_id": new.lms_id,
+                    "name": new.name,
+                    "size": new.size,
+                },
+            ]
+        )
+
+        assert (
+            files_cache.invalidate.call_args_list
+            == Any.list.containing(
+                [
+                    call(application_instance.lms_host(), changed.course_id),
+                    call(application_instance.lms_host(), new.course_id),
+                ]
+            ).only()
+        )
+
+    def test_upsert_without_a_files_cache(self, application_instance, db_session):
+        svc = FileService(application_instance, db_session)
+        db_session.flush()
+
+        svc.upsert(
+            [
+                {
+                    "type": "canvas_file",
+                    "course_id": "COURSE_ID",
+                    "lms_id": "LMS_ID",
+                    "name": "NAME",
+                    "size": 10,
+                }
+            ]
+        )
+
+        assert svc.get("LMS_ID", "canvas_file")
+
+    def test_upsert_with_no_files(self, svc, files_cache):
+        svc.upsert([])
+
+        files_cache.invalidate.assert_not_called()
+
+    @pytest.fixture
+    def files_cache(self):
+        return create_autospec(FilesCache, instance=True, spec_set=True)
+
+    @pytest.fixture
+    def svc(self, application_instance, db_session, files_cache):
+        return FileService(application_instance, db_session, files_cache)
+
 
 @pytest.mark.usefixtures("application_instance_service")
 class TestFactory:
-    def test_it(self, pyramid_request):
+    def test_it(self, pyramid_request, FileService, application_instance_service):
         file_service = factory(sentinel.context, pyramid_request)
 
-        assert isinstance(file_service, FileService)
+        FileService.assert_called_once_with(
+            application_instance=application_instance_service.get_current.return_value,
+            db=pyramid_request.db,
+            files_cache=FILES_CACHE,
+        )
+        assert file_service == FileService.return_value
+
+    @pytest.fixture
+    def FileService(self, patch):
+        return patch("lms.services.file.FileService")
 
 
 @pytest.fixture
@@ -93,8 +181,3 @@ def application_instance():
 @pytest.fixture(autouse=True)
 def noise(application_instance):
     factories.File(application_instance=application_instance)
-
-
-@pytest.fixture
-def svc(application_instance, db_session):
-    return FileService(application_instance, db_session)
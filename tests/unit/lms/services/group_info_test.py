@@ -1,6 +1,7 @@
 from unittest import mock
 
 import pytest
+from sqlalchemy import select
 
 from lms.models import GroupInfo
 from lms.services.group_info import GroupInfoService
@@ -13,7 +14,7 @@ class TestGroupInfoService:
     def test_upsert_group_info_adds_a_new_if_none_exists(self, db_session, svc, params):
         course = factories.Course(authority_provided_id=self.AUTHORITY)
 
-        svc.upsert_group_info(course, params=params)
+        svc.upsert_group_infos([course], params=params)
 
         group_info = self.get_inserted_group_info(db_session)
 
@@ -30,14 +31,17 @@ class TestGroupInfoService:
         # Sanity check that we can change the application instance
         assert pre_existing_group.application_instance != new_application_instance
 
-        svc.upsert_group_info(
-            factories.Course(
-                authority_provided_id=self.AUTHORITY,
-                application_instance=new_application_instance,
-            ),
+        svc.upsert_group_infos(
+            [
+                factories.Course(
+                    authority_provided_id=self.AUTHORITY,
+                    application_instance=new_application_instance,
+                )
+            ],
             params=dict(params, context_title="NEW_TITLE"),
         )
 
+        db_session.expire_all()
         group_info = self.get_inserted_group_info(db_session)
 
         # This is very strange, but you can "steal" a group info row from
@@ -50,8 +54,8 @@ class TestGroupInfoService:
     def test_upsert_group_info_ignores_non_metadata_params(
         self, db_session, svc, params
     ):
-        svc.upsert_group_info(
-            factories.Course(authority_provided_id=self.AUTHORITY),
+        svc.upsert_group_infos(
+            [factories.Course(authority_provided_id=self.AUTHORITY)],
             params=dict(
                 params,
                 id="IGNORE ME 1",
@@ -69,8 +73,8 @@ class TestGroupInfoService:
     def test_upsert_group_info_records_instructors_with_group_info(
         self, db_session, svc, pyramid_request
     ):
-        svc.upsert_group_info(
-            factories.Course(authority_provided_id=self.AUTHORITY), params={}
+        svc.upsert_group_infos(
+            [factories.Course(authority_provided_id=self.AUTHORITY)], params={}
         )
 
         group_info = self.get_inserted_group_info(db_session)
@@ -86,14 +90,128 @@ class TestGroupInfoService:
     def test_upsert_group_info_doesnt_record_learners_with_group_info(
         self, db_session, svc
     ):
-        svc.upsert_group_info(
-            factories.Course(authority_provided_id=self.AUTHORITY), params={}
+        svc.upsert_group_infos(
+            [factories.Course(authority_provided_id=self.AUTHORITY)], params={}
         )
 
         group_info = self.get_inserted_group_info(db_session)
 
         assert group_info.instructors == []
 
+    def test_upsert_group_infos_upserts_many_groupings_in_one_go(
+        self, db_session, svc, params
+    ):
+        course = factories.Course(authority_provided_id=self.AUTHORITY)
+        section = factories.CanvasSection(
+            application_instance=course.application_instance
+        )
+        # Duplicates are fine
+        groupings = [course, section, section]
+
+        svc.upsert_group_infos(groupings, params=params)
+
+        group_infos = db_session.query(GroupInfo).filter(
+            GroupInfo.authority_provided_id.in_(
+                [course.authority_provided_id, section.authority_provided_id]
+            )
+        )
+        assert {
+            (
+                group_info.authority_provided_id,
+                group_info.type,
+                group_info.context_title,
+            )
+            for group_info in group_infos
+        } == {
+            (course.authority_provided_id, "course_group", params["context_title"]),
+            (section.authority_provided_id, "section_group", params["context_title"]),
+        }
+
+    def test_upsert_group_infos_with_no_groupings(self, db_session, svc):
+        svc.upsert_group_infos([], params={})
+
+        assert not db_session.query(GroupInfo).count()
+
+    def test_upsert_group_infos_doesnt_change_columns_missing_from_params(
+        self, db_session, svc, params
+    ):
+        course = factories.Course(authority_provided_id=self.AUTHORITY)
+        svc.upsert_group_infos([course], params=params)
+
+        svc.upsert_group_infos([course], params={"context_title": "NEW_TITLE"})
+
+        group_info = self.get_inserted_group_info(db_session)
+        assert group_info.context_title == "NEW_TITLE"
+        assert group_info.context_label == params["context_label"]
+
+    @pytest.mark.parametrize(
+        "existing_instructors,expected_usernames",
+        [
+            (None, ["ME"]),
+            ([], ["ME"]),
+            (["OTHER"], ["OTHER", "ME"]),
+            (["A", "ME", "B"], ["A", "ME", "B"]),
+        ],
+    )
+    @pytest.mark.usefixtures("user_is_instructor")
+    def test_upsert_group_infos_merges_instructors(
+        self, db_session, svc, pyramid_request, existing_instructors, expected_usernames
+    ):
+        my_username = pyramid_request.lti_user.h_user.username
+        usernames = {"ME": my_username}
+        course = factories.Course(authority_provided_id=self.AUTHORITY)
+        info = {"type": "course_group", "other": "value"}
+        if existing_instructors is not None:
+            info["instructors"] = [
+                {"username": usernames.get(name, name), "display_name": "OLD_NAME"}
+                for name in existing_instructors
+            ]
+        factories.GroupInfo(
+            authority_provided_id=self.AUTHORITY,
+            application_instance=course.application_instance,
+            _info=info,
+        )
+        db_session.flush()
+
+        svc.upsert_group_infos([course], params={})
+
+        db_session.expire_all()
+        group_info = self.get_inserted_group_info(db_session)
+        assert [instructor["username"] for instructor in group_info.instructors] == [
+            usernames.get(name, name) for name in expected_usernames
+        ]
+        for instructor in group_info.instructors:
+            if instructor["username"] == my_username:
+                assert instructor["email"] == "test_email"
+            else:
+                assert instructor["display_name"] == "OLD_NAME"
+        # Other info is left alone
+        info = db_session.scalar(
+            select(GroupInfo.__table__.c.info).where(
+                GroupInfo.authority_provided_id == self.AUTHORITY
+            )
+        )
+        assert info["other"] == "value"
+
+    @pytest.mark.usefixtures("user_is_learner")
+    def test_upsert_group_infos_keeps_instructors_when_learners_launch(
+        self, db_session, svc
+    ):
+        course = factories.Course(authority_provided_id=self.AUTHORITY)
+        factories.GroupInfo(
+            authority_provided_id=self.AUTHORITY,
+            application_instance=course.application_instance,
+            _info={"instructors": [{"username": "INSTRUCTOR"}]},
+        )
+        db_session.flush()
+
+        svc.upsert_group_infos([course], params={})
+
+        db_session.expire_all()
+        group_info = self.get_inserted_group_info(db_session)
+        assert group_info.instructors == [{"username": "INSTRUCTOR"}]
+        assert group_info.type == "course_group"
+
     def get_inserted_group_info(self, db_session):
         return (
             db_session.query(GroupInfo)
@@ -110,9 +110,7 @@ class TestUpsertGroupings:
             }
         )
 
-    def test_it_updates_existing(
-        self, db_session, svc, parent_course, existing_grouping
-    ):
+    def test_it_updates_existing(self, svc, parent_course, existing_grouping):
         attrs = {
             "lms_id": existing_grouping.lms_id,
             # We'll update existing_grouping's lms_name and extra.
@@ -126,10 +124,9 @@ class TestUpsertGroupings:
             parent=parent_course,
         )
 
-        # Load the changes we made in SQLAlchemy
-        db_session.refresh(existing_grouping)
-
+        # The grouping we already had is updated in place
         assert groupings == [existing_grouping]
+        assert groupings[0] is existing_grouping
         assert existing_grouping == Any.object.with_attrs(attrs)
 
     def test_it_with_new_course(self, svc):
@@ -158,9 +155,8 @@ class TestUpsertGroupings:
             [dict(attrs, settings={"IGNORED": True})], type_=Grouping.Type.COURSE
         )
 
-        # Load the changes we made in SQLAlchemy
-        db_session.refresh(parent_course)
         assert courses == [parent_course]
+        assert courses[0] is parent_course
         assert parent_course == Any.object.with_attrs(attrs)
 
     @pytest.fixture
@@ -0,0 +1,52 @@
+import pytest
+from h_api.bulk_api import CommandBuilder
+
+from lms.services.h_sync_cache import H_SYNC_CACHE, HSyncCache
+
+
+class TestHSyncCache:
+    def test_fingerprint_is_stable(self):
+        assert HSyncCache.fingerprint(commands()) == HSyncCache.fingerprint(commands())
+
+    def test_fingerprint_changes_with_the_commands(self):
+        assert HSyncCache.fingerprint(commands()) != HSyncCache.fingerprint(
+            commands(name="Other name")
+        )
+
+    def test_is_fresh_with_unknown_fingerprint(self, cache):
+        assert not cache.is_fresh("FINGERPRINT")
+
+    def test_is_fresh_after_record(self, cache):
+        cache.record("FINGERPRINT")
+
+        assert cache.is_fresh("FINGERPRINT")
+        assert cache.stats() == {"fingerprints": 1, "skipped": 1, "synced": 1}
+
+    def test_clear(self, cache):
+        cache.record("FINGERPRINT")
+        cache.is_fresh("FINGERPRINT")
+
+        cache.clear()
+
+        assert cache.stats() == {"fingerprints": 0, "skipped": 0, "synced": 0}
+
+    def test_there_is_a_shared_cache(self):
+        assert isinstance(H_SYNC_CACHE, HSyncCache)
+
+    @pytest.fixture
+    def cache(self):
+        return HSyncCache()
+
+
+def commands(name="Name"):
+    return [
+        CommandBuilder.group.upsert(
+            {
+                "authority": "lms.hypothes.is",
+                "name": name,
+                "authority_provided_id": "ID",
+            },
+            "group_0",
+        ),
+        CommandBuilder.group_membership.create("user_0", "group_0"),
+    ]
@@ -0,0 +1,117 @@
+import importlib
+from datetime import timedelta
+
+import pytest
+from h_api.bulk_api import CommandBuilder
+
+from lms.services import h_sync_queue
+from lms.services.h_sync_queue import H_SYNC_QUEUE, HSyncQueue
+
+
+class TestHSyncQueue:
+    def test_add_doesnt_send_straight_away(self, queue, sync_to_h):
+        queue.add(USER, [GROUP])
+
+        sync_to_h.delay.assert_not_called()
+        assert queue.stats() == {"added": 1, "batches": 0, "pending": 1}
+
+    def test_flush(self, queue, sync_to_h):
+        queue.add(USER, [GROUP])
+
+        queue.flush()
+
+        sync_to_h.delay.assert_called_once_with(
+            [
+                CommandBuilder.user.upsert(dict(USER), "user_0").raw,
+                CommandBuilder.group.upsert(dict(GROUP), "group_0").raw,
+                CommandBuilder.group_membership.create("user_0", "group_0").raw,
+            ]
+        )
+        assert queue.stats() == {"added": 1, "batches": 1, "pending": 0}
+
+    def test_flush_coalesces_syncs(self, queue, sync_to_h):
+        queue.add(USER, [GROUP])
+        queue.add(dict(USER, display_name="New name"), [GROUP])
+        queue.add(OTHER_USER, [GROUP, OTHER_GROUP])
+
+        queue.flush()
+
+        sync_to_h.delay.assert_called_once_with(
+            [
+                CommandBuilder.user.upsert(
+                    dict(USER, display_name="New name"), "user_0"
+                ).raw,
+                CommandBuilder.user.upsert(dict(OTHER_USER), "user_1").raw,
+                CommandBuilder.group.upsert(dict(GROUP), "group_0").raw,
+                CommandBuilder.group.upsert(dict(OTHER_GROUP), "group_1").raw,
+                CommandBuilder.group_membership.create("user_1", "group_0").raw,
+                CommandBuilder.group_membership.create("user_1", "group_1").raw,
+                CommandBuilder.group_membership.create("user_0", "group_0").raw,
+            ]
+        )
+
+    def test_flush_with_nothing_to_send(self, queue, sync_to_h):
+        queue.flush()
+
+        sync_to_h.delay.assert_not_called()
+
+    def test_flush_if_queueing_fails(self, queue, sync_to_h):
+        sync_to_h.delay.side_effect = OSError
+        queue.add(USER, [GROUP])
+
+        queue.flush()
+
+        assert not queue.stats()["pending"]
+
+    def test_it_sends_after_the_window(self, sync_to_h):
+        queue = HSyncQueue(window=timedelta(seconds=0.01))
+
+        queue.add(USER, [GROUP])
+        queue._timer.join(5)  # pylint:disable=protected-access
+
+        sync_to_h.delay.assert_called_once()
+
+    def test_it_sends_when_full(self, sync_to_h):
+        queue = HSyncQueue(max_users=2)
+
+        queue.add(USER, [GROUP])
+        queue.add(OTHER_USER, [GROUP])
+
+        sync_to_h.delay.assert_called_once()
+        assert not queue.stats()["pending"]
+
+    def test_there_is_a_shared_queue(self):
+        assert isinstance(H_SYNC_QUEUE, HSyncQueue)
+
+    def test_the_shared_queue_is_flushed_on_exit(self, patch):
+        register = patch("atexit.register")
+
+        try:
+            module = importlib.reload(h_sync_queue)
+
+            register.assert_called_once_with(module.H_SYNC_QUEUE.flush)
+        finally:
+            # Put back the originals other modules have already imported
+            h_sync_queue.HSyncQueue = HSyncQueue
+            h_sync_queue.H_SYNC_QUEUE = H_SYNC_QUEUE
+
+    @pytest.fixture
+    def queue(self):
+        queue = HSyncQueue(window=timedelta(hours=1))
+        yield queue
+        queue.flush()
+
+    @pytest.fixture(autouse=True)
+    def sync_to_h(self, patch):
+        return patch("lms.tasks.h_api.sync_to_h")
+
+
+USER = {
+    "authority": "lms.hypothes.is",
+    "username": "user",
+    "display_name": "User",
+    "identities": [{"provider": "PROVIDER", "provider_unique_id": "USER"}],
+}
+OTHER_USER = dict(USER, username="other_user")
+GROUP = {"authority": "lms.hypothes.is", "name": "Group", "authority_provided_id": "1"}
+OTHER_GROUP = dict(GROUP, authority_provided_id="2")
@@ -0,0 +1,130 @@
+import socket
+from unittest.mock import Mock, patch
+
+import httpretty
+import pytest
+
+from lms.services.http_pool import SESSION_POOL, SessionPool
+
+
+class TestSessionPool:
+    def test_get_returns_the_same_session_for_the_same_host(self, pool):
+        session = pool.get("https://example.com/path")
+
+        assert pool.get("https://EXAMPLE.com/other?query=1") is session
+        assert pool.stats() == {
+            "sessions": 1,
+            "hits": 1,
+            "misses": 1,
+            "evictions": 0,
+            "connections": 0,
+            "requests": 0,
+        }
+
+    @pytest.mark.parametrize(
+        "other_url",
+        ["https://other.example.com", "http://example.com", "https://example.com:8443"],
+    )
+    def test_get_returns_different_sessions_for_different_hosts(self, pool, other_url):
+        assert pool.get("https://example.com") is not pool.get(other_url)
+
+    def test_get_configures_the_session(self):
+        pool = SessionPool(pool_connections=3, pool_maxsize=7)
+
+        session = pool.get("https://example.com")
+
+        adapter = session.get_adapter("https://example.com")
+        assert session.get_adapter("http://example.com") is adapter
+        assert adapter.poolmanager.connection_pool_kw["maxsize"] == 7
+        for port in range(4):
+            adapter.poolmanager.connection_from_host("example.com", port)
+        assert len(adapter.poolmanager.pools) == 3
+        assert (
+            socket.SOL_SOCKET,
+            socket.SO_KEEPALIVE,
+            1,
+        ) in adapter.poolmanager.connection_pool_kw["socket_options"]
+
+    def test_get_without_keepalive(self):
+        pool = SessionPool(keepalive=False)
+
+        adapter = pool.get("https://example.com").get_adapter("https://example.com")
+
+        assert "socket_options" not in adapter.poolmanager.connection_pool_kw
+
+    def test_get_evicts_the_least_recently_used_session(self):
+        pool = SessionPool(max_hosts=2)
+        first = pool.get("https://first.example.com")
+        second = pool.get("https://second.example.com")
+        pool.get("https://first.example.com")
+
+        with patch.object(second, "close") as close:
+            pool.get("https://third.example.com")
+
+        close.assert_called_once_with()
+        assert pool.get("https://first.example.com") is first
+        assert pool.get("https://second.example.com") is not second
+        assert pool.stats()["evictions"] == 2
+
+    def test_get_starts_again_after_a_fork(self, pool):
+        session = pool.get("https://example.com")
+
+        with patch("lms.services.http_pool.os.getpid", return_value=-1):
+            assert pool.get("https://example.com") is not session
+            assert pool.stats()["misses"] == 1
+
+    def test_connections_are_reused(self, pool, server_url):
+        for _ in range(3):
+            pool.get(server_url).get(server_url, timeout=5).raise_for_status()
+
+        stats = pool.stats()
+        assert stats["connections"] == 1
+        assert stats["requests"] == 3
+
+    def test_stats_skips_connection_pools_closed_while_counting(self, pool):
+        adapter = pool.get("https://example.com").get_adapter("https://example.com")
+
+        with patch.object(
+            adapter.poolmanager,
+            "pools",
+            Mock(keys=Mock(return_value=["key"]), get=Mock(return_value=None)),
+        ):
+            assert not pool.stats()["connections"]
+
+    def test_cookies_are_never_stored(self, pool, server_url):
+        session = pool.get(server_url)
+
+        session.get(server_url, timeout=5)
+        session.get(server_url, timeout=5)
+
+        assert not session.cookies
+        assert "Cookie" not in httpretty.last_request().headers
+
+    def test_clear(self, pool):
+        session = pool.get("https://example.com")
+
+        with patch.object(session, "close") as close:
+            pool.clear()
+
+        close.assert_called_once_with()
+        assert not pool.stats()["sessions"]
+        assert pool.get("https://example.com") is not session
+
+    def test_there_is_a_shared_pool(self):
+        assert isinstance(SESSION_POOL, SessionPool)
+
+    @pytest.fixture
+    def pool(self):
+        pool = SessionPool()
+        yield pool
+        pool.clear()
+
+    @pytest.fixture
+    def server_url(self):
+        httpretty.register_uri(
+            "GET",
+            "http://example.com/",
+            body="",
+            adding_headers={"Set-Cookie": "session=secret"},
+        )
+        return "http://example.com/"
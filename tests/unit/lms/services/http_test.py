@@ -6,35 +6,59 @@ from requests import RequestException
 
 from lms.services.exceptions import ExternalRequestError
 from lms.services.http import HTTPService, factory
+from lms.services.http_pool import SESSION_POOL, SessionPool
 
 
 class TestHTTPService:
-    def test_request(self, svc, passed_args):
+    def test_request(self, svc, session_pool, session, passed_args):
         response = svc.request(sentinel.method, sentinel.url, **passed_args)
 
-        svc.session.request.assert_called_once_with(
+        session_pool.get.assert_called_once_with(sentinel.url)
+        session.request.assert_called_once_with(
             sentinel.method, sentinel.url, **passed_args
         )
-        assert response == svc.session.request.return_value
+        assert response == session.request.return_value
+
+    @pytest.mark.parametrize(
+        "headers,expected",
+        [
+            (None, {"Default": "default", "Other": "other"}),
+            ({"New": "new"}, {"Default": "default", "Other": "other", "New": "new"}),
+            ({"Other": "override"}, {"Default": "default", "Other": "override"}),
+        ],
+    )
+    def test_request_with_default_headers(
+        self, session_pool, session, headers, expected
+    ):
+        svc = HTTPService(
+            headers={"Default": "default", "Other": "other"},
+            session_pool=session_pool,
+        )
+
+        svc.request("GET", "https://example.com", headers=headers)
+
+        session.request.assert_called_once_with(
+            "GET", "https://example.com", timeout=(10, 10), headers=expected
+        )
 
     @pytest.mark.parametrize("method", ["get", "put", "post", "patch", "delete"])
-    def test_convenience_methods(self, svc, method, passed_args):
+    def test_convenience_methods(self, svc, session, method, passed_args):
         response = getattr(svc, method.lower())(sentinel.url, **passed_args)
 
-        svc.session.request.assert_called_once_with(
+        session.request.assert_called_once_with(
             method.upper(), sentinel.url, **passed_args
         )
-        assert response == svc.session.request.return_value
+        assert response == session.request.return_value
 
-    def test_request_defaults(self, svc):
+    def test_request_defaults(self, svc, session):
         svc.request(sentinel.method, sentinel.url)
 
-        svc.session.request.assert_called_once_with(
+        session.request.assert_called_once_with(
             sentinel.method, sentinel.url, timeout=(10, 10)
         )
 
-    def test_it_raises_if_sending_the_request_fails(self, svc):
-        svc.session.request.side_effect = RequestException(
+    def test_it_raises_if_sending_the_request_fails(self, svc, session):
+        session.request.side_effect = RequestException(
             request=sentinel.err_request, response=sentinel.err_response
         )
 
@@ -44,8 +68,8 @@ class TestHTTPService:
         assert exc_info.value.request == sentinel.err_request
         assert exc_info.value.response is None
 
-    def test_it_raises_if_the_response_is_an_error(self, svc):
-        response = svc.session.request.return_value
+    def test_it_raises_if_the_response_is_an_error(self, svc, session):
+        response = session.request.return_value
         response.raise_for_status.side_effect = RequestException(
             request=sentinel.err_request, response=sentinel.err_response
         )
@@ -67,11 +91,23 @@ class TestHTTPService:
             "timeout": sentinel.timeout,
         }
 
+    def test_it_uses_the_shared_session_pool_by_default(self):
+        # pylint:disable=protected-access
+        assert HTTPService()._session_pool == SESSION_POOL
+
+    @pytest.fixture
+    def session(self):
+        return create_autospec(requests.Session, instance=True, spec_set=True)
+
+    @pytest.fixture
+    def session_pool(self, session):
+        session_pool = create_autospec(SessionPool, instance=True, spec_set=True)
+        session_pool.get.return_value = session
+        return session_pool
+
     @pytest.fixture
-    def svc(self):
-        svc = HTTPService()
-        svc.session = create_autospec(requests.Session, instance=True, spec_set=True)
-        return svc
+    def svc(self, session_pool):
+        return HTTPService(session_pool=session_pool)
 
 
 class TestFactory:
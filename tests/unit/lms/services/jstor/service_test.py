@@ -12,10 +12,10 @@ API_URL = "http://jstore_api.example.com"
 
 
 class TestJSTORService:
-    def test_it_sets_tracking_headers(self, get_service, http_service):
+    def test_it_sets_tracking_headers(self, get_service, HTTPService):
         get_service(headers={"X-Header": "value"})
 
-        assert http_service.session.headers == {"X-Header": "value"}
+        HTTPService.assert_called_once_with(headers={"X-Header": "value"})
 
     @pytest.mark.parametrize("enabled", (True, False, None))
     @pytest.mark.parametrize("site_code", ("code", None, ""))
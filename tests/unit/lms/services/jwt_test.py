@@ -3,24 +3,20 @@ import datetime
 import json
 from unittest.mock import create_autospec, sentinel
 
-import httpretty
 import jwt
 import pytest
+from cryptography.hazmat.primitives.asymmetric import rsa
 from freezegun import freeze_time
-from jwt.exceptions import InvalidTokenError
+from jwt import PyJWK
+from jwt.algorithms import RSAAlgorithm
+from jwt.exceptions import PyJWKClientError
 from pyramid.config import Configurator
 from pytest import param
 
 from lms.services.exceptions import ExpiredJWTError, InvalidJWTError
-from lms.services.jwt import (
-    JWTService,
-    _get_lti_jwt,
-    _RequestsPyJWKClient,
-    factory,
-    includeme,
-)
+from lms.services.jwt import JWTService, _get_lti_jwt, factory, includeme
+from lms.services.platform_jwks import PLATFORM_JWKS, PlatformJWKSCache
 from lms.validation import ValidationError
-from tests import factories
 
 
 class TestJWTService:
@@ -75,119 +71,169 @@ class TestJWTService:
 
         encoded_jwt = svc.encode_with_private_key(payload)
 
-        rsa_key_service.get_random_key.assert_called_once_with()
+        rsa_key_service.get_random_signing_key.assert_called_once_with()
+        signing_key = rsa_key_service.get_random_signing_key.return_value
         jwt.encode.assert_called_once_with(
             payload,
-            rsa_key_service.private_key.return_value,
+            signing_key.private_key,
             algorithm="RS256",
-            headers={"kid": rsa_key_service.get_random_key.return_value.kid},
+            headers={"kid": signing_key.kid},
         )
         assert encoded_jwt == jwt.encode.return_value
 
-    def test_decode_lti_token(
-        self, svc, jwt, _RequestsPyJWKClient, lti_registration_service
-    ):
-        registration = factories.LTIRegistration(key_set_url="http://jwk.com")
-        lti_registration_service.get.return_value = registration
-        jwt.decode.return_value = {"aud": "AUD", "iss": "ISS"}
+    def test_decode_lti_token(self, svc, platform_jwks, lti_registration_service):
+        id_token = self.encode_lti_token(CLAIMS)
 
-        payload = svc.decode_lti_token(sentinel.id_token)
+        payload = svc.decode_lti_token(id_token)
 
-        jwt.get_unverified_header.assert_called_once_with(sentinel.id_token)
         lti_registration_service.get.assert_called_once_with("ISS", "AUD")
-        _RequestsPyJWKClient.assert_called_once_with(
-            lti_registration_service.get.return_value.key_set_url
-        )
-        jwt.decode.assert_called_with(
-            sentinel.id_token,
-            key=_RequestsPyJWKClient.return_value.get_signing_key_from_jwt.return_value.key,
-            audience="AUD",
-            algorithms=["RS256"],
+        platform_jwks.get_signing_key.assert_called_once_with(
+            lti_registration_service.get.return_value.key_set_url, "KID"
         )
-        assert payload == {"aud": "AUD", "iss": "ISS"}
+        assert payload == CLAIMS
 
     def test_decode_lti_token_with_empty_token(self, svc):
         assert not svc.decode_lti_token("")
 
-    def test_decode_lti_token_with_no_kid(self, svc):
-        jwt_str = self.encode_jwt({"key": "value"}, headers={"key": "value"})
+    def test_verify_lti_token(self, svc):
+        id_token = self.encode_lti_token(CLAIMS)
+
+        token = svc.verify_lti_token(id_token)
+
+        assert token.header == {"alg": "RS256", "typ": "JWT", "kid": "KID"}
+        assert token.claims == CLAIMS
+
+    def test_verify_lti_token_only_parses_the_token_once(self, svc, patch):
+        # If we fall back to PyJWT's decoding we'd parse the token again
+        jwt = patch("lms.services.jwt.jwt")
+
+        svc.verify_lti_token(self.encode_lti_token(CLAIMS))
 
+        jwt.get_unverified_header.assert_not_called()
+        jwt.decode.assert_not_called()
+
+    @pytest.mark.parametrize(
+        "id_token",
+        [
+            "not a jwt",
+            "a.b",
+            "!!!.!!!.!!!",
+            "W10.W10.c2ln",  # JSON lists rather than objects
+        ],
+    )
+    def test_verify_lti_token_with_malformed_token(self, svc, id_token):
         with pytest.raises(ValidationError) as exc_info:
-            svc.decode_lti_token(jwt_str)
+            svc.verify_lti_token(id_token)
 
         assert "jwt" in exc_info.value.messages
 
-    def test_decode_lti_token_with_no_registration(
-        self, svc, jwt, lti_registration_service
-    ):
-        jwt.decode.return_value = {"aud": "AUD", "iss": "ISS"}
+    def test_verify_lti_token_with_no_kid(self, svc):
+        id_token = self.encode_lti_token(CLAIMS, headers={})
+
+        with pytest.raises(ValidationError) as exc_info:
+            svc.verify_lti_token(id_token)
+
+        assert "jwt" in exc_info.value.messages
+
+    def test_verify_lti_token_with_no_registration(self, svc, lti_registration_service):
         lti_registration_service.get.return_value = None
 
         with pytest.raises(ValidationError) as exc_info:
-            svc.decode_lti_token(sentinel.id_token)
+            svc.verify_lti_token(self.encode_lti_token(CLAIMS))
 
         assert "jwt" in exc_info.value.messages
 
-    def test_decode_lti_token_with_invalid_jwt(self, svc, jwt):
-        jwt.decode.side_effect = [{"aud": "AUD", "iss": "ISS"}, InvalidTokenError()]
+    def test_verify_lti_token_with_unknown_signing_key(self, svc, platform_jwks):
+        platform_jwks.get_signing_key.side_effect = PyJWKClientError()
 
         with pytest.raises(ValidationError) as exc_info:
-            svc.decode_lti_token(sentinel.id_token)
+            svc.verify_lti_token(self.encode_lti_token(CLAIMS))
+
+        assert "jwt" in exc_info.value.messages
+
+    @pytest.mark.parametrize(
+        "id_token",
+        [
+            param(
+                lambda encode: encode(CLAIMS, private_key=OTHER_PRIVATE_KEY),
+                id="wrong_key",
+            ),
+            param(lambda encode: encode(CLAIMS)[:-4] + "AAAA", id="tampered_signature"),
+            param(
+                lambda encode: jwt.encode(
+                    CLAIMS, "secret", algorithm="HS256", headers={"kid": "KID"}
+                ),
+                id="wrong_algorithm",
+            ),
+            param(lambda encode: encode(dict(CLAIMS, exp=NOW - 60)), id="expired"),
+            param(
+                lambda encode: encode(dict(CLAIMS, nbf=NOW + 60)), id="not_yet_valid"
+            ),
+            param(lambda encode: encode(dict(CLAIMS, exp="soon")), id="bad_exp"),
+            param(lambda encode: encode(dict(CLAIMS, nbf="later")), id="bad_nbf"),
+            param(lambda encode: encode(dict(CLAIMS, iat="now")), id="bad_iat"),
+        ],
+    )
+    def test_verify_lti_token_with_invalid_token(self, svc, id_token):
+        with pytest.raises(ValidationError) as exc_info:
+            svc.verify_lti_token(id_token(self.encode_lti_token))
 
         assert "jwt" in exc_info.value.messages
 
+    def test_verify_lti_token_with_valid_time_claims(self, svc):
+        claims = dict(CLAIMS, exp=NOW + 60, nbf=NOW - 60, iat=NOW - 60)
+
+        assert svc.verify_lti_token(self.encode_lti_token(claims)).claims == claims
+
+    @staticmethod
+    def encode_lti_token(claims, private_key=None, headers=None):
+        return jwt.encode(
+            claims,
+            private_key or PRIVATE_KEY,
+            algorithm="RS256",
+            headers={"kid": "KID"} if headers is None else headers,
+        )
+
     @staticmethod
     def encode_jwt(
         payload,
         secret="test_secret",
         algorithm="HS256",
         headers=None,
-        lifetime=None,
+        lifetime=datetime.timedelta(hours=1),
     ):
         """Return payload encoded to a jwt with secret and algorithm."""
         payload = copy.deepcopy(payload)
-
-        if lifetime:
-            payload["exp"] = datetime.datetime.utcnow() + lifetime
+        payload["exp"] = datetime.datetime.utcnow() + lifetime
 
         return jwt.encode(payload, secret, algorithm=algorithm, headers=headers)
 
-    @pytest.fixture(autouse=True)
-    def jwk_endpoint(self):
-        keys = {"keys": [{"kid": "KID", "kty": "RSA", "n": "1000", "e": "500"}]}
-
-        httpretty.register_uri("GET", "http://jwk.com", body=json.dumps(keys))
-
     @pytest.fixture()
     def jwt(self, patch):
         return patch("lms.services.jwt.jwt")
 
-    @pytest.fixture()
-    def _RequestsPyJWKClient(self, patch):
-        return patch("lms.services.jwt._RequestsPyJWKClient")
+    @pytest.fixture(autouse=True)
+    def now(self):
+        with freeze_time(datetime.datetime.utcfromtimestamp(NOW)):
+            yield
 
     @pytest.fixture
-    def svc(self, lti_registration_service, rsa_key_service):
-        svc = JWTService(lti_registration_service, rsa_key_service)
-        # Clear the lru_cache to make tests independent
-        svc._get_jwk_client.cache_clear()  # pylint: disable=protected-access
-        return svc
-
-
-class Test_RequestsPyJWKClient:
-    def test_fetch_data(self, requests):
-        keys = _RequestsPyJWKClient(sentinel.url).fetch_data()
-
-        requests.get.assert_called_once_with(
-            sentinel.url, headers={"User-Agent": "requests"}
-        )
-        assert (
-            keys == requests.get.return_value.__enter__.return_value.json.return_value
+    def platform_jwks(self):
+        platform_jwks = create_autospec(PlatformJWKSCache, instance=True, spec_set=True)
+        platform_jwks.get_signing_key.return_value = PyJWK.from_dict(
+            json.loads(RSAAlgorithm.to_jwk(PRIVATE_KEY.public_key()))
         )
+        return platform_jwks
 
     @pytest.fixture
-    def requests(self, patch):
-        return patch("lms.services.jwt.requests")
+    def svc(self, lti_registration_service, rsa_key_service, platform_jwks):
+        return JWTService(lti_registration_service, rsa_key_service, platform_jwks)
+
+
+PRIVATE_KEY = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+OTHER_PRIVATE_KEY = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+NOW = 1648000000
+CLAIMS = {"iss": "ISS", "aud": "AUD", "sub": "SUB"}
 
 
 class TestFactory:
@@ -196,7 +242,11 @@ class TestFactory:
     ):
         jwt_service = factory(sentinel.context, pyramid_request)
 
-        JWTService.assert_called_once_with(lti_registration_service, rsa_key_service)
+        JWTService.assert_called_once_with(
+            registration_service=lti_registration_service,
+            rsa_key_service=rsa_key_service,
+            platform_jwks=PLATFORM_JWKS,
+        )
         assert jwt_service == JWTService.return_value
 
     @pytest.fixture
@@ -0,0 +1,190 @@
+from datetime import datetime, timedelta
+from unittest.mock import sentinel
+
+import pytest
+import sqlalchemy as sa
+from h_matchers import Any
+
+from lms.models import (
+    Assignment,
+    AssignmentGrouping,
+    AssignmentMembership,
+    GroupingMembership,
+    LTIParams,
+)
+from lms.services.launch_persistence import LaunchPersistenceService, factory
+from tests import factories
+
+
+class TestLaunchPersistenceService:
+    def test_record_assignment_launch_with_existing_assignment(
+        self, svc, db_session, assignment, launch_kwargs
+    ):
+        result = svc.record_assignment_launch(**launch_kwargs)
+
+        assert result == assignment
+        db_session.refresh(assignment)
+        assert assignment == Any.object.with_attrs(self.assignment_attrs)
+        assert assignment.created < datetime.now() - timedelta(days=1)
+        assert assignment.updated >= datetime.now() - timedelta(days=1)
+
+    def test_record_assignment_launch_with_new_assignment(
+        self, svc, db_session, assignment, launch_kwargs
+    ):
+        launch_kwargs["resource_link_id"] = "NEW"
+
+        result = svc.record_assignment_launch(**launch_kwargs)
+
+        assert result != assignment
+        db_session.refresh(result)
+        assert result == Any.instance_of(Assignment).with_attrs(
+            dict(
+                self.assignment_attrs,
+                tool_consumer_instance_guid=assignment.tool_consumer_instance_guid,
+                resource_link_id="NEW",
+            )
+        )
+        assert result.created >= datetime.now() - timedelta(days=1)
+
+    @pytest.mark.parametrize("extra", (None, {}))
+    @pytest.mark.usefixtures("assignment")
+    def test_record_assignment_launch_keeps_extra_if_none_is_given(
+        self, svc, launch_kwargs, extra
+    ):
+        launch_kwargs["extra"] = extra
+
+        result = svc.record_assignment_launch(**launch_kwargs)
+
+        assert result.extra == {"existing": "value"}
+
+    def test_record_assignment_launch_records_memberships(
+        self, svc, db_session, assignment, launch_kwargs
+    ):
+        user, course, lti_roles = (
+            launch_kwargs["user"],
+            launch_kwargs["course"],
+            launch_kwargs["lti_roles"],
+        )
+        # Existing rows which should be updated, not duplicated
+        factories.AssignmentMembership(
+            assignment=assignment, user=user, lti_role=lti_roles[0]
+        )
+        factories.AssignmentGrouping(assignment=assignment, grouping=course)
+        db_session.flush()
+
+        svc.record_assignment_launch(**launch_kwargs)
+
+        assert (
+            db_session.query(AssignmentMembership).all()
+            == Any.list.containing(
+                [
+                    Any.instance_of(AssignmentMembership).with_attrs(
+                        {"user": user, "assignment": assignment, "lti_role": lti_role}
+                    )
+                    for lti_role in lti_roles
+                ]
+            ).only()
+        )
+        assert db_session.query(AssignmentGrouping).all() == [
+            Any.instance_of(AssignmentGrouping).with_attrs(
+                {"assignment": assignment, "grouping": course}
+            )
+        ]
+        assert db_session.query(GroupingMembership).all() == [
+            Any.instance_of(GroupingMembership).with_attrs(
+                {"user": user, "grouping": course}
+            )
+        ]
+
+    def test_record_assignment_launch_without_roles(
+        self, svc, db_session, launch_kwargs
+    ):
+        launch_kwargs["lti_roles"] = []
+
+        svc.record_assignment_launch(**launch_kwargs)
+
+        assert not db_session.query(AssignmentMembership).count()
+        assert db_session.query(GroupingMembership).count() == 1
+
+    def test_record_assignment_launch_flushes_new_objects(self, svc, launch_kwargs):
+        launch_kwargs["lti_roles"].append(factories.LTIRole())
+
+        svc.record_assignment_launch(**launch_kwargs)
+
+        assert launch_kwargs["lti_roles"][-1].id
+
+    def test_record_assignment_launch_uses_one_statement(
+        self, svc, db_session, launch_kwargs
+    ):
+        # This is run on every launch, so we want to keep the round trips down
+        statements = []
+
+        @sa.event.listens_for(db_session.bind, "before_cursor_execute")
+        def count(_conn, _cursor, statement, *_args):
+            statements.append(statement)
+
+        try:
+            svc.record_assignment_launch(**launch_kwargs)
+        finally:
+            sa.event.remove(db_session.bind, "before_cursor_execute", count)
+
+        assert len(statements) == 1
+
+    assignment_attrs = {
+        "document_url": "new_document_url",
+        "extra": {"new": "values"},
+        "is_gradable": True,
+        "title": "title",
+        "description": "description",
+    }
+
+    @pytest.fixture
+    def launch_kwargs(self, assignment, db_session):
+        kwargs = {
+            "course": factories.Course(),
+            "user": factories.User(),
+            "lti_roles": factories.LTIRole.create_batch(3),
+            "tool_consumer_instance_guid": assignment.tool_consumer_instance_guid,
+            "resource_link_id": assignment.resource_link_id,
+            "document_url": "new_document_url",
+            "lti_params": LTIParams(
+                {
+                    "resource_link_title": "title",
+                    "resource_link_description": "description",
+                }
+            ),
+            "is_gradable": True,
+            "extra": {"new": "values"},
+        }
+        db_session.flush()
+        return kwargs
+
+    @pytest.fixture
+    def svc(self, db_session):
+        return LaunchPersistenceService(db_session)
+
+    @pytest.fixture(autouse=True)
+    def assignment(self):
+        return factories.Assignment(
+            created=datetime(2000, 1, 1),
+            updated=datetime(2000, 1, 1),
+            extra={"existing": "value"},
+        )
+
+    @pytest.fixture(autouse=True)
+    def with_assignment_noise(self, assignment):
+        factories.Assignment(
+            tool_consumer_instance_guid=assignment.tool_consumer_instance_guid,
+            resource_link_id="noise_resource_link_id",
+        )
+        factories.Assignment(
+            tool_consumer_instance_guid="noise_tool_consumer_instance_guid",
+            resource_link_id=assignment.resource_link_id,
+        )
+
+
+class TestFactory:
+    def test_it(self, pyramid_request):
+        svc = factory(sentinel.context, pyramid_request)
+
+        assert isinstance(svc, LaunchPersistenceService)
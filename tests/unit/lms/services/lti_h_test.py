@@ -1,10 +1,14 @@
+from datetime import datetime, timedelta
 from unittest.mock import create_autospec, sentinel
 
 import pytest
 from h_api.bulk_api import CommandBuilder
+from sqlalchemy import func
 
-from lms.models import Grouping
+from lms.models import GroupingMembership
 from lms.services import ApplicationInstanceNotFound, HAPIError
+from lms.services.h_sync_cache import HSyncCache
+from lms.services.h_sync_queue import HSyncQueue
 from lms.services.lti_h import LTIHService
 from tests import factories
 
@@ -70,6 +74,54 @@ class TestSync:
             CommandBuilder.group_membership.create("user_0", "group_1").raw,
         ]
 
+    def test_sync_skips_h_if_nothing_changed(
+        self, h_api, lti_h_svc, grouping, group_info_service, sync_cache
+    ):
+        lti_h_svc.sync([grouping], sentinel.params)
+
+        lti_h_svc.sync([grouping], sentinel.params)
+
+        h_api.execute_bulk.assert_called_once()
+        # We still keep our own records up to date
+        assert group_info_service.upsert_group_infos.call_count == 2
+        assert sync_cache.stats() == {"fingerprints": 1, "skipped": 1, "synced": 1}
+
+    def test_sync_calls_h_if_the_user_changed(
+        self, h_api, pyramid_request, sync_cache, grouping
+    ):
+        LTIHService(None, pyramid_request, sync_cache).sync([grouping], {})
+
+        pyramid_request.lti_user = pyramid_request.lti_user._replace(
+            display_name="New name"
+        )
+        LTIHService(None, pyramid_request, sync_cache).sync([grouping], {})
+
+        assert h_api.execute_bulk.call_count == 2
+
+    def test_sync_calls_h_if_a_grouping_changed(self, h_api, lti_h_svc, grouping):
+        lti_h_svc.sync([grouping], sentinel.params)
+
+        grouping.lms_name = "New name"
+        lti_h_svc.sync([grouping], sentinel.params)
+
+        assert h_api.execute_bulk.call_count == 2
+
+    def test_sync_calls_h_for_different_groupings(self, h_api, lti_h_svc, grouping):
+        lti_h_svc.sync([grouping], sentinel.params)
+
+        lti_h_svc.sync([grouping, factories.Course()], sentinel.params)
+
+        assert h_api.execute_bulk.call_count == 2
+
+    def test_sync_doesnt_remember_failed_syncs(self, h_api, lti_h_svc, grouping):
+        h_api.execute_bulk.side_effect = [HAPIError, None]
+
+        with pytest.raises(HAPIError):
+            lti_h_svc.sync([grouping], sentinel.params)
+        lti_h_svc.sync([grouping], sentinel.params)
+
+        assert h_api.execute_bulk.call_count == 2
+
     def test_sync_raises_if_theres_no_ApplicationInstance(
         self, application_instance_service, grouping, lti_h_svc
     ):
@@ -85,13 +137,153 @@ class TestSync:
     ):
         lti_h_svc.sync([grouping], sentinel.params)
 
-        group_info_service.upsert_group_info.assert_called_once_with(
-            grouping=grouping, params=sentinel.params
+        group_info_service.upsert_group_infos.assert_called_once_with(
+            groupings=[grouping], params=sentinel.params
+        )
+
+    @pytest.mark.usefixtures("with_async_sync", "h_has_seen_everything")
+    def test_sync_queues_the_sync_if_h_has_seen_everything(
+        self, h_api, lti_h_svc, grouping, sync_queue, h_user, group_info_service
+    ):
+        lti_h_svc.sync([grouping], sentinel.params)
+
+        h_api.execute_bulk.assert_not_called()
+        sync_queue.add.assert_called_once_with(
+            user={
+                "authority": "lms.hypothes.is",
+                "username": h_user.username,
+                "display_name": h_user.display_name,
+                "identities": [
+                    {
+                        "provider": h_user.provider,
+                        "provider_unique_id": h_user.provider_unique_id,
+                    }
+                ],
+            },
+            groups=[
+                {
+                    "authority": "lms.hypothes.is",
+                    "name": grouping.name,
+                    "authority_provided_id": grouping.authority_provided_id,
+                }
+            ],
+        )
+        group_info_service.upsert_group_infos.assert_called_once()
+
+    @pytest.mark.usefixtures("with_async_sync", "h_has_seen_everything")
+    def test_sync_doesnt_remember_queued_syncs(
+        self, lti_h_svc, grouping, sync_queue, sync_cache
+    ):
+        lti_h_svc.sync([grouping], sentinel.params)
+        lti_h_svc.sync([grouping], sentinel.params)
+
+        # The queued sync could still fail, so the next launch queues again
+        assert sync_queue.add.call_count == 2
+        assert not sync_cache.stats()["synced"]
+
+    @pytest.mark.usefixtures("with_async_sync", "h_has_seen_everything")
+    def test_sync_waits_for_h_if_h_hasnt_seen_the_user(
+        self, h_api, lti_h_svc, grouping, sync_queue, pyramid_request, db_session
+    ):
+        pyramid_request.user.h_userid = "acct:someone_else@lms.hypothes.is"
+        db_session.flush()
+
+        lti_h_svc.sync([grouping], sentinel.params)
+
+        h_api.execute_bulk.assert_called_once()
+        sync_queue.add.assert_not_called()
+
+    @pytest.mark.usefixtures("with_async_sync", "h_has_seen_everything")
+    def test_sync_waits_for_h_if_the_user_is_new(
+        self, h_api, lti_h_svc, grouping, sync_queue, pyramid_request, db_session
+    ):
+        # Recorded by this request
+        pyramid_request.user.created = func.now()
+        db_session.flush()
+
+        lti_h_svc.sync([grouping], sentinel.params)
+
+        h_api.execute_bulk.assert_called_once()
+        sync_queue.add.assert_not_called()
+
+    @pytest.mark.usefixtures("with_async_sync", "h_has_seen_everything")
+    def test_sync_waits_for_h_if_h_hasnt_seen_the_membership(
+        self, h_api, lti_h_svc, grouping, sync_queue, db_session
+    ):
+        db_session.query(GroupingMembership).delete()
+
+        lti_h_svc.sync([grouping], sentinel.params)
+
+        h_api.execute_bulk.assert_called_once()
+        sync_queue.add.assert_not_called()
+
+    @pytest.mark.usefixtures("with_async_sync", "h_has_seen_everything")
+    def test_sync_waits_for_h_if_the_membership_is_new(
+        self, h_api, lti_h_svc, grouping, sync_queue, db_session
+    ):
+        # Recorded by this request, e.g. a student opening a course they've
+        # never launched before
+        db_session.query(GroupingMembership).update(
+            {"created": func.now()}, synchronize_session=False
         )
 
+        lti_h_svc.sync([grouping], sentinel.params)
+
+        h_api.execute_bulk.assert_called_once()
+        sync_queue.add.assert_not_called()
+
+    @pytest.mark.usefixtures("with_async_sync", "h_has_seen_everything")
+    def test_sync_waits_for_h_if_h_hasnt_seen_a_group(
+        self, h_api, lti_h_svc, grouping, sync_queue
+    ):
+        lti_h_svc.sync([grouping, factories.Course()], sentinel.params)
+
+        h_api.execute_bulk.assert_called_once()
+        sync_queue.add.assert_not_called()
+
+    @pytest.mark.usefixtures("h_has_seen_everything")
+    def test_sync_doesnt_queue_if_async_sync_is_off(
+        self, h_api, lti_h_svc, grouping, sync_queue
+    ):
+        lti_h_svc.sync([grouping], sentinel.params)
+
+        h_api.execute_bulk.assert_called_once()
+        sync_queue.add.assert_not_called()
+
     @pytest.fixture
-    def lti_h_svc(self, pyramid_request):
-        return LTIHService(None, pyramid_request)
+    def with_async_sync(self, pyramid_request):
+        pyramid_request.registry.settings["h_sync_async"] = True
+
+    @pytest.fixture
+    def h_has_seen_everything(
+        self, pyramid_request, grouping, db_session, application_instance
+    ):
+        # Everything was recorded by an earlier request
+        a_while_ago = datetime.utcnow() - timedelta(days=1)
+        pyramid_request.user.application_instance = application_instance
+        pyramid_request.user.h_userid = pyramid_request.lti_user.h_user.userid(
+            "lms.hypothes.is"
+        )
+        pyramid_request.user.created = a_while_ago
+        factories.GroupingMembership(
+            grouping=grouping, user=pyramid_request.user, created=a_while_ago
+        )
+        factories.GroupInfo(authority_provided_id=grouping.authority_provided_id)
+        db_session.flush()
+
+    @pytest.fixture
+    def sync_cache(self):
+        return HSyncCache()
+
+    @pytest.fixture
+    def sync_queue(self):
+        return create_autospec(HSyncQueue, instance=True, spec_set=True)
+
+    @pytest.fixture
+    def lti_h_svc(self, pyramid_request, sync_cache, sync_queue):
+        return LTIHService(
+            None, pyramid_request, sync_cache=sync_cache, sync_queue=sync_queue
+        )
 
     @pytest.fixture
     def h_user(self, pyramid_request):
@@ -99,4 +291,4 @@ class TestSync:
 
     @pytest.fixture
     def grouping(self):
-        return create_autospec(Grouping, instance=True, spec_set=True)
+        return factories.Course()
@@ -1,9 +1,11 @@
-from unittest.mock import sentinel
+from unittest.mock import create_autospec, sentinel
 
 import pytest
+from h_matchers import Any
 
 from lms.models import LTIRegistration
 from lms.services.lti_registration import LTIRegistrationService, factory
+from lms.services.snapshot_cache import SNAPSHOT_CACHE, SnapshotCache
 from tests import factories
 
 
@@ -18,6 +20,20 @@ class TestLTIRegistrationService:
     def test_get_without_client_id(self, svc, registration):
         assert svc.get(registration.issuer) == registration
 
+    def test_get_uses_the_cache(self, db_session, registration):
+        cache = create_autospec(SnapshotCache, instance=True, spec_set=True)
+        cache.get.side_effect = lambda _db, _key, load: load()
+        svc = LTIRegistrationService(db_session, cache=cache)
+
+        result = svc.get(registration.issuer, registration.client_id)
+
+        cache.get.assert_called_once_with(
+            db_session,
+            ("lti_registration", registration.issuer, registration.client_id),
+            Any.callable(),
+        )
+        assert result == registration
+
     def test_create(self, svc, db_session):
         registration = svc.create_registration(
             "ISSUER", "CLIENT_ID", "AUTH_LOGIN_URL", "KEY_SET_URL", "TOKEN_URL"
@@ -73,7 +89,9 @@ class TestFactory:
     def test_it(self, pyramid_request, LTIRegistrationService):
         service = factory(sentinel.context, pyramid_request)
 
-        LTIRegistrationService.assert_called_once_with(pyramid_request.db)
+        LTIRegistrationService.assert_called_once_with(
+            db=pyramid_request.db, cache=SNAPSHOT_CACHE
+        )
 
         assert service == LTIRegistrationService.return_value
 
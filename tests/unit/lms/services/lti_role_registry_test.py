@@ -0,0 +1,61 @@
+import pytest
+
+from lms.services.lti_role_registry import LTIRoleRegistry, RoleRow
+from tests import factories
+
+
+class TestLTIRoleRegistry:
+    def test_get_loads_every_role_on_first_use(self, registry, db_session, roles):
+        result = registry.get(db_session, [roles[0].value, "UNKNOWN"])
+
+        assert result == {roles[0].value: self.row(roles[0])}
+        # The rest are loaded too
+        factories.LTIRole()
+        db_session.flush()
+        assert registry.get(db_session, [roles[1].value]) == {
+            roles[1].value: self.row(roles[1])
+        }
+
+    def test_get_does_not_load_again(self, registry, db_session):
+        registry.get(db_session, [])
+        role = factories.LTIRole()
+        db_session.flush()
+
+        assert not registry.get(db_session, [role.value])
+
+    def test_add(self, registry, db_session):
+        registry.get(db_session, [])
+        row = RoleRow("NEW_ROLE", 1234, "instructor")
+
+        registry.add([row])
+
+        assert registry.get(db_session, ["NEW_ROLE"]) == {"NEW_ROLE": row}
+
+    def test_add_before_loading_does_nothing(self, registry, db_session, roles):
+        registry.add([RoleRow(roles[0].value, 1234, "instructor")])
+
+        assert registry.get(db_session, [roles[0].value]) == {
+            roles[0].value: self.row(roles[0])
+        }
+
+    def test_clear(self, registry, db_session):
+        registry.get(db_session, [])
+        role = factories.LTIRole()
+        db_session.flush()
+
+        registry.clear()
+
+        assert registry.get(db_session, [role.value])
+
+    def row(self, role):
+        return RoleRow(role.value, role.id, role.type)
+
+    @pytest.fixture
+    def registry(self):
+        return LTIRoleRegistry()
+
+    @pytest.fixture
+    def roles(self, db_session):
+        roles = factories.LTIRole.create_batch(2)
+        db_session.flush()
+        return roles
@@ -1,9 +1,12 @@
-from unittest.mock import sentinel
+from unittest.mock import Mock, sentinel
 
 import pytest
+import sqlalchemy as sa
+import transaction
 from h_matchers import Any
 
 from lms.models import LTIRole
+from lms.services.lti_role_registry import LTI_ROLE_REGISTRY, LTIRoleRegistry, RoleRow
 from lms.services.lti_role_service import LTIRoleService, service_factory
 from tests import factories
 
@@ -44,11 +47,119 @@ class TestLTIRoleService:
         return factories.LTIRole.create_batch(3)
 
 
+class TestLTIRoleServiceWithRegistry:
+    def test_get_roles_from_the_registry(
+        self, svc, db_session, existing_roles, statements
+    ):
+        values = [role.value for role in existing_roles]
+        svc.get_roles(", ".join(values))
+        db_session.expunge_all()
+        statements.clear()
+
+        roles = svc.get_roles(", ".join(reversed(values)))
+
+        assert not statements
+        assert [(role.id, role.value, role.type) for role in roles] == [
+            (role.id, role.value, role.type) for role in reversed(existing_roles)
+        ]
+        assert all(role in db_session for role in roles)
+
+    def test_get_roles_uses_roles_already_in_the_session(self, svc, existing_roles):
+        svc.get_roles(existing_roles[0].value)
+
+        assert svc.get_roles(existing_roles[0].value) == [existing_roles[0]]
+
+    def test_get_roles_registers_new_roles_once_committed(
+        self, svc, registry, db_session, transaction_manager
+    ):
+        with transaction_manager:
+            (role,) = svc.get_roles("NEW_ROLE")
+            assert not registry.get(db_session, ["NEW_ROLE"])
+
+        assert registry.get(db_session, ["NEW_ROLE"]) == {
+            "NEW_ROLE": RoleRow("NEW_ROLE", role.id, role.type)
+        }
+
+    def test_get_roles_registers_roles_from_other_processes(
+        self, svc, registry, db_session, transaction_manager
+    ):
+        # Load the registry before another process creates a role
+        registry.get(db_session, [])
+        role = factories.LTIRole()
+        db_session.flush()
+
+        with transaction_manager:
+            assert svc.get_roles(role.value) == [role]
+
+        assert registry.get(db_session, [role.value])
+
+    def test_get_roles_does_not_register_roles_if_the_transaction_fails(
+        self, svc, registry, db_session, transaction_manager
+    ):
+        with pytest.raises(ValueError):
+            with transaction_manager:
+                svc.get_roles("NEW_ROLE")
+                raise ValueError()
+
+        assert not registry.get(db_session, ["NEW_ROLE"])
+
+    def test_get_roles_does_not_register_roles_if_the_commit_fails(
+        self, svc, registry, db_session, transaction_manager
+    ):
+        failing_resource = Mock(
+            commit=Mock(side_effect=ValueError), sortKey=Mock(return_value="fail")
+        )
+
+        with pytest.raises(ValueError):
+            with transaction_manager as tx:
+                tx.join(failing_resource)
+                svc.get_roles("NEW_ROLE")
+
+        assert not registry.get(db_session, ["NEW_ROLE"])
+
+    @pytest.fixture
+    def svc(self, db_session, registry, transaction_manager):
+        return LTIRoleService(
+            db_session=db_session,
+            registry=registry,
+            transaction_manager=transaction_manager,
+        )
+
+    @pytest.fixture
+    def registry(self):
+        return LTIRoleRegistry()
+
+    @pytest.fixture
+    def transaction_manager(self):
+        return transaction.TransactionManager(explicit=True)
+
+    @pytest.fixture
+    def existing_roles(self, db_session):
+        roles = factories.LTIRole.create_batch(3)
+        db_session.flush()
+        return roles
+
+    @pytest.fixture
+    def statements(self, db_session):
+        statements = []
+
+        def record(_conn, _cursor, statement, *_args):
+            statements.append(statement)
+
+        sa.event.listen(db_session.bind, "before_cursor_execute", record)
+        yield statements
+        sa.event.remove(db_session.bind, "before_cursor_execute", record)
+
+
 class TestServiceFactory:
     def test_it(self, pyramid_request, LTIRoleService):
         svc = service_factory(sentinel.context, pyramid_request)
 
-        LTIRoleService.assert_called_once_with(db_session=pyramid_request.db)
+        LTIRoleService.assert_called_once_with(
+            db_session=pyramid_request.db,
+            registry=LTI_ROLE_REGISTRY,
+            transaction_manager=pyramid_request.tm,
+        )
         assert svc == LTIRoleService.return_value
 
     @pytest.fixture
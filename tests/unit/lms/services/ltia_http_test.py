@@ -4,7 +4,13 @@ from unittest.mock import sentinel
 import pytest
 from freezegun import freeze_time
 
+from lms.services.exceptions import ExternalRequestError
 from lms.services.ltia_http import LTIAHTTPService, factory
+from lms.services.ltia_token_cache import (
+    ACCESS_TOKEN_CACHE,
+    AccessTokenCache,
+    AccessTokenKey,
+)
 from tests import factories
 
 
@@ -41,10 +47,81 @@ class TestLTIAHTTPService:
         )
         assert response == http_service.request.return_value
 
+    def test_request_reuses_the_access_token(self, svc, http_service, token_cache):
+        svc.request("GET", "https://example.com", ["SCOPE_2", "SCOPE_1"])
+        svc.request("GET", "https://example.com", ["SCOPE_1", "SCOPE_2"])
+
+        http_service.post.assert_called_once()
+        assert token_cache.stats() == {"tokens": 1, "hits": 1, "misses": 1}
+
+    def test_request_uses_different_tokens_for_different_scopes(
+        self, svc, http_service
+    ):
+        svc.request("GET", "https://example.com", ["SCOPE_1"])
+        svc.request("GET", "https://example.com", ["SCOPE_2"])
+
+        assert http_service.post.call_count == 2
+
+    @pytest.mark.parametrize("expires_in", [None, "not a number"])
+    def test_request_doesnt_cache_tokens_without_an_expiry(
+        self, svc, http_service, expires_in
+    ):
+        http_service.post.return_value.json.return_value["expires_in"] = expires_in
+
+        svc.request("GET", "https://example.com", ["SCOPE"])
+        svc.request("GET", "https://example.com", ["SCOPE"])
+
+        assert http_service.post.call_count == 2
+
+    def test_request_retries_with_a_new_token_if_the_token_is_rejected(
+        self, svc, http_service, application_instance, token_cache
+    ):
+        key = AccessTokenKey(application_instance.lti_registration.id, ("SCOPE",))
+        token_cache.get(key, lambda: ("REVOKED_TOKEN", 3600))
+        http_service.request.side_effect = [
+            ExternalRequestError(response=factories.requests.Response(status_code=401)),
+            sentinel.response,
+        ]
+
+        response = svc.request("GET", "https://example.com", ["SCOPE"])
+
+        assert response == sentinel.response
+        assert [
+            call.kwargs["headers"] for call in http_service.request.call_args_list
+        ] == [
+            {"Authorization": "Bearer REVOKED_TOKEN"},
+            {"Authorization": "Bearer NEW_TOKEN"},
+        ]
+        http_service.post.assert_called_once()
+
+    def test_request_doesnt_retry_other_errors(self, svc, http_service):
+        http_service.request.side_effect = ExternalRequestError(
+            response=factories.requests.Response(status_code=403)
+        )
+
+        with pytest.raises(ExternalRequestError):
+            svc.request("GET", "https://example.com", ["SCOPE"])
+
+        assert http_service.request.call_count == 1
+
+    @pytest.fixture(autouse=True)
+    def token_response(self, http_service):
+        http_service.post.return_value.json.return_value = {
+            "access_token": "NEW_TOKEN",
+            "expires_in": 3600,
+        }
+
+    @pytest.fixture
+    def token_cache(self):
+        return AccessTokenCache()
+
     @pytest.fixture
-    def svc(self, application_instance, jwt_service, http_service):
+    def svc(self, application_instance, jwt_service, http_service, token_cache):
         return LTIAHTTPService(
-            application_instance.lti_registration, jwt_service, http_service
+            application_instance.lti_registration,
+            jwt_service,
+            http_service,
+            token_cache,
         )
 
     @pytest.fixture
@@ -65,7 +142,10 @@ class TestFactory:
         ltia_http_service = factory(sentinel.context, pyramid_request)
 
         LTIAHTTPService.assert_called_once_with(
-            application_instance.lti_registration, jwt_service, http_service
+            application_instance.lti_registration,
+            jwt_service,
+            http_service,
+            ACCESS_TOKEN_CACHE,
         )
         assert ltia_http_service == LTIAHTTPService.return_value
 
@@ -74,8 +154,8 @@ class TestFactory:
         return patch("lms.services.ltia_http.LTIAHTTPService")
 
 
-@pytest.mark.usefixtures("db_session")
 @pytest.fixture
-def application_instance(application_instance):
+def application_instance(application_instance, db_session):
     application_instance.lti_registration = factories.LTIRegistration()
+    db_session.flush()
     return application_instance
@@ -0,0 +1,130 @@
+import threading
+from datetime import timedelta
+from unittest.mock import Mock
+
+import pytest
+from freezegun import freeze_time
+
+from lms.services.ltia_token_cache import (
+    ACCESS_TOKEN_CACHE,
+    AccessTokenCache,
+    AccessTokenKey,
+)
+
+
+class TestAccessTokenCache:
+    def test_get_fetches_a_token(self, cache, fetch):
+        assert cache.get(KEY, fetch) == "TOKEN"
+
+        fetch.assert_called_once_with()
+        assert cache.stats() == {"tokens": 1, "hits": 0, "misses": 1}
+
+    def test_get_returns_a_cached_token(self, cache, fetch):
+        cache.get(KEY, fetch)
+
+        assert cache.get(KEY, fetch) == "TOKEN"
+
+        fetch.assert_called_once_with()
+        assert cache.stats() == {"tokens": 1, "hits": 1, "misses": 1}
+
+    def test_get_keeps_tokens_for_different_keys_apart(self, cache):
+        cache.get(KEY, lambda: ("TOKEN", 3600))
+
+        assert cache.get(OTHER_KEY, lambda: ("OTHER_TOKEN", 3600)) == "OTHER_TOKEN"
+
+    @pytest.mark.parametrize(
+        "expires_in,fresh_for",
+        [
+            # Tokens are refreshed a minute before they expire
+            (3600, timedelta(minutes=59)),
+            # ... or half way through their lifetime if that's sooner
+            (60, timedelta(seconds=30)),
+        ],
+    )
+    def test_get_refreshes_tokens_before_they_expire(
+        self, cache, expires_in, fresh_for
+    ):
+        load_new_token = Mock(return_value=("NEW_TOKEN", expires_in))
+
+        with freeze_time("2022-01-01") as frozen_time:
+            cache.get(KEY, lambda: ("TOKEN", expires_in))
+
+            frozen_time.tick(fresh_for - timedelta(seconds=1))
+            assert cache.get(KEY, load_new_token) == "TOKEN"
+            load_new_token.assert_not_called()
+
+            frozen_time.tick(timedelta(seconds=1))
+            assert cache.get(KEY, load_new_token) == "NEW_TOKEN"
+
+    @pytest.mark.parametrize("expires_in", [None, 0])
+    def test_get_doesnt_cache_tokens_without_an_expiry(self, cache, expires_in):
+        cache.get(KEY, lambda: ("TOKEN", expires_in))
+
+        assert cache.get(KEY, lambda: ("NEW_TOKEN", expires_in)) == "NEW_TOKEN"
+
+    def test_get_evicts_the_least_recently_used_tokens(self):
+        cache = AccessTokenCache(max_size=1)
+        cache.get(KEY, lambda: ("TOKEN", 3600))
+
+        cache.get(OTHER_KEY, lambda: ("OTHER_TOKEN", 3600))
+
+        assert cache.get(KEY, lambda: ("NEW_TOKEN", 3600)) == "NEW_TOKEN"
+
+    def test_get_only_fetches_once_for_concurrent_callers(self, cache):
+        fetching = threading.Event()
+        release = threading.Event()
+
+        def slow_fetch():
+            fetching.set()
+            release.wait(5)
+            return "TOKEN", 3600
+
+        fetch = Mock(side_effect=slow_fetch)
+        results = []
+
+        def get():
+            results.append(cache.get(KEY, fetch))
+
+        threads = [threading.Thread(target=get) for _ in range(5)]
+        threads[0].start()
+        fetching.wait(5)
+        for thread in threads[1:]:
+            thread.start()
+        release.set()
+        for thread in threads:
+            thread.join(5)
+
+        fetch.assert_called_once_with()
+        assert results == ["TOKEN"] * 5
+
+    def test_invalidate(self, cache, fetch):
+        cache.get(KEY, fetch)
+
+        cache.invalidate(KEY)
+
+        assert cache.get(KEY, lambda: ("NEW_TOKEN", 3600)) == "NEW_TOKEN"
+
+    def test_invalidate_missing_key(self, cache):
+        cache.invalidate(KEY)
+
+    def test_clear(self, cache, fetch):
+        cache.get(KEY, fetch)
+
+        cache.clear()
+
+        assert cache.stats() == {"tokens": 0, "hits": 0, "misses": 0}
+
+    def test_there_is_a_shared_cache(self):
+        assert isinstance(ACCESS_TOKEN_CACHE, AccessTokenCache)
+
+    @pytest.fixture
+    def fetch(self):
+        return Mock(return_value=("TOKEN", 3600))
+
+    @pytest.fixture
+    def cache(self):
+        return AccessTokenCache()
+
+
+KEY = AccessTokenKey(1, ("SCOPE_1", "SCOPE_2"))
+OTHER_KEY = AccessTokenKey(1, ("SCOPE_1",))
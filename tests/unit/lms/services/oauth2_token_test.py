@@ -1,4 +1,4 @@
-from datetime import datetime
+from datetime import datetime, timedelta
 from unittest import mock
 
 import pytest
@@ -6,8 +6,12 @@ from h_matchers import Any
 from pytest import param
 
 from lms.models import OAuth2Token
-from lms.services import OAuth2TokenError
-from lms.services.oauth2_token import OAuth2TokenService, oauth2_token_service_factory
+from lms.services import ExternalRequestError, OAuth2TokenError
+from lms.services.oauth2_token import (
+    OAuth2TokenService,
+    find_expiring_tokens,
+    oauth2_token_service_factory,
+)
 from tests import factories
 
 
@@ -58,6 +62,112 @@ class TestOAuth2TokenService:
         with pytest.raises(OAuth2TokenError):
             service.get()
 
+    @pytest.mark.parametrize("expires_in", [60, -60])
+    def test_refresh_if_expiring_refreshes_expiring_tokens(
+        self, svc, oauth_token, refresh, expires_in
+    ):
+        oauth_token.expires_in = expires_in
+
+        assert svc.refresh_if_expiring(refresh)
+
+        refresh.assert_called_once_with()
+
+    @pytest.mark.parametrize(
+        "attrs",
+        [
+            {"expires_in": 3600},
+            {"expires_in": None},
+            {"refresh_token": None},
+        ],
+    )
+    def test_refresh_if_expiring_leaves_other_tokens(
+        self, svc, oauth_token, refresh, attrs
+    ):
+        for name, value in attrs.items():
+            setattr(oauth_token, name, value)
+
+        assert not svc.refresh_if_expiring(refresh)
+
+        refresh.assert_not_called()
+
+    def test_refresh_if_expiring_saves_the_new_token(
+        self, svc, oauth_token, db_session
+    ):
+        def refresh():
+            svc.save("new_access_token", "new_refresh_token", 3600)
+
+        svc.refresh_if_expiring(refresh)
+
+        # It's saved in a transaction of its own, so there's nothing left for
+        # the request to write
+        assert oauth_token not in db_session.dirty
+        assert db_session.query(
+            OAuth2Token.access_token, OAuth2Token.refresh_token, OAuth2Token.expires_in
+        ).filter_by(id=oauth_token.id).one() == (
+            "new_access_token",
+            "new_refresh_token",
+            3600,
+        )
+
+    def test_refresh_if_expiring_with_a_margin(self, svc, oauth_token, refresh):
+        oauth_token.expires_in = 600
+
+        assert svc.refresh_if_expiring(refresh, margin=timedelta(minutes=15))
+
+    def test_refresh_if_expiring_leaves_tokens_someone_else_refreshed(
+        self, svc, oauth_token, refresh, db_session
+    ):
+        svc.get()
+        # Another process refreshes the token after we loaded it
+        db_session.query(OAuth2Token).filter_by(id=oauth_token.id).update(
+            {"expires_in": 3600, "received_at": datetime.utcnow()},
+            synchronize_session=False,
+        )
+
+        assert not svc.refresh_if_expiring(refresh)
+
+        refresh.assert_not_called()
+
+    @pytest.mark.usefixtures("oauth_token")
+    def test_refresh_if_expiring_leaves_tokens_someone_else_is_refreshing(
+        self, svc, refresh, patch
+    ):
+        SESSION = patch("lms.services.oauth2_token.SESSION")
+        session = SESSION.return_value
+        query = session.query.return_value.filter_by.return_value
+        # `SKIP LOCKED` finds nothing while another process has the row locked
+        query.with_for_update.return_value.one_or_none.return_value = None
+
+        assert not svc.refresh_if_expiring(refresh)
+
+        refresh.assert_not_called()
+        session.close.assert_called_once_with()
+
+    @pytest.mark.usefixtures("oauth_token")
+    def test_refresh_if_expiring_ignores_failures(self, svc, refresh):
+        refresh.side_effect = ExternalRequestError
+
+        assert not svc.refresh_if_expiring(refresh)
+
+    def test_refresh_if_expiring_raises_if_theres_no_token(self, svc, refresh):
+        with pytest.raises(OAuth2TokenError):
+            svc.refresh_if_expiring(refresh)
+
+    @pytest.fixture
+    def oauth_token(self, db_session, lti_user, application_instance):
+        oauth_token = factories.OAuth2Token(
+            user_id=lti_user.user_id,
+            application_instance=application_instance,
+            expires_in=60,
+            received_at=datetime.utcnow(),
+        )
+        db_session.flush()
+        return oauth_token
+
+    @pytest.fixture
+    def refresh(self):
+        return mock.MagicMock()
+
     @pytest.fixture(
         params=(param(True, id="token in db"), param(False, id="token not in db"))
     )
@@ -85,6 +195,63 @@ class TestOAuth2TokenService:
         )
 
 
+class TestFindExpiringTokens:
+    def test_it(self, db_session, token):
+        assert find_expiring_tokens(db_session, **self.KWARGS) == [token]
+
+    @pytest.mark.parametrize(
+        "attrs",
+        [
+            # Doesn't expire soon
+            {"expires_in": 3600},
+            # Has already expired
+            {"expires_in": -60},
+            {"expires_in": None},
+            {"refresh_token": None},
+        ],
+    )
+    def test_it_ignores_tokens_which_cant_be_refreshed_soon(
+        self, db_session, token, attrs
+    ):
+        for name, value in attrs.items():
+            setattr(token, name, value)
+
+        assert not find_expiring_tokens(db_session, **self.KWARGS)
+
+    def test_it_ignores_users_who_havent_launched_recently(
+        self, db_session, grouping_membership
+    ):
+        grouping_membership.updated = datetime.utcnow() - timedelta(days=1)
+
+        assert not find_expiring_tokens(db_session, **self.KWARGS)
+
+    KWARGS = {
+        "margin": timedelta(minutes=10),
+        "active_since": datetime.utcnow() - timedelta(hours=2),
+    }
+
+    @pytest.fixture
+    def token(self, user):
+        return factories.OAuth2Token(
+            user_id=user.user_id,
+            application_instance=user.application_instance,
+            expires_in=300,
+            received_at=datetime.utcnow(),
+        )
+
+    @pytest.fixture
+    def user(self, application_instance):
+        return factories.User(application_instance=application_instance)
+
+    @pytest.fixture(autouse=True)
+    def grouping_membership(self, user, db_session):
+        grouping_membership = factories.GroupingMembership(
+            user=user, grouping=factories.Course()
+        )
+        db_session.flush()
+        return grouping_membership
+
+
 class TestOAuth2TokenServiceFactory:
     def test_it(self, pyramid_request, application_instance_service):
         svc = oauth2_token_service_factory(mock.sentinel.context, pyramid_request)
@@ -38,6 +38,29 @@ class TestOAuthHTTPService:
         )
         assert response == http_service.request.return_value
 
+    def test_request_refreshes_expiring_tokens_first(
+        self, svc, http_service, oauth2_token_service
+    ):
+        def refresh():
+            oauth2_token_service.get.return_value.access_token = "new_access_token"
+
+        oauth2_token_service.refresh_if_expiring.side_effect = lambda refresh: refresh()
+
+        svc.request(sentinel.method, sentinel.url, refresh=refresh)
+
+        http_service.request.assert_called_once_with(
+            sentinel.method,
+            sentinel.url,
+            headers={"Authorization": "Bearer new_access_token"},
+        )
+
+    def test_request_doesnt_refresh_without_a_refresh_function(
+        self, svc, oauth2_token_service
+    ):
+        svc.request(sentinel.method, sentinel.url)
+
+        oauth2_token_service.refresh_if_expiring.assert_not_called()
+
     def test_request_crashes_if_theres_already_an_Authorization_header(self, svc):
         with pytest.raises(AssertionError):
             svc.request(sentinel.method, sentinel.url, headers={"Authorization": "foo"})
@@ -0,0 +1,238 @@
+import threading
+from datetime import timedelta
+from unittest.mock import create_autospec
+
+import pytest
+from freezegun import freeze_time
+from h_matchers import Any
+from jwt.exceptions import PyJWKClientError
+
+from lms.services.exceptions import ExternalRequestError
+from lms.services.http import HTTPService
+from lms.services.platform_jwks import PLATFORM_JWKS, PlatformJWKSCache
+from tests import factories
+
+
+class TestPlatformJWKSCache:
+    def test_get_signing_key(self, cache, http_service):
+        key = cache.get_signing_key(KEY_SET_URL, "KID")
+
+        http_service.get.assert_called_once_with(KEY_SET_URL, timeout=(5, 10))
+        assert key.key_id == "KID"
+        assert cache.stats() == Any.dict.containing(
+            {"key_sets": 1, "hits": 0, "misses": 1, "fetches": 1}
+        )
+
+    def test_get_signing_key_uses_the_cached_key_set(self, cache, http_service):
+        cache.get_signing_key(KEY_SET_URL, "KID")
+
+        cache.get_signing_key(KEY_SET_URL, "OTHER_KID")
+
+        http_service.get.assert_called_once()
+        assert cache.stats() == Any.dict.containing(
+            {"hits": 1, "misses": 1, "fetches": 1}
+        )
+
+    def test_get_signing_key_ignores_non_signing_keys(self, cache, http_service):
+        http_service.get.return_value = response(
+            [dict(JWK, kid="ENC", use="enc"), dict(JWK, kid=None)]
+        )
+
+        with pytest.raises(PyJWKClientError):
+            cache.get_signing_key(KEY_SET_URL, "ENC")
+
+    def test_get_signing_key_refreshes_stale_key_sets_in_the_background(
+        self, cache, http_service
+    ):
+        with freeze_time("2022-01-01") as frozen_time:
+            cache.get_signing_key(KEY_SET_URL, "KID")
+            http_service.get.return_value = response([dict(JWK, kid="NEW_KID")])
+            frozen_time.tick(timedelta(hours=1))
+
+            # We get the old key straight away...
+            assert cache.get_signing_key(KEY_SET_URL, "KID").key_id == "KID"
+            wait_for_background_refresh()
+
+            # ... and the new one once the refresh is done
+            assert cache.get_signing_key(KEY_SET_URL, "NEW_KID").key_id == "NEW_KID"
+
+        assert http_service.get.call_count == 2
+        assert cache.stats()["stale_hits"] == 1
+
+    def test_get_signing_key_refreshes_a_key_set_once_at_a_time(
+        self, cache, http_service, slow_fetch
+    ):
+        with freeze_time("2022-01-01") as frozen_time:
+            cache.get_signing_key(KEY_SET_URL, "KID")
+            http_service.get.side_effect = slow_fetch
+            frozen_time.tick(timedelta(hours=1))
+            cache.get_signing_key(KEY_SET_URL, "KID")
+            slow_fetch.fetching.wait(5)
+            frozen_time.tick(timedelta(seconds=30))
+
+            cache.get_signing_key(KEY_SET_URL, "KID")
+
+            slow_fetch.release.set()
+            wait_for_background_refresh()
+
+        assert http_service.get.call_count == 2
+        assert cache.stats()["stale_hits"] == 2
+
+    def test_get_signing_key_keeps_stale_keys_if_the_refresh_fails(
+        self, cache, http_service
+    ):
+        with freeze_time("2022-01-01") as frozen_time:
+            cache.get_signing_key(KEY_SET_URL, "KID")
+            http_service.get.side_effect = ExternalRequestError()
+            frozen_time.tick(timedelta(hours=1))
+
+            cache.get_signing_key(KEY_SET_URL, "KID")
+            wait_for_background_refresh()
+
+            assert cache.get_signing_key(KEY_SET_URL, "KID").key_id == "KID"
+            wait_for_background_refresh()
+            assert cache.stats()["fetch_errors"] == 1
+
+            # We try again after a while
+            frozen_time.tick(timedelta(seconds=30))
+            cache.get_signing_key(KEY_SET_URL, "KID")
+            wait_for_background_refresh()
+            assert cache.stats()["fetch_errors"] == 2
+
+    def test_get_signing_key_refetches_key_sets_which_are_too_stale(
+        self, cache, http_service
+    ):
+        with freeze_time("2022-01-01") as frozen_time:
+            cache.get_signing_key(KEY_SET_URL, "KID")
+            http_service.get.side_effect = ExternalRequestError()
+            frozen_time.tick(timedelta(hours=24))
+
+            with pytest.raises(PyJWKClientError):
+                cache.get_signing_key(KEY_SET_URL, "KID")
+
+    def test_get_signing_key_refetches_for_unknown_kids(self, cache, http_service):
+        with freeze_time("2022-01-01") as frozen_time:
+            cache.get_signing_key(KEY_SET_URL, "KID")
+            http_service.get.return_value = response([dict(JWK, kid="NEW_KID")])
+            frozen_time.tick(timedelta(seconds=30))
+
+            key = cache.get_signing_key(KEY_SET_URL, "NEW_KID")
+
+        assert key.key_id == "NEW_KID"
+        assert http_service.get.call_count == 2
+
+    def test_get_signing_key_doesnt_refetch_for_unknown_kids_too_often(
+        self, cache, http_service
+    ):
+        with freeze_time("2022-01-01") as frozen_time:
+            cache.get_signing_key(KEY_SET_URL, "KID")
+            frozen_time.tick(timedelta(seconds=29))
+
+            with pytest.raises(PyJWKClientError):
+                cache.get_signing_key(KEY_SET_URL, "UNKNOWN_KID")
+
+        http_service.get.assert_called_once()
+
+    def test_get_signing_key_uses_key_sets_fetched_while_it_waited(
+        self, cache, http_service
+    ):
+        cache.get_signing_key(KEY_SET_URL, "KID")
+
+        # As if we'd missed the cache before the fetch above finished
+        key_set = cache._fetch(KEY_SET_URL, None)  # pylint:disable=protected-access
+
+        http_service.get.assert_called_once()
+        assert "KID" in key_set.keys
+
+    def test_get_signing_key_doesnt_keep_locks_for_failed_fetches(
+        self, cache, http_service
+    ):
+        http_service.get.side_effect = ExternalRequestError()
+
+        for i in range(3):
+            with pytest.raises(PyJWKClientError):
+                cache.get_signing_key(f"http://{i}.example.com/jwks", "KID")
+
+        assert not cache._fetch_locks  # pylint:disable=protected-access
+
+    @pytest.mark.parametrize(
+        "error",
+        [ExternalRequestError(), ValueError()],
+    )
+    def test_get_signing_key_when_the_fetch_fails(self, cache, http_service, error):
+        http_service.get.side_effect = error
+
+        with pytest.raises(PyJWKClientError):
+            cache.get_signing_key(KEY_SET_URL, "KID")
+
+        assert cache.stats() == Any.dict.containing(
+            {"key_sets": 0, "misses": 1, "fetches": 1, "fetch_errors": 1}
+        )
+
+    @pytest.mark.parametrize("data", [{}, {"keys": []}, {"keys": [{"kty": "BAD"}]}])
+    def test_get_signing_key_with_an_invalid_key_set(self, cache, http_service, data):
+        http_service.get.return_value = factories.requests.Response(json_data=data)
+
+        with pytest.raises(PyJWKClientError):
+            cache.get_signing_key(KEY_SET_URL, "KID")
+
+    def test_get_signing_key_evicts_the_least_recently_used_key_sets(
+        self, http_service
+    ):
+        cache = PlatformJWKSCache(http_service, max_size=1)
+        cache.get_signing_key(KEY_SET_URL, "KID")
+        cache.get_signing_key("http://other.example.com/jwks", "KID")
+
+        cache.get_signing_key(KEY_SET_URL, "KID")
+
+        assert http_service.get.call_count == 3
+        assert cache.stats()["key_sets"] == 1
+
+    def test_clear(self, cache):
+        cache.get_signing_key(KEY_SET_URL, "KID")
+
+        cache.clear()
+
+        assert cache.stats() == Any.dict.containing(
+            {"key_sets": 0, "misses": 0, "fetches": 0, "fetch_seconds_total": 0}
+        )
+
+    def test_there_is_a_shared_cache(self):
+        assert isinstance(PLATFORM_JWKS, PlatformJWKSCache)
+
+    @pytest.fixture
+    def http_service(self):
+        http_service = create_autospec(HTTPService, instance=True, spec_set=True)
+        http_service.get.return_value = response([JWK, dict(JWK, kid="OTHER_KID")])
+        return http_service
+
+    @pytest.fixture
+    def slow_fetch(self):
+        """Return a side effect for `http_service.get` which waits to respond."""
+        fetching, release = threading.Event(), threading.Event()
+
+        def slow_fetch(*_args, **_kwargs):
+            fetching.set()
+            release.wait(5)
+            return response([JWK])
+
+        slow_fetch.fetching, slow_fetch.release = fetching, release
+        return slow_fetch
+
+    @pytest.fixture
+    def cache(self, http_service):
+        return PlatformJWKSCache(http_service)
+
+
+def response(keys):
+    return factories.requests.Response(json_data={"keys": keys})
+
+
+def wait_for_background_refresh():
+    for thread in threading.enumerate():
+        if thread.name == "PlatformJWKSRefresh":
+            thread.join(5)
+
+
+KEY_SET_URL = "http://jwk.example.com/jwks"
+JWK = {"kid": "KID", "kty": "RSA", "n": "1000", "e": "500"}
@@ -1,21 +1,33 @@
+import hashlib
+import json
 from datetime import datetime, timedelta
-from unittest.mock import sentinel
+from unittest.mock import Mock, create_autospec, sentinel
 
 import pytest
 from cryptography.hazmat.backends import default_backend
 from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa as real_rsa
 from freezegun import freeze_time
 from h_matchers import Any
 from jose import constants
 
 from lms.models import RSAKey
-from lms.services.rsa_key import RSAKeyService, factory
+from lms.services.rsa_key import (
+    JWKS_CACHE,
+    SIGNING_KEYRING,
+    JWKSCache,
+    JWKSDocument,
+    RSAKeyService,
+    SigningKey,
+    SigningKeyring,
+    factory,
+)
 from tests import factories
 
 
 class TestAESService:
     @freeze_time("2022-1-15")
-    def test_rotate(self, svc, valid_keys, expired_keys, db_session):
+    def test_rotate(self, svc, valid_keys, expired_keys, db_session, keyring):
         # Keys created the 10th, max ages of 2 and 4 both expire valid and
         # deleted expired on the 15th.
         target_keys = 5
@@ -27,6 +39,7 @@ class TestAESService:
         assert all((key.expired for key in valid_keys))
         assert not any((key in db_session for key in expired_keys))
         assert db_session.query(RSAKey).filter_by(expired=False).count() == target_keys
+        keyring.invalidate.assert_called_once_with()
 
     @freeze_time("2022-1-11")
     @pytest.mark.usefixtures("expired_keys")
@@ -98,10 +111,72 @@ class TestAESService:
         ]
         assert keys == Any.list.containing(expected_keys).only()
 
-    def test_get_random_key(self, svc, valid_keys):
-        key = svc.get_random_key()
+    @pytest.mark.usefixtures("valid_keys", "expired_keys")
+    def test_get_public_jwks_document(self, svc):
+        document = svc.get_public_jwks_document()
 
-        assert key in valid_keys
+        assert json.loads(document.body) == {"keys": svc.get_all_public_jwks()}
+        assert document.etag == hashlib.sha256(document.body).hexdigest()
+
+    @pytest.mark.usefixtures("valid_keys")
+    def test_get_public_jwks_document_is_only_built_once(self, svc):
+        document = svc.get_public_jwks_document()
+
+        assert svc.get_public_jwks_document() is document
+
+    @pytest.mark.usefixtures("expired_keys")
+    def test_get_public_jwks_document_is_rebuilt_when_keys_change(
+        self, svc, valid_keys, db_session
+    ):
+        document = svc.get_public_jwks_document()
+
+        db_session.delete(valid_keys[0])
+        db_session.flush()
+        assert svc.get_public_jwks_document().etag != document.etag
+
+        svc.generate()
+        db_session.flush()
+        assert svc.get_public_jwks_document().etag != document.etag
+
+    @pytest.mark.usefixtures("valid_keys")
+    def test_get_public_jwks_document_isnt_rebuilt_when_keys_expire(
+        self, svc, valid_keys, db_session
+    ):
+        document = svc.get_public_jwks_document()
+
+        valid_keys[0].expired = True
+        db_session.flush()
+
+        assert svc.get_public_jwks_document() is document
+
+    def test_get_random_signing_key(self, svc, keyring):
+        key = svc.get_random_signing_key()
+
+        keyring.get_random_key.assert_called_once_with(Any.callable())
+        assert key == keyring.get_random_key.return_value
+
+    @pytest.mark.usefixtures("expired_keys")
+    def test_get_random_signing_key_loads_the_valid_keys(
+        self, svc, keyring, valid_keys, aes_service
+    ):
+        private_key = real_rsa.generate_private_key(
+            public_exponent=65537, key_size=2048, backend=default_backend()
+        )
+        aes_service.decrypt.return_value = private_key.private_bytes(
+            encoding=serialization.Encoding.PEM,
+            format=serialization.PrivateFormat.TraditionalOpenSSL,
+            encryption_algorithm=serialization.NoEncryption(),
+        )
+        svc.get_random_signing_key()
+        load = keyring.get_random_key.call_args[0][0]
+
+        keys = load()
+
+        assert [key.kid for key in keys] == Any.list.containing(
+            [key.kid for key in valid_keys]
+        ).only()
+        for key in keys:
+            assert key.private_key.private_numbers() == private_key.private_numbers()
 
     @pytest.fixture
     def valid_keys(self):
@@ -121,8 +196,16 @@ class TestAESService:
         )
 
     @pytest.fixture
-    def svc(self, db_session, aes_service):
-        return RSAKeyService(db_session, aes_service)
+    def keyring(self):
+        return create_autospec(SigningKeyring, instance=True, spec_set=True)
+
+    @pytest.fixture
+    def jwks_cache(self):
+        return JWKSCache()
+
+    @pytest.fixture
+    def svc(self, db_session, aes_service, keyring, jwks_cache):
+        return RSAKeyService(db_session, aes_service, keyring, jwks_cache)
 
     @pytest.fixture
     def jwk(self, patch):
@@ -137,9 +220,96 @@ class TestFactory:
     def test_it(self, pyramid_request, RSAKeyService, aes_service, db_session):
         rsa_key_service = factory(sentinel.context, pyramid_request)
 
-        RSAKeyService.assert_called_once_with(db_session, aes_service)
+        RSAKeyService.assert_called_once_with(
+            db_session, aes_service, SIGNING_KEYRING, JWKS_CACHE
+        )
         assert rsa_key_service == RSAKeyService.return_value
 
     @pytest.fixture
     def RSAKeyService(self, patch):
         return patch("lms.services.rsa_key.RSAKeyService")
+
+
+class TestSigningKeyring:
+    def test_get_random_key(self, keyring, load):
+        key = keyring.get_random_key(load)
+
+        load.assert_called_once_with()
+        assert key in KEYS
+
+    def test_get_random_key_spreads_usage_between_keys(self, keyring, load):
+        keys = {keyring.get_random_key(load) for _ in range(100)}
+
+        assert keys == set(KEYS)
+
+    def test_get_random_key_only_loads_once(self, keyring, load):
+        keyring.get_random_key(load)
+        keyring.get_random_key(load)
+
+        load.assert_called_once_with()
+
+    def test_get_random_key_reloads_after_the_ttl(self, keyring, load):
+        with freeze_time("2022-01-01") as frozen_time:
+            keyring.get_random_key(load)
+            frozen_time.tick(timedelta(minutes=10))
+
+            keyring.get_random_key(load)
+
+        assert load.call_count == 2
+
+    def test_get_random_key_with_no_keys(self, keyring):
+        load = Mock(return_value=[])
+
+        assert keyring.get_random_key(load) is None
+        # We don't remember that there aren't any
+        keyring.get_random_key(load)
+        assert load.call_count == 2
+
+    def test_invalidate(self, keyring, load):
+        keyring.get_random_key(load)
+
+        keyring.invalidate()
+
+        keyring.get_random_key(load)
+        assert load.call_count == 2
+
+    @pytest.fixture
+    def load(self):
+        return Mock(return_value=KEYS)
+
+    @pytest.fixture
+    def keyring(self):
+        return SigningKeyring()
+
+
+KEYS = [
+    SigningKey(kid="KID_1", private_key=sentinel.private_key_1),
+    SigningKey(kid="KID_2", private_key=sentinel.private_key_2),
+]
+
+
+class TestJWKSCache:
+    def test_get_builds_the_document(self, cache, build):
+        assert cache.get((1, 1), build) == build.return_value
+
+    def test_get_returns_the_same_version(self, cache, build):
+        cache.get((1, 1), build)
+
+        cache.get((1, 1), build)
+
+        build.assert_called_once_with()
+
+    def test_get_rebuilds_for_other_versions(self, cache, build):
+        cache.get((1, 1), build)
+
+        cache.get((2, 2), build)
+
+        assert build.call_count == 2
+
+    @pytest.fixture
+    def build(self):
+        return Mock(return_value=JWKSDocument(body=b'{"keys":[]}', etag="ETAG"))
+
+    @pytest.fixture
+    def cache(self):
+        return JWKSCache()
@@ -0,0 +1,259 @@
+from datetime import timedelta
+from unittest import mock
+from unittest.mock import MagicMock
+
+import pytest
+import sqlalchemy as sa
+
+from lms.db import SESSION
+from lms.models import ApplicationInstance, Organization
+from lms.services.snapshot_cache import (
+    SnapshotCache,
+    includeme,
+    invalidate_changes,
+    record_changes,
+)
+from tests import factories
+
+
+class TestSnapshotCache:
+    def test_get_loads_on_a_miss(self, cache, db_session, application_instance, load):
+        result = cache.get(db_session, "key", load)
+
+        load.assert_called_once_with()
+        assert result == application_instance
+        assert cache.stats() == {"entries": 1, "hits": 0, "misses": 1}
+
+    def test_get_restores_from_the_cache_without_queries(
+        self, cache, db_session, application_instance, load, statements
+    ):
+        cache.get(db_session, "key", load, related=["organization"])
+        # Like a new request with a new session
+        db_session.expunge_all()
+        load.reset_mock()
+        statements.clear()
+
+        result = cache.get(db_session, "key", load, related=["organization"])
+
+        load.assert_not_called()
+        assert result is not application_instance
+        assert result in db_session
+        assert result.consumer_key == application_instance.consumer_key
+        assert result.organization.public_id == (
+            application_instance.organization.public_id
+        )
+        assert not statements
+        assert cache.stats() == {"entries": 1, "hits": 1, "misses": 1}
+
+    def test_get_restores_missing_related_objects(
+        self, cache, db_session, application_instance, load, statements
+    ):
+        application_instance.organization = None
+        db_session.flush()
+        cache.get(db_session, "key", load, related=["organization"])
+        db_session.expunge_all()
+        statements.clear()
+
+        result = cache.get(db_session, "key", load, related=["organization"])
+
+        assert result.organization is None
+        assert not statements
+
+    def test_get_saves_changes_to_restored_objects(
+        self, cache, db_session, application_instance, load
+    ):
+        cache.get(db_session, "key", load)
+        db_session.expunge_all()
+
+        result = cache.get(db_session, "key", load)
+        result.settings.set("group", "key", "value")
+        result.lms_url = "http://new.example.com"
+        db_session.flush()
+        db_session.expire_all()
+
+        stored = db_session.query(ApplicationInstance).get(application_instance.id)
+        assert stored.settings.get("group", "key") == "value"
+        assert stored.lms_url == "http://new.example.com"
+
+    def test_changes_to_restored_objects_are_not_cached(self, cache, db_session, load):
+        cache.get(db_session, "key", load)
+        db_session.expunge_all()
+        cache.get(db_session, "key", load).settings.set("group", "key", "value")
+        db_session.expunge_all()
+
+        result = cache.get(db_session, "key", load)
+
+        assert result.settings.get("group", "key") is None
+
+    def test_get_uses_objects_already_in_the_session(
+        self, cache, db_session, application_instance, load
+    ):
+        cache.get(db_session, "key", load)
+        application_instance.lms_url = "http://pending.example.com"
+
+        result = cache.get(db_session, "key", load)
+
+        assert result is application_instance
+        assert result.lms_url == "http://pending.example.com"
+
+    def test_get_keeps_related_objects_already_in_the_session(
+        self, cache, db_session, application_instance, load
+    ):
+        cache.get(db_session, "key", load, related=["organization"])
+        organization = factories.Organization()
+        application_instance.organization = organization
+
+        result = cache.get(db_session, "key", load, related=["organization"])
+
+        assert result.organization is organization
+
+    def test_get_does_not_cache_None(self, cache, db_session):
+        assert cache.get(db_session, "key", lambda: None) is None
+        assert not cache.stats()["entries"]
+
+    def test_get_loads_again_once_the_ttl_has_passed(self, db_session, load):
+        cache = SnapshotCache(ttl=timedelta(0))
+
+        cache.get(db_session, "key", load)
+        cache.get(db_session, "key", load)
+
+        assert load.call_count == 2
+
+    def test_get_evicts_the_least_recently_used(self, db_session, load):
+        cache = SnapshotCache(max_size=2)
+
+        for key in ["a", "b", "a", "c"]:
+            cache.get(db_session, key, load)
+        load.reset_mock()
+        cache.get(db_session, "a", load)
+        load.assert_not_called()
+        cache.get(db_session, "b", load)
+
+        load.assert_called_once_with()
+
+    def test_invalidate(self, cache, db_session, application_instance, load):
+        cache.get(db_session, "key", load, related=["organization"])
+        cache.get(db_session, "other_key", load)
+
+        cache.invalidate(Organization, (application_instance.organization.id,))
+
+        assert cache.stats()["entries"] == 1
+
+    def test_clear(self, cache, db_session, load):
+        cache.get(db_session, "key", load)
+
+        cache.clear()
+
+        assert cache.stats() == {"entries": 0, "hits": 0, "misses": 0}
+
+    @pytest.fixture
+    def load(self, application_instance):
+        return MagicMock(return_value=application_instance)
+
+
+class TestInvalidation:
+    def test_it_invalidates_changed_rows(
+        self, cache, db_session, application_instance, load
+    ):
+        cache.get(db_session, "key", load, related=["organization"])
+        application_instance.organization.enabled = False
+        db_session.flush()
+
+        invalidate_changes(db_session)
+
+        assert not cache.stats()["entries"]
+
+    def test_it_invalidates_deleted_rows(
+        self, cache, db_session, application_instance, load
+    ):
+        cache.get(db_session, "key", load)
+        db_session.delete(application_instance)
+        db_session.flush()
+
+        invalidate_changes(db_session)
+
+        assert not cache.stats()["entries"]
+
+    def test_it_ignores_rows_set_to_the_same_values(
+        self, cache, db_session, application_instance, load
+    ):
+        cache.get(db_session, "key", load)
+        application_instance.lms_url = application_instance.lms_url
+        db_session.flush()
+
+        invalidate_changes(db_session)
+
+        assert cache.stats()["entries"] == 1
+
+    def test_it_ignores_rows_which_arent_cached(
+        self, cache, db_session, application_instance, load
+    ):
+        cache.get(db_session, "key", load)
+        application_instance.organization.enabled = False
+        db_session.flush()
+
+        invalidate_changes(db_session)
+
+        assert cache.stats()["entries"] == 1
+
+    def test_it_only_invalidates_once_the_transaction_is_over(
+        self, cache, db_session, application_instance, load
+    ):
+        cache.get(db_session, "key", load)
+        application_instance.lms_url = "http://new.example.com"
+        db_session.flush()
+
+        assert cache.stats()["entries"] == 1
+
+    def test_includeme(self):
+        includeme(None)
+        includeme(None)
+
+        try:
+            for identifier, listener in (
+                ("after_flush", record_changes),
+                ("after_commit", invalidate_changes),
+                ("after_rollback", invalidate_changes),
+            ):
+                assert sa.event.contains(SESSION, identifier, listener)
+        finally:
+            sa.event.remove(SESSION, "after_flush", record_changes)
+            sa.event.remove(SESSION, "after_commit", invalidate_changes)
+            sa.event.remove(SESSION, "after_rollback", invalidate_changes)
+
+    @pytest.fixture(autouse=True)
+    def with_listener(self, db_session, cache):
+        with mock.patch("lms.services.snapshot_cache.SNAPSHOT_CACHE", cache):
+            sa.event.listen(db_session, "after_flush", record_changes)
+            yield
+            sa.event.remove(db_session, "after_flush", record_changes)
+
+    @pytest.fixture
+    def load(self, application_instance):
+        return MagicMock(return_value=application_instance)
+
+
+@pytest.fixture
+def cache():
+    return SnapshotCache()
+
+
+@pytest.fixture
+def application_instance(db_session):
+    application_instance = factories.ApplicationInstance(
+        organization=factories.Organization()
+    )
+    db_session.flush()
+    return application_instance
+
+
+@pytest.fixture
+def statements(db_session):
+    statements = []
+
+    def record(_conn, _cursor, statement, *_args):
+        statements.append(statement)
+
+    sa.event.listen(db_session.bind, "before_cursor_execute", record)
+    yield statements
+    sa.event.remove(db_session.bind, "before_cursor_execute", record)
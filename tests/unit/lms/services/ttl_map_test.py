@@ -0,0 +1,100 @@
+from datetime import datetime, timedelta
+
+import pytest
+from freezegun import freeze_time
+
+from lms.services.ttl_map import TTLMap
+
+
+class TestTTLMap:
+    def test_get_with_an_unknown_key(self, ttl_map):
+        assert ttl_map.get("key") is None
+        assert ttl_map.get("key", "default") == "default"
+
+    def test_get_after_set(self, ttl_map):
+        ttl_map.set("key", "value")
+
+        assert ttl_map.get("key") == "value"
+        assert len(ttl_map) == 1
+
+    def test_get_expires_after_the_ttl(self, ttl_map):
+        with freeze_time("2022-01-01") as frozen_time:
+            ttl_map.set("key", "value")
+
+            frozen_time.tick(timedelta(minutes=1) - timedelta(seconds=1))
+            assert ttl_map.get("key") == "value"
+
+            frozen_time.tick(timedelta(seconds=1))
+            assert ttl_map.get("key", "default") == "default"
+            # Expired entries are kept until they're replaced or evicted
+            assert len(ttl_map) == 1
+
+    @pytest.mark.parametrize(
+        "expires_in,fresh_for",
+        [
+            (timedelta(seconds=30), timedelta(seconds=30)),
+            (timedelta(hours=1), timedelta(minutes=1)),
+        ],
+    )
+    def test_set_with_expires_at(self, ttl_map, expires_in, fresh_for):
+        with freeze_time("2022-01-01") as frozen_time:
+            ttl_map.set("key", "value", expires_at=datetime.utcnow() + expires_in)
+
+            frozen_time.tick(fresh_for - timedelta(seconds=1))
+            assert ttl_map.get("key") == "value"
+
+            frozen_time.tick(timedelta(seconds=1))
+            assert ttl_map.get("key") is None
+
+    def test_set_evicts_the_least_recently_used(self, ttl_map):
+        for key in ["a", "b", "c"]:
+            ttl_map.set(key, key)
+        # Use the first one so the second one is the least recently used
+        ttl_map.get("a")
+
+        ttl_map.set("d", "d")
+
+        assert ttl_map.get("b") is None
+        for key in ["a", "c", "d"]:
+            assert ttl_map.get(key) == key
+
+    def test_peek(self, ttl_map):
+        with freeze_time("2022-01-01") as frozen_time:
+            ttl_map.set("key", "value")
+            assert ttl_map.peek("key") == ("value", True)
+
+            frozen_time.tick(timedelta(minutes=1))
+            assert ttl_map.peek("key") == ("value", False)
+
+        assert ttl_map.peek("unknown") is None
+
+    def test_refresh(self, ttl_map):
+        with freeze_time("2022-01-01") as frozen_time:
+            ttl_map.set("key", "value")
+            frozen_time.tick(timedelta(minutes=5))
+
+            ttl_map.refresh("key")
+            ttl_map.refresh("unknown")
+
+            assert ttl_map.get("key") == "value"
+            assert len(ttl_map) == 1
+
+    def test_remove_if(self, ttl_map):
+        for key in ["a", "b", "c"]:
+            ttl_map.set(key, key)
+
+        ttl_map.remove_if(lambda key: key != "b")
+
+        assert ttl_map.peek("b") == ("b", True)
+        assert len(ttl_map) == 1
+
+    def test_clear(self, ttl_map):
+        ttl_map.set("key", "value")
+
+        ttl_map.clear()
+
+        assert not ttl_map
+
+    @pytest.fixture
+    def ttl_map(self):
+        return TTLMap(max_size=3, ttl=timedelta(minutes=1))
@@ -1,3 +1,4 @@
+import pytest
 import sqlalchemy as sa
 from h_matchers import Any
 
@@ -55,6 +56,116 @@ class TestBulkAction:
                 "other": model.other,
             } in expected_rows
 
+    def test_upsert_returning_entities(self, db_session):
+        existing = self.TableWithBulkUpsert(id=1, name="pre_existing", other="pre")
+        db_session.add(existing)
+        db_session.flush()
+
+        result = bulk_upsert(
+            db_session,
+            self.TableWithBulkUpsert,
+            [
+                {"id": 1, "name": "update_old", "other": "post_1"},
+                {"id": 2, "name": "create", "other": "post_2"},
+            ],
+            self.INDEX_ELEMENTS,
+            self.UPDATE_COLUMNS,
+            return_entities=True,
+        )
+
+        assert result == [
+            Any.instance_of(self.TableWithBulkUpsert).with_attrs(
+                {"id": 1, "name": "update_old", "other": "pre"}
+            ),
+            Any.instance_of(self.TableWithBulkUpsert).with_attrs(
+                {"id": 2, "name": "create", "other": "post_2"}
+            ),
+        ]
+        # The object we already had is updated in place
+        assert result[0] is existing
+
+    @pytest.mark.parametrize("return_entities", (True, False))
+    def test_upsert_in_chunks(self, db_session, monkeypatch, return_entities):
+        # Three values with three parameters each fit two to a statement
+        monkeypatch.setattr("lms.services.upsert.MAX_PARAMETERS", 6)
+        db_session.flush()
+        statements = []
+
+        @sa.event.listens_for(db_session.bind, "before_cursor_execute")
+        def count(_conn, _cursor, statement, *_args):
+            statements.append(statement)
+
+        try:
+            result = bulk_upsert(
+                db_session,
+                self.TableWithBulkUpsert,
+                [{"id": i, "name": f"name_{i}", "other": "other"} for i in range(3)],
+                self.INDEX_ELEMENTS,
+                self.UPDATE_COLUMNS,
+                return_entities=return_entities,
+            )
+        finally:
+            sa.event.remove(db_session.bind, "before_cursor_execute", count)
+
+        assert len(statements) == 2
+        assert all(
+            statement.startswith("INSERT INTO test_table_with_bulk_upsert")
+            for statement in statements
+        )
+        assert sorted(model.id for model in result) == [0, 1, 2]
+
+    def test_upsert_with_update_expressions(self, db_session):
+        db_session.add(self.TableWithBulkUpsert(id=1, name="pre_existing", other="pre"))
+        db_session.flush()
+
+        bulk_upsert(
+            db_session,
+            self.TableWithBulkUpsert,
+            [{"id": 1, "name": "update", "other": "post"}],
+            self.INDEX_ELEMENTS,
+            self.UPDATE_COLUMNS,
+            update_expressions=lambda excluded: {
+                "other": self.TableWithBulkUpsert.other + "+" + excluded.other
+            },
+        )
+
+        self.assert_has_rows(
+            db_session, {"id": 1, "name": "update", "other": "pre+post"}
+        )
+
+    def test_upsert_with_update_where(self, db_session):
+        db_session.add_all(
+            [
+                self.TableWithBulkUpsert(id=1, name="same", other="pre_1"),
+                self.TableWithBulkUpsert(id=2, name="old", other="pre_2"),
+            ]
+        )
+        db_session.flush()
+
+        result = bulk_upsert(
+            db_session,
+            self.TableWithBulkUpsert,
+            [
+                {"id": 1, "name": "same", "other": "post_1"},
+                {"id": 2, "name": "new", "other": "post_2"},
+                {"id": 3, "name": "create", "other": "post_3"},
+            ],
+            self.INDEX_ELEMENTS,
+            ["name", "other"],
+            update_where=lambda excluded: self.TableWithBulkUpsert.name
+            != excluded.name,
+            return_keys=True,
+        )
+
+        # Only the changed and new rows are written and returned
+        assert sorted(row.id for row in result) == [2, 3]
+        self.assert_has_rows(
+            db_session,
+            {"id": 1, "name": "same", "other": "pre_1"},
+            {"id": 2, "name": "new", "other": "post_2"},
+            {"id": 3, "name": "create", "other": "post_3"},
+        )
+
     def test_upsert_return_empty_query_if_given_an_empty_list_of_values(
         self, db_session
     ):
@@ -69,6 +180,32 @@ class TestBulkAction:
             == []
         )
 
+    def test_upsert_returning_entities_with_an_empty_list_of_values(self, db_session):
+        assert (
+            bulk_upsert(
+                db_session,
+                self.TableWithBulkUpsert,
+                [],
+                self.INDEX_ELEMENTS,
+                self.UPDATE_COLUMNS,
+                return_entities=True,
+            )
+            == []
+        )
+
+    def test_upsert_returning_keys_with_an_empty_list_of_values(self, db_session):
+        assert (
+            bulk_upsert(
+                db_session,
+                self.TableWithBulkUpsert,
+                [],
+                self.INDEX_ELEMENTS,
+                self.UPDATE_COLUMNS,
+                return_keys=True,
+            )
+            == []
+        )
+
     def assert_has_rows(self, db_session, *attrs):
         rows = list(db_session.query(self.TableWithBulkUpsert))
 
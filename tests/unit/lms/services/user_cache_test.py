@@ -0,0 +1,38 @@
+import pytest
+
+from lms.services.user_cache import USER_CACHE, StoredUser, UserCache
+
+
+class TestUserCache:
+    def test_is_stored_with_an_unknown_user(self, cache):
+        assert not cache.is_stored(KEY, VALUES)
+
+    def test_is_stored_after_record(self, cache):
+        cache.record(KEY, VALUES)
+
+        assert cache.is_stored(KEY, VALUES)
+        assert cache.stats() == {"users": 1, "skipped": 1, "recorded": 1}
+
+    def test_is_stored_with_different_values(self, cache):
+        cache.record(KEY, VALUES)
+
+        assert not cache.is_stored(KEY, VALUES._replace(roles="Learner"))
+
+    def test_clear(self, cache):
+        cache.record(KEY, VALUES)
+        cache.is_stored(KEY, VALUES)
+
+        cache.clear()
+
+        assert cache.stats() == {"users": 0, "skipped": 0, "recorded": 0}
+
+    def test_there_is_a_shared_cache(self):
+        assert isinstance(USER_CACHE, UserCache)
+
+    @pytest.fixture
+    def cache(self):
+        return UserCache()
+
+
+KEY = (1, "USER_ID")
+VALUES = StoredUser(roles="Instructor", h_userid="acct:user@lms.hypothes.is")
@@ -1,12 +1,14 @@
 from datetime import datetime
-from unittest.mock import sentinel
+from unittest.mock import Mock, sentinel
 
 import pytest
+import transaction
 from h_matchers import Any
 
 from lms.models import User
 from lms.services import UserService
 from lms.services.user import UserNotFound, factory
+from lms.services.user_cache import USER_CACHE, StoredUser, UserCache
 from tests import factories
 
 
@@ -38,6 +40,72 @@ class TestUserService:
         assert saved_user.roles == lti_user.roles
         assert user == saved_user
 
+    def test_upsert_user_records_the_user_once_committed(
+        self, service_with_cache, cache, lti_user, transaction_manager
+    ):
+        with transaction_manager:
+            user = service_with_cache.upsert_user(lti_user)
+            assert not cache.stats()["users"]
+
+        assert cache.is_stored(
+            (lti_user.application_instance_id, lti_user.user_id),
+            StoredUser(user.roles, user.h_userid),
+        )
+
+    def test_upsert_user_does_not_record_the_user_if_the_transaction_fails(
+        self, service_with_cache, cache, lti_user, transaction_manager
+    ):
+        with pytest.raises(ValueError):
+            with transaction_manager:
+                service_with_cache.upsert_user(lti_user)
+                raise ValueError()
+
+        assert not cache.stats()["users"]
+
+    def test_upsert_user_does_not_record_the_user_if_the_commit_fails(
+        self, service_with_cache, cache, lti_user, transaction_manager
+    ):
+        failing_resource = Mock(
+            commit=Mock(side_effect=ValueError), sortKey=Mock(return_value="fail")
+        )
+
+        with pytest.raises(ValueError):
+            with transaction_manager as tx:
+                tx.join(failing_resource)
+                service_with_cache.upsert_user(lti_user)
+
+        assert not cache.stats()["users"]
+
+    def test_upsert_user_if_changed_skips_recently_stored_users(
+        self, service_with_cache, cache, lti_user, db_session
+    ):
+        cache.record(
+            (lti_user.application_instance_id, lti_user.user_id),
+            StoredUser(lti_user.roles, lti_user.h_user.userid("authority.example.com")),
+        )
+        db_session.flush()
+        user_count = db_session.query(User).count()
+
+        assert service_with_cache.upsert_user_if_changed(lti_user) is None
+        assert db_session.query(User).count() == user_count
+
+    def test_upsert_user_if_changed_stores_changed_users(
+        self, service_with_cache, cache, user, lti_user, db_session, transaction_manager
+    ):
+        cache.record(
+            (lti_user.application_instance_id, lti_user.user_id),
+            StoredUser(user.roles, user.h_userid),
+        )
+
+        with transaction_manager:
+            stored_user = service_with_cache.upsert_user_if_changed(lti_user)
+
+        assert stored_user == user
+        assert db_session.query(User).get(user.id).roles == lti_user.roles
+
+    def test_upsert_user_if_changed_without_a_cache(self, service, lti_user):
+        assert service.upsert_user_if_changed(lti_user) == Any.instance_of(User)
+
     def test_get(self, user, service):
         db_user = service.get(user.application_instance, user.user_id)
 
@@ -60,13 +128,33 @@ class TestUserService:
     def service(self, db_session):
         return UserService(db_session, h_authority="authority.example.com")
 
+    @pytest.fixture
+    def service_with_cache(self, db_session, cache, transaction_manager):
+        return UserService(
+            db_session,
+            h_authority="authority.example.com",
+            cache=cache,
+            transaction_manager=transaction_manager,
+        )
+
+    @pytest.fixture
+    def cache(self):
+        return UserCache()
+
+    @pytest.fixture
+    def transaction_manager(self):
+        return transaction.TransactionManager(explicit=True)
+
 
 class TestFactory:
     def test_it(self, pyramid_request, UserService):
         user_service = factory(sentinel.context, pyramid_request)
 
         UserService.assert_called_once_with(
-            pyramid_request.db, pyramid_request.registry.settings["h_authority"]
+            pyramid_request.db,
+            pyramid_request.registry.settings["h_authority"],
+            cache=USER_CACHE,
+            transaction_manager=pyramid_request.tm,
         )
         assert user_service == UserService.return_value
 
@@ -20,13 +20,12 @@ def xml_like(body):
 
 
 class TestVitalSourceClient:
-    def test_init(self):
-        client = VitalSourceClient(api_key=sentinel.api_key)
+    def test_init(self, HTTPService):
+        VitalSourceClient(api_key=sentinel.api_key)
 
-        # pylint: disable=protected-access
-        assert client._http_session.session.headers == {
-            "X-VitalSource-API-Key": sentinel.api_key
-        }
+        HTTPService.assert_called_once_with(
+            headers={"X-VitalSource-API-Key": sentinel.api_key}
+        )
 
     def test_init_raises_if_launch_credentials_invalid(self):
         with pytest.raises(ValueError):
@@ -248,9 +247,11 @@ class TestVitalSourceClient:
         return VitalSourceClient("api_key")
 
     @pytest.fixture(autouse=True)
-    def http_service(self, patch):
-        HTTPService = patch("lms.services.vitalsource._client.HTTPService")
+    def HTTPService(self, patch):
+        return patch("lms.services.vitalsource._client.HTTPService")
 
+    @pytest.fixture
+    def http_service(self, HTTPService):
         return HTTPService.return_value
 
     @pytest.fixture
@@ -0,0 +1,48 @@
+import json
+from contextlib import contextmanager
+from unittest.mock import sentinel
+
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from lms.tasks.event import create_event_partitions, insert_events
+
+
+def test_insert_events(event_service):
+    insert_events(sentinel.payloads)
+
+    event_service.insert_events.assert_called_once_with(sentinel.payloads)
+
+
+def test_insert_events_only_retries_operational_errors():
+    assert insert_events.autoretry_for == (OperationalError,)
+
+
+def test_insert_events_logs_the_events_it_drops(caplog):
+    insert_events.on_failure(ValueError(), "TASK_ID", [[PAYLOAD]], {}, None)
+
+    assert caplog.messages == [
+        f"Dropped 1 events which couldn't be written: {json.dumps([PAYLOAD])}"
+    ]
+
+
+def test_create_event_partitions(event_partition_service):
+    create_event_partitions()
+
+    event_partition_service.create_partitions.assert_called_once_with()
+
+
+@pytest.fixture(autouse=True)
+def app(patch, pyramid_request):
+    app = patch("lms.tasks.event.app")
+
+    @contextmanager
+    def request_context():
+        yield pyramid_request
+
+    app.request_context = request_context
+
+    return app
+
+
+PAYLOAD = {"type": "audit", "user_id": 1}
@@ -0,0 +1,43 @@
+from contextlib import contextmanager
+
+import pytest
+from h_api.bulk_api import CommandBuilder
+from h_matchers import Any
+
+from lms.tasks.h_api import sync_to_h
+
+
+def test_sync_to_h(h_api):
+    commands = [
+        CommandBuilder.group.upsert(
+            {
+                "authority": "lms.hypothes.is",
+                "name": "Group",
+                "authority_provided_id": "1",
+            },
+            "group_0",
+        ),
+    ]
+
+    sync_to_h([command.raw for command in commands])
+
+    h_api.execute_bulk.assert_called_once_with(
+        commands=[Any.instance_of(type(commands[0]))]
+    )
+    _, kwargs = h_api.execute_bulk.call_args
+    assert [command.raw for command in kwargs["commands"]] == [
+        command.raw for command in commands
+    ]
+
+
+@pytest.fixture(autouse=True)
+def app(patch, pyramid_request):
+    app = patch("lms.tasks.h_api.app")
+
+    @contextmanager
+    def request_context():
+        yield pyramid_request
+
+    app.request_context = request_context
+
+    return app
@@ -0,0 +1,142 @@
+from contextlib import contextmanager
+from datetime import datetime
+from unittest.mock import sentinel
+
+import pytest
+from freezegun import freeze_time
+from h_matchers import Any
+
+from lms.models import LTIUser
+from lms.services import ApplicationInstanceNotFound
+from lms.tasks.oauth2_token import (
+    REFRESH_MARGIN,
+    refresh_expiring_tokens,
+    refresh_token,
+)
+from tests import factories
+
+
+class TestRefreshExpiringTokens:
+    @freeze_time("2022-01-01 12:00:00")
+    def test_it(self, pyramid_request, find_expiring_tokens, refresh_token_task):
+        tokens = factories.OAuth2Token.build_batch(2)
+        find_expiring_tokens.return_value = tokens
+
+        refresh_expiring_tokens()
+
+        find_expiring_tokens.assert_called_once_with(
+            pyramid_request.db,
+            margin=REFRESH_MARGIN,
+            active_since=datetime(2022, 1, 1, 10),
+        )
+        assert refresh_token_task.delay.call_args_list == [
+            ((token.application_instance_id, token.user_id),) for token in tokens
+        ]
+
+    @pytest.fixture(autouse=True)
+    def find_expiring_tokens(self, patch):
+        return patch("lms.tasks.oauth2_token.find_expiring_tokens")
+
+    @pytest.fixture(autouse=True)
+    def refresh_token_task(self, patch):
+        return patch("lms.tasks.oauth2_token.refresh_token")
+
+
+class TestRefreshToken:
+    def test_it_refreshes_canvas_tokens(
+        self,
+        pyramid_request,
+        application_instance,
+        oauth2_token_service,
+        canvas_api_client,
+    ):
+        application_instance.tool_consumer_info_product_family_code = "canvas"
+
+        self.refresh(pyramid_request, oauth2_token_service)
+
+        canvas_api_client.get_refreshed_token.assert_called_once_with(
+            oauth2_token_service.get.return_value.refresh_token
+        )
+
+    def test_it_refreshes_blackboard_tokens(
+        self,
+        pyramid_request,
+        application_instance,
+        oauth2_token_service,
+        blackboard_api_client,
+    ):
+        application_instance.tool_consumer_info_product_family_code = "BlackboardLearn"
+
+        self.refresh(pyramid_request, oauth2_token_service)
+
+        blackboard_api_client.refresh_access_token.assert_called_once_with()
+
+    def test_it_refreshes_d2l_tokens(
+        self,
+        pyramid_request,
+        application_instance,
+        oauth2_token_service,
+        d2l_api_client,
+    ):
+        application_instance.tool_consumer_info_product_family_code = "desire2learn"
+
+        self.refresh(pyramid_request, oauth2_token_service)
+
+        d2l_api_client.refresh_access_token.assert_called_once_with()
+
+    def test_it_sets_the_lti_user(self, pyramid_request, application_instance):
+        refresh_token(application_instance.id, sentinel.user_id)
+
+        assert pyramid_request.lti_user == Any.instance_of(LTIUser).with_attrs(
+            {
+                "user_id": sentinel.user_id,
+                "application_instance_id": application_instance.id,
+            }
+        )
+
+    def test_it_does_nothing_for_other_LMSes(
+        self, application_instance, oauth2_token_service
+    ):
+        application_instance.tool_consumer_info_product_family_code = "moodle"
+
+        refresh_token(application_instance.id, sentinel.user_id)
+
+        oauth2_token_service.refresh_if_expiring.assert_not_called()
+
+    def test_it_does_nothing_without_an_application_instance(
+        self, application_instance_service, oauth2_token_service
+    ):
+        application_instance_service.get_current.side_effect = (
+            ApplicationInstanceNotFound
+        )
+
+        refresh_token(sentinel.application_instance_id, sentinel.user_id)
+
+        oauth2_token_service.refresh_if_expiring.assert_not_called()
+
+    @staticmethod
+    def refresh(pyramid_request, oauth2_token_service):
+        """Run the task and call the refresh function it gives the service."""
+        refresh_token(pyramid_request.lti_user.application_instance_id, "USER_ID")
+
+        oauth2_token_service.refresh_if_expiring.assert_called_once_with(
+            Any.function(), margin=REFRESH_MARGIN
+        )
+        oauth2_token_service.refresh_if_expiring.call_args[0][0]()
+
+    @pytest.fixture(autouse=True)
+    def application_instance_service(self, application_instance_service):
+        return application_instance_service
+
+
+@pytest.fixture(autouse=True)
+def app(patch, pyramid_request):
+    app = patch("lms.tasks.oauth2_token.app")
+
+    @contextmanager
+    def request_context():
+        yield pyramid_request
+
+    app.request_context = request_context
+
+    return app
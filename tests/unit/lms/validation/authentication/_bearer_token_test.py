@@ -1,7 +1,11 @@
 import datetime
 
+import jwt
 import pytest
+from freezegun import freeze_time
+from pyramid.request import Request
 
+from lms.services.bearer_token_cache import BearerTokenCache
 from lms.services.exceptions import ExpiredJWTError, InvalidJWTError
 from lms.validation import ValidationError
 from lms.validation.authentication import (
@@ -89,10 +93,26 @@ class TestBearerTokenSchema:
             "headers": {param: ["Missing data for required field."]},
         }
 
+    @pytest.mark.parametrize(
+        "location,request_kwargs",
+        [
+            ("headers", {"headers": {"Authorization": "Bearer ENCODED_JWT"}}),
+            ("querystring", {"path": "/?authorization=Bearer%20ENCODED_JWT"}),
+            ("form", {"POST": {"authorization": "Bearer ENCODED_JWT"}}),
+            (None, {}),
+            (None, {"headers": {"Authorization": "Basic CREDENTIALS"}}),
+        ],
+    )
+    def test_authorization_location(self, location, request_kwargs):
+        request_kwargs.setdefault("path", "/")
+        request = Request.blank(**request_kwargs)
+
+        assert BearerTokenSchema.authorization_location(request) == location
+
     @pytest.fixture
     def schema(self, pyramid_request):
         """Return a BearerTokenSchema configured with the right secret."""
-        return BearerTokenSchema(pyramid_request)
+        return BearerTokenSchema(pyramid_request, token_cache=None)
 
     @pytest.fixture
     def pyramid_request(self, pyramid_request):
@@ -105,3 +125,60 @@ class TestBearerTokenSchema:
         jwt_service.encode_with_secret.return_value = "ENCODED_JWT"
 
         return jwt_service
+
+
+class TestBearerTokenSchemaWithTokenCache:
+    def test_it_caches_verified_tokens(self, lti_user, schema, jwt_service):
+        assert schema.lti_user(location="headers") == lti_user
+        assert schema.lti_user(location="headers") == lti_user
+
+        jwt_service.decode_with_secret.assert_called_once()
+
+    def test_cached_tokens_expire_with_the_token(
+        self, schema, jwt_service, frozen_time
+    ):
+        schema.lti_user(location="headers")
+
+        frozen_time.tick(datetime.timedelta(seconds=30))
+        jwt_service.decode_with_secret.side_effect = ExpiredJWTError()
+
+        with pytest.raises(ExpiredSessionTokenError):
+            schema.lti_user(location="headers")
+
+    def test_it_does_not_cache_invalid_tokens(self, schema, jwt_service, token_cache):
+        jwt_service.decode_with_secret.side_effect = InvalidJWTError()
+
+        with pytest.raises(InvalidSessionTokenError):
+            schema.lti_user(location="headers")
+
+        assert not token_cache.stats()["tokens"]
+
+    @pytest.fixture
+    def schema(self, pyramid_request, token_cache):
+        return BearerTokenSchema(pyramid_request, token_cache=token_cache)
+
+    @pytest.fixture
+    def token_cache(self):
+        return BearerTokenCache()
+
+    @pytest.fixture
+    def pyramid_request(self, pyramid_request, frozen_time):
+        # pylint:disable=unused-argument
+        token = jwt.encode(
+            {"exp": datetime.datetime.utcnow() + datetime.timedelta(seconds=30)},
+            "test_secret",
+            algorithm="HS256",
+        )
+        pyramid_request.headers["authorization"] = f"Bearer {token}"
+        return pyramid_request
+
+    @pytest.fixture
+    def frozen_time(self):
+        with freeze_time("2022-01-01 00:00:00") as frozen_time:
+            yield frozen_time
+
+    @pytest.fixture(autouse=True)
+    def jwt_service(self, jwt_service, lti_user):
+        jwt_service.decode_with_secret.return_value = lti_user._asdict()
+
+        return jwt_service
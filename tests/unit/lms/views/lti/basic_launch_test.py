@@ -23,12 +23,11 @@ class TestHasDocumentURL:
 
 
 @pytest.mark.usefixtures(
-    "assignment_service",
     "application_instance_service",
     "grading_info_service",
+    "launch_persistence_service",
     "lti_h_service",
     "lti_role_service",
-    "grouping_service",
 )
 class TestBasicLaunchViews:
     def test___init___(self, context, pyramid_request):
@@ -169,9 +168,8 @@ class TestBasicLaunchViews:
         pyramid_request,
         context,
         lti_h_service,
-        assignment_service,
+        launch_persistence_service,
         lti_role_service,
-        grouping_service,
     ):
         # pylint: disable=protected-access
         result = svc._show_document(
@@ -182,13 +180,14 @@ class TestBasicLaunchViews:
             [context.course], pyramid_request.lti_params
         )
 
-        # `_record_course()`
-        grouping_service.upsert_grouping_memberships.assert_called_once_with(
-            user=pyramid_request.user, groups=[context.course]
-        )
-
         # `_record_assignment()`
-        assignment_service.upsert_assignment.assert_called_once_with(
+        lti_role_service.get_roles.assert_called_once_with(
+            pyramid_request.lti_params["roles"]
+        )
+        launch_persistence_service.record_assignment_launch.assert_called_once_with(
+            course=context.course,
+            user=pyramid_request.user,
+            lti_roles=lti_role_service.get_roles.return_value,
             tool_consumer_instance_guid=pyramid_request.lti_params[
                 "tool_consumer_instance_guid"
             ],
@@ -198,19 +197,7 @@ class TestBasicLaunchViews:
             is_gradable=False,
             extra=sentinel.assignment_extra,
         )
-        assignment = assignment_service.upsert_assignment.return_value
-
-        lti_role_service.get_roles.assert_called_once_with(
-            pyramid_request.lti_params["roles"]
-        )
-        assignment_service.upsert_assignment_membership.assert_called_once_with(
-            assignment=assignment,
-            user=pyramid_request.user,
-            lti_roles=lti_role_service.get_roles.return_value,
-        )
-        assignment_service.upsert_assignment_groupings.assert_called_once_with(
-            assignment_id=assignment.id, groupings=[context.course]
-        )
+        assignment = launch_persistence_service.record_assignment_launch.return_value
 
         context.js_config.enable_lti_launch_mode.assert_called_once_with(assignment)
         context.js_config.set_focused_user.assert_not_called()
@@ -312,15 +299,15 @@ class TestBasicLaunchViews:
         context.js_config.add_canvas_speedgrader_settings.assert_not_called()
 
     @pytest.fixture
-    def with_gradable_assignment(self, assignment_service):
-        assignment_service.upsert_assignment.return_value = factories.Assignment(
-            is_gradable=True
+    def with_gradable_assignment(self, launch_persistence_service):
+        launch_persistence_service.record_assignment_launch.return_value = (
+            factories.Assignment(is_gradable=True)
         )
 
     @pytest.fixture
-    def with_non_gradable_assignment(self, assignment_service):
-        assignment_service.upsert_assignment.return_value = factories.Assignment(
-            is_gradable=False
+    def with_non_gradable_assignment(self, launch_persistence_service):
+        launch_persistence_service.record_assignment_launch.return_value = (
+            factories.Assignment(is_gradable=False)
         )
 
     @pytest.fixture
@@ -1,8 +1,46 @@
+import pytest
+from pyramid.httpexceptions import HTTPNotModified
+from webob.etag import ETagMatcher, NoETag
+
+from lms.services.rsa_key import JWKSDocument
 from lms.views.lti.jwk import jwks
 
 
 def test_jwks(rsa_key_service, pyramid_request):
-    result = jwks(pyramid_request)
+    pyramid_request.if_none_match = NoETag
+
+    response = jwks(pyramid_request)
+
+    rsa_key_service.get_public_jwks_document.assert_called_once_with()
+    assert response.body == b'{"keys":[]}'
+    assert response.content_type == "application/json"
+    assert response.etag == "ETAG"
+    assert response.cache_control.public
+    assert response.cache_control.max_age == 300
+
+
+def test_jwks_when_the_document_hasnt_changed(pyramid_request):
+    pyramid_request.if_none_match = ETagMatcher(["ETAG"])
+
+    response = jwks(pyramid_request)
+
+    assert isinstance(response, HTTPNotModified)
+    assert response.etag == "ETAG"
+    assert response.cache_control.max_age == 300
+
+
+def test_jwks_when_the_document_has_changed(pyramid_request):
+    pyramid_request.if_none_match = ETagMatcher(["OLD_ETAG"])
+
+    response = jwks(pyramid_request)
+
+    assert response.status_code == 200
+    assert response.body == b'{"keys":[]}'
+
 
-    rsa_key_service.get_all_public_jwks.assert_called_once_with()
-    assert result == {"keys": rsa_key_service.get_all_public_jwks.return_value}
+@pytest.fixture(autouse=True)
+def rsa_key_service(rsa_key_service):
+    rsa_key_service.get_public_jwks_document.return_value = JWKSDocument(
+        body=b'{"keys":[]}', etag="ETAG"
+    )
+    return rsa_key_service
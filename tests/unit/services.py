@@ -17,6 +17,7 @@ from lms.services.canvas_api import CanvasAPIClient
 from lms.services.course import CourseService
 from lms.services.d2l_api import D2LAPIClient
 from lms.services.event import EventService
+from lms.services.event_partition import EventPartitionService
 from lms.services.file import FileService
 from lms.services.grading_info import GradingInfoService
 from lms.services.grant_token import GrantTokenService
@@ -26,6 +27,7 @@ from lms.services.h_api import HAPI
 from lms.services.http import HTTPService
 from lms.services.jstor import JSTORService
 from lms.services.jwt import JWTService
+from lms.services.launch_persistence import LaunchPersistenceService
 from lms.services.launch_verifier import LaunchVerifier
 from lms.services.lti_grading import LTIGradingService
 from lms.services.lti_h import LTIHService
@@ -54,6 +56,7 @@ __all__ = (
     "d2l_api_client",
     "document_url_service",
     "event_service",
+    "event_partition_service",
     "file_service",
     "grading_info_service",
     "grant_token_service",
@@ -63,6 +66,7 @@ __all__ = (
     "http_service",
     "jstor_service",
     "jwt_service",
+    "launch_persistence_service",
     "launch_verifier",
     "lti_grading_service",
     "lti_h_service",
@@ -168,6 +172,11 @@ def event_service(mock_service):
     return mock_service(EventService)
 
 
+@pytest.fixture
+def event_partition_service(mock_service):
+    return mock_service(EventPartitionService)
+
+
 @pytest.fixture
 def file_service(mock_service):
     return mock_service(FileService, service_name="file")
@@ -219,6 +228,11 @@ def jwt_service(mock_service):
     return mock_service(JWTService)
 
 
+@pytest.fixture
+def launch_persistence_service(mock_service):
+    return mock_service(LaunchPersistenceService)
+
+
 @pytest.fixture
 def oauth_http_service(mock_service):
     oauth_http_service = mock_service(OAuthHTTPService, service_name="oauth_http")